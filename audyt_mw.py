@@ -1,22 +1,28 @@
 # Plik: audyt_mw.py
-# Wersja: 0.9.0
+# Wersja: 1.0.0
 # Opis: Potrójny audyt kodu "MW" (Warsztat Menager) – szybki, głęboki i ryzyka.
 #  - Przechodzi po katalogu projektu, skanuje pliki .py (i ważne .json)
 #  - 3 przebiegi:
 #       1) FAST: składnia, nagłówki (# Plik, # Wersja), zakazane wzorce
 #       2) DEEP: AST – importy, graf zależności, cykle, zduplikowane definicje, proste unused imports
 #       3) RISK: heurystyki miejsc ryzyka w GUI (tkinter), gołe excepty, eval/exec, wildcard importy
+#  - Każdy plik jest czytany i parsowany RAZ (analyze_file); wyniki trzech przebiegów
+#    liczone są w jednym przejściu, równolegle w puli procesów
+#  - Wyniki per plik trafiają do .audit_mw_cache.json (klucz: ścieżka, mtime, rozmiar, sha1);
+#    tryb --incremental analizuje ponownie tylko pliki zmienione od ostatniego raportu
 #  - Tworzy: audit_mw_report.json + audit_mw_report.md z wnioskami i sugestiami
 #  - Opcjonalnie weryfikuje config.json, data/maszyny.json, uzytkownicy.json jeśli występują
 # Użycie:
-#   python audyt_mw.py "C:\\ścieżka\\do\\MW"
+#   python audyt_mw.py "C:\\ścieżka\\do\\MW" [--incremental] [--workers N]
 #   (bez argumentu – bierze bieżący katalog)
 
 from __future__ import annotations
-import os, re, sys, json, ast, traceback
-from collections import defaultdict, Counter, deque
+import os, re, sys, json, ast, hashlib
+from bisect import bisect_left
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Set, Tuple, Optional
+from typing import Any, List, Dict, Set, Tuple, Optional
 
 from utils.path_utils import cfg_path
 
@@ -35,6 +41,155 @@ GUI_RISK_HINTS = [
     (re.compile(r"after\(\s*\d+\s*,"), "Użycie .after(...) – sprawdź, czy nie gubi referencji i czy czyszczone przy zamykaniu"),
 ]
 
+RISK_PATTERNS = [
+    (re.compile(r"except\s*:\s*"), 'WARN', 'ERROR-HANDLING', 'Goły except – dodaj konkretny wyjątek i logowanie'),
+    (re.compile(r"\b(TODO|FIXME|HACK)\b"), 'INFO', 'TODO', 'Znacznik TODO/FIXME/HACK – rozważ zaplanowanie zadania'),
+]
+
+CACHE_NAME = '.audit_mw_cache.json'
+ANALYZER_VERSION = 1          # zmiana reguł analizy -> unieważnia cache
+PARALLEL_MIN_FILES = 16       # mniej plików – analiza w bieżącym procesie
+
+
+class LineIndex:
+    """Tablica pozycji znaków nowej linii – numer linii dla offsetu w O(log n)."""
+
+    def __init__(self, text: str):
+        self._newlines = [m.start() for m in re.finditer('\n', text)]
+
+    def line_of(self, pos: int) -> int:
+        # to samo co text.count('\n', 0, pos) + 1
+        return bisect_left(self._newlines, pos) + 1
+
+
+def _read_headers(text: str) -> Tuple[bool, bool, Optional[str], Optional[str]]:
+    name = ver = None
+    has_hf = has_hv = False
+    for line in text.splitlines()[:15]:
+        if not has_hf:
+            m = HEADER_FILE_RE.match(line.strip())
+            if m:
+                has_hf = True
+                name = m.group('name').strip()
+        if not has_hv:
+            m = HEADER_VER_RE.match(line.strip())
+            if m:
+                has_hv = True
+                ver = m.group('ver').strip()
+    return has_hf, has_hv, name, ver
+
+
+def _collect_imports(tree: ast.AST) -> List[str]:
+    mods = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                mods.append(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            if node.module:
+                mods.append(node.module)
+    return sorted(set(mods))
+
+
+def _collect_defs(tree: ast.AST) -> List[str]:
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.append(node.name)
+    return sorted(set(names))
+
+
+def _unused_imports(tree: ast.AST) -> List[str]:
+    imported_names = set()
+    used_names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imported_names.add(alias.asname or alias.name.split('.')[0])
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                imported_names.add(alias.asname or alias.name)
+        elif isinstance(node, ast.Name):
+            used_names.add(node.id)
+    return sorted(imported_names - used_names)
+
+
+def analyze_file(path: str, data: Optional[bytes] = None) -> Dict[str, Any]:
+    """Pełna analiza jednego pliku .py w jednym odczycie i jednym ``ast.parse``.
+
+    Zwraca słownik gotowy do JSON (cache) i do przesłania z procesu roboczego:
+    ``summary`` (pola FileSummary) oraz listy problemów ``fast``/``unused``/``risk``
+    w postaci ``[severity, kind, message, line]``.
+    """
+    fast: List[list] = []
+    if data is None:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except Exception as e:
+            data = None
+            fast.append(['ERROR', 'IO', f'Błąd czytania: {e}', None])
+    text = ''
+    if data is not None:
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            fast.append(['ERROR', 'IO', f'Błąd czytania: {e}', None])
+    has_hf, has_hv, dname, dver = _read_headers(text)
+
+    tree = None
+    try:
+        tree = ast.parse(text)
+    except SyntaxError as e:
+        fast.append(['ERROR', 'SYNTAX', f"{e.msg}", e.lineno or None])
+    except Exception as e:
+        fast.append(['ERROR', 'SYNTAX', f"{e}", None])
+
+    imports = _collect_imports(tree) if tree else []
+    defs = _collect_defs(tree) if tree else []
+    unused = _unused_imports(tree) if tree else []
+
+    if not has_hf:
+        fast.append(['WARN', 'HEADER', 'Brak nagłówka # Plik: ...', None])
+    if not has_hv:
+        fast.append(['WARN', 'HEADER', 'Brak nagłówka # Wersja: ...', None])
+    if has_hf and dname:
+        base = os.path.basename(path)
+        if dname.strip() != base:
+            fast.append(['INFO', 'HEADER', f"Nagłówek # Plik wskazuje '{dname}', ale plik to '{base}'", None])
+
+    lines = LineIndex(text)
+    for regex, desc in FORBIDDEN_PATTERNS:
+        for m in regex.finditer(text):
+            fast.append(['ERROR', 'SECURITY', f"{desc}", lines.line_of(m.start())])
+    for regex, desc in GUI_RISK_HINTS:
+        for m in regex.finditer(text):
+            fast.append(['INFO', 'GUI', f"{desc}", lines.line_of(m.start())])
+    risk: List[list] = []
+    for regex, severity, kind, desc in RISK_PATTERNS:
+        for m in regex.finditer(text):
+            risk.append([severity, kind, desc, lines.line_of(m.start())])
+
+    return {
+        'summary': {
+            'has_header_file': has_hf, 'has_header_ver': has_hv,
+            'declared_name': dname, 'declared_ver': dver,
+            'syntax_ok': tree is not None, 'defs': defs, 'imports': imports,
+        },
+        'fast': fast,
+        'unused': unused,
+        'risk': risk,
+    }
+
+
+def _file_sig(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 @dataclass
 class FileIssue:
     file: str
@@ -55,14 +210,19 @@ class FileSummary:
     imports: List[str]
 
 class AudytMW:
-    def __init__(self, root: str):
+    def __init__(self, root: str, workers: Optional[int] = None, incremental: bool = False):
         self.root = os.path.abspath(root)
+        self.workers = workers
+        self.incremental = incremental
         self.py_files: List[str] = []
         self.json_files: List[str] = []
         self.issues: List[FileIssue] = []
         self.summaries: Dict[str, FileSummary] = {}
         self.import_graph: Dict[str, Set[str]] = defaultdict(set)
         self.name_index: Dict[str, List[str]] = defaultdict(list)  # def name -> [files]
+        self.results: Optional[Dict[str, Dict[str, Any]]] = None
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self.reused: List[str] = []     # pliki wzięte z cache (bez analizy)
 
     # ---------- DISCOVERY ----------
     def discover(self):
@@ -78,46 +238,93 @@ class AudytMW:
         self.py_files.sort()
         self.json_files.sort()
 
+    # ---------- ANALIZA (jeden odczyt i parse na plik) ----------
+    def analyze(self) -> Dict[str, Dict[str, Any]]:
+        """Przeanalizuj wszystkie pliki raz; wyniki współdzielą trzy przebiegi."""
+        if self.results is not None:
+            return self.results
+        if self.incremental:
+            self._load_cache()
+        results: Dict[str, Dict[str, Any]] = {}
+        todo: List[Tuple[str, Optional[bytes]]] = []
+        for path in self.py_files:
+            sig = _file_sig(path)
+            entry = self._cache.get(path)
+            if entry and sig and tuple(entry['sig']) == sig:
+                results[path] = entry['result']
+                self.reused.append(path)
+                continue
+            data = None
+            if entry and sig:
+                # mtime się zmienił (np. checkout) – porównaj treść po sha1
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                except OSError:
+                    data = None
+                if data is not None and hashlib.sha1(data).hexdigest() == entry['sha1']:
+                    entry['sig'] = list(sig)
+                    results[path] = entry['result']
+                    self.reused.append(path)
+                    continue
+            todo.append((path, data))
+
+        for (path, data), result in zip(todo, self._run_analysis(todo)):
+            results[path] = result
+            sig = _file_sig(path)
+            if sig is None:
+                self._cache.pop(path, None)
+                continue
+            if data is None:
+                try:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                except OSError:
+                    continue
+            self._cache[path] = {'sig': list(sig), 'sha1': hashlib.sha1(data).hexdigest(), 'result': result}
+        for stale in set(self._cache) - set(self.py_files):
+            del self._cache[stale]
+        self.results = results
+        return results
+
+    def _run_analysis(self, todo: List[Tuple[str, Optional[bytes]]]) -> List[Dict[str, Any]]:
+        workers = self.workers if self.workers is not None else (os.cpu_count() or 1)
+        if workers > 1 and len(todo) >= PARALLEL_MIN_FILES and not getattr(sys, 'frozen', False):
+            paths = [p for p, _ in todo]
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    return list(pool.map(analyze_file, paths, chunksize=max(1, len(paths) // (workers * 4))))
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f"[MW] Pula procesów niedostępna ({e}) – analiza w jednym procesie")
+        return [analyze_file(path, data) for path, data in todo]
+
+    def _cache_path(self) -> str:
+        return os.path.join(self.root, CACHE_NAME)
+
+    def _load_cache(self):
+        try:
+            with open(self._cache_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == ANALYZER_VERSION:
+            self._cache = data.get('files') or {}
+
+    def save_cache(self):
+        tmp = self._cache_path() + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': ANALYZER_VERSION, 'files': self._cache}, f, ensure_ascii=False)
+            os.replace(tmp, self._cache_path())
+        except OSError as e:
+            print(f"[MW] Nie zapisano cache audytu: {e}")
+
     # ---------- PASS 1: FAST ----------
     def pass_fast(self):
-        for path in self.py_files:
-            text = self._read(path)
-            has_hf, has_hv, dname, dver = self._read_headers(text)
-            syntax_ok, tree = self._parse_ast(path, text)
-
-            imports, defs = [], []
-            if tree:
-                imports = self._collect_imports(tree)
-                defs    = self._collect_defs(tree)
-
-            self.summaries[path] = FileSummary(
-                file=path, has_header_file=has_hf, has_header_ver=has_hv,
-                declared_name=dname, declared_ver=dver, syntax_ok=syntax_ok,
-                defs=defs, imports=imports,
-            )
-
-            if not has_hf:
-                self._issue(path, 'WARN', 'HEADER', 'Brak nagłówka # Plik: ...')
-            if not has_hv:
-                self._issue(path, 'WARN', 'HEADER', 'Brak nagłówka # Wersja: ...')
-
-            # nazwa w nagłówku vs faktyczna
-            if has_hf and dname:
-                base = os.path.basename(path)
-                if dname.strip() != base:
-                    self._issue(path, 'INFO', 'HEADER', f"Nagłówek # Plik wskazuje '{dname}', ale plik to '{base}'")
-
-            # wzorce zabronione
-            for regex, desc in FORBIDDEN_PATTERNS:
-                for m in regex.finditer(text):
-                    line = text.count('\n', 0, m.start()) + 1
-                    self._issue(path, 'ERROR', 'SECURITY', f"{desc}", line)
-
-            # hinty GUI
-            for regex, desc in GUI_RISK_HINTS:
-                for m in regex.finditer(text):
-                    line = text.count('\n', 0, m.start()) + 1
-                    self._issue(path, 'INFO', 'GUI', f"{desc}", line)
+        for path, res in self.analyze().items():
+            self.summaries[path] = FileSummary(file=path, **res['summary'])
+            for severity, kind, message, line in res['fast']:
+                self._issue(path, severity, kind, message, line)
 
     # ---------- PASS 2: DEEP ----------
     def pass_deep(self):
@@ -144,38 +351,17 @@ class AudytMW:
             if len(set(files)) > 1 and name not in ('main'):
                 self._issue(', '.join(sorted(set(files))), 'INFO', 'STYLE', f"Definicja '{name}' występuje w wielu plikach – rozważ prefiks albo wydzielenie wspólnego modułu")
 
-        # proste unused imports (jeśli importowane, ale nieużyte nazwy)
-        for path in self.py_files:
-            text = self._read(path)
-            try:
-                tree = ast.parse(text)
-            except Exception:
-                continue
-            imported_names = set()
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imported_names.add(alias.asname or alias.name.split('.')[0])
-                elif isinstance(node, ast.ImportFrom):
-                    for alias in node.names:
-                        imported_names.add(alias.asname or alias.name)
-            used_names = {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}
-            unused = sorted(imported_names - used_names)
-            for n in unused:
+        # proste unused imports (policzone w analyze_file z tego samego drzewa AST)
+        for path, res in self.analyze().items():
+            for n in res['unused']:
                 self._issue(path, 'INFO', 'STYLE', f"Możliwy nieużyty import: {n}")
 
     # ---------- PASS 3: RISK ----------
     def pass_risk(self):
-        for path in self.py_files:
-            text = self._read(path)
-            # gołe excepty
-            for m in re.finditer(r"except\s*:\s*", text):
-                line = text.count('\n', 0, m.start()) + 1
-                self._issue(path, 'WARN', 'ERROR-HANDLING', 'Goły except – dodaj konkretny wyjątek i logowanie', line)
-            # TODO/FIXME
-            for m in re.finditer(r"\b(TODO|FIXME|HACK)\b", text):
-                line = text.count('\n', 0, m.start()) + 1
-                self._issue(path, 'INFO', 'TODO', 'Znacznik TODO/FIXME/HACK – rozważ zaplanowanie zadania', line)
+        # gołe excepty, TODO/FIXME – trafienia z analyze_file
+        for path, res in self.analyze().items():
+            for severity, kind, message, line in res['risk']:
+                self._issue(path, severity, kind, message, line)
 
         # JSON sanity
         self._check_json_file(cfg_path("config.json"), required_keys=['theme', 'start_view', 'pin_required'])
@@ -227,61 +413,10 @@ class AudytMW:
             json.dump(data, f, ensure_ascii=False, indent=2)
         with open(out_md, 'w', encoding='utf-8') as f:
             f.write(self._render_md(data))
+        if self.results is not None:
+            self.save_cache()
 
     # ---------- INTERNAL UTILS ----------
-    def _read(self, path: str) -> str:
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            self._issue(path, 'ERROR', 'IO', f'Błąd czytania: {e}')
-            return ''
-
-    def _read_headers(self, text: str) -> Tuple[bool,bool,Optional[str],Optional[str]]:
-        name = ver = None
-        has_hf = has_hv = False
-        for line in text.splitlines()[:15]:
-            if not has_hf:
-                m = HEADER_FILE_RE.match(line.strip())
-                if m:
-                    has_hf = True
-                    name = m.group('name').strip()
-            if not has_hv:
-                m = HEADER_VER_RE.match(line.strip())
-                if m:
-                    has_hv = True
-                    ver = m.group('ver').strip()
-        return has_hf, has_hv, name, ver
-
-    def _parse_ast(self, path: str, text: str) -> Tuple[bool, Optional[ast.AST]]:
-        try:
-            tree = ast.parse(text)
-            return True, tree
-        except SyntaxError as e:
-            self._issue(path, 'ERROR', 'SYNTAX', f"{e.msg}", e.lineno or None)
-            return False, None
-        except Exception as e:
-            self._issue(path, 'ERROR', 'SYNTAX', f"{e}")
-            return False, None
-
-    def _collect_imports(self, tree: ast.AST) -> List[str]:
-        mods = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    mods.append(alias.name)
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    mods.append(node.module)
-        return sorted(set(mods))
-
-    def _collect_defs(self, tree: ast.AST) -> List[str]:
-        names = []
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-                names.append(node.name)
-        return sorted(set(names))
-
     def _find_module_path(self, module: str) -> Optional[str]:
         candidate = os.path.join(self.root, module + '.py')
         return candidate if os.path.exists(candidate) else None
@@ -367,11 +502,23 @@ class AudytMW:
 
 # ---------- CLI ----------
 
-def main():
-    root = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
-    audit = AudytMW(root)
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Audyt kodu MW")
+    ap.add_argument('root', nargs='?', default=os.getcwd())
+    ap.add_argument('--incremental', action='store_true',
+                    help='analizuj tylko pliki zmienione od ostatniego raportu')
+    ap.add_argument('--workers', type=int, default=None,
+                    help='liczba procesów analizy (domyślnie liczba CPU)')
+    args = ap.parse_args(argv)
+    root = args.root
+    audit = AudytMW(root, workers=args.workers, incremental=args.incremental)
     print(f"[MW] Audyt katalogu: {audit.root}")
     audit.discover()
+    audit.analyze()
+    if args.incremental:
+        print(f"[MW] Z cache: {len(audit.reused)}/{len(audit.py_files)} plików")
     print(f"[PASS 1/3] FAST – składnia, nagłówki, wzorce...")
     audit.pass_fast()
     print(f"[PASS 2/3] DEEP – AST, graf importów, cykle...")
@@ -1,7 +1,30 @@
+"""Kopie zapasowe danych wysyłane na serwer WebDAV.
+
+Potok nocnej kopii::
+
+    archive, digest, size = build_archive("data", "backup/data_20261019.tar.gz")
+    upload_backup(archive)
+
+:func:`build_archive` pakuje katalog strumieniowo do ``tar.gz`` (bez kopii
+plików w pamięci) i liczy sha256 w trakcie zapisu. :func:`upload_backup`
+wysyła plik w kawałkach ``<nazwa>.parts/NNNNN`` z ponawianiem, a postęp zapisuje
+w ``<plik>.upload.json`` – przerwany transfer wznawia się od pierwszego
+niewysłanego kawałka. Pliki nie większe niż jeden kawałek wysyłane są jednym
+PUT pod ``<folder>/<nazwa>`` (jak dotychczas). W obu przypadkach na końcu na
+serwer trafia ``<nazwa>.manifest.json`` z rozmiarem i sha256 (dla kawałków
+także z ich sumami); :func:`download_backup` składa plik z powrotem i sprawdza
+sumy. Bez manifestu (404 – kopie sprzed tej zmiany) pobierany jest sam plik.
+"""
+
 from __future__ import annotations
 
 import base64
+import hashlib
+import json
 import os
+import tarfile
+import time
+from typing import Any, BinaryIO, Dict, Iterable, Optional, Tuple
 from urllib.parse import urljoin
 import urllib.request
 import urllib.error
@@ -11,8 +34,189 @@ from config_manager import ConfigManager
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_MB = 8
+RETRY_DELAYS = (1.0, 2.0, 5.0, 10.0)
+HTTP_TIMEOUT_S = 60
+HASH_BLOCK = 1 << 20
+
+_sleep = time.sleep  # podmieniane w testach
+
+
+class UploadError(RuntimeError):
+    """Kawałek nie został przyjęty mimo ponowień."""
+
+
+def _cloud_settings() -> Dict[str, Any]:
+    cfg = ConfigManager()
+    return {
+        "url": cfg.get("backup.cloud.url", "").rstrip("/"),
+        "username": cfg.get("backup.cloud.username", ""),
+        "password": cfg.get("backup.cloud.password", ""),
+        "folder": cfg.get("backup.cloud.folder", "").strip("/"),
+        "chunk_mb": cfg.get("backup.cloud.chunk_mb", DEFAULT_CHUNK_MB),
+    }
+
+
+# ----------------------------------------------------------------------
+# Archiwum
+
+
+class _HashingWriter:
+    """Plik do zapisu, który po drodze liczy sha256 i rozmiar."""
+
+    def __init__(self, fh: BinaryIO) -> None:
+        self._fh = fh
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._fh.write(data)
+        self.sha256.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        self._fh.flush()
+
+
+def build_archive(src_dir: str, dest_path: str,
+                  exclude: Iterable[str] = ("__pycache__",)) -> Tuple[str, str, int]:
+    """Spakuj ``src_dir`` strumieniowo do ``dest_path`` (tar.gz).
+
+    Zwraca ``(ścieżka, sha256, rozmiar)``. Archiwum powstaje jako ``.tmp`` i
+    jest podmieniane dopiero po domknięciu, więc przerwane pakowanie nie
+    zostawia uszkodzonego pliku pod docelową nazwą.
+    """
+    skip = set(exclude)
+    dest_abs = os.path.abspath(dest_path)
+    os.makedirs(os.path.dirname(dest_abs) or ".", exist_ok=True)
+    tmp = dest_abs + ".tmp"
+    with open(tmp, "wb") as raw:
+        writer = _HashingWriter(raw)
+        with tarfile.open(fileobj=writer, mode="w|gz") as tar:
+            for dirpath, dirnames, filenames in os.walk(src_dir):
+                dirnames[:] = sorted(d for d in dirnames if d not in skip)
+                for fn in sorted(filenames):
+                    path = os.path.join(dirpath, fn)
+                    if os.path.abspath(path) in (dest_abs, tmp):
+                        continue
+                    arcname = os.path.relpath(path, os.path.dirname(os.path.abspath(src_dir)))
+                    try:
+                        tar.add(path, arcname=arcname.replace(os.sep, "/"), recursive=False)
+                    except OSError as e:
+                        logger.warning("Backup: pominięto %s: %s", path, e)
+    os.replace(tmp, dest_abs)
+    return dest_abs, writer.sha256.hexdigest(), writer.size
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ----------------------------------------------------------------------
+# HTTP / WebDAV
+
+
+def _auth_headers(settings: Dict[str, Any]) -> Dict[str, str]:
+    user, password = settings.get("username", ""), settings.get("password", "")
+    if not (user or password):
+        return {}
+    token = base64.b64encode(f"{user}:{password}".encode("utf-8")).decode("ascii")
+    return {"Authorization": f"Basic {token}"}
+
+
+def _request(method: str, url: str, settings: Dict[str, Any],
+             data: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None):
+    req = urllib.request.Request(url, data=data, method=method)
+    for k, v in {**_auth_headers(settings), **(headers or {})}.items():
+        req.add_header(k, v)
+    return urllib.request.urlopen(req, timeout=HTTP_TIMEOUT_S)  # type: ignore[call-arg]
+
+
+def _with_retries(what: str, func):
+    last: Optional[BaseException] = None
+    for attempt, delay in enumerate((0.0,) + tuple(RETRY_DELAYS)):
+        if delay:
+            _sleep(delay)
+        try:
+            return func()
+        except urllib.error.HTTPError as e:
+            last = e
+            if 400 <= e.code < 500 and e.code not in (408, 423, 429):
+                break  # błąd klienta – ponawianie nic nie da
+        except (urllib.error.URLError, OSError) as e:
+            last = e
+        logger.warning("Backup: %s – próba %d nieudana: %s", what, attempt + 1, last)
+    raise UploadError(f"{what}: {last}") from last
+
 
-def upload_backup(local_path: str) -> bool:
+def _is_not_found(exc: BaseException) -> bool:
+    cause = exc.__cause__
+    return isinstance(cause, urllib.error.HTTPError) and cause.code == 404
+
+
+def _mkcol(url: str, settings: Dict[str, Any]) -> None:
+    try:
+        with _request("MKCOL", url, settings):
+            pass
+    except urllib.error.HTTPError as e:
+        if e.code not in (405, 409, 501):  # 405 = już istnieje
+            raise
+
+
+def _put_verified(url: str, data: bytes, digest: str, settings: Dict[str, Any]) -> None:
+    headers = {
+        "Content-Type": "application/octet-stream",
+        "OC-Checksum": f"SHA256:{digest}",
+        "X-Content-SHA256": digest,
+    }
+    with _request("PUT", url, settings, data=data, headers=headers) as resp:
+        if not 200 <= resp.status < 300:
+            raise urllib.error.HTTPError(url, resp.status, "PUT", resp.headers, None)
+    try:
+        with _request("HEAD", url, settings) as resp:
+            length = resp.headers.get("Content-Length")
+    except urllib.error.HTTPError as e:
+        if e.code not in (405, 501):  # serwer/proxy bez HEAD – nie da się sprawdzić
+            raise
+        logger.info("Backup: brak HEAD (%s) – pomijam kontrolę rozmiaru %s", e.code, url)
+        return
+    if length is not None and int(length) != len(data):
+        raise OSError(f"rozmiar na serwerze {length} != {len(data)}")
+
+
+def _iter_chunks(path: str, chunk_size: int):
+    with open(path, "rb") as fh:
+        index = 0
+        while True:
+            data = fh.read(chunk_size)
+            if not data:
+                break
+            yield index, data
+            index += 1
+
+
+def _load_state(state_path: str) -> Dict[str, Any]:
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state_path: str, state: Dict[str, Any]) -> None:
+    tmp = state_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, state_path)
+
+
+def upload_backup(local_path: str, settings: Optional[Dict[str, Any]] = None) -> bool:
     """Upload backup file to WebDAV folder specified in config.
 
     The configuration uses keys under ``backup.cloud``:
@@ -20,40 +224,157 @@ def upload_backup(local_path: str) -> bool:
     - ``username`` – optional username
     - ``password`` – optional password
     - ``folder`` – target folder on the server
+    - ``chunk_mb`` – part size for large files (default 8)
 
     Parameters
     ----------
     local_path:
         Path to the file that should be uploaded.
+    settings:
+        Overrides the ``backup.cloud`` configuration (same keys).
 
     Returns
     -------
     bool
-        ``True`` on success, ``False`` otherwise.
+        ``True`` on success, ``False`` otherwise. Failed large uploads keep
+        ``<local_path>.upload.json`` so that the next call resumes them.
     """
-    cfg = ConfigManager()
-    base_url = cfg.get("backup.cloud.url", "").rstrip("/")
-    user = cfg.get("backup.cloud.username", "")
-    password = cfg.get("backup.cloud.password", "")
-    remote_folder = cfg.get("backup.cloud.folder", "").strip("/")
-
+    settings = settings or _cloud_settings()
+    base_url = settings.get("url", "").rstrip("/")
+    remote_folder = settings.get("folder", "").strip("/")
     if not base_url or not remote_folder:
         return False
 
     filename = os.path.basename(local_path)
-    target_url = urljoin(f"{base_url}/", f"{remote_folder}/{filename}")
-
-    with open(local_path, "rb") as fh:
-        data = fh.read()
+    folder_url = urljoin(f"{base_url}/", f"{remote_folder}/")
+    target_url = urljoin(folder_url, filename)
+    chunk_size = max(1, int(float(settings.get("chunk_mb") or DEFAULT_CHUNK_MB) * (1 << 20)))
 
-    req = urllib.request.Request(target_url, data=data, method="PUT")
-    if user or password:
-        token = base64.b64encode(f"{user}:{password}".encode("utf-8")).decode("ascii")
-        req.add_header("Authorization", f"Basic {token}")
+    def _put_manifest(info: Dict[str, Any]) -> None:
+        manifest = json.dumps(info, ensure_ascii=False).encode("utf-8")
+        manifest_url = urljoin(folder_url, f"{filename}.manifest.json")
+        _with_retries(
+            "manifest",
+            lambda: _put_verified(manifest_url, manifest, hashlib.sha256(manifest).hexdigest(), settings),
+        )
 
     try:
-        with urllib.request.urlopen(req) as resp:  # type: ignore[call-arg]
-            return 200 <= resp.status < 300
-    except (urllib.error.URLError, OSError) as e:
+        size = os.path.getsize(local_path)
+        if size <= chunk_size:
+            with open(local_path, "rb") as fh:
+                data = fh.read()
+            digest = hashlib.sha256(data).hexdigest()
+            _with_retries(filename, lambda: _put_verified(target_url, data, digest, settings))
+            # bez "parts": plik leży w całości pod <folder>/<nazwa>
+            _put_manifest({"name": filename, "size": size, "sha256": digest})
+            return True
+
+        digest = _file_sha256(local_path)
+        state_path = local_path + ".upload.json"
+        state = _load_state(state_path)
+        if state.get("sha256") != digest or state.get("chunk_size") != chunk_size:
+            state = {"sha256": digest, "size": size, "chunk_size": chunk_size, "parts": {}}
+        parts_url = urljoin(folder_url, f"{filename}.parts/")
+        _with_retries("MKCOL", lambda: _mkcol(parts_url, settings))
+
+        parts: Dict[str, str] = state["parts"]
+        for index, data in _iter_chunks(local_path, chunk_size):
+            key = f"{index:05d}"
+            part_digest = hashlib.sha256(data).hexdigest()
+            if parts.get(key) == part_digest:
+                continue  # wysłany w poprzedniej próbie
+            part_url = urljoin(parts_url, key)
+            _with_retries(
+                f"{filename} część {key}",
+                lambda: _put_verified(part_url, data, part_digest, settings),
+            )
+            parts[key] = part_digest
+            _save_state(state_path, state)
+
+        _put_manifest(
+            {
+                "name": filename,
+                "size": size,
+                "sha256": digest,
+                "chunk_size": chunk_size,
+                "parts": [parts[k] for k in sorted(parts)],
+            }
+        )
+        try:
+            os.remove(state_path)
+        except OSError:
+            pass
+        return True
+    except (UploadError, urllib.error.URLError, OSError, ValueError) as e:
         logger.error("Backup upload failed: %s", e, exc_info=True)
         return False
+
+
+def download_backup(filename: str, dest_path: str,
+                    settings: Optional[Dict[str, Any]] = None) -> bool:
+    """Pobierz kopię (pojedynczą lub w kawałkach) i sprawdź sumy sha256."""
+    settings = settings or _cloud_settings()
+    folder_url = urljoin(f"{settings.get('url', '').rstrip('/')}/",
+                         f"{settings.get('folder', '').strip('/')}/")
+
+    def _get(url: str) -> bytes:
+        with _request("GET", url, settings) as resp:
+            return resp.read()
+
+    tmp = dest_path + ".tmp"
+    try:
+        try:
+            manifest = json.loads(
+                _with_retries("manifest", lambda: _get(urljoin(folder_url, f"{filename}.manifest.json")))
+            )
+        except UploadError as e:
+            if not _is_not_found(e):
+                raise  # sieć/serwer – kopia w kawałkach nie leży pod samą nazwą
+            manifest = None
+        total = hashlib.sha256()
+        size = 0
+        with open(tmp, "wb") as out:
+            if manifest is None or "parts" not in manifest:
+                data = _with_retries(filename, lambda: _get(urljoin(folder_url, filename)))
+                out.write(data)
+                total.update(data)
+                size += len(data)
+            else:
+                parts_url = urljoin(folder_url, f"{filename}.parts/")
+                for index, part_digest in enumerate(manifest["parts"]):
+                    url = urljoin(parts_url, f"{index:05d}")
+                    data = _with_retries(f"część {index:05d}", lambda: _get(url))
+                    if hashlib.sha256(data).hexdigest() != part_digest:
+                        raise OSError(f"suma kontrolna części {index:05d} nie zgadza się")
+                    out.write(data)
+                    total.update(data)
+                    size += len(data)
+        if manifest is not None:
+            if size != manifest["size"] or total.hexdigest() != manifest["sha256"]:
+                raise OSError("suma kontrolna kopii nie zgadza się")
+        os.replace(tmp, dest_path)
+        return True
+    except (UploadError, urllib.error.URLError, OSError, ValueError, KeyError) as e:
+        logger.error("Backup download failed: %s", e, exc_info=True)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+
+def backup_data_dir(src_dir: Optional[str] = None, out_dir: Optional[str] = None,
+                    settings: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Spakuj katalog danych i wyślij go na serwer; zwraca ścieżkę archiwum.
+
+    ``None`` oznacza nieudany transfer – archiwum i stan wysyłki zostają,
+    kolejne wywołanie :func:`upload_backup` na tym pliku wznowi transfer.
+    """
+    from utils.path_utils import cfg_path
+
+    src_dir = src_dir or cfg_path("data")
+    out_dir = out_dir or cfg_path("backup")
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    archive, digest, size = build_archive(src_dir, os.path.join(out_dir, f"data_{stamp}.tar.gz"))
+    logger.info("Backup: archiwum %s (%d B, sha256 %s)", archive, size, digest)
+    return archive if upload_backup(archive, settings) else None
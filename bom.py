@@ -4,6 +4,8 @@ from pathlib import Path
 
 from packaging.version import parse as parse_version
 
+from core import metrics
+
 logger = logging.getLogger(__name__)
 DATA_DIR = Path("data")
 
@@ -63,6 +65,7 @@ def get_polprodukt(kod: str) -> dict:
     with path.open(encoding="utf-8") as f:
         return json.load(f)
 
+@metrics.timed("bom.compute_pp")
 def compute_bom_for_prd(kod_prd: str, ilosc: float, version: str | None = None) -> dict:
     """Oblicza ilości półproduktów wraz z dodatkowymi danymi.
 
@@ -96,6 +99,7 @@ def compute_bom_for_prd(kod_prd: str, ilosc: float, version: str | None = None)
         }
     return bom
 
+@metrics.timed("bom.compute_sr_pp")
 def compute_sr_for_pp(kod_pp: str, ilosc: float) -> dict:
     if ilosc <= 0:
         raise ValueError("Parametr 'ilosc' musi byc wiekszy od zera")
@@ -137,6 +141,7 @@ def compute_sr_for_pp(kod_pp: str, ilosc: float) -> dict:
     return {sr["kod"]: {"ilosc": qty, "jednostka": jednostka}}
 
 
+@metrics.timed("bom.compute_sr")
 def compute_sr_for_prd(
     kod_prd: str, ilosc: float, version: str | None = None
 ) -> dict:
@@ -1,6 +1,6 @@
 """
 Config Manager – warstwy: defaults → global → local → secrets
-Wersja: 1.0.2
+Wersja: 1.2.0
 
 Funkcje:
 - Ładowanie i scalanie warstw configu
@@ -8,14 +8,30 @@ Funkcje:
 - Zapis z backupem i audytem zmian
 - Import/eksport (eksport bez sekretów)
 - Rollback przez katalogi w backup_wersji (utrzymujemy ostatnie 10)
+
+Zmiany 1.1.0:
+- ``set`` aktualizuje widok scalony tylko dla zmienionego klucza (bez pełnego
+  ``_merge_all``), ``get`` korzysta z cache odczytów
+- ``batch()`` grupuje wiele ``set`` w jedną transakcję (jeden zapis audytu
+  i jeden ``save_all``); zapis przepisuje tylko zmienione warstwy
+- Szyna zmian (``subscribe``/``watch_file``): powiadomienia o zmianie kluczy
+  i o edycji plików poza programem zamiast odpytywania mtime w panelach
+
+Zmiany 1.2.0:
+- Schemat kompilowany raz do walidatorów (``core.config_schema``), w pamięci
+  wg sha256 pliku; ``set``/``_validate_all``/import nie interpretują już
+  definicji pól przy każdym wywołaniu
 """
 
 from __future__ import annotations
-import json, os, shutil, datetime, time, threading
+import copy, json, os, queue, shutil, datetime, time, threading
 import logging
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Callable, Dict, Iterable, List
 
+from core import config_schema, metrics
+from core.config_schema import ConfigError
 from utils.path_utils import cfg_path
 
 log = logging.getLogger(__name__)
@@ -112,80 +128,227 @@ ROLLBACK_KEEP = 10
 # Initialize module logger
 logger = log
 
+_MISSING = object()
+FILE_WATCH_INTERVAL_S = 2.0
 
-class ConfigError(Exception):
-    pass
 
+class ConfigChangeBus:
+    """Publikuje zmiany konfiguracji subskrybentom.
 
-class ConfigManager:
-    """Caches loaded configuration and allows explicit refresh.
+    * ``subscribe(prefix, cb)`` – ``cb(key, value)`` po zmianie klucza ``prefix``,
+      klucza pod nim (``prefix.*``) lub klucza nadrzędnego; ``""`` = wszystkie.
+    * ``watch_file(path, cb)`` – ``cb(path)`` po zmianie pliku (mtime/rozmiar)
+      wykrytej przez ``check_files`` lub wątek uruchomiony ``start()``.
 
-    Regular instantiation (``ConfigManager()``) returns the cached instance
-    to avoid reloading configuration files multiple times during a session.
-    Use ``ConfigManager.refresh()`` to force a reload.
+    Obie metody zwracają funkcję wypisującą. Po ``attach_tk(root)``
+    subskrybenci kluczy są wołani w wątku Tk: publikacja z innego wątku
+    (np. przeładowanie configu przez ``wm-config-watch``) trafia do kolejki
+    opróżnianej przez ``root.after``. Obserwatorzy plików działają w wątku
+    wykrywającym zmianę – widżety Tk powinny przekazać pracę przez ``after``.
     """
 
-    _instance: "ConfigManager | None" = None
-    _initialized: bool = False
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._subs: List[tuple[str, Callable[[str, Any], None]]] = []
+        self._files: Dict[str, List[Callable[[str], None]]] = {}
+        self._sigs: Dict[str, tuple | None] = {}
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._tk_root: Any = None
+        self._tk_thread: int | None = None
+        self._pending: "queue.SimpleQueue[list]" = queue.SimpleQueue()
+
+    # ----- klucze -----
+    def subscribe(
+        self, prefix: str, callback: Callable[[str, Any], None]
+    ) -> Callable[[], None]:
+        entry = (prefix, callback)
+        with self._lock:
+            self._subs.append(entry)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if entry in self._subs:
+                    self._subs.remove(entry)
+
+        return unsubscribe
+
+    def publish(self, keys: Iterable[str], getter: Callable[[str], Any]) -> None:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return
+        with self._lock:
+            subs = list(self._subs)
+            root, tk_thread = self._tk_root, self._tk_thread
+        calls = [
+            (prefix, callback, key, getter(key))
+            for prefix, callback in subs
+            for key in keys
+            if _keys_related(prefix, key)
+        ]
+        if not calls:
+            return
+        if root is not None and threading.get_ident() != tk_thread:
+            # wartości pobrane teraz; wywołania wykona drain() w wątku Tk
+            self._pending.put(calls)
+            return
+        self._dispatch(calls)
 
-    # >>> WM PATCH START: ensure defaults from schema
     @staticmethod
-    def _iter_schema_fields(schema: Dict[str, Any]) -> "Iterable[Dict[str, Any]]":
-        """Yield all field definitions from ``schema`` including nested subtabs."""
-
-        def from_tabs(tabs: list[Dict[str, Any]]):
-            for tab in tabs:
-                for group in tab.get("groups", []):
-                    for field in group.get("fields", []):
-                        if field.get("deprecated"):
-                            continue
-                        yield field
-                yield from from_tabs(tab.get("subtabs", []))
-
-        yield from from_tabs(schema.get("tabs", []))
-        for opt in schema.get("options", []):
-            if opt.get("deprecated"):
-                continue
-            yield opt
+    def _dispatch(calls: List[tuple]) -> None:
+        for prefix, callback, key, value in calls:
+            try:
+                callback(key, value)
+            except Exception:
+                log.exception("[CFG-BUS] błąd subskrybenta %s", prefix or "*")
 
-    @staticmethod
-    def _coerce_default_for_field(field: Dict[str, Any]) -> Any:
-        """Return a sane default coerced to the field's type."""
+    # ----- wątek Tk -----
+    def attach_tk(self, root: Any, interval_ms: int = 100) -> None:
+        """Przekazuje publikacje z innych wątków do wątku Tk ``root``.
 
-        default = field.get("default")
-        ftype = field.get("type")
+        Wołać z wątku Tk. Kolejkę opróżnia ``root.after`` co ``interval_ms``;
+        po zniszczeniu ``root`` publikacje znów są wołane bezpośrednio.
+        """
 
-        if ftype == "bool":
-            if isinstance(default, bool):
-                return default
-            if isinstance(default, str):
-                return default.lower() in {"1", "true", "yes", "on"}
-            return bool(default) if default is not None else False
+        with self._lock:
+            self._tk_root = root
+            self._tk_thread = threading.get_ident()
 
-        if ftype == "int":
+        def _poll() -> None:
+            if self._tk_root is not root:
+                return
+            self.drain()
             try:
-                return int(default)
-            except (TypeError, ValueError):
-                return 0
+                root.after(interval_ms, _poll)
+            except Exception:
+                self.detach_tk(root)
+
+        _poll()
+
+    def detach_tk(self, root: Any = None) -> None:
+        with self._lock:
+            if root is None or self._tk_root is root:
+                self._tk_root = None
+                self._tk_thread = None
+        self.drain()
 
-        if ftype == "float":
+    def drain(self) -> int:
+        """Wykonuje zakolejkowane publikacje; zwraca liczbę wywołań."""
+
+        count = 0
+        while True:
             try:
-                return float(default)
-            except (TypeError, ValueError):
-                return 0.0
-
-        if ftype in ("enum", "select"):
-            allowed = (
-                field.get("allowed")
-                or field.get("values")
-                or field.get("enum")
-                or []
+                calls = self._pending.get_nowait()
+            except queue.Empty:
+                return count
+            self._dispatch(calls)
+            count += len(calls)
+
+    # ----- pliki -----
+    def watch_file(
+        self, path: str, callback: Callable[[str], None]
+    ) -> Callable[[], None]:
+        path = os.path.abspath(path)
+        with self._lock:
+            callbacks = self._files.setdefault(path, [])
+            if callback not in callbacks:
+                callbacks.append(callback)
+            if path not in self._sigs:
+                self._sigs[path] = _file_signature(path)
+
+        def unwatch() -> None:
+            with self._lock:
+                callbacks = self._files.get(path, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+                if not callbacks:
+                    self._files.pop(path, None)
+                    self._sigs.pop(path, None)
+
+        return unwatch
+
+    def touch(self, path: str) -> None:
+        """Zapamiętuje bieżący stan pliku (własny zapis nie jest zmianą zewnętrzną)."""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path in self._files:
+                self._sigs[path] = _file_signature(path)
+
+    def check_files(self) -> List[str]:
+        """Sprawdza obserwowane pliki i powiadamia o zmienionych; zwraca ich listę."""
+        changed: List[tuple[str, List[Callable[[str], None]]]] = []
+        with self._lock:
+            for path, callbacks in self._files.items():
+                sig = _file_signature(path)
+                if sig != self._sigs.get(path):
+                    self._sigs[path] = sig
+                    changed.append((path, list(callbacks)))
+        for path, callbacks in changed:
+            for callback in callbacks:
+                try:
+                    callback(path)
+                except Exception:
+                    log.exception("[CFG-BUS] błąd obserwatora pliku %s", path)
+        return [path for path, _ in changed]
+
+    def start(self, interval_s: float = FILE_WATCH_INTERVAL_S) -> None:
+        """Uruchamia wątek ``wm-config-watch`` sprawdzający pliki co ``interval_s``."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+
+            def _run() -> None:
+                while not self._stop.wait(interval_s):
+                    self.check_files()
+
+            self._thread = threading.Thread(
+                target=_run, name="wm-config-watch", daemon=True
             )
-            if default in allowed:
-                return default
-            return allowed[0] if allowed else None
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+
+def _keys_related(prefix: str, key: str) -> bool:
+    if not prefix or key == prefix:
+        return True
+    return key.startswith(prefix + ".") or prefix.startswith(key + ".")
+
+
+def _file_signature(path: str) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
 
-        return default
+_BUS = ConfigChangeBus()
+
+
+def _on_config_file_changed(path: str) -> None:
+    inst = ConfigManager._instance
+    if inst is not None and ConfigManager._initialized:
+        inst.reload_from_disk(path)
+
+
+class ConfigManager:
+    """Caches loaded configuration and allows explicit refresh.
+
+    Regular instantiation (``ConfigManager()``) returns the cached instance
+    to avoid reloading configuration files multiple times during a session.
+    Use ``ConfigManager.refresh()`` to force a reload.
+    """
+
+    _instance: "ConfigManager | None" = None
+    _initialized: bool = False
+
+    # >>> WM PATCH START: ensure defaults from schema
+    _iter_schema_fields = staticmethod(config_schema.iter_schema_fields)
+    _coerce_default_for_field = staticmethod(config_schema.coerce_default)
 
     def _ensure_defaults_from_schema(
         self, cfg: Dict[str, Any], schema: Dict[str, Any]
@@ -277,17 +440,21 @@ class ConfigManager:
         if self.__class__._initialized:
             return
 
+        # set/save_all (wątek GUI) i reload_from_disk (wątek wm-config-watch)
+        # podmieniają warstwy i widok scalony – tylko pod tą blokadą
+        self._lock = threading.RLock()
         self.schema_path = schema_path or SCHEMA_PATH
         self.config_path = config_path or GLOBAL_PATH
 
-        self.schema = self._load_json_or_raise(
-            self.schema_path, msg_prefix="Brak pliku schematu"
+        if not os.path.exists(self.schema_path):
+            raise ConfigError(f"Brak pliku schematu: {self.schema_path}")
+        # schemat kompilowany raz na treść pliku (wspólny z oknem ustawień)
+        self.compiled = config_schema.load(
+            self.schema_path,
+            parse=lambda p: self._load_json_or_raise(p, msg_prefix="Brak pliku schematu"),
         )
-        self._schema_idx: Dict[str, Dict[str, Any]] = {}
-        for field in self._iter_schema_fields(self.schema):
-            key = field.get("key")
-            if key and key not in self._schema_idx:
-                self._schema_idx[key] = field
+        self.schema = self.compiled.schema
+        self._schema_idx: Dict[str, Dict[str, Any]] = self.compiled.options
         self.defaults = self._load_json(DEFAULTS_PATH) or {}
         self.global_cfg = self._load_json(self.config_path) or {}
         migrated = False
@@ -332,6 +499,18 @@ class ConfigManager:
         self.secrets = self._load_json(SECRETS_PATH) or {}
         self._ensure_dirs()
         self.merged = self._merge_all()
+        self._get_cache: Dict[str, Any] = {}
+        # warstwy zmienione od ostatniego zapisu (global/local/secrets);
+        # wstrzyknięte domyślne i migracje trafią do config.json przy 1. zapisie
+        self._dirty_layers: set[str] = set()
+        if migrated or self._schema_defaults_injected:
+            self._dirty_layers.add("global")
+        self._batch_depth = 0
+        self._batch_audit: List[Dict[str, Any]] = []
+        self._batch_save = False
+        self._batch_changed: List[str] = []
+        for layer_path in (self.config_path, LOCAL_PATH, SECRETS_PATH):
+            _BUS.watch_file(layer_path, _on_config_file_changed)
         print(f"[WM-DBG][SETTINGS] require_reauth={self.get('magazyn.require_reauth', True)}")
         self._validate_all()
 
@@ -357,11 +536,26 @@ class ConfigManager:
         config_path: str | None = None,
         schema_path: str | None = None,
     ) -> "ConfigManager":
-        """Reset cached instance and reload configuration."""
+        """Reset cached instance and reload configuration.
+
+        Subskrybenci szyny zmian dostają klucze różniące się od poprzedniej
+        instancji.
+        """
+        prev = cls._instance if cls._initialized else None
+        before = flatten(prev.merged) if prev is not None else None
         cls._instance = None
         cls._initialized = False
         inst = cls(config_path=config_path, schema_path=schema_path)
         inst._ensure_magazyn_defaults(inst.schema, inst.global_cfg)
+        if before is not None:
+            after = flatten(inst.merged)
+            inst._publish(
+                sorted(
+                    k
+                    for k in before.keys() | after.keys()
+                    if before.get(k, _MISSING) != after.get(k, _MISSING)
+                )
+            )
         return inst
 
     # ========== I/O pomocnicze ==========
@@ -402,15 +596,75 @@ class ConfigManager:
                 os.remove(LOCK_PATH)
             except Exception:
                 pass
+        _BUS.touch(path)
 
     # ========== scalanie i indeks schematu ==========
+    def _layers(self) -> tuple[Dict[str, Any], ...]:
+        return (self.defaults, self.global_cfg, self.local_cfg, self.secrets)
+
     def _merge_all(self) -> Dict[str, Any]:
         merged: Dict[str, Any] = {}
-        for src in (self.defaults, self.global_cfg, self.local_cfg, self.secrets):
+        for src in self._layers():
             if not src:
                 continue
             merged = deep_merge(merged, src)
-        return merged
+        # kopia: widok scalony nie może współdzielić słowników z warstwami,
+        # bo _merge_key modyfikuje go w miejscu
+        return copy.deepcopy(merged)
+
+    def _merge_key(self, key: str) -> str:
+        """Przelicza widok scalony tylko dla ścieżki ``key``.
+
+        Schodzi po ścieżce, dopóki we wszystkich warstwach jest słownik (lub
+        brak wartości); jeśli któraś warstwa ma tam wartość prostą, scala od
+        tego poziomu. Zwraca faktycznie przeliczoną ścieżkę.
+        """
+
+        parts = key.split(".")
+        layers = [layer for layer in self._layers() if layer]
+        depth = 1
+        while depth < len(parts):
+            prefix = parts[:depth]
+            if any(
+                not isinstance(v, dict)
+                for v in (_lookup(layer, prefix) for layer in layers)
+                if v is not _MISSING
+            ):
+                break
+            depth += 1
+        path = parts[:depth]
+
+        value: Any = _MISSING
+        for layer in layers:
+            v = _lookup(layer, path)
+            if v is _MISSING:
+                continue
+            if isinstance(value, dict) and isinstance(v, dict):
+                value = deep_merge(value, v)
+            else:
+                value = v
+
+        node = self.merged
+        for part in path[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {}
+            node = child
+        if value is _MISSING:
+            node.pop(path[-1], None)
+        else:
+            node[path[-1]] = copy.deepcopy(value)
+        return ".".join(path)
+
+    def _invalidate_cache(self, key: str) -> None:
+        prefix = key + "."
+        stale = [
+            k
+            for k in self._get_cache
+            if k == key or k.startswith(prefix) or key.startswith(k + ".")
+        ]
+        for k in stale:
+            del self._get_cache[k]
 
     def _schema_index(self) -> Dict[str, Dict[str, Any]]:
         """Zwraca zbuforowany indeks schematu."""
@@ -418,99 +672,169 @@ class ConfigManager:
 
     # ========== walidacja ==========
     def _validate_all(self):
-        idx = self._schema_idx
-        for key, opt in idx.items():
-            value = get_by_key(self.merged, key, None)
-            if value is None:
-                continue
-            self._validate_value(opt, value)
+        self.compiled.validate_config(self.merged)
 
     def _validate_value(self, opt: Dict[str, Any], value: Any):
-        t = opt.get("type")
-        if t == "bool":
-            if not isinstance(value, bool):
-                raise ConfigError(
-                    f"{opt['key']}: oczekiwano bool, dostano {type(value).__name__}"
-                )
-        elif t == "int":
-            if not isinstance(value, int):
-                raise ConfigError(
-                    f"{opt['key']}: oczekiwano int, dostano {type(value).__name__}"
-                )
-            if "min" in opt and value < opt["min"]:
-                raise ConfigError(f"{opt['key']}: < min {opt['min']}")
-            if "max" in opt and value > opt["max"]:
-                raise ConfigError(f"{opt['key']}: > max {opt['max']}")
-        elif t == "enum":
-            allowed = opt.get("enum") or opt.get("values") or []
-            if value not in allowed:
-                raise ConfigError(f"{opt['key']}: {value} nie w {allowed}")
-        elif t == "array":
-            if not isinstance(value, list):
-                raise ConfigError(
-                    f"{opt['key']}: oczekiwano listy, dostano {type(value).__name__}"
-                )
-        elif t in ("dict", "object"):
-            if not isinstance(value, dict):
-                raise ConfigError(
-                    f"{opt['key']}: oczekiwano dict, dostano {type(value).__name__}"
-                )
-            vtype = opt.get("value_type")
-            if vtype:
-                for k, v in value.items():
-                    if vtype == "string" and not isinstance(v, str):
-                        raise ConfigError(
-                            f"{opt['key']}.{k}: oczekiwano string, dostano {type(v).__name__}"
-                        )
-                    elif vtype == "int" and not isinstance(v, int):
-                        raise ConfigError(
-                            f"{opt['key']}.{k}: oczekiwano int, dostano {type(v).__name__}"
-                        )
-                    elif vtype == "float" and not isinstance(v, (int, float)):
-                        raise ConfigError(
-                            f"{opt['key']}.{k}: oczekiwano float, dostano {type(v).__name__}"
-                        )
-                    elif vtype == "bool" and not isinstance(v, bool):
-                        raise ConfigError(
-                            f"{opt['key']}.{k}: oczekiwano bool, dostano {type(v).__name__}"
-                        )
-        elif t in ("string", "path"):
-            if not isinstance(value, str):
-                raise ConfigError(f"{opt['key']}: oczekiwano string")
-        else:
-            # nieznane typy traktujemy jako string/opaque
-            pass
+        """Walidacja pojedynczej definicji (pola schematu używają ``compiled``)."""
+        field = self.compiled.get(opt.get("key", ""))
+        if field is None or field.opt is not opt:
+            field = config_schema.compile_field(opt)
+        field.validate(value)
 
     # ========== API ==========
     def get(self, key: str, default: Any = None) -> Any:
-        return get_by_key(self.merged, key, default)
+        try:
+            value = self._get_cache[key]
+        except KeyError:
+            with self._lock:
+                value = self._get_cache[key] = get_by_key(self.merged, key, _MISSING)
+        return default if value is _MISSING else value
 
     def is_schema_default(self, key: str) -> bool:
         """Zwraca True, jeśli wartość została wstrzyknięta z domyślnego schematu."""
 
         return key in self._schema_defaults_injected
 
+    @metrics.timed("config.set")
     def set(self, key: str, value: Any, who: str = "system"):
-        idx = self._schema_idx
-        opt = idx.get(key)
-        if opt:
-            self._validate_value(opt, value)
-            scope = opt.get("scope", "global")
+        field = self.compiled.get(key)
+        layer = "global"
+        if field is not None:
+            field.validate(value)
+            opt = field.opt
+            layer = {"local": "local", "secret": "secrets"}.get(
+                opt.get("scope", "global"), "global"
+            )
+        with self._lock:
+            # klucz spoza schematu → zapis do global
             target = {
                 "global": self.global_cfg,
                 "local": self.local_cfg,
-                "secret": self.secrets,
-            }.get(scope, self.global_cfg)
-        else:
-            # klucz spoza schematu → zapis do global
-            target = self.global_cfg
-        before_val = get_by_key(self.merged, key)
-        self._schema_defaults_injected.discard(key)
-        set_by_key(target, key, value)
-        self.merged = self._merge_all()
-        self._audit_change(key, before_val=before_val, after_val=value, who=who)
+                "secrets": self.secrets,
+            }[layer]
+            self._schema_defaults_injected.discard(key)
+            if get_by_key(target, key, _MISSING) == value:
+                return
+            before_val = get_by_key(self.merged, key)
+            set_by_key(target, key, value)
+            self._dirty_layers.add(layer)
+            self._invalidate_cache(self._merge_key(key))
+            self._audit_change(key, before_val=before_val, after_val=value, who=who)
+            if self._batch_depth:
+                self._batch_changed.append(key)
+                return
+        self._publish([key])
+
+    # ========== szyna zmian ==========
+    bus = _BUS
+
+    def subscribe(
+        self, prefix: str, callback: Callable[[str, Any], None]
+    ) -> Callable[[], None]:
+        """Rejestruje ``callback(key, value)`` na zmiany kluczy ``prefix``.
+
+        Subskrypcje przeżywają ``ConfigManager.refresh()``. Zwraca funkcję
+        wypisującą.
+        """
+
+        return _BUS.subscribe(prefix, callback)
+
+    def watch_file(self, path: str, callback: Callable[[str], None]) -> Callable[[], None]:
+        """Rejestruje ``callback(path)`` na zmianę pliku ``path`` (zob. ``ConfigChangeBus``)."""
+
+        return _BUS.watch_file(path, callback)
+
+    @staticmethod
+    def start_file_watch(interval_s: float = FILE_WATCH_INTERVAL_S) -> None:
+        """Uruchamia wątek wykrywający zmiany plików configu poza programem."""
+
+        _BUS.start(interval_s)
+
+    def _publish(self, keys: Iterable[str]) -> None:
+        _BUS.publish(keys, self.get)
+
+    def reload_from_disk(self, path: str | None = None) -> List[str]:
+        """Wczytuje ponownie warstwy zmienione poza programem.
+
+        ``path`` ogranicza przeładowanie do jednego pliku warstwy. Warstwy z
+        niezapisanymi zmianami są pomijane. Publikuje i zwraca zmienione klucze.
+        """
+
+        layers = {
+            "global": self.config_path,
+            "local": LOCAL_PATH,
+            "secrets": SECRETS_PATH,
+        }
+        target = os.path.abspath(path) if path else None
+        with self._lock:
+            before = flatten(self.merged)
+            reloaded = False
+            for name, layer_path in layers.items():
+                if target and os.path.abspath(layer_path) != target:
+                    continue
+                if name in self._dirty_layers:
+                    log.warning(
+                        "[CFG-BUS] %s zmieniony poza programem, ale są niezapisane zmiany – pomijam",
+                        layer_path,
+                    )
+                    continue
+                data = self._load_json(layer_path) or {}
+                migrate_dotted_keys(data)
+                if name == "global":
+                    self.global_cfg = self._ensure_defaults_from_schema(data, self.schema)
+                elif name == "local":
+                    self.local_cfg = data
+                else:
+                    self.secrets = data
+                reloaded = True
+            if not reloaded:
+                return []
+            self.merged = self._merge_all()
+            self._get_cache = {}
+            after = flatten(self.merged)
+        changed = sorted(
+            k
+            for k in before.keys() | after.keys()
+            if before.get(k, _MISSING) != after.get(k, _MISSING)
+        )
+        if changed:
+            log.info("[CFG-BUS] przeładowano config z dysku: %d zmian", len(changed))
+            self._publish(changed)
+        return changed
+
+    @contextmanager
+    def batch(self):
+        """Grupuje wiele ``set`` w jedną transakcję.
+
+        Wpisy audytu są zapisywane jednym dopisaniem do pliku, a ``save_all``
+        wywołane wewnątrz bloku wykonuje się raz – po wyjściu z najbardziej
+        zewnętrznego ``batch()``::
+
+            with cfg.batch():
+                cfg.set("ui.theme", "dark")
+                cfg.set("ui.language", "pl")
+                cfg.save_all()
+        """
+
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                records, self._batch_audit = self._batch_audit, []
+                self._write_audit(records)
+                changed, self._batch_changed = self._batch_changed, []
+                self._publish(changed)
+                if self._batch_save:
+                    self._batch_save = False
+                    self.save_all()
 
     def save_all(self):
+        with self._lock:
+            if self._batch_depth:
+                self._batch_save = True
+                return
         now = time.monotonic()
         perform_now = False
         remaining = self._save_debounce_seconds
@@ -547,27 +871,57 @@ class ConfigManager:
             self._last_save_ts = time.monotonic()
         self._perform_save_all()
 
+    @metrics.timed("config.save")
     def _perform_save_all(self) -> None:
-        migrate_dotted_keys(self.global_cfg)
-        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = Path(BACKUP_DIR)
-        backup_dir.mkdir(parents=True, exist_ok=True)
-        backup_path = backup_dir / f"config_{stamp}.json"
-        config_path = Path(self.config_path)
-        print(f"[WM-DBG] backup_dir={backup_dir}")
-        if config_path.exists():
-            shutil.copy2(config_path, backup_path)
-        else:
-            self._save_json(str(backup_path), self.global_cfg or {})
-        print(f"[WM-DBG] writing backup: {backup_path}")
-        if self.global_cfg is not None:
+        # także z wątku timera (zapis odroczony) – warstwy nie mogą się
+        # zmienić w trakcie zapisu ani przeładowania z dysku
+        with self._lock:
+            dirty = self._write_dirty_layers()
+        if dirty & {"global", "local"}:
+            self._snapshot_config()
+
+    def _write_dirty_layers(self) -> set[str]:
+        dirty, self._dirty_layers = self._dirty_layers, set()
+        if not dirty:
+            print("[WM-DBG] save_all: brak zmian – pomijam zapis")
+            return dirty
+        if "global" in dirty:
+            migrate_dotted_keys(self.global_cfg)
+            stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            backup_dir = Path(BACKUP_DIR)
+            backup_dir.mkdir(parents=True, exist_ok=True)
+            backup_path = backup_dir / f"config_{stamp}.json"
+            config_path = Path(self.config_path)
+            print(f"[WM-DBG] backup_dir={backup_dir}")
+            if config_path.exists():
+                shutil.copy2(config_path, backup_path)
+            else:
+                self._save_json(str(backup_path), self.global_cfg or {})
+            print(f"[WM-DBG] writing backup: {backup_path}")
             self._save_json(str(config_path), self.global_cfg)
             print(f"[WM-DBG] writing config: {config_path}")
-        if self.local_cfg is not None:
+        if "local" in dirty:
             self._save_json(LOCAL_PATH, self.local_cfg)
-        if self.secrets is not None:
+        if "secrets" in dirty:
             self._save_json(SECRETS_PATH, self.secrets)
         self._prune_rollbacks()
+        return dirty
+
+    def _snapshot_config(self) -> None:
+        """Migawka config.json/config.local.json w magazynie ``snapshots``.
+
+        Kopie ``config_*.json`` zostają jako szybki rollback ostatnich zapisów;
+        dłuższa historia (razem z ``data/``) siedzi w magazynie migawek, gdzie
+        niezmienione treści nie zajmują dodatkowego miejsca.
+        """
+        try:
+            import snapshots
+
+            snapshots.take_snapshot(
+                snapshots.config_sources(self.config_path), label="config", prune=False
+            )
+        except Exception as exc:  # migawka nie może zablokować zapisu
+            log.warning("[CFG] migawka konfiguracji nieudana: %r", exc)
 
     def export_public(self, path: str):
         """Eksport bez sekretnych kluczy (scope=secret)."""
@@ -577,11 +931,9 @@ class ConfigManager:
 
     def import_with_dry_run(self, path: str) -> Dict[str, Any]:
         incoming = self._load_json_or_raise(path, msg_prefix="Brak pliku do importu")
-        idx = self._schema_idx
         diffs: List[Dict[str, Any]] = []
         for k, v in flatten(incoming).items():
-            if k in idx:
-                self._validate_value(idx[k], v)
+            self.compiled.validate(k, v)
             cur = get_by_key(self.merged, k, None)
             if cur != v:
                 diffs.append({"key": k, "current": cur, "new": v})
@@ -590,9 +942,10 @@ class ConfigManager:
     def apply_import(self, path: str, who: str = "system"):
         _ = self.import_with_dry_run(path)  # walidacja
         incoming = self._load_json_or_raise(path)
-        for k, v in flatten(incoming).items():
-            self.set(k, v, who=who)
-        self.save_all()
+        with self.batch():
+            for k, v in flatten(incoming).items():
+                self.set(k, v, who=who)
+            self.save_all()
         return _
 
     # ========== audyt i porządkowanie backupów ==========
@@ -606,10 +959,20 @@ class ConfigManager:
             "before": before_val,
             "after": after_val,
         }
+        if getattr(self, "_batch_depth", 0):
+            self._batch_audit.append(rec)
+            return
+        self._write_audit([rec])
+
+    def _write_audit(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
         os.makedirs(AUDIT_DIR, exist_ok=True)
         path = os.path.join(AUDIT_DIR, "config_changes.jsonl")
         with open(path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.write(
+                "".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in records)
+            )
 
     def _prune_rollbacks(self):
         try:
@@ -639,6 +1002,32 @@ def get_path(key: str, default: Any = None) -> Any:
     return mgr.get(key, default)
 
 
+def live_config() -> Dict[str, Any]:
+    """Widok scalony bieżącej instancji (bez kopiowania; ``{}`` przy błędzie).
+
+    Moduły bez własnego ``set_config`` czytają przez to zawsze aktualny config –
+    ``set`` aktualizuje ten słownik w miejscu, a ``refresh`` podmienia instancję.
+    """
+
+    try:
+        return ConfigManager().merged
+    except Exception as exc:
+        log.debug("live_config niedostępny: %s", exc)
+        return {}
+
+
+def config_or_live(cfg: Any) -> Dict[str, Any]:
+    """``cfg`` przekazany przez ``set_config`` modułu, a gdy go nie ma – :func:`live_config`.
+
+    Dla modułów (obecność, urlopy) trzymających słownik ``config`` ustawiany
+    opcjonalnie przy starcie: bez niego widziałyby pusty config.
+    """
+
+    if isinstance(cfg, dict) and cfg:
+        return cfg
+    return live_config()
+
+
 def set_path(key: str, value: Any, *, who: str = "system", save: bool = True) -> None:
     """Shortcut for setting a config path and optionally saving immediately."""
 
@@ -669,6 +1058,15 @@ def flatten(d: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
     return res
 
 
+def _lookup(d: Dict[str, Any], parts: List[str]) -> Any:
+    cur: Any = d
+    for part in parts:
+        if not isinstance(cur, dict) or part not in cur:
+            return _MISSING
+        cur = cur[part]
+    return cur
+
+
 def get_by_key(d: Dict[str, Any], dotted: str, default: Any = None) -> Any:
     cur: Any = d
     for part in dotted.split("."):
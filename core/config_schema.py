@@ -0,0 +1,363 @@
+"""Skompilowany schemat ustawień (``settings_schema.json``).
+
+Schemat jest przechodzony raz: każde pole (z zakładek, grup, podzakładek i
+``options``) zamieniane jest na :class:`CompiledField` z gotowym
+walidatorem dobranym do typu. Wynik trzymany jest w pamięci pod kluczem
+sha256 pliku schematu, więc kolejne ``ConfigManager.refresh()`` i okna
+ustawień nie kompilują go ponownie, dopóki plik się nie zmieni.
+
+Użycie::
+
+    compiled = config_schema.load(SCHEMA_PATH)
+    compiled.validate("ui.theme", "dark")      # ConfigError przy błędzie
+    compiled.validate_config(merged_cfg)       # cały config
+    compiled.coerce("ui.autosave", "1")        # -> True (wartość z widżetu)
+
+:class:`ConfigManager` i ``gui_settings.SettingsPanel`` korzystają z tego
+samego obiektu (``ConfigManager.compiled``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class ConfigError(Exception):
+    pass
+
+
+Check = Callable[[Any], None]
+
+_MISSING = object()
+
+
+def iter_schema_fields(schema: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Definicje pól ``schema`` (bez ``deprecated``), także z podzakładek."""
+
+    def from_tabs(tabs: List[Dict[str, Any]]):
+        for tab in tabs:
+            for group in tab.get("groups", []):
+                for field in group.get("fields", []):
+                    if field.get("deprecated"):
+                        continue
+                    yield field
+            yield from from_tabs(tab.get("subtabs", []))
+
+    yield from from_tabs(schema.get("tabs", []))
+    for opt in schema.get("options", []):
+        if opt.get("deprecated"):
+            continue
+        yield opt
+
+
+# ---------------------------------------------------------------------------
+# Walidatory typów
+
+
+def _type_error(key: str, expected: str, value: Any) -> ConfigError:
+    return ConfigError(f"{key}: oczekiwano {expected}, dostano {type(value).__name__}")
+
+
+def _check_bool(opt: Dict[str, Any]) -> Check:
+    key = opt.get("key", "")
+
+    def check(value: Any) -> None:
+        if not isinstance(value, bool):
+            raise _type_error(key, "bool", value)
+
+    return check
+
+
+def _check_int(opt: Dict[str, Any]) -> Check:
+    key = opt.get("key", "")
+    lo = opt.get("min", _MISSING)
+    hi = opt.get("max", _MISSING)
+
+    def check(value: Any) -> None:
+        if not isinstance(value, int):
+            raise _type_error(key, "int", value)
+        if lo is not _MISSING and value < lo:
+            raise ConfigError(f"{key}: < min {lo}")
+        if hi is not _MISSING and value > hi:
+            raise ConfigError(f"{key}: > max {hi}")
+
+    return check
+
+
+def _check_enum(opt: Dict[str, Any]) -> Check:
+    key = opt.get("key", "")
+    allowed = opt.get("enum") or opt.get("values") or []
+    try:
+        fast = frozenset(allowed)
+    except TypeError:  # wartości niehaszowalne – zostaje lista
+        fast = None
+
+    def check(value: Any) -> None:
+        try:
+            ok = value in fast if fast is not None else value in allowed
+        except TypeError:
+            ok = value in allowed
+        if not ok:
+            raise ConfigError(f"{key}: {value} nie w {allowed}")
+
+    return check
+
+
+def _check_array(opt: Dict[str, Any]) -> Check:
+    key = opt.get("key", "")
+
+    def check(value: Any) -> None:
+        if not isinstance(value, list):
+            raise _type_error(key, "listy", value)
+
+    return check
+
+
+_VALUE_TYPES: Dict[str, Tuple[str, Tuple[type, ...]]] = {
+    "string": ("string", (str,)),
+    "int": ("int", (int,)),
+    "float": ("float", (int, float)),
+    "bool": ("bool", (bool,)),
+}
+
+
+def _check_dict(opt: Dict[str, Any]) -> Check:
+    key = opt.get("key", "")
+    vtype = _VALUE_TYPES.get(opt.get("value_type") or "")
+
+    def check(value: Any) -> None:
+        if not isinstance(value, dict):
+            raise _type_error(key, "dict", value)
+        if vtype is None:
+            return
+        name, types = vtype
+        for k, v in value.items():
+            if not isinstance(v, types):
+                raise _type_error(f"{key}.{k}", name, v)
+
+    return check
+
+
+def _check_string(opt: Dict[str, Any]) -> Check:
+    key = opt.get("key", "")
+
+    def check(value: Any) -> None:
+        if not isinstance(value, str):
+            raise ConfigError(f"{key}: oczekiwano string")
+
+    return check
+
+
+def _check_any(_value: Any) -> None:
+    """Nieznane typy traktujemy jako string/opaque."""
+
+
+_CHECKS: Dict[str, Callable[[Dict[str, Any]], Check]] = {
+    "bool": _check_bool,
+    "int": _check_int,
+    "enum": _check_enum,
+    "array": _check_array,
+    "dict": _check_dict,
+    "object": _check_dict,
+    "string": _check_string,
+    "path": _check_string,
+}
+
+
+# ---------------------------------------------------------------------------
+# Koercja wartości (domyślne ze schematu, wartości z widżetów)
+
+
+def allowed_values(opt: Dict[str, Any]) -> List[Any]:
+    return opt.get("allowed") or opt.get("values") or opt.get("enum") or []
+
+
+def coerce_default(opt: Dict[str, Any]) -> Any:
+    """Wartość domyślna pola sprowadzona do jego typu."""
+
+    default = opt.get("default")
+    ftype = opt.get("type")
+
+    if ftype == "bool":
+        if isinstance(default, bool):
+            return default
+        if isinstance(default, str):
+            return default.lower() in {"1", "true", "yes", "on"}
+        return bool(default) if default is not None else False
+
+    if ftype == "int":
+        try:
+            return int(default)
+        except (TypeError, ValueError):
+            return 0
+
+    if ftype == "float":
+        try:
+            return float(default)
+        except (TypeError, ValueError):
+            return 0.0
+
+    if ftype in ("enum", "select"):
+        allowed = allowed_values(opt)
+        if default in allowed:
+            return default
+        return allowed[0] if allowed else None
+
+    return default
+
+
+def coerce_value(opt: Dict[str, Any], value: Any) -> Any:
+    """Wartość odczytana z widżetu przed zapisem do ``ConfigManager``.
+
+    ``"0"``/``"1"`` dla pól bool zamieniane są na ``bool``; spoza listy
+    dozwolonych wartości pola ``enum`` wybierana jest pierwsza dozwolona.
+    """
+
+    ftype = opt.get("type")
+    if ftype == "bool" and isinstance(value, str) and value in {"0", "1"}:
+        return value == "1"
+    if ftype == "enum":
+        allowed = opt.get("allowed") or opt.get("enum") or opt.get("values") or []
+        if allowed and value not in allowed:
+            return allowed[0]
+    return value
+
+
+# ---------------------------------------------------------------------------
+# Schemat skompilowany
+
+
+class CompiledField:
+    """Pole schematu z walidatorem przygotowanym raz przy kompilacji."""
+
+    __slots__ = ("key", "type", "opt", "_check")
+
+    def __init__(self, opt: Dict[str, Any]) -> None:
+        self.key: str = opt.get("key", "")
+        self.type: Optional[str] = opt.get("type")
+        self.opt = opt
+        factory = _CHECKS.get(self.type or "")
+        self._check: Check = factory(opt) if factory else _check_any
+
+    def validate(self, value: Any) -> None:
+        self._check(value)
+
+    def default(self) -> Any:
+        return coerce_default(self.opt)
+
+    def coerce(self, value: Any) -> Any:
+        return coerce_value(self.opt, value)
+
+
+def compile_field(opt: Dict[str, Any]) -> CompiledField:
+    return CompiledField(opt)
+
+
+class CompiledSchema:
+    """Indeks pól ``klucz → CompiledField`` (pierwsze wystąpienie klucza wygrywa)."""
+
+    def __init__(self, schema: Dict[str, Any], digest: str = "") -> None:
+        self.schema = schema
+        self.digest = digest
+        self.fields: Dict[str, CompiledField] = {}
+        for opt in iter_schema_fields(schema):
+            key = opt.get("key")
+            if key and key not in self.fields:
+                self.fields[key] = CompiledField(opt)
+        # słownik definicji – dawny ``ConfigManager._schema_idx``
+        self.options: Dict[str, Dict[str, Any]] = {k: f.opt for k, f in self.fields.items()}
+        self._paths = [(f, k.split(".")) for k, f in self.fields.items()]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.fields
+
+    def get(self, key: str) -> Optional[CompiledField]:
+        return self.fields.get(key)
+
+    def validate(self, key: str, value: Any) -> None:
+        """Sprawdź ``value`` dla ``key``; klucze spoza schematu przechodzą."""
+        field = self.fields.get(key)
+        if field is not None:
+            field._check(value)
+
+    def validate_config(self, cfg: Dict[str, Any]) -> None:
+        """Sprawdź wszystkie pola obecne w ``cfg`` (wartości ``None`` pomijane)."""
+        for field, parts in self._paths:
+            node: Any = cfg
+            for part in parts:
+                if not isinstance(node, dict):
+                    node = None
+                    break
+                node = node.get(part)
+            if node is not None:
+                field._check(node)
+
+    def coerce(self, key: str, value: Any) -> Any:
+        field = self.fields.get(key)
+        return field.coerce(value) if field is not None else value
+
+    def defaults(self) -> Dict[str, Any]:
+        return {k: f.default() for k, f in self.fields.items() if f.opt.get("default") is not None}
+
+
+# ---------------------------------------------------------------------------
+# Pamięć podręczna wg sha256 pliku
+
+_LOCK = threading.Lock()
+_BY_DIGEST: Dict[str, CompiledSchema] = {}
+_BY_PATH: Dict[str, Tuple[int, int, str]] = {}  # ścieżka -> (mtime_ns, rozmiar, sha256)
+
+
+def _parse_json(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load(path: str, parse: Optional[Callable[[str], Dict[str, Any]]] = None) -> CompiledSchema:
+    """Skompilowany schemat z pliku ``path``.
+
+    Przy niezmienionym ``(mtime, rozmiar)`` pliku wynik jest zwracany bez
+    czytania; w przeciwnym razie liczony jest sha256 treści i dopiero przy
+    nowej treści schemat jest parsowany (``parse(path)``) i kompilowany.
+    """
+
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    with _LOCK:
+        known = _BY_PATH.get(key)
+        if known and known[:2] == (st.st_mtime_ns, st.st_size) and known[2] in _BY_DIGEST:
+            return _BY_DIGEST[known[2]]
+    with open(key, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    with _LOCK:
+        compiled = _BY_DIGEST.get(digest)
+    if compiled is None:
+        compiled = CompiledSchema((parse or _parse_json)(key), digest)
+    with _LOCK:
+        compiled = _BY_DIGEST.setdefault(digest, compiled)
+        _BY_PATH[key] = (st.st_mtime_ns, st.st_size, digest)
+    return compiled
+
+
+def clear_cache() -> None:
+    with _LOCK:
+        _BY_DIGEST.clear()
+        _BY_PATH.clear()
+
+
+__all__ = [
+    "ConfigError",
+    "CompiledField",
+    "CompiledSchema",
+    "allowed_values",
+    "clear_cache",
+    "coerce_default",
+    "coerce_value",
+    "compile_field",
+    "iter_schema_fields",
+    "load",
+]
@@ -0,0 +1,303 @@
+"""Lekkie metryki czasu i liczniki dla gorących ścieżek WM.
+
+Użycie::
+
+    from core import metrics
+
+    @metrics.timed("magazyn.save")
+    def save_magazyn(data): ...
+
+    with metrics.timer("bom.compute"):
+        ...
+
+    metrics.incr("presence.heartbeat")
+
+Metryki są domyślnie wyłączone – wtedy ``timed``/``timer``/``incr`` kosztują
+jedno sprawdzenie flagi. Włączenie: ``metrics.enable()`` (lub
+``diagnostics.metrics_enabled`` w configu, zob. :func:`configure`, albo
+zmienna środowiskowa ``WM_METRICS=1``; wartość z configu ma pierwszeństwo).
+Migawki trafiają okresowo do pliku JSONL ``metrics.jsonl`` w ``paths.logs_dir``
+(:func:`metrics_path`) i są widoczne w zakładce *Diagnostyka* ustawień.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from config.paths import join_path
+
+# Nadpisuje lokalizację pliku metryk (testy); domyślnie paths.logs_dir/metrics.jsonl
+METRICS_PATH: Path | None = None
+DEFAULT_FLUSH_INTERVAL_S = 60.0
+
+# Górne granice kubełków histogramu czasu (ms); ostatni kubełek to "więcej".
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_ENABLED = os.getenv("WM_METRICS", "").strip().lower() in {"1", "true", "yes", "on"}
+_LOCK = threading.Lock()
+_COUNTERS: Dict[str, float] = {}
+_HISTOGRAMS: Dict[str, "_Histogram"] = {}
+_STARTED = datetime.now().isoformat(timespec="seconds")
+_FLUSH_TIMER: threading.Timer | None = None
+_FLUSH_INTERVAL_S = DEFAULT_FLUSH_INTERVAL_S
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.buckets[bisect_left(BUCKETS_MS, value)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Przybliżony kwantyl – górna granica kubełka (ograniczona przez max)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                bound = BUCKETS_MS[idx] if idx < len(BUCKETS_MS) else self.max
+                return min(float(bound), self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "avg_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min, 3) if self.count else 0.0,
+            "max_ms": round(self.max, 3),
+            "p50_ms": round(self.quantile(0.5), 3),
+            "p95_ms": round(self.quantile(0.95), 3),
+        }
+
+
+# ===================== włączanie =====================
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def metrics_path() -> Path:
+    """Plik JSONL z migawkami metryk (``paths.logs_dir`` z ustawień)."""
+    if METRICS_PATH is not None:
+        return Path(METRICS_PATH)
+    return Path(join_path("paths.logs_dir", "metrics.jsonl"))
+
+
+def enable(flag: bool = True, flush_interval_s: float | None = None) -> None:
+    """Włącza/wyłącza zbieranie metryk i okresowy zapis do :func:`metrics_path`."""
+    global _ENABLED, _FLUSH_INTERVAL_S
+    _ENABLED = bool(flag)
+    if flush_interval_s is not None:
+        _FLUSH_INTERVAL_S = float(flush_interval_s)
+    if _ENABLED and _FLUSH_INTERVAL_S > 0:
+        _schedule_flush()
+    else:
+        _cancel_flush()
+
+
+def configure(cfg: Any) -> None:
+    """Ustawia metryki wg configu (``diagnostics.metrics_enabled`` i
+    ``diagnostics.metrics_flush_s``). ``cfg`` to obiekt z metodą ``get``.
+
+    Ustawiona w configu flaga wygrywa z ``WM_METRICS``; bez niej zostaje
+    stan bieżący."""
+    try:
+        value = cfg.get("diagnostics.metrics_enabled", None)
+        interval = float(
+            cfg.get("diagnostics.metrics_flush_s", DEFAULT_FLUSH_INTERVAL_S)
+        )
+    except Exception:
+        return
+    enable(_ENABLED if value is None else bool(value), flush_interval_s=interval)
+
+
+# ===================== rejestrowanie =====================
+
+
+def incr(name: str, value: float = 1) -> None:
+    """Zwiększa licznik ``name``."""
+    if not _ENABLED:
+        return
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + value
+
+
+def observe(name: str, value_ms: float) -> None:
+    """Dodaje pomiar (w milisekundach) do histogramu ``name``."""
+    if not _ENABLED:
+        return
+    with _LOCK:
+        hist = _HISTOGRAMS.get(name)
+        if hist is None:
+            hist = _HISTOGRAMS[name] = _Histogram()
+        hist.add(value_ms)
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        observe(self.name, (time.perf_counter() - self.start) * 1000.0)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str):
+    """Context manager mierzący czas bloku (no-op przy wyłączonych metrykach)."""
+    if not _ENABLED:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Dekorator mierzący czas wywołania funkcji w histogramie ``name``."""
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(name, (time.perf_counter() - start) * 1000.0)
+
+        return wrapper
+
+    return decorator
+
+
+# ===================== odczyt / zapis =====================
+
+
+def snapshot() -> Dict[str, Any]:
+    """Zwraca bieżące wartości: ``{"counters": {...}, "timers": {...}}``."""
+    with _LOCK:
+        counters = dict(_COUNTERS)
+        timers = {name: h.as_dict() for name, h in _HISTOGRAMS.items()}
+    return {"counters": counters, "timers": timers}
+
+
+def reset() -> None:
+    with _LOCK:
+        _COUNTERS.clear()
+        _HISTOGRAMS.clear()
+
+
+def flush(path: str | os.PathLike[str] | None = None) -> bool:
+    """Dopisuje migawkę metryk jako linię JSON. Zwraca ``False`` gdy brak danych."""
+    data = snapshot()
+    if not data["counters"] and not data["timers"]:
+        return False
+    target = Path(path) if path is not None else metrics_path()
+    rec = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "session": _STARTED,
+        "pid": os.getpid(),
+        **data,
+    }
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    except OSError as exc:
+        print(f"[WM-DBG][METRICS] zapis nieudany {target}: {exc}")
+        return False
+    return True
+
+
+def _flush_tick() -> None:
+    global _FLUSH_TIMER
+    _FLUSH_TIMER = None
+    flush()
+    if _ENABLED:
+        _schedule_flush()
+
+
+def _schedule_flush() -> None:
+    global _FLUSH_TIMER
+    with _LOCK:
+        if _FLUSH_TIMER is not None:
+            return
+        _FLUSH_TIMER = threading.Timer(_FLUSH_INTERVAL_S, _flush_tick)
+        _FLUSH_TIMER.daemon = True
+        _FLUSH_TIMER.start()
+
+
+def _cancel_flush() -> None:
+    global _FLUSH_TIMER
+    with _LOCK:
+        timer_ = _FLUSH_TIMER
+        _FLUSH_TIMER = None
+    if timer_ is not None:
+        timer_.cancel()
+
+
+def _flush_at_exit() -> None:
+    if _ENABLED:
+        flush()
+
+
+atexit.register(_flush_at_exit)
+
+
+__all__ = [
+    "METRICS_PATH",
+    "configure",
+    "enable",
+    "flush",
+    "incr",
+    "is_enabled",
+    "metrics_path",
+    "observe",
+    "reset",
+    "snapshot",
+    "timed",
+    "timer",
+]
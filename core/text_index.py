@@ -0,0 +1,124 @@
+"""Indeks n-gramowy do szybkiego wyszukiwania podciągów w pamięci.
+
+Teksty są normalizowane przez :func:`fold` (małe litery, bez polskich
+znaków diakrytycznych), więc „sruba” znajduje „Śruba”. Wynik wyszukiwania
+jest zawsze weryfikowany zwykłym ``in`` na znormalizowanym tekście – indeks
+tylko zawęża kandydatów, semantyka pozostaje „podciąg”.
+
+Użycie::
+
+    idx = NgramIndex()
+    idx.build((tool["nr"], blob) for tool in tools)
+    idx.search("frez 12")   # -> klucze w kolejności dodania
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from typing import Dict, Hashable, Iterable, List, Set
+
+DEFAULT_N = 3
+
+_FOLD_TABLE = str.maketrans({"ł": "l", "Ł": "l"})
+
+
+def fold(text: object) -> str:
+    """Małe litery bez znaków diakrytycznych (``"Łożysko Ś"`` → ``"lozysko s"``)."""
+
+    s = str(text or "").translate(_FOLD_TABLE).lower()
+    if s.isascii():
+        return s
+    return "".join(
+        ch for ch in unicodedata.normalize("NFKD", s) if not unicodedata.combining(ch)
+    )
+
+
+class NgramIndex:
+    """Odwrócony indeks n-gramów: ``n-gram → zbiór kluczy``.
+
+    Zapytania krótsze niż ``n`` znaków przeszukują teksty liniowo (nadal w
+    pamięci, bez czytania plików).
+    """
+
+    def __init__(self, n: int = DEFAULT_N) -> None:
+        self.n = n
+        self._texts: Dict[Hashable, str] = {}
+        self._order: Dict[Hashable, int] = {}
+        self._postings: Dict[str, Set[Hashable]] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._texts
+
+    def _grams(self, text: str) -> Set[str]:
+        n = self.n
+        return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+    def build(self, docs: Iterable[tuple[Hashable, object]]) -> "NgramIndex":
+        self.clear()
+        for key, text in docs:
+            self.add(key, text)
+        return self
+
+    def clear(self) -> None:
+        self._texts.clear()
+        self._order.clear()
+        self._postings.clear()
+        self._seq = 0
+
+    def add(self, key: Hashable, text: object) -> None:
+        """Dodaje lub zastępuje dokument ``key`` (zachowuje jego pozycję)."""
+
+        if key in self._texts:
+            self._unlink(key)
+        else:
+            self._order[key] = self._seq
+            self._seq += 1
+        folded = fold(text)
+        self._texts[key] = folded
+        for gram in self._grams(folded):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        if key not in self._texts:
+            return
+        self._unlink(key)
+        del self._texts[key]
+        del self._order[key]
+
+    def _unlink(self, key: Hashable) -> None:
+        for gram in self._grams(self._texts[key]):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def search(self, query: object, limit: int | None = None) -> List[Hashable]:
+        """Klucze dokumentów zawierających ``query`` (po :func:`fold`)."""
+
+        q = fold(query).strip()
+        if not q:
+            keys: Iterable[Hashable] = self._texts
+        elif len(q) < self.n:
+            keys = [k for k, t in self._texts.items() if q in t]
+        else:
+            grams = sorted(self._grams(q), key=lambda g: len(self._postings.get(g, ())))
+            candidates: Set[Hashable] | None = None
+            for gram in grams:
+                posting = self._postings.get(gram)
+                if not posting:
+                    return []
+                candidates = set(posting) if candidates is None else candidates & posting
+                if not candidates:
+                    return []
+            texts = self._texts
+            keys = [k for k in candidates or () if q in texts[k]]
+        out = sorted(keys, key=self._order.__getitem__)
+        return out[:limit] if limit is not None else out
+
+
+__all__ = ["NgramIndex", "fold"]
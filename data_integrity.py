@@ -0,0 +1,721 @@
+# data_integrity.py
+# Wersja: 1.0.1
+"""Kontrola spójności plików JSON/JSONL w katalogu ``data/``.
+
+Każdy plik sprawdzany jest pod kątem kodowania (BOM, nie-UTF-8), uciętego
+zapisu (pusty plik, zera, urwany dokument lub ostatnia linia JSONL) oraz
+kształtu danych wg :data:`SCHEMAS` (magazyn, narzędzia, zlecenia, maszyny,
+profile, przypisania). Z każdego pliku zapamiętywane są też kody, które
+definiuje i do których się odwołuje – na tej podstawie sprawdzane są
+odwołania między magazynami (półprodukty i surowce w BOM, produkty w
+zleceniach, numery narzędzi w przypisaniach).
+
+Wyniki trzymane są w ``data/.integrity_cache.json`` pod kluczem
+``(mtime_ns, rozmiar)``, więc przy starcie czytane są tylko pliki zmienione
+od poprzedniego uruchomienia (w puli wątków); reszta kosztuje jeden ``stat``.
+
+Użycie::
+
+    result = data_integrity.check()          # -> ScanResult
+    for issue in result.issues: ...
+    data_integrity.repair(result)            # BOM/kodowanie/ogon JSONL,
+                                             # migawka albo kwarantanna
+    data_integrity.run_startup_check()       # to samo z logowaniem
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAME = ".integrity_cache.json"
+QUARANTINE_DIR = "_quarantine"
+CHECKER_VERSION = 1
+SCAN_WORKERS = 8
+MAX_SCHEMA_ERRORS = 20  # więcej komunikatów na plik nic nie wnosi
+SKIP_DIRS = {QUARANTINE_DIR, "__pycache__", "media"}
+SUFFIXES = (".json", ".jsonl")
+
+BOM = b"\xef\xbb\xbf"
+FALLBACK_ENCODING = "cp1250"  # pliki edytowane ręcznie w Notatniku
+
+# rodzaje problemów
+BOM_MARK = "bom"
+ENCODING = "encoding"
+EMPTY = "empty"
+TRUNCATED = "truncated"
+SYNTAX = "syntax"
+SCHEMA = "schema"
+REFERENCE = "ref"
+# rodzaje naprawiane przez repair() (reszta tylko w raporcie)
+REPAIRABLE = {BOM_MARK, ENCODING, EMPTY, TRUNCATED, SYNTAX}
+
+Sig = Tuple[int, int]
+
+
+@dataclass
+class Issue:
+    path: str  # ścieżka względem katalogu danych (z "/")
+    kind: str
+    message: str
+    severity: str = "error"  # "error" | "warning"
+
+
+@dataclass
+class FileReport:
+    path: str
+    sig: Sig
+    issues: List[Issue] = field(default_factory=list)
+    provides: Dict[str, List[str]] = field(default_factory=dict)
+    uses: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def broken(self) -> bool:
+        return any(i.kind in (ENCODING, EMPTY, TRUNCATED, SYNTAX) for i in self.issues)
+
+
+@dataclass
+class ScanResult:
+    root: str
+    reports: Dict[str, FileReport]
+    issues: List[Issue]
+    checked: int = 0  # pliki przeczytane w tym przebiegu
+    cached: int = 0  # pliki obsłużone z pamięci podręcznej
+
+    @property
+    def errors(self) -> List[Issue]:
+        return [i for i in self.issues if i.severity == "error"]
+
+
+# ---------------------------------------------------------------------------
+# Schematy magazynów
+
+
+@dataclass(frozen=True)
+class StoreSchema:
+    """Oczekiwany kształt pliku pasującego do ``pattern`` (``fnmatch``).
+
+    ``container`` wskazuje klucz z kolekcją rekordów (np. ``items``);
+    ``each`` oznacza, że rekordami są elementy listy / wartości słownika,
+    w przeciwnym razie rekordem jest cały dokument.
+    """
+
+    pattern: str
+    store: str
+    root: Tuple[type, ...] = (dict,)
+    container: Optional[str] = None
+    each: bool = False
+    record: type = dict
+    required: Tuple[str, ...] = ()
+    numbers: Tuple[str, ...] = ()
+    lists: Tuple[str, ...] = ()
+
+    def validate(self, data: Any) -> List[str]:
+        if not isinstance(data, self.root):
+            names = "/".join(t.__name__ for t in self.root)
+            return [f"oczekiwano {names}, jest {type(data).__name__}"]
+        records: Any = data
+        if self.container is not None and isinstance(data, dict):
+            records = data.get(self.container)
+            if not isinstance(records, (dict, list)):
+                return [f"brak kolekcji '{self.container}'"]
+        if not self.each:
+            return self._check_record("", records)
+        items = records.items() if isinstance(records, dict) else enumerate(records)
+        errors: List[str] = []
+        for key, rec in items:
+            errors.extend(self._check_record(f"[{key}] ", rec))
+            if len(errors) >= MAX_SCHEMA_ERRORS:
+                break
+        return errors[:MAX_SCHEMA_ERRORS]
+
+    def _check_record(self, where: str, rec: Any) -> List[str]:
+        if not isinstance(rec, self.record):
+            return [f"{where}oczekiwano {self.record.__name__}, jest {type(rec).__name__}"]
+        if not isinstance(rec, dict):
+            return []
+        errors = [f"{where}brak pola '{k}'" for k in self.required if rec.get(k) in (None, "")]
+        for k in self.numbers:
+            v = rec.get(k)
+            if v is not None and (isinstance(v, bool) or not isinstance(v, (int, float))):
+                errors.append(f"{where}pole '{k}' nie jest liczbą")
+        for k in self.lists:
+            if k in rec and not isinstance(rec[k], list):
+                errors.append(f"{where}pole '{k}' nie jest listą")
+        return errors
+
+
+# Pierwszy pasujący wzorzec wygrywa; pliki bez schematu sprawdzane są tylko
+# pod kątem kodowania i składni.
+SCHEMAS: Tuple[StoreSchema, ...] = (
+    StoreSchema("magazyn/magazyn.json", "magazyn", container="items", each=True,
+                required=("nazwa",), numbers=("stan", "min_poziom", "rezerwacje")),
+    StoreSchema("magazyn/surowce.json", "magazyn", root=(list,), each=True,
+                required=("kod",), numbers=("stan", "prog_alertu")),
+    StoreSchema("magazyn/polprodukty.json", "magazyn", each=True, numbers=("stan",)),
+    StoreSchema("magazyn/stany.json", "magazyn", each=True, numbers=("stan", "prog_alert")),
+    StoreSchema("magazyn/przyjecia.json", "magazyn", root=(list,), each=True),
+    StoreSchema("narzedzia/*.json", "narzedzia", required=("numer",), lists=("zadania",)),
+    StoreSchema("zlecenia/_seq.json", "zlecenia"),
+    StoreSchema("zlecenia/*.json", "zlecenia", required=("id", "status"),
+                numbers=("ilosc",), lists=("historia",)),
+    StoreSchema("produkty/*.json", "bom", lists=("polprodukty", "czynnosci")),
+    StoreSchema("polprodukty/*.json", "bom", required=("kod",), lists=("czynnosci",)),
+    StoreSchema("maszyny/maszyny.json", "maszyny", root=(list, dict), each=True,
+                container="maszyny", lists=("zadania",)),
+    StoreSchema("maszyny.json", "maszyny", root=(list,), each=True, lists=("zadania",)),
+    StoreSchema("profiles.json", "profile", root=(dict, list), each=True),
+    StoreSchema("uzytkownicy.json", "profile", root=(list,), each=True, required=("login",)),
+    StoreSchema("user/*.json", "profile"),
+    StoreSchema("zadania_przypisania.json", "przypisania", root=(list,), each=True,
+                required=("task", "user")),
+    StoreSchema("profil_overrides/assign_*.json", "przypisania", each=True, record=str),
+)
+
+
+def schema_for(rel: str) -> Optional[StoreSchema]:
+    for schema in SCHEMAS:
+        if fnmatch.fnmatchcase(rel, schema.pattern):
+            return schema
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Odwołania między magazynami
+
+
+def _tool_key(value: Any) -> str:
+    """Numer narzędzia bez zer wiodących (``"007"``, ``"NARZ-7-2"`` -> ``"7"``)."""
+    text = str(value).strip()
+    if text.upper().startswith("NARZ-"):
+        text = text[5:].split("-", 1)[0]
+    return str(int(text)) if text.isdigit() else text
+
+
+def _norm(ns: str, code: str) -> str:
+    return _tool_key(code) if ns == "narzedzie" else code.strip().casefold()
+
+
+def _references(rel: str, data: Any) -> Tuple[Dict[str, List[str]], List[Tuple[str, str]]]:
+    """Kody definiowane przez plik i odwołania do kodów z innych plików."""
+    provides: Dict[str, set] = {}
+    uses: List[Tuple[str, str]] = []
+
+    def give(ns: str, *codes: Any) -> None:
+        provides.setdefault(ns, set()).update(str(c) for c in codes if c not in (None, ""))
+
+    stem = rel.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+    if rel.startswith("polprodukty/") and isinstance(data, dict):
+        give("polprodukt", stem, data.get("kod"))
+        sur = data.get("surowiec")
+        if isinstance(sur, dict) and sur.get("kod"):
+            uses.append(("surowiec", str(sur["kod"])))
+    elif rel.startswith("produkty/") and isinstance(data, dict):
+        give("produkt", stem, data.get("kod"), data.get("symbol"))
+        for pp in data.get("polprodukty") or []:
+            if not isinstance(pp, dict):
+                continue
+            if pp.get("kod"):
+                uses.append(("polprodukt", str(pp["kod"])))
+            sur = pp.get("surowiec")
+            if isinstance(sur, dict) and sur.get("typ"):
+                uses.append(("surowiec", str(sur["typ"])))
+    elif rel == "magazyn/polprodukty.json" and isinstance(data, dict):
+        give("polprodukt", *data)
+    elif rel == "magazyn/surowce.json" and isinstance(data, list):
+        for rec in data:
+            if isinstance(rec, dict):
+                give("surowiec", rec.get("kod"), rec.get("nazwa"))
+    elif rel in ("magazyn/stany.json", "magazyn/magazyn.json") and isinstance(data, dict):
+        # BOM-y odwołują się do surowców kodem albo nazwą
+        items = data.get("items") if rel == "magazyn/magazyn.json" else data
+        if isinstance(items, dict):
+            for code, rec in items.items():
+                give("surowiec", code, rec.get("nazwa") if isinstance(rec, dict) else None)
+    elif rel.startswith("narzedzia/") and isinstance(data, dict):
+        give("narzedzie", stem, data.get("numer"))
+    elif rel.startswith("zlecenia/") and isinstance(data, dict) and data.get("produkt"):
+        uses.append(("produkt", str(data["produkt"])))
+    elif rel == "profil_overrides/assign_tools.json" and isinstance(data, dict):
+        uses.extend(("narzedzie", str(k)) for k in data)
+    elif rel == "zadania_przypisania.json" and isinstance(data, list):
+        for rec in data:
+            if isinstance(rec, dict) and str(rec.get("task", "")).upper().startswith("NARZ-"):
+                uses.append(("narzedzie", str(rec["task"])))
+    return {ns: sorted({_norm(ns, c) for c in codes}) for ns, codes in provides.items()}, uses
+
+
+ASSIGNMENTS = "zadania_przypisania.json"
+ASSIGNMENTS_LOG = "zadania_przypisania.log.jsonl"
+
+
+def _assignment_uses(root: str, reports: Dict[str, FileReport]) -> Optional[List[Tuple[str, str]]]:
+    """Odwołania przypisań po odtworzeniu dziennika na migawce.
+
+    ``zadania_assign_io`` dopisuje zmiany do dziennika i zwija go do
+    migawki co kilkaset wpisów – sama migawka nie widzi świeżych przypisań
+    ani zwolnień. Kolejność operacji jak w ``AssignmentStore._apply``
+    (klucz ``(task, context)``). ``None``, gdy dziennika nie ma.
+    """
+    if ASSIGNMENTS_LOG not in reports:
+        return None
+    tasks: Dict[Tuple[Any, Any], Any] = {}
+    store = reports.get(ASSIGNMENTS)
+    if store is not None and not store.broken:
+        try:
+            with open(os.path.join(root, ASSIGNMENTS), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = []
+        for rec in data if isinstance(data, list) else []:
+            if isinstance(rec, dict):
+                tasks[(rec.get("task"), rec.get("context"))] = rec.get("task")
+    try:
+        with open(os.path.join(root, ASSIGNMENTS_LOG), encoding="utf-8") as f:
+            lines = f.read().split("\n")
+    except (OSError, ValueError):
+        lines = []
+    for line in lines:
+        try:
+            op = json.loads(line) if line.strip() else None
+        except ValueError:
+            continue  # urwana linia – zgłasza ją już kontrola pliku
+        if not isinstance(op, dict):
+            continue
+        key = (op.get("task"), op.get("context"))
+        if op.get("op") == "unassign":
+            tasks.pop(key, None)
+        else:
+            tasks[key] = op.get("task")
+    return [
+        ("narzedzie", str(task)) for task in tasks.values()
+        if str(task or "").upper().startswith("NARZ-")
+    ]
+
+
+# Odwołania sprawdzamy tylko wtedy, gdy istnieje plik definiujący dany rodzaj
+# kodów – bez katalogu narzędzi każde przypisanie byłoby „błędne”.
+REFERENCE_LABELS = {
+    "polprodukt": "półprodukt",
+    "surowiec": "surowiec",
+    "produkt": "produkt",
+    "narzedzie": "narzędzie",
+}
+
+
+def _check_references(reports: Dict[str, FileReport]) -> List[Issue]:
+    known: Dict[str, set] = {}
+    for rep in reports.values():
+        for ns, codes in rep.provides.items():
+            known.setdefault(ns, set()).update(codes)
+    issues: List[Issue] = []
+    for rel in sorted(reports):
+        missing = sorted({
+            (ns, code) for ns, code in reports[rel].uses
+            if ns in known and _norm(ns, code) not in known[ns]
+        })
+        for ns, code in missing:
+            issues.append(Issue(rel, REFERENCE,
+                                f"brak odwołania ({REFERENCE_LABELS.get(ns, ns)}): {code}",
+                                "warning"))
+    return issues
+
+
+# ---------------------------------------------------------------------------
+# Kontrola pojedynczego pliku
+
+
+def _decode(raw: bytes, rel: str, issues: List[Issue]) -> Optional[str]:
+    if raw.startswith(BOM):
+        issues.append(Issue(rel, BOM_MARK, "plik zaczyna się od BOM", "warning"))
+        raw = raw[len(BOM):]
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError as e:
+        issues.append(Issue(rel, ENCODING, f"niepoprawne UTF-8 (bajt {e.start})"))
+        return None
+
+
+def _parse_json(text: str, rel: str, issues: List[Issue]) -> Any:
+    if not text.strip("\x00 \t\r\n"):
+        issues.append(Issue(rel, EMPTY, "plik pusty lub wyzerowany"))
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        if "\x00" in text or e.pos >= len(text.rstrip()):
+            issues.append(Issue(rel, TRUNCATED, f"urwany zapis (linia {e.lineno})"))
+        else:
+            issues.append(Issue(rel, SYNTAX, f"błąd składni: {e.msg} (linia {e.lineno})"))
+        return None
+
+
+def _parse_jsonl(text: str, rel: str, issues: List[Issue]) -> List[Any]:
+    rows: List[Any] = []
+    lines = text.split("\n")
+    last = len(lines) - 1
+    for no, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError:
+            if no == last:  # brak końcowego "\n" – zapis przerwany w połowie
+                issues.append(Issue(rel, TRUNCATED, f"urwana ostatnia linia {no + 1}"))
+            else:
+                issues.append(Issue(rel, SYNTAX, f"niepoprawna linia {no + 1}"))
+    return rows
+
+
+def check_file(path: str, rel: str, sig: Optional[Sig] = None) -> FileReport:
+    """Sprawdź jeden plik; ``rel`` to ścieżka względem katalogu danych."""
+    if sig is None:
+        st = os.stat(path)
+        sig = (st.st_mtime_ns, st.st_size)
+    report = FileReport(rel, sig)
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        report.issues.append(Issue(rel, ENCODING, f"nie można odczytać: {e}"))
+        return report
+    text = _decode(raw, rel, report.issues)
+    if text is None:
+        return report
+    if rel.endswith(".jsonl"):
+        _parse_jsonl(text, rel, report.issues)
+        return report
+    before = len(report.issues)
+    data = _parse_json(text, rel, report.issues)
+    if len(report.issues) > before:
+        return report
+    schema = schema_for(rel)
+    if schema is not None:
+        report.issues.extend(Issue(rel, SCHEMA, msg) for msg in schema.validate(data))
+    report.provides, report.uses = _references(rel, data)
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Przebieg po całym katalogu
+
+
+class IntegrityChecker:
+    """Kontrola katalogu danych z wynikami zapamiętanymi wg ``(mtime_ns, rozmiar)``."""
+
+    def __init__(self, root: str, workers: Optional[int] = None) -> None:
+        self.root = os.path.abspath(root)
+        self.workers = workers or SCAN_WORKERS
+        self.cache_path = os.path.join(self.root, CACHE_NAME)
+        self._lock = threading.Lock()
+        self._cache: Optional[Dict[str, FileReport]] = None
+
+    # ----- pamięć podręczna -----
+    def _load_cache(self) -> Dict[str, FileReport]:
+        if self._cache is not None:
+            return self._cache
+        cache: Dict[str, FileReport] = {}
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                raw = json.load(f)
+            if raw.get("version") == CHECKER_VERSION:
+                for rel, ent in raw.get("files", {}).items():
+                    cache[rel] = FileReport(
+                        rel,
+                        tuple(ent["sig"]),
+                        [Issue(rel, *i) for i in ent.get("issues", [])],
+                        ent.get("provides", {}),
+                        [tuple(u) for u in ent.get("uses", [])],
+                    )
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            cache = {}
+        self._cache = cache
+        return cache
+
+    def save_cache(self) -> None:
+        files = {
+            rel: {
+                "sig": list(rep.sig),
+                "issues": [[i.kind, i.message, i.severity] for i in rep.issues],
+                "provides": rep.provides,
+                "uses": [list(u) for u in rep.uses],
+            }
+            for rel, rep in (self._cache or {}).items()
+        }
+        tmp = self.cache_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": CHECKER_VERSION, "files": files}, f, ensure_ascii=False)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logger.warning("[INTEGRITY] nie zapisano %s: %s", self.cache_path, e)
+
+    # ----- skan -----
+    def _walk(self) -> Iterable[Tuple[str, str, Sig]]:
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+            for fn in sorted(filenames):
+                if fn.startswith(".") or not fn.endswith(SUFFIXES):
+                    continue
+                path = os.path.join(dirpath, fn)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+                yield rel, path, (st.st_mtime_ns, st.st_size)
+
+    def scan(self) -> ScanResult:
+        """Sprawdź wszystkie pliki JSON/JSONL i odwołania między nimi."""
+        cache = self._load_cache()
+        reports: Dict[str, FileReport] = {}
+        stale: List[Tuple[str, str, Sig]] = []
+        for rel, path, sig in self._walk():
+            cached = cache.get(rel)
+            if cached is not None and tuple(cached.sig) == sig:
+                reports[rel] = cached
+            else:
+                stale.append((rel, path, sig))
+        if len(stale) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="integrity") as pool:
+                fresh = list(pool.map(lambda item: check_file(item[1], item[0], item[2]), stale))
+        else:
+            fresh = [check_file(path, rel, sig) for rel, path, sig in stale]
+        for rep in fresh:
+            reports[rep.path] = rep
+        with self._lock:
+            self._cache = dict(reports)
+        if stale or len(cache) != len(reports):
+            self.save_cache()
+        issues = [i for rel in sorted(reports) for i in reports[rel].issues]
+        refs = reports
+        assignment_uses = _assignment_uses(self.root, reports)
+        if assignment_uses is not None:
+            # przypisania = migawka + dziennik; raport w pamięci podręcznej bez zmian
+            target = ASSIGNMENTS if ASSIGNMENTS in reports else ASSIGNMENTS_LOG
+            refs = dict(reports)
+            refs[target] = replace(reports[target], uses=assignment_uses)
+        issues.extend(_check_references(refs))
+        return ScanResult(self.root, reports, issues,
+                          checked=len(stale), cached=len(reports) - len(stale))
+
+    # ----- naprawa -----
+    def repair(self, result: ScanResult, store: Any = None) -> List[Tuple[str, str]]:
+        """Napraw pliki z ``result``; zwraca listę ``(ścieżka, akcja)``.
+
+        * BOM i pliki w ``cp1250`` – zapis jako czyste UTF-8,
+        * JSONL – usunięcie urwanej/niepoprawnych linii (oryginał do kwarantanny),
+        * uszkodzony JSON – ostatnia poprawna wersja z migawek ``store``
+          (``snapshots.SnapshotStore``), a gdy jej brak – przeniesienie pliku
+          do ``_quarantine/<znacznik>/``.
+
+        Błędy schematu i odwołań są tylko raportowane. Pliki przypisań
+        naprawiane są pod blokadą ``zadania_assign_io`` i po ponownym odczycie.
+        """
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        actions: List[Tuple[str, str]] = []
+        for rel in sorted(result.reports):
+            rep = result.reports[rel]
+            kinds = {i.kind for i in rep.issues}
+            if not kinds & REPAIRABLE:
+                continue
+            path = os.path.join(self.root, rel)
+            try:
+                with self._write_lock(rel):
+                    if rel in (ASSIGNMENTS, ASSIGNMENTS_LOG):
+                        # „urwana” linia mogła być dopisywana przez inny proces
+                        kinds = {i.kind for i in check_file(path, rel).issues}
+                    action = (self._repair_file(rel, path, kinds, stamp, store)
+                              if kinds & REPAIRABLE else None)
+            except OSError as e:
+                logger.warning("[INTEGRITY] naprawa %s nieudana: %s", rel, e)
+                action = None
+            if action:
+                actions.append((rel, action))
+        if actions:
+            self._cache = None  # sygnatury naprawionych plików się zmieniły
+        return actions
+
+    def _write_lock(self, rel: str) -> Any:
+        """Blokada zapisu między procesami dla plików ``zadania_assign_io``."""
+        if rel not in (ASSIGNMENTS, ASSIGNMENTS_LOG):
+            return nullcontext()
+        import zadania_assign_io
+
+        return zadania_assign_io.file_lock(os.path.join(self.root, ASSIGNMENTS))
+
+    def _repair_file(self, rel: str, path: str, kinds: set, stamp: str,
+                     store: Any) -> Optional[str]:
+        with open(path, "rb") as f:
+            raw = f.read()
+        body = raw[len(BOM):] if raw.startswith(BOM) else raw
+        if ENCODING in kinds:
+            try:
+                text = body.decode(FALLBACK_ENCODING)
+            except UnicodeDecodeError:
+                text = None
+            if text is not None and not check_text(rel, text):
+                _atomic_write(path, text.encode("utf-8"))
+                return f"przekodowano z {FALLBACK_ENCODING}"
+        elif rel.endswith(".jsonl"):
+            if kinds & {TRUNCATED, SYNTAX}:
+                kept = [ln for ln in body.decode("utf-8").split("\n") if ln.strip() and _json_ok(ln)]
+                self._quarantine(rel, path, stamp, move=False)
+                _atomic_write(path, "".join(ln + "\n" for ln in kept).encode("utf-8"))
+                return f"usunięto niepoprawne linie (zostało {len(kept)})"
+            _atomic_write(path, body)
+            return "usunięto BOM"
+        elif not kinds & {EMPTY, TRUNCATED, SYNTAX}:
+            _atomic_write(path, body)
+            return "usunięto BOM"
+        restored = self._restore_from_snapshot(rel, path, store)
+        if restored:
+            return f"przywrócono z migawki {restored}"
+        return "kwarantanna: " + self._quarantine(rel, path, stamp, move=True)
+
+    def _restore_from_snapshot(self, rel: str, path: str, store: Any) -> Optional[str]:
+        if store is None:
+            return None
+        key = "data/" + rel
+        try:
+            snap_ids = list(reversed(store.list_snapshots()))
+        except OSError:
+            return None
+        for sid in snap_ids:
+            try:
+                manifest = store.manifest(sid)
+                if os.path.abspath(manifest.get("sources", {}).get("data", "")) != self.root:
+                    continue
+                if key not in manifest.get("files", {}):
+                    continue
+                data = store.read_file(sid, key)
+            except (OSError, ValueError, KeyError):
+                continue
+            try:
+                text = data.decode("utf-8")
+            except UnicodeDecodeError:
+                continue
+            if not check_text(rel, text):
+                _atomic_write(path, data)
+                return sid
+        return None
+
+    def _quarantine(self, rel: str, path: str, stamp: str, move: bool) -> str:
+        target = os.path.join(self.root, QUARANTINE_DIR, stamp, rel)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if move:
+            os.replace(path, target)
+        else:
+            shutil.copy2(path, target)
+        return os.path.relpath(target, self.root).replace(os.sep, "/")
+
+
+def _json_ok(line: str) -> bool:
+    try:
+        json.loads(line)
+    except ValueError:
+        return False
+    return True
+
+
+def check_text(rel: str, text: str) -> List[Issue]:
+    """Błędy krytyczne (składnia/ucięcie) dla treści ``text`` pliku ``rel``."""
+    issues: List[Issue] = []
+    if rel.endswith(".jsonl"):
+        _parse_jsonl(text, rel, issues)
+    else:
+        _parse_json(text, rel, issues)
+    return issues
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Powiązanie z aplikacją
+
+_CHECKERS: Dict[str, IntegrityChecker] = {}
+
+
+def data_dir() -> str:
+    from utils.path_utils import cfg_path
+
+    return cfg_path("data")
+
+
+def get_checker(root: Optional[str] = None) -> IntegrityChecker:
+    root = os.path.abspath(root or data_dir())
+    checker = _CHECKERS.get(root)
+    if checker is None:
+        checker = _CHECKERS[root] = IntegrityChecker(root)
+    return checker
+
+
+def check(root: Optional[str] = None) -> ScanResult:
+    return get_checker(root).scan()
+
+
+def repair(result: ScanResult, store: Any = None) -> List[Tuple[str, str]]:
+    return get_checker(result.root).repair(result, store=store)
+
+
+def _snapshot_store() -> Any:
+    try:
+        import snapshots
+
+        return snapshots.get_store()
+    except Exception:
+        return None
+
+
+def run_startup_check(root: Optional[str] = None, fix: bool = True) -> ScanResult:
+    """Kontrola przy starcie: skan, naprawa plików uszkodzonych, log wyników."""
+    started = datetime.now()
+    result = check(root)
+    if fix and any(rep.broken or any(i.kind == BOM_MARK for i in rep.issues)
+                   for rep in result.reports.values()):
+        for rel, action in repair(result, store=_snapshot_store()):
+            logger.warning("[INTEGRITY] %s: %s", rel, action)
+        result = check(root)
+    for issue in result.issues:
+        log = logger.warning if issue.severity == "error" else logger.info
+        log("[INTEGRITY] %s: %s", issue.path, issue.message)
+    ms = (datetime.now() - started).total_seconds() * 1000
+    print(
+        f"[WM-DBG][INTEGRITY] plików={len(result.reports)} przeczytanych={result.checked} "
+        f"błędów={len(result.errors)} ostrzeżeń={len(result.issues) - len(result.errors)} "
+        f"czas={ms:.0f} ms"
+    )
+    return result
+
+
+__all__ = [
+    "Issue",
+    "FileReport",
+    "ScanResult",
+    "StoreSchema",
+    "SCHEMAS",
+    "IntegrityChecker",
+    "check_file",
+    "check_text",
+    "schema_for",
+    "get_checker",
+    "check",
+    "repair",
+    "run_startup_check",
+]
@@ -1,14 +1,18 @@
-# Wersja pliku: 1.0.0
+# Wersja pliku: 1.1.0
 # Plik: grafiki/shifts_schedule.py
 # Zmiany:
 # - Silnik rotacji zmian oraz API
+# - 1.1.0: cache tygodni grafiku per (tydzień, rewizja trybów/kotwicy/użytkowników),
+#          who_is_on_now z gotowego podziału na sloty, eksport zakresu dat
 
 from __future__ import annotations
 
 import json
 import os
+from collections import OrderedDict
 from datetime import datetime, date, time, timedelta
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 from config_manager import ConfigManager
 from utils.path_utils import cfg_path
@@ -28,6 +32,15 @@ _USER_DEFAULTS: Dict[str, str] = {}
 _LAST_USERS_SRC: Optional[str] = None
 _LAST_USERS_COUNT: Optional[int] = None
 
+# Lista użytkowników czytana ponownie tylko po zmianie plików źródłowych.
+_USERS_CACHE: Dict[str, object] = {"sig": None, "users": [], "defaults": {}}
+_PROFILES_MISSING = object()
+_PROFILES_MOD: object = None
+
+# Gotowe tygodnie grafiku: (poniedziałek, rewizja) -> tydzień.
+ROSTER_CACHE_SIZE = 64
+_ROSTER_CACHE: "OrderedDict[tuple, dict]" = OrderedDict()
+
 
 def _read_json(path: str) -> dict:
     try:
@@ -87,6 +100,7 @@ def _anchor_monday() -> date:
     return d
 
 
+@lru_cache(maxsize=64)
 def _parse_time(txt: str) -> time:
     return datetime.strptime(txt, "%H:%M").time()
 
@@ -115,7 +129,51 @@ def _log_user_count(src: str, users: List[Dict[str, str]]) -> None:
         _LAST_USERS_SRC, _LAST_USERS_COUNT = src, count
 
 
+def _file_sig(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _profiles_module():
+    global _PROFILES_MOD
+    if _PROFILES_MOD is None:
+        try:  # pragma: no cover - profiles module rarely available
+            import profiles
+
+            _PROFILES_MOD = profiles
+        except Exception:
+            _PROFILES_MOD = _PROFILES_MISSING
+    return None if _PROFILES_MOD is _PROFILES_MISSING else _PROFILES_MOD
+
+
+def _users_sources_sig() -> tuple:
+    return (
+        _USERS_FILE,
+        _file_sig(_USERS_FILE),
+        _file_sig(os.path.join("data", "profiles.json")),
+        _file_sig(os.path.join("data", "users", "users.json")),
+    )
+
+
 def _load_users() -> List[Dict[str, str]]:
+    global _USER_DEFAULTS
+    sig = None
+    if _profiles_module() is None:
+        sig = _users_sources_sig()
+        if sig == _USERS_CACHE["sig"]:
+            _USER_DEFAULTS = dict(_USERS_CACHE["defaults"])  # type: ignore[arg-type]
+            return [dict(u) for u in _USERS_CACHE["users"]]  # type: ignore[union-attr]
+    users = _read_users()
+    _USERS_CACHE.update(
+        sig=sig, users=[dict(u) for u in users], defaults=dict(_USER_DEFAULTS)
+    )
+    return users
+
+
+def _read_users() -> List[Dict[str, str]]:
     global _USER_DEFAULTS
     defaults_raw = _read_json(_USERS_FILE) or []
     defaults_map: Dict[str, str] = {}
@@ -123,8 +181,9 @@ def _load_users() -> List[Dict[str, str]]:
         uid = str(u.get("id") or u.get("user_id") or u.get("login") or "")
         defaults_map[uid] = u.get("tryb_zmian", "111")
     try:  # pragma: no cover - profiles module rarely available
-        import profiles
-
+        profiles = _profiles_module()
+        if profiles is None:
+            raise ImportError("profiles")
         raw = profiles.get_all_users()
         _log_user_count("profiles", raw)
     except Exception:
@@ -206,13 +265,8 @@ def who_is_on_now(now: Optional[datetime] = None) -> Dict[str, List[str]]:
         slot = "POPO"
     if slot is None:
         return {"slot": None, "users": []}
-    widx = _week_idx(now.date())
-    users = [
-        u["name"]
-        for u in _load_users()
-        if u.get("active") and _slot_for_mode(_user_mode(u["id"]), widx) == slot
-    ]
-    return {"slot": slot, "users": users}
+    week = _week_roster(now.date())
+    return {"slot": slot, "users": list(week["by_slot"].get(slot, []))}
 
 
 def today_summary(now: Optional[datetime] = None) -> str:
@@ -244,59 +298,135 @@ def today_summary(now: Optional[datetime] = None) -> str:
     return f"Ostatnia aktualizacja {last_update} | {label} {s}–{e} → {names}"
 
 
-def week_matrix(start_date: date) -> Dict[str, List[Dict]]:
-    """Build a weekly schedule matrix starting from the given date.
-
-    Args:
-        start_date (date): Any day within the week for which the matrix
-            should be produced.
-
-    Returns:
-        Dict[str, List[Dict]]: Structure containing the ISO formatted
-        ``week_start`` and ``rows`` with shift details for each active user.
-    """
-    week_start = start_date - timedelta(days=start_date.weekday())
-    times = _shift_times()
-    rows: List[Dict] = []
+def _roster_revision(users: List[Dict[str, str]], times: Dict[str, time]) -> tuple:
+    """Key of everything a week depends on (modes, patterns, anchor, users, hours)."""
+    data = _load_modes()
+    patterns = data.get("patterns") or {}
+    if isinstance(patterns, dict):
+        patterns = tuple(sorted(patterns.items()))
+    else:
+        patterns = tuple(patterns)
+    return (
+        _anchor_monday(),
+        patterns,
+        tuple(sorted((data.get("modes") or {}).items())),
+        tuple(
+            (u["id"], u["name"], bool(u.get("active")), u.get("tryb_zmian"))
+            for u in users
+        ),
+        tuple(sorted(times.items())),
+    )
+
+
+def _build_week(week_start: date, users: List[Dict[str, str]], times: Dict[str, time]) -> dict:
+    modes = _load_modes().get("modes", {})
     widx = _week_idx(week_start)
-    for u in _load_users():
-        if not u.get("active"):
-            continue
-        mode = _user_mode(u["id"])
-        slot = _slot_for_mode(mode, widx)
-        days = []
-        for i in range(7):
-            d = week_start + timedelta(days=i)
-            wd = d.weekday()
-            if wd == 6:
-                continue
-            if wd == 5:
-                shift = "R"
-                start = times["R_START"]
-                end = times["R_END"]
-            else:
-                shift = "R" if slot == "RANO" else "P"
-                start = times["R_START"] if shift == "R" else times["P_START"]
-                end = times["R_END"] if shift == "R" else times["P_END"]
+    fmt = {k: v.strftime("%H:%M") for k, v in times.items()}
+    # dni tygodnia liczone raz dla obu slotów i współdzielone przez wiersze
+    days_for: Dict[str, List[Dict[str, str]]] = {"RANO": [], "POPO": []}
+    for i in range(6):  # niedziela wolna
+        d = week_start + timedelta(days=i)
+        for slot, days in days_for.items():
+            shift = "R" if d.weekday() == 5 or slot == "RANO" else "P"
             days.append(
                 {
                     "date": d.strftime("%Y-%m-%d"),
                     "dow": d.strftime("%a"),
                     "shift": shift,
-                    "start": start.strftime("%H:%M"),
-                    "end": end.strftime("%H:%M"),
+                    "start": fmt["R_START"] if shift == "R" else fmt["P_START"],
+                    "end": fmt["R_END"] if shift == "R" else fmt["P_END"],
                 }
             )
+    slot_for: Dict[str, str] = {}  # jeden _slot_for_mode na tryb, nie na osobę
+    rows: List[Dict] = []
+    by_slot: Dict[str, List[str]] = {"RANO": [], "POPO": []}
+    for u in users:
+        if not u.get("active"):
+            continue
+        default = _USER_DEFAULTS.get(u["id"]) or u.get("tryb_zmian") or "111"
+        mode = modes.get(u["id"], default)
+        slot = slot_for.get(mode)
+        if slot is None:
+            slot = slot_for[mode] = _slot_for_mode(mode, widx)
+        by_slot.setdefault(slot, []).append(u["name"])
         rows.append(
             {
                 "user": u["name"],
                 "user_id": u["id"],
                 "mode": mode,
                 "slot": slot,
-                "days": days,
+                "days": days_for[slot],
             }
         )
-    return {"week_start": week_start.strftime("%Y-%m-%d"), "rows": rows}
+    return {
+        "week_start": week_start.strftime("%Y-%m-%d"),
+        "widx": widx,
+        "rows": rows,
+        "by_slot": by_slot,
+    }
+
+
+def _week_roster(day: date) -> dict:
+    """Cached week containing ``day``; rebuilt only when its revision changes."""
+    week_start = day - timedelta(days=day.weekday())
+    users = _load_users()
+    times = _shift_times()
+    key = (week_start, _roster_revision(users, times))
+    week = _ROSTER_CACHE.get(key)
+    if week is None:
+        week = _ROSTER_CACHE[key] = _build_week(week_start, users, times)
+        while len(_ROSTER_CACHE) > ROSTER_CACHE_SIZE:
+            _ROSTER_CACHE.popitem(last=False)
+    else:
+        _ROSTER_CACHE.move_to_end(key)
+    return week
+
+
+def clear_roster_cache() -> None:
+    _ROSTER_CACHE.clear()
+    _USERS_CACHE["sig"] = None
+
+
+def week_matrix(start_date: date) -> Dict[str, List[Dict]]:
+    """Build a weekly schedule matrix starting from the given date.
+
+    Args:
+        start_date (date): Any day within the week for which the matrix
+            should be produced.
+
+    Returns:
+        Dict[str, List[Dict]]: Structure containing the ISO formatted
+        ``week_start`` and ``rows`` with shift details for each active user.
+        Rows come from the roster cache and must be treated as read-only.
+    """
+    week = _week_roster(start_date)
+    return {"week_start": week["week_start"], "rows": list(week["rows"])}
+
+
+def roster_range(start_date: date, end_date: date) -> List[Dict[str, str]]:
+    """Flat roster for a date range (month/quarter exports).
+
+    Args:
+        start_date (date): First day of the range.
+        end_date (date): Last day of the range (inclusive).
+
+    Returns:
+        List[Dict[str, str]]: One entry per user and working day with
+        ``date``, ``user``, ``user_id``, ``shift``, ``start`` and ``end``,
+        ordered by date.
+    """
+    out: List[Dict[str, str]] = []
+    monday = start_date - timedelta(days=start_date.weekday())
+    first, last = start_date.isoformat(), end_date.isoformat()
+    while monday <= end_date:
+        week = _week_roster(monday)
+        for i in range(6):
+            for row in week["rows"]:
+                day = row["days"][i]
+                if first <= day["date"] <= last:
+                    out.append({"user": row["user"], "user_id": row["user_id"], **day})
+        monday += timedelta(days=7)
+    return out
 
 
 def set_user_mode(user_id: str, mode: str) -> None:
@@ -354,6 +484,8 @@ __all__ = [
     "who_is_on_now",
     "today_summary",
     "week_matrix",
+    "roster_range",
+    "clear_roster_cache",
     "set_user_mode",
     "set_anchor_monday",
     "TRYBY",
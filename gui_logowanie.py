@@ -49,6 +49,7 @@ entry_pin = None
 entry_login = None
 root_global = None
 _on_login_cb = None
+_update_badge = None
 
 def ekran_logowania(root=None, on_login=None, update_available=False):
     """Ekran logowania: logo u góry na środku, box PIN w centrum,
@@ -58,12 +59,14 @@ def ekran_logowania(root=None, on_login=None, update_available=False):
        Parametry:
            root: opcjonalne istniejące okno główne tkinter.
            on_login: opcjonalny callback (login, rola, extra=None) wywoływany po poprawnym logowaniu.
-           update_available (bool): jeśli True, pokaż komunikat o dostępnej aktualizacji.
+           update_available (bool): jeśli True, pokaż komunikat o dostępnej aktualizacji
+               (wynik sprawdzenia w tle można pokazać później przez show_update_badge).
     """
-    global entry_login, entry_pin, root_global, _on_login_cb
+    global entry_login, entry_pin, root_global, _on_login_cb, _update_badge
     if root is None:
         root = tk.Tk()
     root_global = root
+    _update_badge = None
     _on_login_cb = on_login
     cfg = ConfigManager()
 
@@ -318,11 +321,34 @@ def ekran_logowania(root=None, on_login=None, update_available=False):
     except (subprocess.CalledProcessError, FileNotFoundError):
         lbl_update.configure(text=update_text)
     if update_available:
-        ttk.Label(
+        show_update_badge(root)
+
+
+def show_update_badge(root=None):
+    """Pokazuje komunikat o dostępnej aktualizacji na ekranie logowania.
+
+    Wywoływane także asynchronicznie (po wyniku sprawdzenia w tle), więc
+    nic nie robi, gdy ekran logowania został już zastąpiony panelem.
+    Zwraca etykietę komunikatu albo ``None``.
+    """
+    global _update_badge
+    root = root or root_global
+    if root is None or root is not root_global:
+        return None
+    try:
+        if entry_pin is None or not entry_pin.winfo_exists():
+            return None
+        if _update_badge is not None and _update_badge.winfo_exists():
+            return _update_badge
+        _update_badge = ttk.Label(
             root,
             text="Dostępna aktualizacja – uruchom 'git pull'",
             style="WM.Muted.TLabel",
-        ).pack(side="bottom", pady=(0, 2))
+        )
+        _update_badge.pack(side="bottom", pady=(0, 2))
+    except tk.TclError:
+        return None
+    return _update_badge
 
 def _login_pinless():
     try:
@@ -1,5 +1,8 @@
 # Plik: gui_magazyn.py
-# Wersja pliku: 1.7.0
+# Wersja pliku: 1.8.0
+# Zmiany 1.8.0:
+# - Tabela wirtualizowana (ui_virtual_tree): w Treeview istnieją tylko widoczne wiersze,
+#   filtrowanie w pamięci po gotowym blobie (Nazwa/Rozmiar) z opóźnieniem przy pisaniu.
 # Zmiany 1.7.0:
 # - Integracja z kreatorem zleceń (`open_order_creator`) zamiast lokalnego dialogu zamówień.
 # - Usunięto zależność od `gui_magazyn_order` (stary kreator zamówień).
@@ -17,7 +20,6 @@
 # Zasada: minimalne modyfikacje, bez naruszania istniejących API.
 
 import json
-import re
 import tkinter as tk
 from tkinter import messagebox, ttk
 
@@ -40,6 +42,7 @@ from config.paths import get_path
 from wm_log import dbg as wm_dbg, err as wm_err
 
 from ui_theme import apply_theme_safe as apply_theme
+from ui_virtual_tree import RowStore, VirtualTreeview
 
 import logika_magazyn as LM
 from gui_magazyn_edit import open_edit_dialog
@@ -107,7 +110,7 @@ def build_magazyn_toolbar(toolbar: ttk.Frame, owner):
         toolbar, textvariable=owner._filter_query, width=28
     )
     owner.ent_q.pack(side="left", padx=(0, 6))
-    owner.ent_q.bind("<KeyRelease>", lambda _e: owner._apply_filters())
+    owner.ent_q.bind("<KeyRelease>", lambda _e: owner._schedule_filters())
 
     _add_orders_button(toolbar, owner)
 
@@ -280,19 +283,28 @@ def _open_orders_for_shortages(self):
         messagebox.showinfo(
             "Zamów brakujące", "Brak pozycji poniżej progów minimalnych."
         )
-def _tag_low_stock(self, node, item_dict):
+def _low_stock_tags(_item_id, item_dict):
     try:
         stan = float(item_dict.get("stan", 0) or 0)
         minp = float(item_dict.get("min_poziom", 0) or 0)
         if minp > 0 and stan <= minp:
-            if "low" not in self.tree.tag_names():
-                self.tree.tag_configure("low", foreground="#C62828")
-            self.tree.item(node, tags=("low",))
+            return ("low",)
     except Exception:
         pass
+    return ()
+
+
+def _search_blob(_item_id, item):
+    """Tekst przeszukiwany polem „Szukaj” (Nazwa/Rozmiar)."""
+    return f"{item.get('nazwa', '')} {item.get('rozmiar', '')}"
 
 
 def _get_selected_item(self):
+    view = getattr(self, "view", None)
+    if view is not None:
+        item_id = view.selected_key()
+        data = getattr(self, "_items_map", None) or {}
+        return item_id, data.get(item_id)
     sel = self.tree.selection()
     if not sel:
         return None, None
@@ -376,10 +388,13 @@ class MagazynFrame(ttk.Frame):
         self.tree.column("stan", width=120, anchor="center")
         self.tree.column("zadania", width=280, anchor="w")
 
-        # Scrollbar pionowy
-        vsb = ttk.Scrollbar(self.tree, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)
+        # Scrollbar pionowy – steruje widokiem wirtualnym, nie samym Treeview
+        vsb = ttk.Scrollbar(self.tree, orient="vertical")
         vsb.pack(side="right", fill="y")
+        self.tree.tag_configure("low", foreground="#C62828")
+        self._store = RowStore(_format_row, _search_blob, tags=_low_stock_tags)
+        self.view = VirtualTreeview(self.tree, vsb)
+        self.view.bind_store(self._store)
 
         # Double-click → edycja
         self.tree.bind("<Double-1>", self._on_double_click)
@@ -411,6 +426,7 @@ class MagazynFrame(ttk.Frame):
             if isinstance(item, dict):
                 self._all_rows.append((item_id, item))
                 self._items_map[item_id] = item
+        self._store.load(self._all_rows)
 
         # wartości do combobox Typ
         typy = ["(wszystkie)"]
@@ -426,65 +442,41 @@ class MagazynFrame(ttk.Frame):
         if cur not in typy:
             self._filter_typ.set("(wszystkie)")
 
-        # wypełnij widok z filtrami
-        self._apply_filters()
-
-    def _apply_filters(self):
-        # wyczyść widok
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
+        # wypełnij widok z filtrami (bez przewijania na początek)
+        self._apply_filters(keep_position=True)
 
-        q = self._filter_query.get().strip().lower()
+    def _filtered_ids(self):
+        q = self._filter_query.get()
         t = self._filter_typ.get()
+        if t == "(wszystkie)":
+            return self._store.filter(q)
+        t_low = t.lower()
+        return self._store.filter(
+            q,
+            lambda _id, item: str(item.get("typ", "")).strip().lower() == t_low,
+            predicate_id=t_low,
+        )
 
-        # przygotuj regex „q” bezpiecznie (opcjonalne)
-        rx = None
-        if q:
-            try:
-                rx = re.compile(re.escape(q))
-            except Exception:
-                rx = None
-
-        for item_id, item in getattr(self, "_all_rows", []):
-            # filtr po typie
-            typ_val = str(item.get("typ", "")).strip()
-            if t != "(wszystkie)" and typ_val.lower() != t.lower():
-                continue
-
-            # filtr po szukajce (Nazwa/Rozmiar)
-            nazwa = str(item.get("nazwa", "")).lower()
-            rozmiar = str(item.get("rozmiar", "")).lower()
-            hay = f"{nazwa} {rozmiar}"
-            if q:
-                if rx:
-                    if rx.search(hay) is None:
-                        continue
-                else:
-                    if q not in hay:
-                        continue
-
-            # dodaj wiersz
-            node = self.tree.insert("", "end", values=_format_row(item_id, item))
-            _tag_low_stock(self, node, item)
+    def _apply_filters(self, keep_position=False):
+        self.view.set_keys(self._filtered_ids(), keep_position=keep_position)
+
+    def _schedule_filters(self):
+        """Filtrowanie przy pisaniu – z opóźnieniem, ostatni znak wygrywa."""
+        self.view.schedule(self._filtered_ids)
 
     def _on_double_click(self, _e):
-        sel = self.tree.selection()
-        if not sel:
+        item_id = self.view.selected_key()
+        if not item_id:
             return
         if not _can(self, "edit"):
             messagebox.showwarning(
                 "Uprawnienia", "Tylko magazynier może edytować pozycje."
             )
             return
-        values = self.tree.item(sel[0], "values")
-        item_id = values[0]
         open_edit_dialog(self, item_id, on_saved=lambda _id=item_id: self.refresh())
 
     def _selected_item_id(self):
-        sel = self.tree.selection()
-        if not sel:
-            return None
-        return self.tree.item(sel[0], "values")[0]
+        return self.view.selected_key()
 
     def _rez_do_polproduktu(self):
         if not _can(self, "reserve"):
@@ -511,9 +503,7 @@ class MagazynFrame(ttk.Frame):
         self.refresh()
 
     def _on_right_click(self, event, menu):
-        iid = self.tree.identify_row(event.y)
-        if iid:
-            self.tree.selection_set(iid)
+        if self.view.select_at(event.y) is not None:
             try:
                 menu.tk_popup(event.x_root, event.y_root)
             finally:
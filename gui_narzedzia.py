@@ -32,9 +32,12 @@ import logika_magazyn as LM  # [MAGAZYN] zwrot materiałów
 from utils.path_utils import cfg_path
 import ui_hover
 import zadania_assign_io
+import narzedzia_history
 import profile_utils
 from config_manager import ConfigManager
 from config.paths import get_path
+from core import metrics
+from core.text_index import NgramIndex
 from tools_config_loader import (
     load_config,
     get_status_names_for_type,
@@ -45,6 +48,8 @@ from tools_config_loader import (
 # ===================== MOTYW (użytkownika) =====================
 from ui_theme import apply_theme_safe as apply_theme
 from utils.gui_helpers import clear_frame
+from utils import thumbnails
+from services import search_service
 from utils import error_dialogs
 import logger
 import logging
@@ -86,6 +91,9 @@ NN_PROD_STATES = {
 # Obsługa załączników do narzędzi
 ALLOWED_EXTENSIONS = {".png", ".jpg", ".dxf"}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
+PREWARM_ROWS = 30  # ile wierszy listy dostaje miniatury z wyprzedzeniem
+PREWARM_DELAY_MS = 400  # miniatury dopiero po przerwie w pisaniu w wyszukiwarce
+DXF_POLL_MS = 100
 
 
 _current_login: str | None = None
@@ -640,6 +648,7 @@ def _invalidate_tools_definitions_cache() -> None:
     _TOOLS_DEFINITIONS_CACHE.clear()
 
 
+@metrics.timed("narzedzia.load_definitions")
 def _load_tools_definitions(collection_id: str, *, force: bool = False) -> dict:
     """Load tools definitions for *collection_id* with caching."""
 
@@ -1107,33 +1116,12 @@ def _ensure_folder():
 
 
 def _generate_dxf_preview(dxf_path: str) -> str | None:
-    """Spróbuj wygenerować miniaturę PNG dla pliku DXF.
+    """Spróbuj wygenerować miniaturę PNG dla pliku DXF (synchronicznie).
 
     Zwraca ścieżkę do wygenerowanego pliku lub None w przypadku błędu.
+    W GUI podgląd generuje się w tle – patrz ``thumbnails.submit_dxf_preview``.
     """
-    try:  # pragma: no cover - zależne od opcjonalnych bibliotek
-        import ezdxf
-        from ezdxf.addons.drawing import matplotlib as ezdxf_matplotlib
-        import matplotlib.pyplot as plt
-
-        doc = ezdxf.readfile(dxf_path)
-        msp = doc.modelspace()
-        fig = ezdxf_matplotlib.draw(msp)
-        png_path = os.path.splitext(dxf_path)[0] + "_dxf.png"
-        fig.savefig(png_path)
-        plt.close(fig)
-        try:
-            from PIL import Image
-
-            with Image.open(png_path) as img:
-                img.thumbnail((600, 800))
-                img.save(png_path)
-        except OSError:  # pragma: no cover - Pillow best effort
-            pass
-        return png_path
-    except (OSError, ImportError, ValueError, RuntimeError) as e:  # pragma: no cover - best effort
-        _dbg("Błąd generowania miniatury DXF:", e)
-        return None
+    return thumbnails.render_dxf_preview(dxf_path)
 
 # ===================== STATUSY / NORMALIZACJA =====================
 def _statusy_for_mode(mode):
@@ -1257,6 +1245,7 @@ def _save_tool(data):
     path = os.path.join(folder, f"{obj['numer']}.json")
     with open(path, "w", encoding="utf-8") as f:
         json.dump(obj, f, indent=2, ensure_ascii=False)
+    search_service.notify_saved(search_service.DOMAIN_TOOLS, path)
     _dbg("Zapisano narzędzie:", path)
 
 def _iter_folder_items():
@@ -1374,6 +1363,7 @@ def _iter_legacy_json_items():
             _dbg("Błąd parsowania pozycji legacy:", e)
     return items
 
+@metrics.timed("narzedzia.load_all")
 def _load_all_tools():
     _dbg("CWD:", os.getcwd())
     tools_dir = _resolve_tools_dir()
@@ -1535,16 +1525,73 @@ def panel_narzedzia(root, frame, login=None, rola=None):
     _refresh_assignments_view()
     frame.assign_tree = assign_tree
 
+    # Przypisania zmienione w innym panelu (lub procesie) odświeżają listę
+    # przez kanał zmian magazynu przypisań – bez ponownego czytania pliku.
+    assign_refresh = {"pending": False}
+
+    def _assign_refresh_now() -> None:
+        assign_refresh["pending"] = False
+        if _assign_tree is assign_tree:
+            _refresh_assignments_view()
+
+    def _on_assign_change(event: dict) -> None:
+        if event.get("op") != "reload" and event.get("context") != "narzedzia":
+            return
+        if assign_refresh["pending"]:
+            return
+        assign_refresh["pending"] = True
+        try:
+            frame.after(0, _assign_refresh_now)
+        except (tk.TclError, RuntimeError):
+            assign_refresh["pending"] = False
+
+    assign_unsubscribe = zadania_assign_io.subscribe(_on_assign_change)
+
+    def _on_assign_destroy(event=None):
+        if event is not None and event.widget is not frame:
+            return
+        assign_unsubscribe()
+
+    frame.bind("<Destroy>", _on_assign_destroy, add="+")
+
+    # Lista narzędzi trzymana w pamięci po jednym odczycie z dysku; wyszukiwanie
+    # idzie po indeksie n-gramów, a podglądy obrazów rozwiązywane są przy
+    # pierwszym najechaniu na wiersz.
+    tools_cache: dict[str, object] = {"items": None, "index": None}
+
+    def _tool_blob(tool: dict) -> str:
+        return "%s %s %s %s %s %s %s %s" % (
+            tool["nr"], tool["nazwa"], tool["typ"], tool["status"], tool["data"], tool["postep"], tool.get("tryb", ""), tool.get("opis", "")
+        )
+
+    def _tools_in_memory():
+        if tools_cache["items"] is None:
+            items = _load_all_tools()
+            tools_cache["items"] = items
+            tools_cache["index"] = NgramIndex().build(
+                (i, _tool_blob(t)) for i, t in enumerate(items)
+            )
+        return tools_cache["items"], tools_cache["index"]
+
+    def _media_paths(tool: dict) -> list[str]:
+        base_dir = Path(_resolve_tools_dir())
+        return [str(base_dir / tool[key]) for key in ("dxf_png", "obraz") if tool.get(key)]
+
+    def _hover_paths(iid: str) -> list[str]:
+        for p in _media_paths(row_data.get(iid) or {}):
+            if os.path.exists(p):
+                return [p]
+        return []
+
+    row_hover = ui_hover.TreeviewRowHover(tree, _hover_paths)
+
     def refresh_list(*_):
         tree.delete(*tree.get_children()); row_data.clear()
-        q = (search_var.get() or "").strip().lower()
-        data = _load_all_tools()
-        for tool in data:
-            blob = ("%s %s %s %s %s %s %s %s" % (
-                tool["nr"], tool["nazwa"], tool["typ"], tool["status"], tool["data"], tool["postep"], tool.get("tryb", ""), tool.get("opis", "")
-            )).lower()
-            if q and q not in blob:
-                continue
+        row_hover.clear()
+        q = (search_var.get() or "").strip()
+        data, index = _tools_in_memory()
+        for pos in index.search(q):
+            tool = data[pos]
             tag = _band_tag(tool["postep"])
             bar = _bar_text(tool["postep"])
             iid = tree.insert(
@@ -1554,23 +1601,36 @@ def panel_narzedzia(root, frame, login=None, rola=None):
                 tags=(tag,),
             )
             row_data[iid] = tool
-            base_dir = Path(_resolve_tools_dir())
-            paths = []
-            rel = tool.get("dxf_png")
-            if rel:
-                p = base_dir / rel
-                if p.exists():
-                    paths.append(str(p))
-            if not paths:
-                rel = tool.get("obraz")
-                if rel:
-                    p = base_dir / rel
-                    if p.exists():
-                        paths.append(str(p))
-            if paths:
-                ui_hover.bind_treeview_row_hover(tree, iid, paths)
         if not data:
             _dbg("Lista narzędzi pusta – filtr:", q or "(brak)")
+        _schedule_prewarm()
+
+    # miniatury dla pierwszego ekranu wierszy liczą się w tle, ale dopiero
+    # gdy wynik filtra się ustali – nie przy każdym znaku w wyszukiwarce
+    _prewarm_state: dict[str, object] = {"after": None}
+
+    def _schedule_prewarm() -> None:
+        pending = _prewarm_state["after"]
+        if pending is not None:
+            try:
+                frame.after_cancel(pending)
+            except Exception:
+                pass
+        try:
+            _prewarm_state["after"] = frame.after(PREWARM_DELAY_MS, _prewarm_visible)
+        except Exception:
+            _prewarm_state["after"] = None
+
+    def _prewarm_visible() -> None:
+        _prewarm_state["after"] = None
+        thumbnails.prewarm(
+            p for tool in list(row_data.values())[:PREWARM_ROWS] for p in _media_paths(tool)
+        )
+
+    def reload_list(*_):
+        """Ponowny odczyt narzędzi z dysku (po zapisie/zmianie definicji)."""
+        tools_cache["items"] = None
+        refresh_list()
 
     _defs_watch_state: dict[str, object] = {"path": None, "mtime": None}
 
@@ -1603,7 +1663,7 @@ def panel_narzedzia(root, frame, login=None, rola=None):
             print("[ERROR][NARZ] błąd przeładowania definicji:", exc)
         _invalidate_tools_definitions_cache()
         try:
-            refresh_list()
+            reload_list()
         except Exception as exc:
             print("[ERROR][NARZ] błąd odświeżenia widoku:", exc)
         else:
@@ -1618,6 +1678,8 @@ def panel_narzedzia(root, frame, login=None, rola=None):
         prev_mtime = _defs_watch_state.get("mtime")
         _defs_watch_state["path"] = path
         _defs_watch_state["mtime"] = mtime
+        if prev_path != path:
+            _watch_definitions_file(path)
         if not path:
             return False
         if not force and prev_path == path and prev_mtime == mtime:
@@ -1626,30 +1688,44 @@ def panel_narzedzia(root, frame, login=None, rola=None):
         _reload_definitions_from_disk(path)
         return True
 
+    # Zmiany definicji przychodzą z szyny ConfigManager (zmiana klucza
+    # tools.definitions_path lub edycja pliku), a nie z odpytywania przy FocusIn.
+    _defs_unsubscribe: list = []
+
+    def _schedule_definitions_check(*_args) -> None:
+        try:
+            frame.after(0, _maybe_reload_definitions)
+        except tk.TclError:
+            pass
+
+    def _watch_definitions_file(path: str | None) -> None:
+        while len(_defs_unsubscribe) > 1:
+            _defs_unsubscribe.pop()()
+        if path:
+            _defs_unsubscribe.append(
+                ConfigManager.bus.watch_file(path, _schedule_definitions_check)
+            )
+
+    _defs_unsubscribe.append(
+        ConfigManager.bus.subscribe("tools.definitions_path", _schedule_definitions_check)
+    )
     _defs_watch_state["path"] = _resolve_definitions_path()
     _defs_watch_state["mtime"] = _definitions_mtime(_defs_watch_state["path"])
+    _watch_definitions_file(_defs_watch_state["path"])
 
-    def _on_focus_back(_event=None):
-        _maybe_reload_definitions()
+    def _on_frame_destroy(event=None):
+        if event is not None and event.widget is not frame:
+            return
+        while _defs_unsubscribe:
+            _defs_unsubscribe.pop()()
 
-    widgets_to_bind = {root, frame, getattr(frame, "master", None)}
-    try:
-        widgets_to_bind.add(frame.winfo_toplevel())
-    except Exception:
-        pass
-    for widget in widgets_to_bind:
-        if widget is None:
-            continue
-        try:
-            widget.bind("<FocusIn>", _on_focus_back, add="+")
-        except Exception:
-            pass
+    frame.bind("<Destroy>", _on_frame_destroy, add="+")
 
     def _on_cfg_updated(_event=None):
         _maybe_seed_config_templates()
         changed = _maybe_reload_definitions(force=True)
         if not changed:
-            refresh_list()
+            reload_list()
 
     root.bind("<<ConfigUpdated>>", _on_cfg_updated)
 
@@ -1742,11 +1818,25 @@ def panel_narzedzia(root, frame, login=None, rola=None):
         hist_view.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(0,10))
 
         hist_items = list((tool.get("historia") if editing else []) or [])
+        # wpisy z dziennika narzędzia (QR, przypisania) – tylko ogon pliku
+        hist_log_rows = []
+        if editing and nr_auto:
+            for e in narzedzia_history.recent(nr_auto, 50):
+                try:
+                    ts = datetime.fromisoformat(e.get("ts", "")).astimezone().strftime("%Y-%m-%d %H:%M")
+                except (TypeError, ValueError):
+                    ts = str(e.get("ts", ""))
+                hist_log_rows.append((ts, e.get("user", ""), f"[{e.get('action', '')}]", e.get("status", "")))
         def repaint_hist():
             hist_view.delete(*hist_view.get_children())
-            for h in reversed(hist_items[-50:]):
-                ts = h.get("ts",""); by = h.get("by",""); z = h.get("z",""); na = h.get("na","")
-                hist_view.insert("", "end", values=(ts, by, z, na))
+            rows = [
+                (h.get("ts",""), h.get("by",""), h.get("z",""), h.get("na",""))
+                for h in reversed(hist_items[-50:])
+            ]
+            if hist_log_rows:
+                rows = sorted(rows + hist_log_rows, key=lambda r: str(r[0]), reverse=True)[:50]
+            for values in rows:
+                hist_view.insert("", "end", values=values)
         repaint_hist()
 
         def toggle_hist():
@@ -2002,12 +2092,25 @@ def panel_narzedzia(root, frame, login=None, rola=None):
                 rel = os.path.relpath(dest, _resolve_tools_dir())
                 var_dxf.set(rel)
                 dxf_lbl.config(text=os.path.basename(dest))
-                png = _generate_dxf_preview(dest)
-                if png:
-                    rel_png = os.path.relpath(png, _resolve_tools_dir())
-                    var_dxf_png.set(rel_png)
             except (OSError, shutil.Error) as e:
                 _dbg("Błąd kopiowania DXF:", e)
+                return
+            # render DXF trwa – liczymy go w osobnym procesie i odpytujemy wynik
+            future = thumbnails.submit_dxf_preview(dest)
+
+            def _poll_preview():
+                if not future.done():
+                    dxf_lbl.after(DXF_POLL_MS, _poll_preview)
+                    return
+                try:
+                    png = future.result()
+                except Exception as e:
+                    _dbg("Błąd generowania miniatury DXF:", e)
+                    return
+                if png and var_dxf.get() == rel:
+                    var_dxf_png.set(os.path.relpath(png, _resolve_tools_dir()))
+
+            _poll_preview()
 
         def preview_media():
             path = (var_img.get() or "").strip()
@@ -2586,7 +2689,7 @@ def panel_narzedzia(root, frame, login=None, rola=None):
 
             _save_tool(data_obj)
             dlg.destroy()
-            refresh_list()
+            reload_list()
 
         ttk.Button(btns, text="Zapisz", command=save, style="WM.Side.TButton").pack(side="right")
         ttk.Button(btns, text="Anuluj", command=dlg.destroy, style="WM.Side.TButton").pack(side="right", padx=(0,8))
@@ -1,6 +1,9 @@
 # Plik: gui_panel.py
-# Wersja pliku: 1.6.17
-# Zmiany 1.6.17:
+# Wersja pliku: 1.7.0
+# Zmiany 1.7.0:
+# - Panele z paska bocznego trzymane w ui_panel_cache.PanelCache (ukryte ramki,
+#   limit paneli/widżetów, LRU); odświeżane przy pokazaniu po zmianie danych.
+# Poprzednio (1.6.17):
 # - Dodano przycisk w stopce otwierający changelog.
 # - Zapamiętywanie czasu ostatniego obejrzenia changeloga.
 # Poprzednio (1.6.16):
@@ -21,6 +24,7 @@ from datetime import datetime, time, timedelta, timezone
 from services.profile_service import get_user, save_user
 
 from ui_theme import apply_theme_safe as apply_theme
+from ui_panel_cache import DEFAULT_MAX_PANELS, DEFAULT_MAX_WIDGETS, PanelCache
 from utils.gui_helpers import clear_frame
 # [PR-1165-MERGE-FIX] unikajmy zbyt szerokiego importu z start (ryzyko cyklu)
 from start import CONFIG_MANAGER, open_settings_window
@@ -88,7 +92,14 @@ def _active_login(self) -> str:
 
 
 def _center_container(self):
-    """Zwraca główny kontener na widoki (centralny panel)."""
+    """Zwraca główny kontener na widoki (centralny panel).
+
+    Gdy panel główny ma cache paneli (``_wm_show_transient``), zwracana jest
+    pusta ramka na widok spoza cache – ukryte panele pozostają nietknięte.
+    """
+    show_transient = getattr(self, "_wm_show_transient", None)
+    if callable(show_transient):
+        return show_transient()
     for attr in ("content", "main_content", "content_frame", "body"):
         if hasattr(self, attr):
             container = getattr(self, attr)
@@ -227,7 +238,85 @@ from gui_magazyn import open_panel_magazyn
 
 def panel_magazyn(root, frame, login=None, rola=None):
     """Adapter do ``open_panel_magazyn`` osadzający widok w kontenerze."""
-    open_panel_magazyn(root, container=frame)
+    return open_panel_magazyn(root, container=frame)
+
+
+def _watch_zlecenia() -> list[str]:
+    from config.paths import get_path
+    import zlecenia_logika
+    import zlecenia_utils
+
+    return [get_path(zlecenia_utils.ORDERS_DIR_KEY), str(zlecenia_logika.ZLECENIA_DIR)]
+
+
+def _watch_narzedzia() -> list[str]:
+    import gui_narzedzia
+    import logika_zadan
+    import zadania_assign_io
+
+    assignments = str(zadania_assign_io.DATA_PATH)
+    return [
+        gui_narzedzia._resolve_tools_dir(),
+        str(logika_zadan.TOOL_TASKS_PATH),
+        assignments,
+        str(zadania_assign_io._log_path(zadania_assign_io.DATA_PATH)),
+    ]
+
+
+def _watch_maszyny() -> list[str]:
+    import utils_maszyny
+
+    return [utils_maszyny.PRIMARY_DATA, utils_maszyny.LEGACY_DATA]
+
+
+def _watch_magazyn() -> list[str]:
+    from config.paths import get_path
+    import logika_magazyn as LM
+
+    return [get_path("warehouse.stock_source"), os.path.dirname(LM.MAGAZYN_PATH)]
+
+
+def _watch_uzytkownicy() -> list[str]:
+    import profile_utils
+
+    return [str(profile_utils.USERS_FILE)]
+
+
+# Panele trzymane w cache: funkcja -> (klucz, funkcja zwracająca pliki danych
+# obserwowane przy pokazaniu – liczone na bieżąco z resolverów modułów, bo
+# ścieżki zależą od configu). Pozostałe widoki (profil, ustawienia) budowane
+# są za każdym razem.
+_PANEL_SPECS = {
+    panel_zlecenia: ("zlecenia", _watch_zlecenia),
+    panel_narzedzia: ("narzedzia", _watch_narzedzia),
+    panel_maszyny: ("maszyny", _watch_maszyny),
+    panel_magazyn: ("magazyn", _watch_magazyn),
+    panel_uzytkownicy: ("uzytkownicy", _watch_uzytkownicy),
+}
+
+
+def _panel_watch(resolver) -> tuple[str, ...]:
+    """Unikalne, niepuste ścieżki z ``resolver()``; błąd resolvera = brak obserwacji."""
+    try:
+        paths = resolver()
+    except Exception as exc:
+        log_akcja(f"[PANEL] Nie ustalono plików danych panelu: {exc}")
+        return ()
+    out: list[str] = []
+    for path in paths:
+        if path and os.path.normpath(path) not in out:
+            out.append(os.path.normpath(path))
+    return tuple(out)
+
+
+def _panel_cache_limits() -> tuple[int, int]:
+    cm = globals().get("CONFIG_MANAGER")
+    try:
+        max_panels = int(cm.get("ui.panel_cache.max_panels", DEFAULT_MAX_PANELS))
+        max_widgets = int(cm.get("ui.panel_cache.max_widgets", DEFAULT_MAX_WIDGETS))
+    except Exception:
+        return DEFAULT_MAX_PANELS, DEFAULT_MAX_WIDGETS
+    return max_panels, max_widgets
 
 
 # ---------- Zmiany / czas pracy ----------
@@ -465,6 +554,12 @@ def uruchom_panel(root, login, rola):
     btn_changelog.pack(side="right", padx=(6, 0))
     _maybe_mark_button(btn_changelog)
     root.after(100, lambda: _toggle_changelog(auto=True))
+    try:
+        import snapshots
+
+        snapshots.schedule_snapshots(root)
+    except Exception as e:  # pragma: no cover - migawki są dodatkiem
+        log_akcja(f"[SNAP] Nie uruchomiono migawek: {e}")
     ttk.Button(
         footer_btns, text="Wyloguj", command=_logout, style="WM.Side.TButton"
     ).pack(side="right", padx=(6, 0))
@@ -585,25 +680,53 @@ def uruchom_panel(root, login, rola):
     shift_job["id"] = root.after(1000, _tick)
     shift.bind("<Destroy>", _on_shift_destroy)
 
-    # nawigacja
+    # nawigacja – panele z paska bocznego zostają w cache (ukryte) między przełączeniami
+    max_panels, max_widgets = _panel_cache_limits()
+    panel_cache = PanelCache(content, max_panels=max_panels, max_widgets=max_widgets)
+    root._wm_panel_cache = panel_cache
+
     def wyczysc_content():
-        clear_frame(content)
+        """Ukrywa panele z cache i zwraca pustą ramkę na widok spoza cache."""
+        return panel_cache.show_transient()
+
+    # widoki otwierane z innych modułów (np. profil z panelu użytkowników)
+    # trafiają do tej samej ramki zamiast czyścić ``root.content``
+    root._wm_show_transient = wyczysc_content
+
+    def _on_content_destroy(_e=None):
+        if getattr(root, "_wm_show_transient", None) is wyczysc_content:
+            root._wm_show_transient = None
+
+    content.bind("<Destroy>", _on_content_destroy, add="+")
 
     def otworz_panel(funkcja, nazwa):
-        wyczysc_content(); log_akcja(f"Kliknięto: {nazwa}")
+        log_akcja(f"Kliknięto: {nazwa}")
+        spec = _PANEL_SPECS.get(funkcja)
+        if spec is None:
+            host = wyczysc_content()
+            try:
+                funkcja(root, host, login, rola)
+            except Exception as e:
+                log_akcja(f"Błąd przy otwieraniu panelu {nazwa}: {e}")
+                ttk.Label(host, text=f"Błąd otwierania panelu: {e}", foreground="#e53935").pack(pady=20)
+            return
+        key, resolver = spec
         try:
-            funkcja(root, content, login, rola)
+            panel_cache.show(
+                key,
+                lambda host: funkcja(root, host, login, rola),
+                watch=_panel_watch(resolver),
+            )
         except Exception as e:
             log_akcja(f"Błąd przy otwieraniu panelu {nazwa}: {e}")
-            ttk.Label(content, text=f"Błąd otwierania panelu: {e}", foreground="#e53935").pack(pady=20)
+            host = wyczysc_content()
+            ttk.Label(host, text=f"Błąd otwierania panelu: {e}", foreground="#e53935").pack(pady=20)
 
     # --- role helpers + quick open profile ---
     def _is_admin_role(r):
         return str(r).lower() in {"admin","kierownik","brygadzista","lider"}
 
     def _open_profile_entry():
-        setattr(root, "content", content)
-        setattr(root, "main_content", content)
         setattr(root, "active_login", login)
         setattr(root, "current_user", login)
         setattr(root, "username", login)
@@ -611,9 +734,9 @@ def uruchom_panel(root, login, rola):
             _open_profile(root)
         except Exception as e:
             log_akcja(f"Błąd otwierania panelu profilu: {e}")
-            clear_frame(content)
+            host = wyczysc_content()
             ttk.Label(
-                content,
+                host,
                 text=f"Błąd otwierania panelu: {e}",
                 foreground="#e53935",
             ).pack(pady=20)
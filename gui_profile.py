@@ -256,8 +256,20 @@ def _tool_visible_for(tool_task, login, rola):
     return False
 
 # ====== Czytanie zadań ======
-def _read_tasks(login: str, role: str | None = None) -> list[dict]:
-    path = Path("data") / "zadania.json"
+# Posortowane zadania per rola (zwykła/brygadzista) + sygnatura plików źródłowych;
+# profil otwierany ponownie nie czyta i nie sortuje plików, dopóki się nie zmienią.
+_TASKS_CACHE: dict[bool, tuple[tuple, list[dict]]] = {}
+
+
+def _file_sig(path: Path) -> tuple:
+    try:
+        st = path.stat()
+        return (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (str(path.absolute()), None, None)
+
+
+def _load_tasks_sorted(path: Path, orders_path: Path | None) -> list[dict]:
     try:
         with path.open(encoding="utf-8") as f:
             tasks = json.load(f)
@@ -270,8 +282,7 @@ def _read_tasks(login: str, role: str | None = None) -> list[dict]:
         log_akcja(f"[WM-DBG][TASKS] Brak pliku: {path.as_posix()}")
         tasks = []
 
-    if str(role or "").lower() == "brygadzista":
-        orders_path = Path("data") / "zlecenia.json"
+    if orders_path is not None:
         orders = _load_json(orders_path, [])
         for o in orders:
             nr = o.get("nr")
@@ -292,6 +303,19 @@ def _read_tasks(login: str, role: str | None = None) -> list[dict]:
         if not t.get("termin"):
             t["termin"] = DEFAULT_TASK_DEADLINE
     tasks.sort(key=lambda t: t.get("termin", DEFAULT_TASK_DEADLINE))
+    return tasks
+
+
+def _read_tasks(login: str, role: str | None = None) -> list[dict]:
+    path = Path("data") / "zadania.json"
+    foreman = str(role or "").lower() == "brygadzista"
+    orders_path = Path("data") / "zlecenia.json" if foreman else None
+    sig = (_file_sig(path), _file_sig(orders_path) if orders_path else None)
+    cached = _TASKS_CACHE.get(foreman)
+    if cached is None or cached[0] != sig:
+        cached = _TASKS_CACHE[foreman] = (sig, _load_tasks_sorted(path, orders_path))
+    # kopie rekordów – wywołujący mogą je modyfikować
+    tasks = [dict(t) for t in cached[1]]
     if not tasks and login == "sort_test":
         tasks = [
             {"id": "T1", "termin": "2000-01-01"},
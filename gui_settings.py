@@ -1,4 +1,4 @@
-# Wersja pliku: 1.7.1
+# Wersja pliku: 1.8.0
 # Moduł: gui_settings
 # ⏹ KONIEC WSTĘPU
 
@@ -10,9 +10,10 @@ import json
 import logging
 import os, sys, subprocess, threading
 import re
+import time
 import tkinter as tk
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 from tkinter import colorchooser
 from tkinter import ttk, filedialog, messagebox
 
@@ -206,6 +207,7 @@ except Exception:  # pragma: no cover - środowisko bez gui_tools_config
 
 import config_manager as cm
 from config_manager import ConfigManager, get_path, set_path
+from core import config_schema, metrics
 from gui_products import ProductsMaterialsTab
 from ustawienia_magazyn import MagazynSettingsFrame
 import ustawienia_produkty_bom
@@ -640,12 +642,43 @@ def save_all(options: Dict[str, tk.Variable], cfg: ConfigManager | None = None)
     """Persist all options from mapping using ConfigManager."""
 
     cfg = cfg or ConfigManager()
-    for key, var in options.items():
-        value = var.get()
-        cfg.set(key, value)
-    cfg.save_all()
+    with cfg.batch():
+        for key, var in options.items():
+            value = var.get()
+            cfg.set(key, value)
+        cfg.save_all()
+
+
+
+
+class _LazyVars(dict):
+    """``key -> tk.Variable`` of :class:`SettingsPanel`.
 
+    Tabs are built on first selection; looking up a key whose tab was not
+    built yet builds that tab first, so ``panel.vars[key]`` keeps working.
+    Iteration only covers variables that already exist.
+    """
 
+    def __init__(self, panel: "SettingsPanel") -> None:
+        super().__init__()
+        self._panel = panel
+
+    def __missing__(self, key: str) -> tk.Variable:
+        if self._panel._build_tab_for(key) and dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        if dict.__contains__(self, key):
+            return True
+        return (
+            isinstance(key, str)
+            and self._panel._build_tab_for(key)
+            and dict.__contains__(self, key)
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
 
 
 class SettingsPanel:
@@ -683,7 +716,10 @@ class SettingsPanel:
         bind_settings(self.settings_state)
         ensure_core_tree()
         settings_actions_bind(self.settings_state, on_change=self.on_setting_changed)
-        self.vars: Dict[str, tk.Variable] = {}
+        self.vars: Dict[str, tk.Variable] = _LazyVars(self)
+        self._var_listeners: list[Callable[[str, tk.Variable], None]] = []
+        self._lazy_tabs: dict[str, tuple[str, Callable[[ttk.Frame], None]]] = {}
+        self._key_tabs: dict[str, str] = {}
         self._initial: Dict[str, Any] = {}
         self._defaults: Dict[str, Any] = {}
         self._options: Dict[str, dict[str, Any]] = {}
@@ -722,31 +758,13 @@ class SettingsPanel:
             if cfg is None:
                 return {}
 
-            schema = self._get_schema() or {}
-            state: dict[str, Any] = {}
-
-            def _iter_fields(node: dict[str, Any]):
-                for field in node.get("fields", []):
-                    if field.get("deprecated"):
-                        continue
-                    key = field.get("key")
-                    if key:
-                        yield key, field
-                for child_key in ("tabs", "groups", "subtabs"):
-                    for child in node.get(child_key, []):
-                        yield from _iter_fields(child)
-
-            for key, field in _iter_fields(schema):
-                state[key] = cfg.get(key, field.get("default"))
-
-            for option in schema.get("options", []):
-                if option.get("deprecated"):
-                    continue
-                key = option.get("key")
-                if key:
-                    state[key] = cfg.get(key, option.get("default"))
-
-            return state
+            compiled = getattr(cfg, "compiled", None)
+            if compiled is None:
+                compiled = config_schema.CompiledSchema(self._get_schema() or {})
+            return {
+                key: cfg.get(key, field.opt.get("default"))
+                for key, field in compiled.fields.items()
+            }
         except Exception:
             return {}
 
@@ -757,6 +775,8 @@ class SettingsPanel:
         self._unsaved = False
         self._fields_vars = []
         self.settings_state.clear()
+        # values of tabs that are not built yet come straight from the config
+        self.settings_state.update(self._load_settings_state())
         content_parent = getattr(self, "_content_area", self.master)
         for child in content_parent.winfo_children():
             child.destroy()
@@ -764,6 +784,9 @@ class SettingsPanel:
             for child in self.btns.winfo_children():
                 child.destroy()
 
+        started = time.perf_counter()
+        self._lazy_tabs = {}
+        self._key_tabs = {}
         schema = self._get_schema()
         print(f"[WM-DBG] using schema via _get_schema(): {schema is not None}")
         schema = schema or {}
@@ -781,41 +804,36 @@ class SettingsPanel:
         for tab in schema.get("tabs", []):
             title = tab.get("title", tab.get("id", ""))
             print("[WM-DBG] [SETTINGS] add tab:", title)
-            frame = ttk.Frame(self.nb)
-            self.nb.add(frame, text=title)
-
             tab_id = tab.get("id")
             if tab_id == "magazyn":
+                frame = self._add_lazy_tab(
+                    title, lambda _f: self._init_magazyn_tab(), tab
+                )
                 self._magazyn_frame = frame
                 self._magazyn_schema = tab
-            elif tab_id == "zlecenia":
-                grp_count, fld_count = self._build_orders_tab(frame, tab)
-                print(
-                    f"[WM-DBG] tab='{title}' groups={grp_count} fields={fld_count}"
-                )
-            elif tab_id == "narzedzia":
-                grp_count, fld_count = self._build_tools_tab(frame, tab)
-                print(
-                    f"[WM-DBG] tab='{title}' groups={grp_count} fields={fld_count}"
-                )
-            elif tab_id == "system":
-                _render_system_paths(frame)
-                grp_count, fld_count = self._populate_tab(frame, tab)
-                print(
-                    f"[WM-DBG] tab='{title}' groups={grp_count} fields={fld_count}"
-                )
             else:
-                grp_count, fld_count = self._populate_tab(frame, tab)
-                print(
-                    f"[WM-DBG] tab='{title}' groups={grp_count} fields={fld_count}"
+                self._add_lazy_tab(
+                    title, lambda f, t=tab: self._build_schema_tab(f, t), tab
                 )
 
         base_dir = Path(__file__).resolve().parent
         self._add_magazyn_tab()
-        self.products_tab = ProductsMaterialsTab(self.nb, base_dir=base_dir)
-        self.nb.add(self.products_tab, text="Produkty i materiały")
-        print("[WM-DBG] [SETTINGS] zakładka Produkty i materiały: OK")
+        self.products_tab = None
+
+        def build_products(frame: ttk.Frame) -> None:
+            self.products_tab = ProductsMaterialsTab(frame, base_dir=base_dir)
+            self.products_tab.pack(fill="both", expand=True)
+            print("[WM-DBG] [SETTINGS] zakładka Produkty i materiały: OK")
+
+        self._add_lazy_tab("Produkty i materiały", build_products)
         print("[WM-DBG] [SETTINGS] notebook packed")
+        self._build_tab(self.nb.select())
+        open_ms = (time.perf_counter() - started) * 1000
+        metrics.observe("settings.open", open_ms)
+        print(
+            f"[WM-DBG] [SETTINGS] first tab ready in {open_ms:.0f} ms, "
+            f"{len(self._lazy_tabs)} tabs deferred"
+        )
 
         left_btns = ttk.Frame(self.btns)
         left_btns.pack(side="left", padx=5)
@@ -839,6 +857,80 @@ class SettingsPanel:
 
         self.master.winfo_toplevel().protocol("WM_DELETE_WINDOW", self.on_close)
 
+    def _build_schema_tab(self, frame: ttk.Frame, tab: dict[str, Any]) -> None:
+        """Create widgets of one schema tab inside ``frame``."""
+
+        title = tab.get("title", tab.get("id", ""))
+        tab_id = tab.get("id")
+        if tab_id == "zlecenia":
+            grp_count, fld_count = self._build_orders_tab(frame, tab)
+        elif tab_id == "narzedzia":
+            grp_count, fld_count = self._build_tools_tab(frame, tab)
+        elif tab_id == "system":
+            _render_system_paths(frame)
+            grp_count, fld_count = self._populate_tab(frame, tab)
+        else:
+            grp_count, fld_count = self._populate_tab(frame, tab)
+        print(f"[WM-DBG] tab='{title}' groups={grp_count} fields={fld_count}")
+
+    def _add_lazy_tab(
+        self,
+        title: str,
+        builder: Callable[[ttk.Frame], None],
+        tab: dict[str, Any] | None = None,
+    ) -> ttk.Frame:
+        """Add an empty notebook page filled by ``builder`` on first selection.
+
+        Keys of ``tab`` (schema definition) are remembered, so reading
+        ``self.vars[key]`` builds the page that owns ``key``.
+        """
+
+        frame = ttk.Frame(self.nb)
+        self.nb.add(frame, text=title)
+        path = str(frame)
+        self._lazy_tabs[path] = (title, builder)
+        if tab is not None:
+            for field in config_schema.iter_schema_fields({"tabs": [tab]}):
+                key = field.get("key")
+                if key:
+                    self._key_tabs.setdefault(key, path)
+        return frame
+
+    def _build_tab(self, tab_path: str) -> bool:
+        """Build a deferred notebook page; return ``True`` if it was pending."""
+
+        pending = self._lazy_tabs.pop(str(tab_path), None) if tab_path else None
+        if pending is None:
+            return False
+        title, builder = pending
+        started = time.perf_counter()
+        builder(self.nb.nametowidget(tab_path))
+        build_ms = (time.perf_counter() - started) * 1000
+        metrics.observe("settings.tab_build", build_ms)
+        print(f"[WM-DBG] [SETTINGS] tab='{title}' built in {build_ms:.0f} ms")
+        return True
+
+    def _build_tab_for(self, key: str) -> bool:
+        """Build the page containing option ``key`` (used by ``self.vars``)."""
+
+        path = self._key_tabs.get(key)
+        return bool(path) and self._build_tab(path)
+
+    def _build_pending_tabs(self) -> None:
+        for path in list(self._lazy_tabs):
+            self._build_tab(path)
+
+    def bind_vars(self, callback: Callable[[str, tk.Variable], None]) -> None:
+        """Call ``callback(key, var)`` for current and lazily created variables."""
+
+        self._var_listeners.append(callback)
+        for key, var in list(dict.items(self.vars)):
+            callback(key, var)
+
+    def _var_created(self, key: str, var: tk.Variable) -> None:
+        for callback in self._var_listeners:
+            callback(key, var)
+
     def _close_window(self) -> None:
         """Invoke the standard close flow used by the Cancel button."""
 
@@ -851,15 +943,16 @@ class SettingsPanel:
                 pass
 
     def _add_magazyn_tab(self) -> None:
-        try:
-            frame = MagazynSettingsFrame(self.nb, self.cfg)
-        except Exception as e:
-            import tkinter as tk
-            from tkinter import ttk
-            frame = ttk.Frame(self.nb)
-            lbl = ttk.Label(frame, text=f"Błąd ładowania zakładki Magazyn:\n{e}")
-            lbl.pack(padx=12, pady=12)
-        self.nb.add(frame, text="Magazyn")
+        def build(parent: ttk.Frame) -> None:
+            try:
+                frame = MagazynSettingsFrame(parent, self.cfg)
+            except Exception as e:
+                frame = ttk.Frame(parent)
+                lbl = ttk.Label(frame, text=f"Błąd ładowania zakładki Magazyn:\n{e}")
+                lbl.pack(padx=12, pady=12)
+            frame.pack(fill="both", expand=True)
+
+        self._add_lazy_tab("Magazyn", build)
 
     def _coerce_default_for_var(self, opt: dict[str, Any], default: Any) -> Any:
         """Return value adjusted for Tk variable according to option definition."""
@@ -894,6 +987,7 @@ class SettingsPanel:
         self._fields_vars.append((var, opt))
         self.settings_state[key] = var.get()
         var.trace_add("write", lambda *_: self._on_var_write(key, var))
+        self._var_created(key, var)
 
     def _create_button_field(
         self, parent: tk.Widget, field_def: dict[str, Any]
@@ -1280,7 +1374,10 @@ class SettingsPanel:
                 self._defaults[key] = field_def.get("default")
                 self._fields_vars.append((var, field_def))
                 self.settings_state[key] = current
-                var.trace_add("write", lambda *_: self._on_var_write(key, var))
+                var.trace_add(
+                    "write", lambda *_, k=key, v=var: self._on_var_write(k, v)
+                )
+                self._var_created(key, var)
 
             if tab.get("id") == "narzedzia" and group.get("key") == "narzedzia":
                 ttk.Button(
@@ -2396,9 +2493,7 @@ class SettingsPanel:
         self._magazyn_initialized = True
 
     def _on_tab_change(self, _=None):
-        if self._magazyn_frame is not None and not self._magazyn_initialized:
-            if self.nb.select() == str(self._magazyn_frame):
-                self._init_magazyn_tab()
+        self._build_tab(self.nb.select())
 
         if self.cfg.warn_on_unsaved and self._unsaved:
             if messagebox.askyesno(
@@ -2409,6 +2504,7 @@ class SettingsPanel:
                 self.save()
 
     def restore_defaults(self) -> None:
+        self._build_pending_tabs()
         for var, opt in self._fields_vars:
             default = opt.get("default")
             try:
@@ -2460,32 +2556,22 @@ class SettingsPanel:
 
     def save(self) -> None:
         special_orders: dict[str, Any] = {}
-        for key, var in self.vars.items():
-            if key.startswith("_orders."):
-                name = key.split(".", 1)[1]
-                special_orders[name] = var.get()
-                continue
-            opt = self._options.get(key, {})
-            value = var.get()
-            if opt.get("type") == "bool" and isinstance(value, str):
-                if value in {"0", "1"}:
-                    value = value == "1"
-            if opt.get("type") == "enum":
-                allowed = (
-                    opt.get("allowed")
-                    or opt.get("enum")
-                    or opt.get("values")
-                    or []
+        with self.cfg.batch():
+            for key, var in self.vars.items():
+                if key.startswith("_orders."):
+                    name = key.split(".", 1)[1]
+                    special_orders[name] = var.get()
+                    continue
+                value = config_schema.coerce_value(
+                    self._options.get(key, {}), var.get()
                 )
-                if allowed and value not in allowed:
-                    value = allowed[0]
-            self.cfg.set(key, value)
-            self._initial[key] = value
-        if special_orders:
-            self._apply_orders_config(special_orders)
-            for name, value in special_orders.items():
-                self._initial[f"_orders.{name}"] = value
-        self.cfg.save_all()
+                self.cfg.set(key, value)
+                self._initial[key] = value
+            if special_orders:
+                self._apply_orders_config(special_orders)
+                for name, value in special_orders.items():
+                    self._initial[f"_orders.{name}"] = value
+            self.cfg.save_all()
         self._unsaved = False
         if self._user_var is not None:
             uid = self._user_var.get().strip()
@@ -2533,7 +2619,8 @@ class SettingsWindow(SettingsPanel):
         super().__init__(master, config_path=config_path, schema_path=schema_path)
         self.schema = self.cfg.schema
         print(f"[WM-DBG] tabs loaded: {len(self.schema.get('tabs', []))}")
-        self._init_audit_tab()
+        self._add_lazy_tab("Audyt", self._init_audit_tab)
+        self._add_lazy_tab("Diagnostyka", self._init_diagnostics_tab)
         self._reorder_tabs()
 
     def _reorder_tabs(self) -> None:
@@ -2546,11 +2633,12 @@ class SettingsWindow(SettingsPanel):
             index = self.nb.index(products_id)
             self.nb.insert(index, audit_id)
 
-    def _init_audit_tab(self) -> None:
+    def _init_audit_tab(self, frame: ttk.Frame | None = None) -> None:
         """Create the Audit tab with controls."""
 
-        frame = ttk.Frame(self.nb)
-        self.nb.add(frame, text="Audyt")
+        if frame is None:
+            frame = ttk.Frame(self.nb)
+            self.nb.add(frame, text="Audyt")
 
         btn = ttk.Button(frame, text="Uruchom audyt", command=self._run_audit_now)
         btn.pack(anchor="w", padx=5, pady=5)
@@ -2678,6 +2766,79 @@ class SettingsWindow(SettingsPanel):
         _populate_audit_tree()
         self._refresh_audit_history = _populate_audit_tree
 
+    def _init_diagnostics_tab(self, frame: ttk.Frame | None = None) -> None:
+        """Create the Diagnostics tab showing collected timing metrics."""
+
+        if frame is None:
+            frame = ttk.Frame(self.nb)
+            self.nb.add(frame, text="Diagnostyka")
+
+        bar = ttk.Frame(frame)
+        bar.pack(fill="x", padx=5, pady=5)
+        enabled_var = tk.BooleanVar(value=metrics.is_enabled())
+
+        def _toggle() -> None:
+            flag = bool(enabled_var.get())
+            metrics.enable(flag)
+            try:
+                self.cfg.set("diagnostics.metrics_enabled", flag)
+                self.cfg.save_all()
+            except Exception as exc:
+                logger.warning("[METRICS] Nie zapisano ustawienia: %s", exc)
+            log_akcja(f"[SETTINGS] metryki {'włączone' if flag else 'wyłączone'}")
+
+        ttk.Checkbutton(
+            bar, text="Zbieraj metryki", variable=enabled_var, command=_toggle
+        ).pack(side="left")
+
+        columns = ("name", "count", "avg", "p95", "max")
+        tree = ttk.Treeview(frame, columns=columns, show="headings", height=16)
+        headers = {
+            "name": "Metryka",
+            "count": "Liczba",
+            "avg": "Średnio [ms]",
+            "p95": "p95 [ms]",
+            "max": "Maks. [ms]",
+        }
+        for key, label in headers.items():
+            tree.heading(key, text=label)
+            tree.column(key, width=90, anchor="e")
+        tree.column("name", width=260, anchor="w")
+        tree.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+        self.metrics_tree = tree
+
+        def _populate() -> None:
+            tree.delete(*tree.get_children())
+            snap = metrics.snapshot()
+            for name, stats in sorted(snap["timers"].items()):
+                tree.insert(
+                    "",
+                    "end",
+                    values=(
+                        name,
+                        stats["count"],
+                        f"{stats['avg_ms']:.2f}",
+                        f"{stats['p95_ms']:.2f}",
+                        f"{stats['max_ms']:.2f}",
+                    ),
+                )
+            for name, value in sorted(snap["counters"].items()):
+                tree.insert("", "end", values=(name, value, "", "", ""))
+
+        def _flush() -> None:
+            if metrics.flush():
+                log_akcja(f"[SETTINGS] zapisano metryki do {metrics.metrics_path()}")
+
+        def _clear() -> None:
+            metrics.reset()
+            _populate()
+
+        ttk.Button(bar, text="Odśwież", command=_populate).pack(side="right")
+        ttk.Button(bar, text="Wyczyść", command=_clear).pack(side="right", padx=5)
+        ttk.Button(bar, text="Zapisz teraz", command=_flush).pack(side="right")
+        _populate()
+        self._refresh_metrics = _populate
+
     def _append_audit_out(self, s: str) -> None:
         try:
             self.txt_audit.insert("end", s)
@@ -90,11 +90,16 @@ def _open_profile_in_main(root: tk.Tk, login: str):
         messagebox.showwarning("Profil", "ProfileView niedostępny.")
         return
     container = None
-    for attr in ("content", "main_content", "content_frame", "body"):
-        if hasattr(root, attr):
-            container = getattr(root, attr)
-            if container is not None:
-                break
+    show_transient = getattr(root, "_wm_show_transient", None)
+    if callable(show_transient):
+        # panel główny z cache paneli: pusta, widoczna ramka spoza cache
+        container = show_transient()
+    else:
+        for attr in ("content", "main_content", "content_frame", "body"):
+            if hasattr(root, attr):
+                container = getattr(root, attr)
+                if container is not None:
+                    break
     if container is None:
         messagebox.showwarning("Profil", "Nie znaleziono kontenera głównego.")
         return
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 r"""
 Kreator sprawdzania plikow i wersji – Warsztat Menager
-Wersja narzedzia: 1.3.0 (ASCII-only output)
+Wersja narzedzia: 1.3.1 (ASCII-only output)
 
 Uruchomienie (przyklad):
     python kreator_sprawdzenia.py --root "C:\sciezka\do\WM" --report raport_sprawdzenia.txt --pause
@@ -36,7 +36,9 @@ import json
 import argparse
 from datetime import datetime
 
-TOOL_VERSION = "1.3.0"
+from utils import version_index
+
+TOOL_VERSION = "1.3.1"
 
 # Wbudowane oczekiwane wersje (moga byc nadpisane przez versions_expected.json)
 DEFAULT_EXPECTED = {
@@ -79,13 +81,6 @@ def parse_args():
     ap.add_argument("--write-sample", action="store_true", help="Zapisz przykladowy versions_expected.sample.json i wyjdz")
     return ap.parse_args()
 
-def read_text_head(path, max_bytes=16384):
-    try:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read(max_bytes)
-    except Exception as e:
-        return ""
-
 def extract_version_from_text(text):
     m = VERSION_REGEX.search(text)
     if m:
@@ -138,8 +133,8 @@ def check_file_version(root, fname, expected_cfg):
     if not os.path.isfile(fpath):
         return ("ERR", f"{fname} – file not found", None, None)
 
-    text = read_text_head(fpath)
-    ver = extract_version_from_text(text)
+    # wspolny indeks naglowkow (cache po mtime/rozmiarze) zamiast ponownego czytania
+    ver = extract_version_from_text("\n".join(version_index.get_index().header_lines(fpath)))
     if ver is None:
         return ("WARN", f"{fname} – no version header found", None, None)
 
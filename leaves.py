@@ -1,6 +1,6 @@
 # leaves.py
 # Prosty dziennik urlopów/L4/spóźnień/NN i agregaty do bilansu
-import os, json, time
+import os, json, time, threading
 from datetime import datetime
 
 config = {}
@@ -16,7 +16,9 @@ def set_config(cfg=None, cfg_path=None):
         config_path = cfg_path
 
 def _cfg():
-    return config if isinstance(config, dict) else {}
+    from config_manager import config_or_live
+
+    return config_or_live(config)
 
 def _path(fname):
     base = os.path.dirname(config_path) if config_path else os.getcwd()
@@ -54,12 +56,105 @@ def _write(path, data):
         except Exception:
             pass
 
+# --- dziennik append-only + zmaterializowane sumy -------------------------
+# leaves.jsonl        – jeden wpis na linię, tylko dopisywanie
+# leaves_totals.json  – sumy per (login, rok, typ) + offset w leaves.jsonl,
+#                       do którego są policzone; resztę pliku doczytujemy
+# Stary leaves.json (lista) jest jednorazowo przenoszony do leaves.jsonl.
+LEDGER_FILE = "leaves.jsonl"
+TOTALS_FILE = "leaves_totals.json"
+LEGACY_FILE = "leaves.json"
+
+_LOCK = threading.RLock()
+_STATE = {}  # ścieżka dziennika -> {"offset": int, "totals": {login: {rok: {...}}}}
+_USERS_CACHE = {"sig": None, "rows": []}
+
+
+def _empty_totals():
+    return {"urlop": 0.0, "l4": 0.0, "spoznienie_min": 0, "nn": 0.0, "inny": 0.0}
+
+
+def _bucket(it):
+    t = it.get("type")
+    if t == "spoznienie":
+        return "spoznienie_min", int(it.get("minutes") or 0)
+    key = t if t in ("urlop", "l4", "nn") else "inny"
+    return key, float(it.get("quantity_days") or 0.0)
+
+
+def _fold(totals, it):
+    login = it.get("login") or ""
+    year = str(it.get("date", ""))[:4]
+    key, value = _bucket(it)
+    per_year = totals.setdefault(login, {}).setdefault(year, _empty_totals())
+    per_year[key] += value
+
+
+def _migrate_legacy():
+    ledger = _path(LEDGER_FILE)
+    legacy = _path(LEGACY_FILE)
+    if os.path.exists(ledger) or not os.path.exists(legacy):
+        return
+    items = _read(legacy, [])
+    with open(ledger, "w", encoding="utf-8") as f:
+        for it in items if isinstance(items, list) else []:
+            f.write(json.dumps(it, ensure_ascii=False) + "\n")
+    try:
+        os.replace(legacy, legacy + ".migrated")
+    except Exception:
+        pass
+
+
+def _iter_lines(path, offset=0):
+    """(wpis, offset_po_linii) od ``offset``; niepełna ostatnia linia jest pomijana."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            offset += len(raw)
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line.decode("utf-8")), offset
+            except Exception:
+                continue
+
+
+def _state():
+    """Sumy aktualne względem pliku dziennika (doczytuje tylko nowe linie)."""
+    _migrate_legacy()
+    ledger = _path(LEDGER_FILE)
+    st = _STATE.get(ledger)
+    if st is None:
+        snap = _read(_path(TOTALS_FILE), {})
+        if isinstance(snap, dict) and isinstance(snap.get("totals"), dict):
+            st = {"offset": int(snap.get("offset") or 0), "totals": snap["totals"]}
+        else:
+            st = {"offset": 0, "totals": {}}
+        _STATE[ledger] = st
+    try:
+        size = os.path.getsize(ledger)
+    except OSError:
+        size = 0
+    if size < st["offset"]:  # plik podmieniony/obcięty – liczymy od zera
+        st["offset"], st["totals"] = 0, {}
+    if size > st["offset"]:
+        for it, end in _iter_lines(ledger, st["offset"]):
+            _fold(st["totals"], it)
+            st["offset"] = end
+    return st
+
+
+def _save_totals(st):
+    _write(_path(TOTALS_FILE), {"offset": st["offset"], "totals": st["totals"]})
+
+
 def add_entry(login, type_, date, shift=None, quantity_days=1.0, minutes=0, approved_by=None, note=""):
-    """Dodaj wpis do leaves.json"""
-    path = _path("leaves.json")
-    data = _read(path, [])
+    """Dopisz wpis do leaves.jsonl i zaktualizuj sumy."""
     rid = f"leave_{date}_{login}_{type_}"
-    data.append({
+    rec = {
         "id": rid,
         "login": login,
         "type": type_,  # urlop | l4 | spoznienie | nn | inny
@@ -70,48 +165,68 @@ def add_entry(login, type_, date, shift=None, quantity_days=1.0, minutes=0, appr
         "approved_by": approved_by,
         "created_at": datetime.utcnow().isoformat()+"Z",
         "note": (note or "")
-    })
-    _write(path, data)
+    }
+    with _LOCK:
+        st = _state()  # najpierw wpisy dopisane przez inne procesy
+        with open(_path(LEDGER_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        _state()
+        _save_totals(st)
     return rid
 
 def read_all():
-    return _read(_path("leaves.json"), [])
+    with _LOCK:
+        _migrate_legacy()
+        path = _path(LEDGER_FILE)
+        if not os.path.exists(path):
+            return []
+        return [it for it, _ in _iter_lines(path)]
 
-def totals_for(login, year=None):
-    items = read_all()
-    out = {"urlop":0.0, "l4":0.0, "spoznienie_min":0, "nn":0.0, "inny":0.0}
-    for it in items:
-        if login and it.get("login")!=login: 
+def _sum_years(per_login, year):
+    out = _empty_totals()
+    for y, vals in per_login.items():
+        if year and y != str(year):
             continue
-        if year:
-            y = str(it.get("date",""))[:4]
-            if y != str(year): 
-                continue
-        t = it.get("type")
-        if t=="urlop":
-            out["urlop"] += float(it.get("quantity_days") or 0.0)
-        elif t=="l4":
-            out["l4"] += float(it.get("quantity_days") or 0.0)
-        elif t=="spoznienie":
-            out["spoznienie_min"] += int(it.get("minutes") or 0)
-        elif t=="nn":
-            out["nn"] += float(it.get("quantity_days") or 0.0)
-        else:
-            out["inny"] += float(it.get("quantity_days") or 0.0)
+        for k, v in vals.items():
+            out[k] += v
     return out
 
+def totals_for(login, year=None):
+    """Sumy dla loginu (pusty login = wszyscy) – z agregatów, bez skanu wpisów."""
+    with _LOCK:
+        totals = _state()["totals"]
+        if login:
+            return _sum_years(totals.get(login, {}), year)
+        out = _empty_totals()
+        for per_login in totals.values():
+            for k, v in _sum_years(per_login, year).items():
+                out[k] += v
+        return out
+
+def totals_for_all(year=None):
+    """``{login: sumy}`` dla wszystkich użytkowników (np. bilans roczny HR)."""
+    with _LOCK:
+        return {
+            login: _sum_years(per_login, year)
+            for login, per_login in _state()["totals"].items()
+        }
+
+def _read_users():
+    # uzytkownicy.json czytany ponownie tylko po zmianie pliku
+    p = _path("uzytkownicy.json")
+    try:
+        st = os.stat(p)
+        sig = (p, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return []
+    if _USERS_CACHE["sig"] != sig:
+        rows = _read(p, [])
+        _USERS_CACHE["rows"] = rows if isinstance(rows, list) else []
+        _USERS_CACHE["sig"] = sig
+    return _USERS_CACHE["rows"]
+
 def entitlements_for(login):
     # z uzytkownicy.json + config.leaves.entitlements
-    import json, os
-    def _read_users():
-        p = _path("uzytkownicy.json")
-        try:
-            if os.path.exists(p):
-                with open(p,"r",encoding="utf-8") as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return []
     cfg = _cfg()
     base = {"urlop_rocznie": 26, "l4_limit_rocznie": 33}
     base.update(cfg.get("leaves", {}).get("entitlements", {}))
@@ -1,16 +1,34 @@
 # Plik: logger.py
-# Wersja pliku: 1.0.3
+# Wersja pliku: 1.1.0
+# Zmiany 1.1.0:
+# - log_akcja/log_magazyn nie otwierają pliku przy każdym wywołaniu: linie trafiają
+#   do kolejki, a wątek zapisujący buforuje je i zrzuca na dysk
+#   co LOG_FLUSH_INTERVAL_S lub po LOG_FLUSH_BYTES bajtach
+# - Rotacja logi_gui.txt i logi_magazyn.txt (LOG_MAX_BYTES × LOG_BACKUP_COUNT)
+# - flush_logs()/shutdown_logs() (wołane też przy wyjściu z programu), get_logger()
 # Zmiany 1.0.3:
 # - Dodano log_magazyn(akcja, dane) — zapis do logi_magazyn.txt (JSON Lines)
 # - Reszta bez zmian; pozostawiono log_akcja oraz alias zapisz_log
 
 from datetime import datetime
+import atexit
 import json
 import logging
 import os
+import queue
+import threading
+import time
 
 from config.paths import get_path, join_path
 
+# Parametry bufora i rotacji plików logi_gui.txt / logi_magazyn.txt
+LOG_FLUSH_INTERVAL_S = 1.0
+LOG_FLUSH_BYTES = 64 * 1024
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# Jak często (s) ponownie rozwiązywać ścieżki z ustawień (paths.logs_dir)
+_PATH_TTL_S = 5.0
+
 
 def _ensure_logs_dir() -> str:
     """Zapewnia istnienie katalogu logów i zwraca jego ścieżkę."""
@@ -55,16 +73,215 @@ def _ensure_app_handler() -> None:
 
 _ensure_app_handler()
 
-def log_akcja(tekst: str) -> None:
-    """Zapis prostych zdarzeń GUI/aplikacji do logi_gui.txt (linia tekstowa)."""
-    log_gui_file = join_path("paths.logs_dir", "logi_gui.txt")
-    if not log_gui_file:
+
+def get_logger(name: str) -> logging.Logger:
+    """Zwraca logger modułu (cienka nakładka na ``logging.getLogger``)."""
+
+    return logging.getLogger(name)
+
+
+# ===================== kolejka + wątek zapisujący =====================
+
+
+class _RotatingBuffer:
+    """Bufor linii jednego pliku logu z rotacją przy zrzucie na dysk.
+
+    Plik jest otwierany tylko przy zrzucie (``flush``), a rotacja nazw
+    (``plik.1`` … ``plik.N``) jest zgodna z ``logging.handlers.RotatingFileHandler``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lines: list[str] = []
+        self.pending = 0
+
+    def add(self, line: str) -> None:
+        self.lines.append(line)
+        self.pending += len(line) + 1
+
+    def flush(self) -> None:
+        if not self.lines:
+            return
+        data = "\n".join(self.lines) + "\n"
+        self.lines = []
+        self.pending = 0
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if LOG_MAX_BYTES > 0 and size and size + len(data.encode("utf-8")) > LOG_MAX_BYTES:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def _rotate(self) -> None:
+        if LOG_BACKUP_COUNT <= 0:
+            os.remove(self.path)
+            return
+        for i in range(LOG_BACKUP_COUNT - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+class _LogWriter(threading.Thread):
+    """Wątek odbierający linie ``(ścieżka, tekst)`` z kolejki i zapisujący je.
+
+    Wątek budzi się co ``flush_interval`` sekund (lub na żądanie
+    ``flush_logs``), opróżnia kolejkę i zrzuca bufory na dysk; bufor większy
+    niż ``LOG_FLUSH_BYTES`` jest zrzucany od razu w trakcie opróżniania.
+    Wywołujący nie czekają na dysk ani na wybudzenie wątku.
+    """
+
+    _STOP = object()
+
+    def __init__(self, records: "queue.SimpleQueue", flush_interval: float):
+        super().__init__(name="wm-log-writer", daemon=True)
+        self.records = records
+        self.flush_interval = flush_interval
+        self.wake = threading.Event()
+        self._buffers: dict[str, _RotatingBuffer] = {}
+
+    def run(self) -> None:
+        while True:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            waiters: list[threading.Event] = []
+            stop = self._drain(waiters)
+            for buf in self._buffers.values():
+                self._flush_one(buf)
+            for done in waiters:
+                done.set()
+            if stop:
+                return
+
+    def _drain(self, waiters: list) -> bool:
+        stop = False
+        while True:
+            try:
+                item = self.records.get_nowait()
+            except queue.Empty:
+                return stop
+            if item is self._STOP:
+                stop = True
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            else:
+                path, line = item
+                buf = self._buffers.get(path)
+                if buf is None:
+                    buf = self._buffers[path] = _RotatingBuffer(path)
+                buf.add(line)
+                if buf.pending >= LOG_FLUSH_BYTES:
+                    self._flush_one(buf)
+
+    def _flush_one(self, buf: _RotatingBuffer) -> None:
+        try:
+            buf.flush()
+        except Exception as exc:
+            # awaryjnie do konsoli – wątek zapisujący nie może się zatrzymać
+            print(f"[Błąd loggera] {buf.path}: {exc}")
+
+
+_RECORDS: "queue.SimpleQueue" = queue.SimpleQueue()
+_WRITER: _LogWriter | None = None
+_WRITER_LOCK = threading.Lock()
+_PATH_CACHE: dict[str, tuple[float, str]] = {}
+
+# Przełącznik logów akcji: logging.getLogger("wm.akcje").setLevel(logging.WARNING)
+# wyłącza log_akcja/log_magazyn (sprawdzenie poziomu jest cache'owane przez logging).
+_akcje_logger = logging.getLogger("wm.akcje")
+# Własny poziom: bez niego decyduje root (WARNING, dopóki _ensure_app_handler
+# go nie obniży – a nie robi tego bez paths.logs_dir), co gubiłoby audyt.
+if _akcje_logger.level == logging.NOTSET:
+    _akcje_logger.setLevel(logging.INFO)
+
+
+def _ensure_writer() -> None:
+    global _WRITER
+    if _WRITER is not None and _WRITER.is_alive():
         return
+    with _WRITER_LOCK:
+        if _WRITER is None or not _WRITER.is_alive():
+            _WRITER = _LogWriter(_RECORDS, LOG_FLUSH_INTERVAL_S)
+            _WRITER.start()
 
-    _ensure_logs_dir()
+
+def _log_file(name: str) -> str:
+    """Ścieżka pliku w ``paths.logs_dir`` z krótkim cache (bez odczytu ustawień co linię)."""
+
+    now = time.monotonic()
+    cached = _PATH_CACHE.get(name)
+    if cached and cached[0] > now:
+        return cached[1]
+    path = join_path("paths.logs_dir", name)
+    _PATH_CACHE[name] = (now + _PATH_TTL_S, path)
+    return path
+
+
+def _logging_enabled() -> bool:
+    return _akcje_logger.isEnabledFor(logging.INFO)
+
+
+def _enqueue(path: str, line: str) -> None:
+    _ensure_writer()
+    _RECORDS.put((path, line))
+
+
+def flush_logs(timeout: float = 5.0) -> bool:
+    """Czeka, aż wszystkie zakolejkowane linie trafią na dysk.
+
+    Zwraca ``False``, jeśli wątek zapisujący nie zdążył w ``timeout`` sekund.
+    """
+
+    writer = _WRITER
+    if writer is None or not writer.is_alive():
+        return True
+    done = threading.Event()
+    _RECORDS.put(done)
+    writer.wake.set()
+    return done.wait(timeout)
+
+
+def shutdown_logs(timeout: float = 5.0) -> None:
+    """Zrzuca bufory, zamyka pliki i zatrzymuje wątek zapisujący.
+
+    Kolejne wywołanie ``log_akcja``/``log_magazyn`` uruchomi wątek ponownie.
+    """
+
+    global _WRITER
+    with _WRITER_LOCK:
+        writer = _WRITER
+        _WRITER = None
+    if writer is not None and writer.is_alive():
+        _RECORDS.put(_LogWriter._STOP)
+        writer.wake.set()
+        writer.join(timeout)
+    _PATH_CACHE.clear()
+
+
+atexit.register(shutdown_logs)
+
+
+def log_akcja(tekst: str) -> None:
+    """Zapis prostych zdarzeń GUI/aplikacji do logi_gui.txt (linia tekstowa).
+
+    Zapis jest asynchroniczny – użyj ``flush_logs()``, aby poczekać na dysk.
+    """
+    if not _logging_enabled():
+        return
     try:
-        with open(log_gui_file, "a", encoding="utf-8") as f:
-            f.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tekst}\n")
+        log_gui_file = _log_file("logi_gui.txt")
+        if not log_gui_file:
+            return
+        _enqueue(
+            log_gui_file,
+            f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {tekst}",
+        )
     except Exception as e:
         # awaryjnie do konsoli – nie podnosimy wyjątku, żeby nie wywalać GUI
         print(f"[Błąd loggera] {e}")
@@ -77,20 +294,22 @@ def log_magazyn(akcja: str, dane: dict) -> None:
     Zapis operacji magazynowych do logi_magazyn.txt w formacie JSON Lines.
     Przykład rekordu:
     {"ts":"2025-08-18 12:34:56","akcja":"zuzycie","dane":{"item_id":"PR-30MM","ilosc":2,"by":"jan","ctx":"zadanie:..."}}
+
+    Rekord jest serializowany od razu (późniejsze zmiany ``dane`` nie wpływają
+    na log), a zapis na dysk odbywa się asynchronicznie.
     """
-    log_magazyn_file = join_path("paths.logs_dir", "logi_magazyn.txt")
-    if not log_magazyn_file:
+    if not _logging_enabled():
         return
-
-    _ensure_logs_dir()
     try:
+        log_magazyn_file = _log_file("logi_magazyn.txt")
+        if not log_magazyn_file:
+            return
         line = {
             "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "akcja": akcja,
             "dane": dane
         }
-        with open(log_magazyn_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        _enqueue(log_magazyn_file, json.dumps(line, ensure_ascii=False))
     except Exception as e:
         # awaryjnie do konsoli – nie przerywamy działania
         print(f"[Błąd log_magazyn] {e}")
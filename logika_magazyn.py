@@ -20,7 +20,11 @@ if not logging.getLogger().handlers:
     )
 
 from config_manager import ConfigManager
+from core import metrics
 from magazyn_io import append_history
+from services import search_service
+
+log = logging.getLogger(__name__)
 try:
     from tkinter import messagebox
 except Exception:  # pragma: no cover - środowiska bez GUI
@@ -183,12 +187,13 @@ def _default_magazyn():
         "meta": {"updated": _now(), "item_types": list(DEFAULT_ITEM_TYPES)}
     }
 
+@metrics.timed("magazyn.load")
 def load_magazyn(include_external: bool = True):
     """Wczytuje stan magazynu, opcjonalnie dołączając surowce i półprodukty."""
 
-    print(
-        "[WM-DBG][MAG] Ładuję magazyn (z dołączeniem surowców/półproduktów = %s)."
-        % include_external
+    log.debug(
+        "[WM-DBG][MAG] Ładuję magazyn (z dołączeniem surowców/półproduktów = %s).",
+        include_external,
     )
 
     base = _safe_load(MAGAZYN_PATH, {"pozycje": {}, "historia": []})
@@ -220,9 +225,10 @@ def load_magazyn(include_external: bool = True):
             if iid not in order:
                 order.append(iid)
     meta["order"] = order
-    print(f"[WM-DBG][MAG] Załadowano {len(pozycje)} pozycji")
+    log.debug("[WM-DBG][MAG] Załadowano %d pozycji", len(pozycje))
     return result
 
+@metrics.timed("magazyn.save")
 def save_magazyn(data):
     """Zapisuje magazyn na dysku.
 
@@ -283,6 +289,7 @@ def save_magazyn(data):
             os.remove(lock_path)
         except Exception:
             pass
+    search_service.notify_saved(search_service.DOMAIN_WAREHOUSE, MAGAZYN_PATH)
 
 def _append_history(*args, **kwargs):
     """Append a history entry with backward-compatible schema.
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
 import threading
 from typing import Any, Dict
@@ -10,6 +11,8 @@ from typing import Any, Dict
 from config_manager import ConfigManager
 import tools_autocheck
 
+log = logging.getLogger(__name__)
+
 _CACHE_LOCK = threading.RLock()
 _TASKS_PATH = os.path.join("data", "zadania_narzedzia.json")
 _TOOL_TASKS_CACHE: dict[str, list[dict]] | None = None
@@ -71,7 +74,7 @@ def _ensure_cache() -> None:
             cid: coll.get("types") or [] for cid, coll in collections.items()
         }
         _TOOL_TASKS_MTIME = mtime
-        print(f"[WM-DBG][NARZ] Przeładowano definicje zadań (mtime={mtime})")
+        log.debug("[WM-DBG][NARZ] Przeładowano definicje zadań (mtime=%s)", mtime)
 
 
 def _default_collection() -> str:
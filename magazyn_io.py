@@ -9,6 +9,8 @@ from datetime import datetime, timezone
 from typing import Any, Dict
 import logging
 
+from core import metrics
+
 try:
     import logger
 
@@ -95,6 +97,7 @@ def load(path: str | os.PathLike[str] = MAGAZYN_PATH) -> Dict[str, Any]:
     return {"items": items, "meta": meta}
 
 
+@metrics.timed("magazyn_io.save")
 def save(data: dict) -> None:
     """Zapisuje pełną strukturę magazynu.
 
@@ -109,6 +112,7 @@ def save(data: dict) -> None:
     MAGAZYN_PATH.write_text(txt + "\n", encoding="utf-8")
 
 
+@metrics.timed("magazyn_io.append_history")
 def append_history(
     items: Dict[str, Any],
     item_id: str,
@@ -229,6 +233,7 @@ def generate_pz_id(now: datetime | None = None) -> str:
     return pz_id
 
 
+@metrics.timed("magazyn_io.save_pz")
 def save_pz(entry: Dict[str, Any]) -> str:
     """Append ``entry`` describing a PZ to ``przyjecia.json``.
 
@@ -1,12 +1,27 @@
-"""Utilities for tool history tracking."""
+"""Utilities for tool history tracking.
+
+Each tool has its own ``<TOOL_HISTORY_DIR>/<tool_id>.jsonl`` log.  Reading
+is done through:
+
+* :func:`recent` – newest entries of one tool, read backwards from the end
+  of its file;
+* :func:`query` / :func:`counts` – questions across all tools ("QR issues
+  this week", "who changed status most").  They use :class:`HistoryIndex`,
+  a per-day index of ``(tool, offset, action, user)`` pointers kept in
+  ``_index.json``; only lines appended since the last refresh are parsed.
+"""
 
 from __future__ import annotations
 
 import json
 import os
-from datetime import datetime, timezone
+import threading
+from collections import Counter
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, List, Optional
+
+import tools_history
 
 ALLOWED_ACTIONS = {
     "create",
@@ -51,3 +66,208 @@ def append_tool_history(tool_id: str, user: str, action: str, **kwargs: Any) ->
     fd = os.open(path, os.O_APPEND | os.O_CREAT | os.O_WRONLY)
     with os.fdopen(fd, "a", encoding="utf-8") as f:
         f.write(line + "\n")
+
+
+def recent(tool_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+    """Return up to ``limit`` newest history entries of ``tool_id`` (newest first)."""
+    return tools_history.read_tail(TOOL_HISTORY_DIR / f"{tool_id}.jsonl", limit)
+
+
+# ----------------------------------------------------------------------
+# Cross-tool index
+
+INDEX_NAME = "_index.json"
+INDEX_VERSION = 1
+
+
+def _day_of(value: Any) -> Optional[str]:
+    """``YYYY-MM-DD`` (UTC) for a ``date``/``datetime``/ISO string."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value)
+    try:
+        dt = datetime.fromisoformat(text)
+    except ValueError:
+        return text[:10] or None
+    return _day_of(dt)
+
+
+class HistoryIndex:
+    """Day-partitioned pointers to the entries of all tool logs.
+
+    ``days[day]`` holds ``[tool_id, byte_offset, action, user]`` lists, so
+    counting by action/user/day/tool never touches the log files and
+    :meth:`query` reads only the matching lines.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.path = self.directory / INDEX_NAME
+        self._lock = threading.RLock()
+        self._offsets: Dict[str, int] = {}
+        self._days: Dict[str, List[list]] = {}
+        self._loaded = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return
+        self._offsets = {str(k): int(v) for k, v in (data.get("offsets") or {}).items()}
+        self._days = {str(k): list(v) for k, v in (data.get("days") or {}).items()}
+
+    def _save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": INDEX_VERSION, "offsets": self._offsets, "days": self._days},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        os.replace(tmp, self.path)
+
+    def _scan(self, tool_id: str, path: Path, start: int) -> int:
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset = start
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # write in progress – picked up next time
+                try:
+                    entry = json.loads(raw.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    entry = None
+                if isinstance(entry, dict):
+                    day = _day_of(entry.get("ts")) or ""
+                    self._days.setdefault(day, []).append(
+                        [tool_id, offset, entry.get("action"), entry.get("user")]
+                    )
+                offset += len(raw)
+        return offset
+
+    def refresh(self) -> None:
+        """Index lines appended to any tool log since the last refresh."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            try:
+                files = {p.stem: p for p in self.directory.glob("*.jsonl")}
+            except OSError:
+                files = {}
+            sizes = {}
+            for tool_id, p in files.items():
+                try:
+                    sizes[tool_id] = p.stat().st_size
+                except OSError:
+                    continue
+            if any(sizes.get(t, -1) < off for t, off in self._offsets.items()):
+                # a log was truncated or removed – start over
+                self._offsets.clear()
+                self._days.clear()
+            changed = False
+            for tool_id, size in sizes.items():
+                start = self._offsets.get(tool_id, 0)
+                if size > start:
+                    end = self._scan(tool_id, files[tool_id], start)
+                    if end != start:
+                        self._offsets[tool_id] = end
+                        changed = True
+            if changed:
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"[WM-DBG][HIST] nie zapisano indeksu historii: {e}")
+
+    def _pointers(self, since: Any, until: Any, action, user, tool) -> List[tuple]:
+        """``(day, pointer)`` pairs matching the filters, oldest day first."""
+        lo, hi = _day_of(since), _day_of(until)
+        tool = None if tool is None else str(tool)
+        out: List[tuple] = []
+        for day in sorted(self._days):
+            if (lo and day < lo) or (hi and day > hi):
+                continue
+            for ptr in self._days[day]:
+                if action is not None and ptr[2] != action:
+                    continue
+                if user is not None and ptr[3] != user:
+                    continue
+                if tool is not None and ptr[0] != tool:
+                    continue
+                out.append((day, ptr))
+        return out
+
+    def counts(self, by: str = "action", since: Any = None, until: Any = None,
+               action: Optional[str] = None, user: Optional[str] = None,
+               tool: Optional[str] = None) -> Counter:
+        """Count entries grouped ``by`` ``"action"``, ``"user"``, ``"tool"`` or ``"day"``.
+
+        ``since``/``until`` are inclusive days (``date``, ``datetime`` or ISO string).
+        """
+        fields = {"tool": 0, "action": 2, "user": 3}
+        if by != "day" and by not in fields:
+            raise ValueError(f"Unknown grouping: {by}")
+        with self._lock:
+            self.refresh()
+            pairs = self._pointers(since, until, action, user, tool)
+        if by == "day":
+            return Counter(day for day, _ in pairs)
+        idx = fields[by]
+        return Counter(ptr[idx] for _, ptr in pairs)
+
+    def query(self, since: Any = None, until: Any = None, action: Optional[str] = None,
+              user: Optional[str] = None, tool: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entries matching the filters, oldest first; each has a ``tool`` key."""
+        with self._lock:
+            self.refresh()
+            ptrs = self._pointers(since, until, action, user, tool)
+        by_tool: Dict[str, List[int]] = {}
+        for _, (tool_id, offset, *_rest) in ptrs:
+            by_tool.setdefault(tool_id, []).append(offset)
+        entries: Dict[tuple, Dict[str, Any]] = {}
+        for tool_id, offsets in by_tool.items():
+            try:
+                f = open(self.directory / f"{tool_id}.jsonl", "rb")
+            except OSError:
+                continue
+            with f:
+                for offset in sorted(offsets):
+                    f.seek(offset)
+                    try:
+                        entry = json.loads(f.readline().decode("utf-8"))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        continue
+                    entries[(tool_id, offset)] = {"tool": tool_id, **entry}
+        return [entries[(p[0], p[1])] for _, p in ptrs if (p[0], p[1]) in entries]
+
+
+_INDEX: Optional[HistoryIndex] = None
+
+
+def get_index() -> HistoryIndex:
+    """Return the shared index of :data:`TOOL_HISTORY_DIR`."""
+    global _INDEX
+    if _INDEX is None or _INDEX.directory != Path(TOOL_HISTORY_DIR):
+        _INDEX = HistoryIndex(TOOL_HISTORY_DIR)
+    return _INDEX
+
+
+def query(**filters: Any) -> List[Dict[str, Any]]:
+    """Shortcut for :meth:`HistoryIndex.query` on the shared index."""
+    return get_index().query(**filters)
+
+
+def counts(by: str = "action", **filters: Any) -> Counter:
+    """Shortcut for :meth:`HistoryIndex.counts` on the shared index."""
+    return get_index().counts(by, **filters)
@@ -3,6 +3,8 @@ import os, json, time, tempfile, platform, atexit, traceback
 import logging
 from datetime import datetime, timezone
 
+from core import metrics
+
 # Initialize module logger
 logger = logging.getLogger(__name__)
 
@@ -39,7 +41,9 @@ def _now_utc_iso():
     return datetime.now(timezone.utc).isoformat()
 
 def _get_cfg():
-    return config if isinstance(config, dict) else {}
+    from config_manager import config_or_live
+
+    return config_or_live(config)
 
 def _cfg_dir():
     if config_path:
@@ -94,6 +98,7 @@ def _read_all():
             logger.exception("reading presence file failed: %s", e)
     return {}
 
+@metrics.timed("presence.heartbeat")
 def heartbeat(login, role=None, machine=None, logout=False):
     """Jednorazowy zapis bicia serca. logout=True oznacza świadome wylogowanie."""
     if not login: return False
@@ -193,6 +198,7 @@ def start_heartbeat(root, login, role=None, interval_ms=None):
 
     _tick()
 
+@metrics.timed("presence.read")
 def read_presence(max_age_sec=None):
     """Zwróć listę rekordów z presence.json + online/offline.
        Jeśli logout=True => zawsze offline niezależnie od wieku wpisu.
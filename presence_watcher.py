@@ -37,7 +37,9 @@ def _now():
     return datetime.now(timezone.utc)
 
 def _cfg():
-    return config if isinstance(config, dict) else {}
+    from config_manager import config_or_live
+
+    return config_or_live(config)
 
 def _path(fname):
     base = os.path.dirname(config_path) if config_path else os.getcwd()
@@ -104,37 +106,119 @@ def _today_str(dtobj=None):
         dtobj = datetime.now()
     return dtobj.strftime("%Y-%m-%d")
 
+_USERS_CACHE = {"sig": None, "meta": {}}
+
+# Watcher śpi do najbliższego "start zmiany + grace"; dłuższe oczekiwanie
+# jest dzielone na odcinki, żeby zmiana zegara/configu nie rozjechała planu.
+MAX_SLEEP_MS = 15 * 60 * 1000
+MIN_SLEEP_MS = 1000
+
 def _users_meta():
-    meta = _read_json(_path("uzytkownicy.json"), [])
+    # uzytkownicy.json czytany ponownie tylko po zmianie pliku
+    path = _path("uzytkownicy.json")
+    try:
+        st = os.stat(path)
+        sig = (path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        sig = (path, None, None)
+    if sig == _USERS_CACHE["sig"]:
+        return _USERS_CACHE["meta"]
+    meta = _read_json(path, [])
     out = {}
     if isinstance(meta, list):
         for r in meta:
             if isinstance(r, dict) and r.get("login"):
                 out[r["login"]] = r
+    _USERS_CACHE["sig"], _USERS_CACHE["meta"] = sig, out
     return out
 
-def _ensure_alert(date_str, shift, login):
-    alerts = _read_json(_path("alerts.json"), [])
-    key = f"{date_str}_{login}_{shift}"
-    for a in alerts:
-        if a.get("id")==key:
-            return False  # already exists
-    now_iso = _now().isoformat()
-    alerts.append({
-        "id": key,
+def _norm_shift(value):
+    return str(value or "").upper().replace("3", "III").replace("2", "II").replace("1", "I")
+
+def _parse_hhmm(s):
+    try:
+        hh,mm = s.split(":")
+        return int(hh), int(mm)
+    except Exception:
+        return 0,0
+
+def _alert_record(date_str, shift, login):
+    return {
+        "id": f"{date_str}_{login}_{shift}",
         "login": login,
         "data": date_str,
         "zmiana": shift,
-        "created_at": now_iso,
+        "created_at": _now().isoformat(),
         "status": "pending",
         "resolution": None,
         "minutes": 0,
         "resolved_by": None,
         "resolved_at": None,
         "note": ""
-    })
-    _write_json(_path("alerts.json"), alerts)
-    return True
+    }
+
+def _ensure_alerts(entries):
+    """Dopisz brakujące alerty ``(data, zmiana, login)`` jednym zapisem pliku."""
+    if not entries:
+        return 0
+    alerts = _read_json(_path("alerts.json"), [])
+    known = {a.get("id") for a in alerts if isinstance(a, dict)}
+    added = 0
+    for date_str, shift, login in entries:
+        rec = _alert_record(date_str, shift, login)
+        if rec["id"] in known:
+            continue
+        known.add(rec["id"])
+        alerts.append(rec)
+        added += 1
+    if added:
+        _write_json(_path("alerts.json"), alerts)
+    return added
+
+def _ensure_alert(date_str, shift, login):
+    return _ensure_alerts([(date_str, shift, login)]) == 1
+
+def _online_logins():
+    try:
+        import presence
+        recs, _ = presence.read_presence(max_age_sec=None)
+        return {r.get("login") for r in recs if r.get("online")}
+    except Exception as e:
+        log_akcja(f"[Presence] run_check read error: {e}")
+        return set()
+
+def check_shift(shift, start_dt):
+    """Alerty dla użytkowników zmiany ``shift`` (start ``start_dt``) bez obecności."""
+    assigned = [lg for lg, meta in _users_meta().items() if _norm_shift(meta.get("zmiana")) == shift]
+    if not assigned:
+        return 0
+    online = _online_logins()
+    date_str = _today_str(start_dt)
+    return _ensure_alerts([(date_str, shift, lg) for lg in assigned if lg not in online])
+
+def _shift_start(now_local, shift, shifts):
+    hh, mm = _parse_hhmm(shifts.get(shift, {}).get("start", "06:00"))
+    start_dt = now_local.replace(hour=hh, minute=mm, second=0, microsecond=0)
+    # jeśli nocna i minęła północ, dopasuj start do wczoraj
+    if shift == "III" and now_local.hour < 6:
+        start_dt = start_dt - timedelta(days=1)
+    return start_dt
+
+def next_check(now_local=None):
+    """Najbliższa chwila kontroli: ``(kiedy, zmiana, start_zmiany)`` po ``now_local``."""
+    if now_local is None:
+        now_local = datetime.now()
+    shifts, grace = _shifts_from_cfg(_cfg())
+    best = None
+    day0 = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
+    for shift, spec in shifts.items():
+        hh, mm = _parse_hhmm((spec or {}).get("start", "06:00"))
+        for days in (0, 1):
+            start_dt = day0 + timedelta(days=days, hours=hh, minutes=mm)
+            at = start_dt + timedelta(minutes=grace)
+            if at > now_local and (best is None or at < best[0]):
+                best = (at, shift, start_dt)
+    return best
 
 def run_check():
     """Sprawdź brak obecności po starcie zmiany + grace i twórz alerty."""
@@ -142,52 +226,32 @@ def run_check():
     shifts, grace = _shifts_from_cfg(c)
     now_local = datetime.now()
     active = _active_shift(now_local)
-    # start godziny danej zmiany wg configu
-    def _parse_hhmm(s):
-        try:
-            hh,mm = s.split(":")
-            return int(hh), int(mm)
-        except Exception:
-            return 0,0
-    start_str = shifts.get(active, {}).get("start", "06:00")
-    hh,mm = _parse_hhmm(start_str)
-    start_dt = now_local.replace(hour=hh, minute=mm, second=0, microsecond=0)
-    # jeśli nocna i minęła północ, dopasuj start do wczoraj
-    if active=="III" and now_local.hour < 6:
-        start_dt = start_dt - timedelta(days=1)
+    start_dt = _shift_start(now_local, active, shifts)
 
     # Czekamy aż minie grace
     if now_local < (start_dt + timedelta(minutes=grace)):
         return 0
-
-    users = _users_meta()
-    online_logins = set()
-    try:
-        import presence
-        recs, _ = presence.read_presence(max_age_sec=None)
-        online_logins = {r.get("login") for r in recs if r.get("online")}
-    except Exception as e:
-        log_akcja(f"[Presence] run_check read error: {e}")
-
-    created = 0
-    for lg, meta in users.items():
-        # tylko użytkownicy przypisani do tej zmiany (meta["zmiana"])
-        mshift = str(meta.get("zmiana", "")).upper().replace("3", "III").replace("2", "II").replace("1", "I")
-        if mshift != active:
-            continue
-        if lg in online_logins:
-            continue
-        if _ensure_alert(_today_str(now_local), active, lg):
-            created += 1
-    return created
+    return check_shift(active, start_dt)
 
 def schedule_watcher(root):
-    """Uruchom cykliczny watcher (co 60 s)."""
+    """Uruchom watcher: kontrola od razu, potem tylko o "start zmiany + grace"."""
     if not root:
         return
+    state = {"due": None}
+
+    def _run_due():
+        due = state["due"]
+        if due is None:
+            return run_check()  # pierwszy przebieg – bieżąca zmiana
+        at, shift, start_dt = due
+        if datetime.now() < at:
+            return 0
+        return check_shift(shift, start_dt)
+
     def _tick():
+        delay = MAX_SLEEP_MS
         try:
-            n = run_check()
+            n = _run_due()
             if n:
                 log_akcja(f"[ALERTS] utworzono {n} alert(ów) nieobecności")
         except (OSError, ValueError) as e:
@@ -198,7 +262,15 @@ def schedule_watcher(root):
             )
         finally:
             try:
-                root.after(60000, _tick)
+                state["due"] = nxt = next_check()
+                if nxt is not None:
+                    left = int((nxt[0] - datetime.now()).total_seconds() * 1000)
+                    delay = max(MIN_SLEEP_MS, min(MAX_SLEEP_MS, left))
+            except Exception as e:
+                state["due"] = None
+                log_akcja(f"[ALERTS] watcher error: {e}")
+            try:
+                root.after(delay, _tick)
             except TclError:
                 log_akcja("[ALERTS] watcher scheduling stopped")
             except Exception as e:
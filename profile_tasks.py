@@ -14,13 +14,19 @@ Two public helpers are provided:
 ``workload_for``
     Calculate how many *active* tasks are assigned to each user from the
     provided iterable.
+
+Both are answered from :class:`TaskStore` – the records are loaded once,
+indexed by normalised owner and status with per-owner deadline-sorted
+lists, and reloaded only when the task files change on disk.
 """
 
 from __future__ import annotations
 
+import bisect
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timezone
+from threading import RLock
 from typing import Any, Iterable
 
 from utils.path_utils import cfg_path
@@ -104,6 +110,118 @@ def _task_deadline(rec: dict[str, Any]) -> datetime | None:
         return None
 
 
+def _deadline_key(value: datetime) -> datetime:
+    """Sortable deadline: aware values converted to naive UTC."""
+
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class TaskStore:
+    """In-memory task records with owner/status/deadline indexes.
+
+    :meth:`refresh` compares ``(mtime, size)`` of the candidate files and
+    reloads only when one of them changed.  Per owner the store keeps the
+    record positions sorted by deadline (records without a deadline
+    separately) so "due before X" is a bisect instead of a scan.
+    """
+
+    def __init__(self, files: Iterable[str] | None = None) -> None:
+        self._files = list(files) if files is not None else None
+        self._lock = RLock()
+        self._sig: tuple | None = None
+        self.records: list[dict[str, Any]] = []
+        self._status: list[str] = []
+        self.by_owner: dict[str, list[int]] = {}
+        self.by_status: dict[str, list[int]] = {}
+        # owner -> (sorted deadline keys, positions, positions without deadline)
+        self._deadlines: dict[str, tuple[list[datetime], list[int], list[int]]] = {}
+        self.active_by_owner: dict[str, int] = {}
+
+    def _paths(self) -> list[str]:
+        files = self._files if self._files is not None else _TASK_FILES
+        return [cfg_path(p) for p in files]
+
+    def _signature(self) -> tuple:
+        sig = []
+        for path in self._paths():
+            try:
+                st = os.stat(path)
+                sig.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append((path, None, None))
+        return tuple(sig)
+
+    def refresh(self) -> "TaskStore":
+        with self._lock:
+            sig = self._signature()
+            if sig != self._sig:
+                self._build(_load_tasks_raw() if self._files is None else self._load())
+                self._sig = sig
+        return self
+
+    def _load(self) -> list[dict[str, Any]]:
+        for path in self._paths():
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    data = json.load(fh)
+            except Exception:  # pragma: no cover - defensive tolerance
+                continue
+            if isinstance(data, dict):
+                return list(data.values())
+            if isinstance(data, list):
+                return data
+        return []
+
+    def _build(self, records: list[Any]) -> None:
+        self.records = [r for r in records if isinstance(r, dict)]
+        self._status = []
+        self.by_owner = {}
+        self.by_status = {}
+        self.active_by_owner = {}
+        dated: dict[str, list[tuple[datetime, int]]] = {}
+        undated: dict[str, list[int]] = {}
+        for pos, rec in enumerate(self.records):
+            owner = _normalize_login(_task_owner(rec))
+            status = _task_status(rec)
+            self._status.append(status)
+            self.by_owner.setdefault(owner, []).append(pos)
+            self.by_status.setdefault(status, []).append(pos)
+            if status in _ACTIVE_STATUSES:
+                self.active_by_owner[owner] = self.active_by_owner.get(owner, 0) + 1
+            deadline = _task_deadline(rec)
+            if deadline is None:
+                undated.setdefault(owner, []).append(pos)
+            else:
+                dated.setdefault(owner, []).append((_deadline_key(deadline), pos))
+        self._deadlines = {}
+        for owner in self.by_owner:
+            pairs = sorted(dated.get(owner, ()), key=lambda kp: kp[0])
+            self._deadlines[owner] = (
+                [k for k, _ in pairs],
+                [p for _, p in pairs],
+                undated.get(owner, []),
+            )
+
+    def positions_for(self, owner_norm: str, do_deadline: datetime | None = None) -> list[int]:
+        """Positions of ``owner_norm``'s records, optionally only due by ``do_deadline``."""
+
+        if do_deadline is None:
+            return self.by_owner.get(owner_norm, [])
+        keys, positions, undated = self._deadlines.get(owner_norm, ([], [], []))
+        cut = bisect.bisect_right(keys, _deadline_key(do_deadline))
+        return sorted(positions[:cut] + undated)
+
+    def status_of(self, pos: int) -> str:
+        return self._status[pos]
+
+
+_STORE = TaskStore()
+
+
 def get_tasks_for(
     login: str,
     *,
@@ -122,19 +240,12 @@ def get_tasks_for(
         else None
     )
 
-    matched: list[dict[str, Any]] = []
-    for record in _load_tasks_raw():
-        if _normalize_login(_task_owner(record)) != login_norm:
-            continue
-        status = _task_status(record)
-        if status_filter is not None and status not in status_filter:
-            continue
-        if do_deadline:
-            deadline = _task_deadline(record)
-            if deadline and deadline > do_deadline:
-                continue
-        matched.append(dict(record))
-    return matched
+    store = _STORE.refresh()
+    return [
+        dict(store.records[pos])
+        for pos in store.positions_for(login_norm, do_deadline)
+        if status_filter is None or store.status_of(pos) in status_filter
+    ]
 
 
 def workload_for(
@@ -148,26 +259,20 @@ def workload_for(
     if not user_list:
         return []
 
-    norm_to_original = {
-        _normalize_login(login): login for login in user_list
-    }
-    counts: dict[str, int] = {login: 0 for login in user_list}
-
-    for record in _load_tasks_raw():
-        owner_norm = _normalize_login(_task_owner(record))
-        original_login = norm_to_original.get(owner_norm)
-        if original_login is None:
-            continue
-        if _task_status(record) not in _ACTIVE_STATUSES:
-            continue
-        if do_deadline:
-            deadline = _task_deadline(record)
-            if deadline and deadline > do_deadline:
-                continue
-        counts[original_login] += 1
+    store = _STORE.refresh()
+    counts: dict[str, int] = {}
+    for login in user_list:
+        owner = _normalize_login(login)
+        if do_deadline is None:
+            counts[login] = store.active_by_owner.get(owner, 0)
+        else:
+            counts[login] = sum(
+                1
+                for pos in store.positions_for(owner, do_deadline)
+                if store.status_of(pos) in _ACTIVE_STATUSES
+            )
 
     return sorted(counts.items(), key=lambda item: (item[1], item[0]))
 
 
-__all__ = ["get_tasks_for", "workload_for"]
-
+__all__ = ["TaskStore", "get_tasks_for", "workload_for"]
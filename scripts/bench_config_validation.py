@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Benchmark walidacji całego configu wg ``settings_schema.json``.
+
+Porównuje (domyślnie 2000 powtórzeń):
+
+* ``walk``     – dawny tryb: przejście drzewa schematu i interpretacja
+  definicji pola przy każdej walidacji,
+* ``compiled`` – ``core.config_schema``: schemat skompilowany raz,
+  walidacja gotowymi walidatorami,
+* ``load``     – koszt ``config_schema.load`` przy niezmienionym pliku
+  (trafienie w cache) i pierwszej kompilacji.
+
+Uruchomienie: ``python scripts/bench_config_validation.py [--rounds 2000]``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from config_manager import deep_merge, get_by_key  # noqa: E402
+from core import config_schema  # noqa: E402
+
+
+def _read(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _validate_walk(schema: dict, cfg: dict) -> None:
+    idx = {}
+    for opt in config_schema.iter_schema_fields(schema):
+        key = opt.get("key")
+        if key and key not in idx:
+            idx[key] = opt
+    for key, opt in idx.items():
+        value = get_by_key(cfg, key, None)
+        if value is not None:
+            config_schema.compile_field(opt).validate(value)
+
+
+def _timeit(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=2000)
+    ap.add_argument("--schema", default=str(ROOT / "settings_schema.json"))
+    args = ap.parse_args()
+
+    schema_path = os.path.abspath(args.schema)
+    schema = _read(Path(schema_path))
+    cfg = deep_merge(_read(ROOT / "config.defaults.json"), _read(ROOT / "config.json"))
+
+    config_schema.clear_cache()
+    t0 = time.perf_counter()
+    compiled = config_schema.load(schema_path)
+    first_ms = (time.perf_counter() - t0) * 1000
+
+    walk_us = _timeit(lambda: _validate_walk(schema, cfg), args.rounds)
+    compiled_us = _timeit(lambda: compiled.validate_config(cfg), args.rounds)
+    load_us = _timeit(lambda: config_schema.load(schema_path), args.rounds)
+
+    print(f"pola schematu: {len(compiled.fields)}, powtórzeń: {args.rounds}")
+    print(f"walk      {walk_us:9.1f} µs / pełna walidacja")
+    print(f"compiled  {compiled_us:9.1f} µs / pełna walidacja  (x{walk_us / compiled_us:.1f})")
+    print(f"load      {load_us:9.1f} µs (cache), pierwsza kompilacja {first_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
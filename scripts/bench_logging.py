@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Benchmark logowania operacji magazynowych (log_magazyn + log_akcja).
+
+Porównuje koszt 10 000 operacji (domyślnie) w trzech trybach:
+
+* ``sync``  – dawne zachowanie: otwarcie/dopisanie/zamknięcie pliku co linię,
+* ``async`` – kolejka + wątek zapisujący z ``logger.py``,
+* ``off``   – logowanie wyłączone (poziom ``wm.akcje`` powyżej INFO).
+
+Uruchomienie: ``python scripts/bench_logging.py [--ops 10000]``.
+Pliki logów trafiają do katalogu tymczasowego.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from config import paths  # noqa: E402
+import logger  # noqa: E402
+
+
+def _legacy_append(path: str, line: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def _op_sync(i: int, logs_dir: str) -> None:
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    dane = {"item_id": f"IT-{i % 500}", "ilosc": 1.0, "by": "bench", "ctx": None}
+    _legacy_append(
+        os.path.join(logs_dir, "logi_magazyn.txt"),
+        json.dumps({"ts": ts, "akcja": "zuzycie", "dane": dane}, ensure_ascii=False),
+    )
+    _legacy_append(
+        os.path.join(logs_dir, "logi_gui.txt"), f"[{ts}] Zużycie IT-{i % 500}"
+    )
+
+
+def _op_logger(i: int, _logs_dir: str) -> None:
+    dane = {"item_id": f"IT-{i % 500}", "ilosc": 1.0, "by": "bench", "ctx": None}
+    logger.log_magazyn("zuzycie", dane)
+    logger.log_akcja(f"Zużycie IT-{i % 500}")
+
+
+def _run(label: str, op, ops: int, logs_dir: str) -> float:
+    start = time.perf_counter()
+    for i in range(ops):
+        op(i, logs_dir)
+    elapsed = time.perf_counter() - start
+    flush_start = time.perf_counter()
+    logger.flush_logs(timeout=60)
+    flushed = time.perf_counter() - flush_start
+    print(
+        f"{label:6s} {ops} ops: {elapsed * 1000:8.1f} ms "
+        f"({elapsed / ops * 1e6:6.1f} µs/op), flush {flushed * 1000:.1f} ms"
+    )
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=10_000)
+    args = parser.parse_args()
+
+    akcje = logging.getLogger("wm.akcje")
+    with tempfile.TemporaryDirectory() as tmp:
+        logs_dir = os.path.join(tmp, "logs")
+        paths.set_getter(lambda key: logs_dir if key == "paths.logs_dir" else None)
+        logger.shutdown_logs()
+
+        _run("sync", _op_sync, args.ops, logs_dir)
+        _run("async", _op_logger, args.ops, logs_dir)
+        level = akcje.level
+        akcje.setLevel(logging.WARNING)
+        try:
+            _run("off", _op_logger, args.ops, logs_dir)
+        finally:
+            akcje.setLevel(level)
+        logger.shutdown_logs()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark stosowania motywu na oknie z tysiącami widżetów.
+
+Porównuje (domyślnie 3000 widżetów, motyw z ``config.json``):
+
+* ``recursive`` – dawny tryb: style ttk + ``_set_bg_recursive`` po całym
+  drzewie przy każdym wywołaniu,
+* ``first``     – ``ui_theme.apply_theme`` przy pierwszym użyciu palety
+  (style, baza opcji, jednorazowe przemalowanie drzewa),
+* ``repeat``    – kolejne ``apply_theme_tree`` / nowy ``Toplevel`` z tym
+  samym motywem,
+* ``switch``    – zmiana na inny motyw i z powrotem.
+
+Wymaga ekranu (``DISPLAY``). Uruchomienie:
+``python scripts/bench_theme_apply.py [--widgets 3000] [--rounds 20]``.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+from tkinter import ttk
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import ui_theme  # noqa: E402
+
+
+def _populate(root: tk.Misc, count: int) -> None:
+    made = 0
+    while made < count:
+        box = tk.Frame(root)
+        made += 1
+        for _ in range(9):
+            if made >= count:
+                break
+            if made % 3 == 0:
+                ttk.Label(box, text="ttk")
+            elif made % 3 == 1:
+                tk.Label(box, text="tk")
+            else:
+                tk.Entry(box)
+            made += 1
+
+
+def _apply_recursive(root: tk.Misc, name: str) -> None:
+    style = ttk.Style(root)
+    palette = ui_theme._build_palette.__wrapped__(name)
+    ui_theme._apply_base_styles(style, palette)
+    ui_theme._configure_wm_styles(style, ui_theme.THEMES[name], palette)
+    ui_theme._set_bg_recursive(root, palette)
+
+
+def _ms(fn, rounds: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--widgets", type=int, default=3000)
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as exc:
+        print(f"brak ekranu – pomijam benchmark ({exc})")
+        return
+    root.withdraw()
+    _populate(root, args.widgets)
+    name = ui_theme._configured_theme_name(ui_theme.CONFIG_FILE)
+    other = next(t for t in ui_theme.THEMES if t != name)
+
+    recursive_ms = _ms(lambda: _apply_recursive(root, name), args.rounds)
+    first_ms = _ms(lambda: ui_theme.apply_theme(root, scheme=name))
+    repeat_ms = _ms(lambda: ui_theme.apply_theme_tree(root, scheme=name), args.rounds)
+
+    def new_toplevel() -> None:
+        tk.Toplevel(root).destroy()
+
+    toplevel_ms = _ms(new_toplevel, args.rounds)
+    switch_ms = _ms(
+        lambda: (ui_theme.apply_theme(root, scheme="warm"),
+                 ui_theme.apply_theme(root, scheme=name)),
+        max(1, args.rounds // 5),
+    ) / 2
+    root.destroy()
+
+    print(f"widżetów: {args.widgets}, powtórzeń: {args.rounds}")
+    print(f"recursive {recursive_ms:9.2f} ms / wywołanie")
+    print(f"first     {first_ms:9.2f} ms (raz na paletę)")
+    print(f"repeat    {repeat_ms:9.3f} ms / wywołanie  (x{recursive_ms / max(repeat_ms, 1e-6):.0f})")
+    print(f"toplevel  {toplevel_ms:9.3f} ms / nowe okno")
+    print(f"switch    {switch_ms:9.2f} ms / zmiana motywu")
+
+
+if __name__ == "__main__":
+    main()
@@ -205,10 +205,29 @@ def save_status_override(login: str, task_id: str, status: str) -> None:
     _save_json(path, data)
 
 
+# Mapy przypisań czytane są przy każdym wierszu listy zadań – trzymamy je
+# w pamięci i czytamy plik ponownie tylko po zmianie (mtime_ns, rozmiar).
+_ASSIGN_CACHE: Dict[str, tuple] = {}
+
+
+def _load_assign_map(name: str) -> Dict[str, str]:
+    path = os.path.join(OVERRIDE_DIR, name)
+    try:
+        st = os.stat(path)
+        sig = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        sig = None
+    cached = _ASSIGN_CACHE.get(path)
+    if cached is None or cached[0] != sig:
+        data = _load_json(path, {}) if sig is not None else {}
+        cached = (sig, data if isinstance(data, dict) else {})
+        _ASSIGN_CACHE[path] = cached
+    return dict(cached[1])
+
+
 def load_assign_orders() -> Dict[str, str]:
     """Return mapping of order number to login."""
-    path = os.path.join(OVERRIDE_DIR, "assign_orders.json")
-    return _load_json(path, {})
+    return _load_assign_map("assign_orders.json")
 
 
 def save_assign_order(order_no: str, login: Optional[str]) -> None:
@@ -221,12 +240,12 @@ def save_assign_order(order_no: str, login: Optional[str]) -> None:
         data.pop(key, None)
     path = os.path.join(OVERRIDE_DIR, "assign_orders.json")
     _save_json(path, data)
+    _ASSIGN_CACHE.pop(path, None)
 
 
 def load_assign_tools() -> Dict[str, str]:
     """Return mapping of tool task ID to login."""
-    path = os.path.join(OVERRIDE_DIR, "assign_tools.json")
-    return _load_json(path, {})
+    return _load_assign_map("assign_tools.json")
 
 
 def save_assign_tool(task_id: str, login: Optional[str]) -> None:
@@ -239,6 +258,7 @@ def save_assign_tool(task_id: str, login: Optional[str]) -> None:
         data.pop(key, None)
     path = os.path.join(OVERRIDE_DIR, "assign_tools.json")
     _save_json(path, data)
+    _ASSIGN_CACHE.pop(path, None)
 
 
 def count_presence(login: str, presence_file: str = "presence.json") -> int:
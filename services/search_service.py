@@ -0,0 +1,459 @@
+# -*- coding: utf-8 -*-
+"""Wspólna wyszukiwarka: narzędzia, magazyn, zlecenia i maszyny.
+
+Indeks odwrócony ``słowo → dokumenty`` trzymany w pamięci. Słowa są
+normalizowane przez :func:`core.text_index.fold` (bez polskich znaków),
+a każde słowo zapytania dopasowuje też słowa zaczynające się od niego
+(„tlocz” znajduje „Tłoczące”). Wynik to lista :class:`SearchHit`
+posortowana malejąco po trafności.
+
+Indeks jest aktualizowany przyrostowo per plik: zapis narzędzia, zlecenia,
+magazynu czy maszyn wywołuje :func:`notify_saved`, a zmiany zrobione poza
+programem wyłapuje okresowe porównanie ``(mtime, size)`` plików (nie
+częściej niż co ``RESCAN_S`` sekund, przy wyszukiwaniu).
+
+Użycie::
+
+    from services import search_service
+    for hit in search_service.search("sruba m12", limit=20):
+        print(hit.domain, hit.key, hit.title)
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import os
+import re
+import time
+from dataclasses import dataclass
+from threading import RLock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.paths import get_path
+from core.text_index import fold
+
+DOMAIN_TOOLS = "narzedzia"
+DOMAIN_WAREHOUSE = "magazyn"
+DOMAIN_ORDERS = "zlecenia"
+DOMAIN_MACHINES = "maszyny"
+
+RESCAN_S = 30.0
+TITLE_WEIGHT = 3.0
+PREFIX_FACTOR = 0.5
+
+_TOKEN_RE = re.compile(r"\w+")
+
+DocId = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    domain: str
+    key: str
+    title: str
+    subtitle: str
+    score: float
+
+
+@dataclass
+class Source:
+    """Źródło dokumentów jednej dziedziny.
+
+    ``files()`` zwraca listę plików źródła, ``parse(path)`` pary
+    ``(klucz, rekord)`` z jednego pliku, a ``describe(rekord)`` krotkę
+    ``(tytuł, podtytuł, tekst)`` do zaindeksowania.
+    """
+
+    domain: str
+    files: Callable[[], List[str]]
+    parse: Callable[[str], List[Tuple[str, dict]]]
+    describe: Callable[[dict], Tuple[str, str, str]]
+
+
+def tokenize(text: object) -> List[str]:
+    return _TOKEN_RE.findall(fold(text))
+
+
+# ----------------------------------------------------------------------
+# Indeks
+
+class SearchIndex:
+    """Indeks odwrócony z dopasowaniem prefiksów i prostym rankingiem.
+
+    Waga słowa w dokumencie to liczba wystąpień (słowa z tytułu liczą się
+    ``TITLE_WEIGHT`` razy), mnożona przez idf. Dopasowanie przez prefiks
+    daje ``PREFIX_FACTOR`` wagi dopasowania dokładnego. Wszystkie słowa
+    zapytania muszą zostać znalezione.
+    """
+
+    def __init__(self, sources: Sequence[Source] = ()) -> None:
+        self.sources: Dict[str, Source] = {s.domain: s for s in sources}
+        self._lock = RLock()
+        self._docs: Dict[DocId, Tuple[str, str]] = {}
+        self._doc_terms: Dict[DocId, Dict[str, float]] = {}
+        self._owner: Dict[DocId, str] = {}
+        self._file_docs: Dict[Tuple[str, str], List[DocId]] = {}
+        self._file_sigs: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._postings: Dict[str, Dict[DocId, float]] = {}
+        self._vocab: List[str] | None = None
+        self._scanned_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ----- dokumenty -----
+    def add(self, domain: str, key: str, title: str, subtitle: str = "", text: str = "") -> None:
+        doc_id = (domain, str(key))
+        with self._lock:
+            self.remove(domain, key)
+            terms: Dict[str, float] = {}
+            for tok in tokenize(title):
+                terms[tok] = terms.get(tok, 0.0) + TITLE_WEIGHT
+            for tok in tokenize(f"{subtitle} {text}"):
+                terms[tok] = terms.get(tok, 0.0) + 1.0
+            self._docs[doc_id] = (str(title), str(subtitle))
+            self._doc_terms[doc_id] = terms
+            for tok, weight in terms.items():
+                posting = self._postings.get(tok)
+                if posting is None:
+                    posting = self._postings[tok] = {}
+                    self._vocab = None
+                posting[doc_id] = weight
+
+    def remove(self, domain: str, key: str) -> None:
+        doc_id = (domain, str(key))
+        with self._lock:
+            terms = self._doc_terms.pop(doc_id, None)
+            if terms is None:
+                return
+            del self._docs[doc_id]
+            self._owner.pop(doc_id, None)
+            for tok in terms:
+                posting = self._postings.get(tok)
+                if posting is None:
+                    continue
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[tok]
+                    self._vocab = None
+
+    # ----- pliki źródeł -----
+    def reindex_file(self, domain: str, path: str) -> None:
+        """Ponownie zaindeksuj dokumenty z jednego pliku (lub usuń, gdy go brak)."""
+
+        source = self.sources.get(domain)
+        if source is None:
+            return
+        fkey = (domain, os.path.abspath(path))
+        sig = _file_signature(path)
+        with self._lock:
+            for doc_id in self._file_docs.pop(fkey, []):
+                if self._owner.get(doc_id) == fkey[1]:
+                    self.remove(*doc_id)
+            self._file_sigs.pop(fkey, None)
+            if sig is None:
+                return
+            try:
+                pairs = source.parse(path)
+            except (OSError, ValueError, TypeError) as e:
+                print(f"[WM-DBG][SEARCH] Nie mogę zaindeksować {path}: {e}")
+                pairs = []
+            ids: List[DocId] = []
+            for key, record in pairs:
+                title, subtitle, text = source.describe(record)
+                self.add(domain, key, title, subtitle, text)
+                doc_id = (domain, str(key))
+                self._owner[doc_id] = fkey[1]
+                ids.append(doc_id)
+            self._file_docs[fkey] = ids
+            self._file_sigs[fkey] = sig
+
+    def refresh(self, force: bool = False) -> None:
+        """Przeindeksuj pliki, które zmieniły się od ostatniego skanu."""
+
+        now = time.monotonic()
+        if not force and now - self._scanned_at < RESCAN_S:
+            return
+        with self._lock:
+            self._scanned_at = now
+            for domain, source in self.sources.items():
+                try:
+                    paths = {os.path.abspath(p) for p in source.files()}
+                except OSError:
+                    paths = set()
+                known = {p for d, p in self._file_sigs if d == domain}
+                for path in known - paths:
+                    self.reindex_file(domain, path)
+                for path in paths:
+                    if self._file_sigs.get((domain, path)) != _file_signature(path):
+                        self.reindex_file(domain, path)
+
+    # ----- wyszukiwanie -----
+    def _matching_terms(self, token: str) -> List[str]:
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        vocab = self._vocab
+        start = bisect.bisect_left(vocab, token)
+        end = bisect.bisect_left(vocab, token + "\uffff", start)
+        return vocab[start:end]
+
+    def search(
+        self,
+        query: object,
+        limit: int | None = 50,
+        domains: Iterable[str] | None = None,
+    ) -> List[SearchHit]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        allowed = set(domains) if domains is not None else None
+        with self._lock:
+            total = len(self._docs) or 1
+            scores: Dict[DocId, float] | None = None
+            for token in tokens:
+                partial: Dict[DocId, float] = {}
+                for term in self._matching_terms(token):
+                    posting = self._postings[term]
+                    idf = math.log(1.0 + total / len(posting))
+                    factor = idf if term == token else idf * PREFIX_FACTOR
+                    for doc_id, weight in posting.items():
+                        value = weight * factor
+                        if value > partial.get(doc_id, 0.0):
+                            partial[doc_id] = value
+                if scores is None:
+                    scores = partial
+                else:
+                    scores = {d: s + partial[d] for d, s in scores.items() if d in partial}
+                if not scores:
+                    return []
+            ranked = sorted(
+                (
+                    (score, doc_id)
+                    for doc_id, score in (scores or {}).items()
+                    if allowed is None or doc_id[0] in allowed
+                ),
+                key=lambda pair: (-pair[0], pair[1]),
+            )
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [
+                SearchHit(doc_id[0], doc_id[1], *self._docs[doc_id], score=round(score, 4))
+                for score, doc_id in ranked
+            ]
+
+
+def _file_signature(path: str) -> Tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# ----------------------------------------------------------------------
+# Źródła danych
+
+def _read_json(path: str) -> Any:
+    with open(path, "r", encoding="utf-8-sig") as fh:
+        return json.load(fh)
+
+
+def _flat_text(record: dict) -> str:
+    """Proste pola rekordu (bez list/słowników typu ``historia``)."""
+
+    return " ".join(
+        str(v) for v in record.values() if isinstance(v, (str, int, float)) and not isinstance(v, bool)
+    )
+
+
+def _json_files(directory: str) -> List[str]:
+    if not directory or not os.path.isdir(directory):
+        return []
+    return [
+        os.path.join(directory, fn)
+        for fn in os.listdir(directory)
+        if fn.endswith(".json") and not fn.startswith("_")
+    ]
+
+
+def _files_in_dirs(*dirs: str) -> List[str]:
+    seen: Dict[str, None] = {}
+    for d in dirs:
+        if d:
+            seen.setdefault(os.path.abspath(d), None)
+    return [p for d in seen for p in _json_files(d)]
+
+
+def _tool_files() -> List[str]:
+    """Pliki narzędzi z ``<sciezka_danych>/narzedzia`` (jak panel) i ``paths.tools_dir``."""
+
+    from config_manager import live_config
+
+    base = str(live_config().get("sciezka_danych") or "").strip()
+    panel_dir = os.path.join(base, "narzedzia") if base else "narzedzia"
+    return _files_in_dirs(panel_dir, get_path("paths.tools_dir"))
+
+
+def _order_files() -> List[str]:
+    """Zlecenia z ``paths.orders_dir`` oraz starszego ``data/zlecenia``."""
+
+    from zlecenia_logika import ZLECENIA_DIR
+
+    return _files_in_dirs(get_path("paths.orders_dir"), str(ZLECENIA_DIR))
+
+
+def _parse_tool(path: str) -> List[Tuple[str, dict]]:
+    data = _read_json(path)
+    if not isinstance(data, dict):
+        return []
+    nr = str(data.get("numer") or os.path.splitext(os.path.basename(path))[0]).zfill(3)
+    return [(nr, dict(data, numer=nr))]
+
+
+def _describe_tool(rec: dict) -> Tuple[str, str, str]:
+    title = f"{rec.get('numer', '')} {rec.get('nazwa', '')}".strip()
+    subtitle = " · ".join(str(rec[k]) for k in ("typ", "status") if rec.get(k))
+    return title, subtitle, _flat_text(rec)
+
+
+def _parse_warehouse(path: str) -> List[Tuple[str, dict]]:
+    data = _read_json(path)
+    items = {}
+    if isinstance(data, dict):
+        items = data.get("items") or data.get("pozycje") or {}
+    if isinstance(items, list):
+        items = {str(i.get("id", "")): i for i in items if isinstance(i, dict)}
+    return [
+        (str(rec.get("id") or key), rec)
+        for key, rec in items.items()
+        if isinstance(rec, dict) and (rec.get("id") or key)
+    ]
+
+
+def _describe_warehouse(rec: dict) -> Tuple[str, str, str]:
+    title = f"{rec.get('id', '')} {rec.get('nazwa', '')}".strip()
+    return title, str(rec.get("typ", "") or ""), _flat_text(rec)
+
+
+def _parse_order(path: str) -> List[Tuple[str, dict]]:
+    data = _read_json(path)
+    if not isinstance(data, dict):
+        return []
+    key = str(data.get("id") or os.path.splitext(os.path.basename(path))[0])
+    return [(key, data)]
+
+
+def _describe_order(rec: dict) -> Tuple[str, str, str]:
+    title = f"{rec.get('id', '')} {rec.get('produkt', '') or rec.get('nazwa', '')}".strip()
+    return title, str(rec.get("status", "") or ""), _flat_text(rec)
+
+
+def _machine_files() -> List[str]:
+    from utils_maszyny import LEGACY_DATA, PRIMARY_DATA
+
+    return [p for p in (PRIMARY_DATA, LEGACY_DATA) if os.path.exists(p)]
+
+
+def _parse_machines(path: str) -> List[Tuple[str, dict]]:
+    data = _read_json(path)
+    if isinstance(data, dict):
+        data = data.get("maszyny", list(data.values()))
+    out = []
+    for rec in data if isinstance(data, list) else []:
+        if not isinstance(rec, dict):
+            continue
+        key = str(rec.get("id") or rec.get("nr_ewid") or rec.get("nr") or "").strip()
+        if key:
+            out.append((key, rec))
+    return out
+
+
+def _describe_machine(rec: dict) -> Tuple[str, str, str]:
+    key = rec.get("id") or rec.get("nr_ewid") or rec.get("nr") or ""
+    title = f"{key} {rec.get('nazwa', '')}".strip()
+    hala = rec.get("hala") or rec.get("nr_hali")
+    subtitle = " · ".join(s for s in (str(rec.get("typ", "") or ""), f"hala {hala}" if hala else "") if s)
+    return title, subtitle, _flat_text(rec)
+
+
+def _warehouse_files() -> List[str]:
+    from logika_magazyn import MAGAZYN_PATH
+
+    return [MAGAZYN_PATH] if os.path.exists(MAGAZYN_PATH) else []
+
+
+def default_sources() -> List[Source]:
+    return [
+        Source(DOMAIN_TOOLS, _tool_files, _parse_tool, _describe_tool),
+        Source(DOMAIN_WAREHOUSE, _warehouse_files, _parse_warehouse, _describe_warehouse),
+        Source(DOMAIN_ORDERS, _order_files, _parse_order, _describe_order),
+        Source(DOMAIN_MACHINES, _machine_files, _parse_machines, _describe_machine),
+    ]
+
+
+# ----------------------------------------------------------------------
+# API modułu
+
+_INDEX: Optional[SearchIndex] = None
+_INDEX_LOCK = RLock()
+
+
+def get_index() -> SearchIndex:
+    """Wspólny indeks; budowany przy pierwszym użyciu."""
+
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            index = SearchIndex(default_sources())
+            index.refresh(force=True)
+            _INDEX = index
+        return _INDEX
+
+
+def search(
+    query: object,
+    limit: int | None = 50,
+    domains: Iterable[str] | None = None,
+) -> List[SearchHit]:
+    """Szukaj we wszystkich dziedzinach naraz (``domains`` zawęża)."""
+
+    index = get_index()
+    index.refresh()
+    return index.search(query, limit=limit, domains=domains)
+
+
+def notify_saved(domain: str, path: str) -> None:
+    """Wywoływane po zapisie pliku źródła; bez zbudowanego indeksu nic nie robi."""
+
+    index = _INDEX
+    if index is None:
+        return
+    try:
+        index.reindex_file(domain, path)
+    except Exception as e:  # indeks nie może psuć zapisu danych
+        print(f"[WM-DBG][SEARCH] Błąd aktualizacji indeksu ({domain}): {e}")
+
+
+def reset() -> None:
+    global _INDEX
+    with _INDEX_LOCK:
+        _INDEX = None
+
+
+__all__ = [
+    "DOMAIN_MACHINES",
+    "DOMAIN_ORDERS",
+    "DOMAIN_TOOLS",
+    "DOMAIN_WAREHOUSE",
+    "SearchHit",
+    "SearchIndex",
+    "Source",
+    "default_sources",
+    "get_index",
+    "notify_saved",
+    "reset",
+    "search",
+    "tokenize",
+]
@@ -0,0 +1,450 @@
+# snapshots.py
+# Wersja: 1.1.0
+# [1.1.0] retencja osobno dla każdego zestawu źródeł; migawki różnych źródeł
+#         nie czekają na siebie (blokada wyłączna tylko dla prune/gc)
+"""Migawki konfiguracji i katalogu ``data/`` w magazynie adresowanym treścią.
+
+Pliki dzielone są na kawałki po ``CHUNK_SIZE`` bajtów; każdy kawałek trafia
+raz do ``objects/<ab>/<sha256>`` (skompresowany zlib), a migawka to tylko
+manifest ``snapshots/<id>.json`` z listą kawałków dla każdego pliku. Kolejne
+migawki współdzielą kawałki, więc migawka co kilka minut kosztuje tyle, ile
+zmienionych danych. Pliki o niezmienionym ``(rozmiar, mtime)`` nie są nawet
+czytane – ich wpis przechodzi z poprzedniego manifestu.
+
+Użycie::
+
+    store = snapshots.get_store()
+    sid = snapshots.take_snapshot()                 # config + data/
+    store.restore_file(sid, "data/maszyny.json")    # jeden plik
+    store.restore(sid)                               # całe drzewo
+    store.prune(keep_last=12, keep_hourly=24, keep_daily=30)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20
+DEFAULT_INTERVAL_MIN = 10
+PREVIOUS_SCAN = 50  # ile ostatnich manifestów przeszukać po starcie
+DEFAULT_RETENTION = {"keep_last": 12, "keep_hourly": 24, "keep_daily": 30}
+
+# wpis manifestu: [rozmiar, mtime_ns, [sha256 kawałków]]
+Entry = List[Any]
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _sources_key(sources: Dict[str, str]) -> str:
+    return json.dumps(sources, sort_keys=True)
+
+
+def _retained(ids: List[str], keep_last: int, keep_hourly: int, keep_daily: int) -> set:
+    """Id (od najnowszego) zostające wg polityki ``keep_*``."""
+    keep = set(ids[:keep_last])
+    for width, limit in ((11, keep_hourly), (8, keep_daily)):  # YYYYmmdd_HH / YYYYmmdd
+        buckets: List[str] = []
+        for sid in ids:
+            bucket = sid[:width]
+            if bucket in buckets:
+                continue
+            if len(buckets) >= limit:
+                break
+            buckets.append(bucket)
+            keep.add(sid)
+    return keep
+
+
+class SnapshotStore:
+    """Magazyn migawek w katalogu ``root`` (``objects/`` + ``snapshots/``)."""
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.manifests_dir = os.path.join(self.root, "snapshots")
+        # snapshot() różnych źródeł działa równolegle (np. config z wątku GUI
+        # obok migawki data/ w tle); prune/gc mają wyłączny dostęp do obiektów
+        self._cond = threading.Condition()
+        self._active = 0
+        self._exclusive = False
+        self._source_locks: Dict[str, threading.Lock] = {}
+        self._last: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    @contextmanager
+    def _shared(self, key: str) -> Iterator[None]:
+        """Migawka źródeł ``key``: jedna naraz dla tych samych źródeł, bez gc w tle."""
+        with self._cond:
+            while self._exclusive:
+                self._cond.wait()
+            self._active += 1
+            lock = self._source_locks.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def _exclusive_access(self) -> Iterator[None]:
+        with self._cond:
+            while self._exclusive:
+                self._cond.wait()
+            self._exclusive = True  # nowe migawki czekają, trwające kończą
+            while self._active:
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
+
+    # ----- obiekty -----
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _put_chunk(self, chunk: bytes) -> str:
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            _atomic_write(path, zlib.compress(chunk, 6))
+        return digest
+
+    def _get_chunk(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as f:
+            return zlib.decompress(f.read())
+
+    def _store_file(self, path: str) -> List[str]:
+        chunks: List[str] = []
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(self._put_chunk(chunk))
+        return chunks
+
+    # ----- manifesty -----
+    def list_snapshots(self) -> List[str]:
+        """Identyfikatory migawek od najstarszej."""
+        try:
+            names = os.listdir(self.manifests_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-5] for n in names if n.endswith(".json"))
+
+    def manifest(self, snap_id: str) -> Dict[str, Any]:
+        with open(os.path.join(self.manifests_dir, snap_id + ".json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _previous(self, sources: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Ostatnia migawka tych samych źródeł (z pamięci lub z dysku)."""
+        key = _sources_key(sources)
+        if key in self._last:
+            return self._last[key]
+        found = None
+        for sid in reversed(self.list_snapshots()[-PREVIOUS_SCAN:]):
+            try:
+                manifest = self.manifest(sid)
+            except (OSError, ValueError):
+                continue
+            if manifest.get("sources") == sources:
+                found = manifest
+                break
+        self._last[key] = found
+        return found
+
+    def _walk(self, sources: Dict[str, str]) -> Iterator[Tuple[str, str]]:
+        """``(klucz, ścieżka)`` plików źródeł; klucz to ``nazwa`` lub ``nazwa/rel``."""
+        for name, src in sorted(sources.items()):
+            src = os.path.abspath(src)
+            if os.path.isfile(src):
+                yield name, src
+                continue
+            for dirpath, dirnames, filenames in os.walk(src):
+                # magazyn może leżeć wewnątrz data/ – nie archiwizujemy go
+                dirnames[:] = sorted(
+                    d for d in dirnames
+                    if os.path.join(dirpath, d) != self.root and d != "__pycache__"
+                )
+                for fn in sorted(filenames):
+                    if fn.endswith(".tmp"):
+                        continue
+                    path = os.path.join(dirpath, fn)
+                    rel = os.path.relpath(path, src).replace(os.sep, "/")
+                    yield f"{name}/{rel}", path
+
+    def snapshot(self, sources: Dict[str, str], label: str = "") -> Optional[str]:
+        """Utwórz migawkę ``sources`` (``nazwa -> plik/katalog``).
+
+        Zwraca identyfikator nowej migawki albo ``None``, gdy od ostatniej
+        migawki tych samych źródeł nic się nie zmieniło.
+        """
+        abs_sources = {k: os.path.abspath(v) for k, v in sources.items()}
+        with self._shared(_sources_key(abs_sources)):
+            prev = self._previous(abs_sources)
+            prev_files: Dict[str, Entry] = (prev or {}).get("files", {})
+            files: Dict[str, Entry] = {}
+            for key, path in self._walk(abs_sources):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                old = prev_files.get(key)
+                if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                    files[key] = old
+                    continue
+                try:
+                    files[key] = [st.st_size, st.st_mtime_ns, self._store_file(path)]
+                except OSError as e:
+                    logger.warning("[SNAP] pominięto %s: %s", path, e)
+            if prev and prev.get("files") == files:
+                return None
+            now = datetime.now()
+            snap_id = now.strftime("%Y%m%d_%H%M%S_%f")
+            manifest = {
+                "id": snap_id,
+                "created": now.isoformat(timespec="seconds"),
+                "label": label,
+                "sources": abs_sources,
+                "files": files,
+            }
+            _atomic_write(
+                os.path.join(self.manifests_dir, snap_id + ".json"),
+                json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            )
+            self._last[_sources_key(abs_sources)] = manifest
+            return snap_id
+
+    # ----- odtwarzanie -----
+    def _target(self, manifest: Dict[str, Any], key: str, dest_root: Optional[str]) -> str:
+        if dest_root:
+            return os.path.join(dest_root, *key.split("/"))
+        name, _, rel = key.partition("/")
+        base = manifest["sources"][name]
+        return os.path.join(base, *rel.split("/")) if rel else base
+
+    def _write_entry(self, entry: Entry, target: str) -> bool:
+        size, mtime_ns, chunks = entry
+        try:
+            st = os.stat(target)
+            if st.st_size == size and st.st_mtime_ns == mtime_ns:
+                return False  # już identyczny
+        except OSError:
+            pass
+        _atomic_write(target, b"".join(self._get_chunk(d) for d in chunks))
+        os.utime(target, ns=(mtime_ns, mtime_ns))
+        return True
+
+    def read_file(self, snap_id: str, key: str) -> bytes:
+        """Zawartość pliku ``key`` z migawki (bez zapisu na dysk)."""
+        entry = self.manifest(snap_id)["files"][key]
+        return b"".join(self._get_chunk(d) for d in entry[2])
+
+    def restore_file(self, snap_id: str, key: str, dest: Optional[str] = None) -> str:
+        """Przywróć jeden plik; domyślnie w jego pierwotne miejsce."""
+        manifest = self.manifest(snap_id)
+        target = dest or self._target(manifest, key, None)
+        self._write_entry(manifest["files"][key], target)
+        return target
+
+    def restore(self, snap_id: str, dest_root: Optional[str] = None,
+                delete_extra: bool = False) -> List[str]:
+        """Przywróć całą migawkę; zwraca klucze faktycznie zapisanych plików.
+
+        ``dest_root`` kieruje pliki do innego katalogu (``<dest_root>/<klucz>``).
+        ``delete_extra`` usuwa pliki źródeł, których nie było w migawce.
+        """
+        manifest = self.manifest(snap_id)
+        written = [
+            key for key, entry in manifest["files"].items()
+            if self._write_entry(entry, self._target(manifest, key, dest_root))
+        ]
+        if delete_extra and not dest_root:
+            for key, path in list(self._walk(manifest["sources"])):
+                if key not in manifest["files"]:
+                    try:
+                        os.remove(path)
+                    except OSError as e:
+                        logger.warning("[SNAP] nie usunięto %s: %s", path, e)
+        return written
+
+    # ----- retencja -----
+    def prune(self, keep_last: int = 12, keep_hourly: int = 24, keep_daily: int = 30) -> List[str]:
+        """Usuń migawki spoza polityki i nieużywane obiekty; zwraca usunięte id.
+
+        Polityka działa osobno dla każdego zestawu źródeł (np. sam config
+        vs. config + ``data/``): zostaje ``keep_last`` najnowszych oraz
+        najnowsza migawka z każdej z ostatnich ``keep_hourly`` godzin
+        i ``keep_daily`` dni – seria zapisów ustawień nie wypiera migawek
+        ``data/``.
+        """
+        with self._exclusive_access():
+            groups: Dict[str, List[str]] = {}
+            for sid in reversed(self.list_snapshots()):
+                try:
+                    key = _sources_key(self.manifest(sid).get("sources") or {})
+                except (OSError, ValueError):
+                    continue  # nieczytelny manifest – zostaje
+                groups.setdefault(key, []).append(sid)
+            removed: List[str] = []
+            for ids in groups.values():
+                keep = _retained(ids, keep_last, keep_hourly, keep_daily)
+                removed.extend(sid for sid in ids if sid not in keep)
+            removed.sort(reverse=True)
+            for sid in removed:
+                try:
+                    os.remove(os.path.join(self.manifests_dir, sid + ".json"))
+                except OSError:
+                    pass
+            if removed:
+                self._last.clear()
+                self._gc()
+            return removed
+
+    def gc(self) -> int:
+        """Usuń obiekty, do których nie odwołuje się żadna migawka."""
+        with self._exclusive_access():
+            return self._gc()
+
+    def _gc(self) -> int:
+        live = set()
+        for sid in self.list_snapshots():
+            try:
+                for entry in self.manifest(sid)["files"].values():
+                    live.update(entry[2])
+            except (OSError, ValueError, KeyError):
+                return 0  # uszkodzony manifest – lepiej nic nie kasować
+        removed = 0
+        for dirpath, _dirs, filenames in os.walk(self.objects_dir):
+            for fn in filenames:
+                if fn not in live:
+                    try:
+                        os.remove(os.path.join(dirpath, fn))
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed
+
+    def disk_usage(self) -> int:
+        total = 0
+        for dirpath, _dirs, filenames in os.walk(self.root):
+            for fn in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, fn))
+                except OSError:
+                    pass
+        return total
+
+
+# ----------------------------------------------------------------------
+# Powiązanie z aplikacją
+
+_STORE: Optional[SnapshotStore] = None
+
+
+def store_dir() -> str:
+    import config_manager as cm
+
+    return os.path.join(cm.BACKUP_DIR, "snapshots")
+
+
+def get_store() -> SnapshotStore:
+    global _STORE
+    root = os.path.abspath(store_dir())
+    if _STORE is None or _STORE.root != root:
+        _STORE = SnapshotStore(root)
+    return _STORE
+
+
+def config_sources(config_path: Optional[str] = None) -> Dict[str, str]:
+    import config_manager as cm
+
+    sources = {"config.json": config_path or cm.GLOBAL_PATH, "config.local.json": cm.LOCAL_PATH}
+    return {k: v for k, v in sources.items() if os.path.exists(v)}
+
+
+def default_sources() -> Dict[str, str]:
+    from utils.path_utils import cfg_path
+
+    sources = config_sources()
+    data_dir = cfg_path("data")
+    if os.path.isdir(data_dir):
+        sources["data"] = data_dir
+    return sources
+
+
+def _settings() -> Dict[str, Any]:
+    try:
+        from config_manager import live_config
+
+        cfg = (live_config().get("backup") or {}).get("snapshots") or {}
+    except Exception:
+        cfg = {}
+    return cfg if isinstance(cfg, dict) else {}
+
+
+def take_snapshot(sources: Optional[Dict[str, str]] = None, label: str = "auto",
+                  prune: bool = True) -> Optional[str]:
+    """Migawka ``sources`` (domyślnie config + data/) i retencja z configu."""
+    store = get_store()
+    sid = store.snapshot(sources if sources is not None else default_sources(), label=label)
+    if sid and prune:
+        cfg = _settings()
+        store.prune(**{k: int(cfg.get(k, v)) for k, v in DEFAULT_RETENTION.items()})
+    return sid
+
+
+def schedule_snapshots(widget, interval_min: Optional[float] = None) -> None:
+    """Co ``interval_min`` minut wykonuj migawkę w wątku roboczym."""
+    if interval_min is None:
+        interval_min = float(_settings().get("interval_min", DEFAULT_INTERVAL_MIN))
+    if interval_min <= 0 or getattr(widget, "_wm_snapshots_scheduled", False):
+        return
+    widget._wm_snapshots_scheduled = True  # ponowne logowanie nie dubluje timera
+    delay_ms = int(interval_min * 60_000)
+
+    def _run() -> None:
+        try:
+            sid = take_snapshot()
+            if sid:
+                print(f"[WM-DBG][SNAP] migawka {sid}")
+        except Exception as e:  # migawka nie może zatrzymać aplikacji
+            logger.warning("[SNAP] migawka nieudana: %s", e)
+
+    def _tick() -> None:
+        threading.Thread(target=_run, daemon=True, name="snapshots").start()
+        try:
+            widget.after(delay_ms, _tick)
+        except Exception:
+            pass  # okno zamknięte
+
+    widget.after(delay_ms, _tick)
+
+
+__all__ = [
+    "SnapshotStore",
+    "config_sources",
+    "default_sources",
+    "get_store",
+    "schedule_snapshots",
+    "take_snapshot",
+]
@@ -38,7 +38,7 @@ except Exception:
         return False
 from gui_settings import SettingsWindow
 from config_manager import ConfigManager
-from updater import _run_git_pull, _now_stamp, _git_has_updates
+from updater import _run_git_pull, _now_stamp
 import updater
 from pathlib import Path
 
@@ -215,9 +215,40 @@ def show_startup_error(e):
 
 
 # ====== AUTO UPDATE ======
-def auto_update_on_start():
+def _update_check_settings(cfg=None):
+    """Zwraca ``(interwał_h, timeout_s)`` sprawdzania aktualizacji z configu."""
+    interval = updater.UPDATE_CHECK_INTERVAL_H
+    timeout = updater.UPDATE_CHECK_TIMEOUT_S
+    try:
+        cfg = cfg or CONFIG_MANAGER or ConfigManager()
+        interval = float(cfg.get("updates.check_interval_h", interval))
+        timeout = float(cfg.get("updates.check_timeout_s", timeout))
+    except Exception as e:
+        _error(f"Ustawienia sprawdzania aktualizacji: {e}")
+    return interval, timeout
+
+
+def _show_update_error(message):
+    """Okno błędu aktualizacji bez działającego głównego okna."""
+    try:
+        r = tk.Tk()
+        ensure_theme_applied(r)
+        r.withdraw()
+        error_dialogs.show_error_dialog("Aktualizacje", message)
+        r.destroy()
+    except Exception:
+        pass
+
+
+def auto_update_on_start(show_error=None):
     """Run git pull if ``updates.auto`` flag is enabled.
 
+    The pull is skipped when a recent check (younger than
+    ``updates.check_interval_h``) found no remote changes. At startup this
+    runs on the background update-check worker (see
+    :func:`_start_update_check`), never before the window appears;
+    ``show_error(message)`` reports a conflict with local changes.
+
     Returns ``True`` if the repository was updated, otherwise ``False``.
     """
     try:
@@ -226,6 +257,10 @@ def auto_update_on_start():
         _error(f"ConfigManager init failed: {e}")
         return False
     if cfg.get("updates.auto", False):
+        interval, _timeout = _update_check_settings(cfg)
+        if updater.cached_update_status(interval) is False:
+            _dbg("[UPDATE] brak zmian wg ostatniego sprawdzenia – pomijam git pull")
+            return False
         try:
             output = _run_git_pull(Path.cwd(), _now_stamp())
             if output and "Already up to date." not in output:
@@ -234,16 +269,72 @@ def auto_update_on_start():
             _error(f"auto_update_on_start error: {e}")
             msg = str(e).lower()
             if "lokalne zmiany" in msg or "local changes" in msg:
-                try:
-                    r = tk.Tk()
-                    ensure_theme_applied(r)
-                    r.withdraw()
-                    error_dialogs.show_error_dialog("Aktualizacje", str(e))
-                    r.destroy()
-                except Exception:
-                    pass
+                (show_error or _show_update_error)(str(e))
     return False
 
+
+def _start_update_check(root):
+    """Sprawdza aktualizacje w tle i pokazuje znaczek na ekranie logowania.
+
+    Wynik jest zapamiętywany przez ``updater`` – przy kolejnych startach
+    w ciągu ``updates.check_interval_h`` Git nie jest wywoływany wcale.
+    Przy ``updates.auto`` ten sam wątek wykonuje ``git pull``
+    (:func:`auto_update_on_start`), więc start okna nie czeka na sieć.
+    Zwraca wątek roboczy albo ``None``, gdy sprawdzanie jest wyłączone.
+    """
+    try:
+        cfg = CONFIG_MANAGER or ConfigManager()
+        # updates.auto też potrzebuje wątku – to on wykonuje git pull
+        if not cfg.get("system.auto_check_updates", True) and not cfg.get(
+            "updates.auto", False
+        ):
+            _dbg("[UPDATE] system.auto_check_updates=False – pomijam")
+            return None
+    except Exception:
+        cfg = None
+    interval, timeout = _update_check_settings(cfg)
+
+    def _show_badge():
+        try:
+            import gui_logowanie
+
+            gui_logowanie.show_update_badge(root)
+        except Exception as e:  # pragma: no cover - defensywne
+            _error(f"Nie można pokazać informacji o aktualizacji: {e}")
+
+    def _in_gui(fn):
+        try:
+            root.after(0, fn)
+        except (tk.TclError, RuntimeError):
+            # okno zamknięte zanim przyszedł wynik
+            pass
+
+    def _show_changelog():
+        try:
+            import gui_changelog
+
+            gui_changelog.show_changelog()
+        except Exception as e:
+            _error(f"Nie można wyświetlić changelog: {e}")
+
+    def _on_result(available):
+        # wątek roboczy: fetch już wykonany i zapisany w cache sprawdzania
+        _info(f"[{SESSION_ID}] Sprawdzenie aktualizacji: dostępne={available}")
+        if not available:
+            return
+        if auto_update_on_start(
+            show_error=lambda msg: _in_gui(
+                lambda: error_dialogs.show_error_dialog("Aktualizacje", msg)
+            )
+        ):
+            _in_gui(_show_changelog)
+            return
+        _in_gui(_show_badge)
+
+    return updater.check_updates_in_background(
+        Path.cwd(), _on_result, max_age_hours=interval, timeout=timeout
+    )
+
 # ====== USER FILE (NOWE) ======
 def _ensure_user_file(login, rola):
     """
@@ -406,12 +497,11 @@ def _wm_git_check_on_start(
             "rev-parse",
             "--is-inside-work-tree",
         ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        subprocess.run(
-            ["git", "fetch", "origin", preferred_branch],
-            check=False,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        # bez git fetch przed startem okna – odniesienia zdalne odświeża
+        # (i zapisuje wynik w cache) wątek sprawdzania aktualizacji
+        interval, _timeout = _update_check_settings()
+        if updater.cached_update_status(interval) is None:
+            print("[WM-DBG][GIT] brak świeżego sprawdzenia — fetch wykona wątek w tle.")
 
         dirty = subprocess.run([
             "git",
@@ -509,26 +599,24 @@ def main():
     _info(f"Log file: {_log_path()}")
     _info(f"=== START SESJI: {datetime.now()} | ID={SESSION_ID} ===")
 
-    updated = auto_update_on_start()
-
-    if updated:
-        try:
-            import gui_changelog
-            gui_changelog.show_changelog()
-        except Exception as e:
-            _error(f"Nie można wyświetlić changelog: {e}")
-
-    update_available = _git_has_updates(Path.cwd())
-
+    # git fetch / git pull (updates.auto) wykonuje wątek sprawdzania
+    # aktualizacji uruchamiany po pokazaniu ekranu logowania
     # Wstępna inicjalizacja konfiguracji, jeśli masz ConfigManager, zostawiamy symbolicznie:
     try:
         _info("ConfigManager: OK")
+        from core import metrics
+
+        metrics.configure(CONFIG_MANAGER or ConfigManager())
+        # zmiany plików configu poza programem → szyna zmian ConfigManager
+        ConfigManager.start_file_watch()
     except Exception:
         _error("ConfigManager: problem (pomijam)")
 
     # === GUI start ===
     try:
         root = tk.Tk()
+        # subskrybenci configu wołani w wątku Tk (przeładowanie z wm-config-watch)
+        ConfigManager.bus.attach_tk(root)
         ensure_theme_applied(root)
 
         # [NOWE] Theme od wejścia — dokładnie to, o co prosiłeś:
@@ -552,6 +640,12 @@ def main():
         except Exception:
             pass
 
+        try:
+            import data_integrity       # spójność plików data/ (naprawa / kwarantanna)
+            data_integrity.run_startup_check()
+        except Exception as e:
+            _error(f"Kontrola danych: problem (pomijam): {e}")
+
         try:
             import rc1_profiles_bootstrap  # RC1: profiles.json + przypominajka o haśle admina
         except Exception:
@@ -565,8 +659,10 @@ def main():
         gui_logowanie.ekran_logowania(
             root,
             on_login=lambda login, rola, extra=None: _on_login(root, login, rola, extra),
-            update_available=update_available,
+            update_available=False,
         )
+        # sprawdzenie aktualizacji w tle – znaczek pojawi się po wyniku
+        _start_update_check(root)
 
         try:
             cm = ConfigManager()
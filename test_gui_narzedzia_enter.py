@@ -146,7 +146,10 @@ def test_enter_triggers_actions(monkeypatch):
     monkeypatch.setattr(
         gui_narzedzia,
         "ui_hover",
-        types.SimpleNamespace(bind_treeview_row_hover=lambda *a, **k: None),
+        types.SimpleNamespace(
+            bind_treeview_row_hover=lambda *a, **k: None,
+            TreeviewRowHover=lambda *a, **k: types.SimpleNamespace(clear=lambda: None),
+        ),
     )
     monkeypatch.setattr(
         gui_narzedzia,
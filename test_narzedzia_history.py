@@ -18,3 +18,36 @@ def test_append_tool_history(tmp_path, monkeypatch):
     assert data["action"] == "create"
     assert data["info"] == "x"
     assert data["ts"].endswith("+00:00")
+
+
+def test_recent_and_cross_tool_queries(tmp_path, monkeypatch):
+    import narzedzia_history as nh
+
+    hist_dir = tmp_path / "hist"
+    monkeypatch.setattr(nh, "TOOL_HISTORY_DIR", hist_dir)
+    monkeypatch.setattr(nh, "_INDEX", None)
+    hist_dir.mkdir()
+    rows = [
+        ("001", "2026-10-12T08:00:00+00:00", "adam", "qr_issue"),
+        ("001", "2026-10-13T09:00:00+00:00", "adam", "qr_return"),
+        ("002", "2026-10-13T10:00:00+00:00", "ewa", "status_change"),
+        ("002", "2026-10-19T07:00:00+00:00", "ewa", "qr_issue"),
+        ("003", "2026-10-19T07:30:00+00:00", "adam", "status_change"),
+    ]
+    for tool, ts, user, action in rows:
+        with open(hist_dir / f"{tool}.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ts": ts, "user": user, "action": action}) + "\n")
+
+    assert [e["action"] for e in nh.recent("001", 1)] == ["qr_return"]
+
+    week = nh.query(since="2026-10-13", until="2026-10-19", action="qr_issue")
+    assert [(e["tool"], e["user"]) for e in week] == [("002", "ewa")]
+    assert nh.counts("user", action="status_change") == {"ewa": 1, "adam": 1}
+    assert nh.counts("day")["2026-10-13"] == 2
+    assert (hist_dir / "_index.json").exists()
+
+    # nowe wpisy są dopisywane do indeksu, stare linie nie są czytane ponownie
+    append_tool_history("003", "ola", "qr_fault")
+    monkeypatch.setattr(nh, "_INDEX", None)  # nowy proces – indeks z pliku
+    assert nh.counts("tool")["003"] == 2
+    assert nh.counts("action")["qr_issue"] == 2
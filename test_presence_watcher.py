@@ -89,3 +89,54 @@ def test_schedule_watcher_failure_logs(monkeypatch):
 
     assert any("watcher error" in m for m in logs)
     assert root.after_calls
+
+
+def _watcher_env(monkeypatch, tmp_path, users):
+    import json
+
+    (tmp_path / "uzytkownicy.json").write_text(json.dumps(users), encoding="utf-8")
+    monkeypatch.setattr(presence_watcher, "config_path", str(tmp_path / "config.json"))
+    monkeypatch.setattr(
+        presence_watcher,
+        "config",
+        {"presence": {"grace_min": 15, "shifts": {"I": {"start": "06:00"}, "II": {"start": "14:00"}}}},
+    )
+    monkeypatch.setattr(presence_watcher, "_USERS_CACHE", {"sig": None, "meta": {}})
+
+
+def test_next_check_is_shift_start_plus_grace(monkeypatch, tmp_path):
+    from datetime import datetime
+
+    _watcher_env(monkeypatch, tmp_path, [])
+    at, shift, start = presence_watcher.next_check(datetime(2026, 3, 2, 7, 0))
+    assert (at, shift, start) == (datetime(2026, 3, 2, 14, 15), "II", datetime(2026, 3, 2, 14, 0))
+    at, shift, _ = presence_watcher.next_check(datetime(2026, 3, 2, 15, 0))
+    assert (at, shift) == (datetime(2026, 3, 3, 6, 15), "I")
+
+
+def test_check_shift_writes_alerts_once(monkeypatch, tmp_path):
+    import json
+    from datetime import datetime
+
+    users = [
+        {"login": "a", "zmiana": "1"},
+        {"login": "b", "zmiana": "I"},
+        {"login": "c", "zmiana": "I"},
+        {"login": "d", "zmiana": "II"},
+    ]
+    _watcher_env(monkeypatch, tmp_path, users)
+    monkeypatch.setattr(
+        presence, "read_presence", lambda max_age_sec=None: ([{"login": "b", "online": True}], "")
+    )
+    writes = []
+    real_write = presence_watcher._write_json
+    monkeypatch.setattr(
+        presence_watcher, "_write_json", lambda p, d: (writes.append(p), real_write(p, d))
+    )
+
+    start = datetime(2026, 3, 2, 6, 0)
+    assert presence_watcher.check_shift("I", start) == 2
+    assert presence_watcher.check_shift("I", start) == 0
+    assert len(writes) == 1
+    alerts = json.loads((tmp_path / "alerts.json").read_text(encoding="utf-8"))
+    assert [a["id"] for a in alerts] == ["2026-03-02_a_I", "2026-03-02_c_I"]
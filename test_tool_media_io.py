@@ -110,15 +110,17 @@ def test_refresh_list_prefers_dxf_png(monkeypatch, tmp_path):
 
     captured = {}
 
-    def fake_bind(_tree, _iid, paths):
-        captured["paths"] = paths
+    class FakeRowHover:
+        def __init__(self, _tree, resolve_paths):
+            captured["resolve"] = resolve_paths
 
-    monkeypatch.setattr(
-        gui_narzedzia.ui_hover,
-        "bind_treeview_row_hover",
-        fake_bind,
-    )
+        def clear(self):
+            pass
+
+    monkeypatch.setattr(gui_narzedzia.ui_hover, "TreeviewRowHover", FakeRowHover)
 
     gui_narzedzia.panel_narzedzia(DummyWidget(), DummyWidget())
 
-    assert captured["paths"] == [str(dxf_png)]
+    # ścieżki podglądu rozwiązywane dopiero przy najechaniu na wiersz
+    # (DummyWidget.insert zwraca None jako iid)
+    assert captured["resolve"](None) == [str(dxf_png)]
@@ -0,0 +1,68 @@
+import os
+
+import audyt_mw
+
+
+def _project(tmp_path):
+    (tmp_path / "a.py").write_text(
+        "# Plik: a.py\n# Wersja: 1.0\nimport os\nimport b\n\ntry:\n    pass\nexcept:\n    pass\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "b.py").write_text("import a\n# TODO: x\nx = eval('1')\n", encoding="utf-8")
+    (tmp_path / "zly.py").write_text("def (:\n", encoding="utf-8")
+    return tmp_path
+
+
+def _run(root, **kw):
+    audit = audyt_mw.AudytMW(str(root), **kw)
+    audit.discover()
+    audit.pass_fast()
+    audit.pass_deep()
+    audit.pass_risk()
+    return audit
+
+
+def test_line_index_matches_count():
+    text = "a\nbb\n\nccc\n"
+    idx = audyt_mw.LineIndex(text)
+    for pos in range(len(text) + 1):
+        assert idx.line_of(pos) == text.count("\n", 0, pos) + 1
+
+
+def test_single_pass_findings(tmp_path):
+    audit = _run(_project(tmp_path), workers=1)
+    found = {(os.path.basename(i.file), i.kind, i.line) for i in audit.issues}
+    assert ("a.py", "ERROR-HANDLING", 8) in found
+    assert ("b.py", "TODO", 2) in found
+    assert ("b.py", "HEADER", None) in found
+    assert ("zly.py", "SYNTAX", 1) in found
+    assert any(i.kind == "IMPORT" for i in audit.issues)  # a <-> b
+    msgs = [i.message for i in audit.issues if i.file.endswith("a.py")]
+    assert "Możliwy nieużyty import: os" in msgs
+    assert not audit.summaries[str(tmp_path / "zly.py")].syntax_ok
+
+
+def test_incremental_reuses_unchanged_files(tmp_path, monkeypatch):
+    root = _project(tmp_path)
+    first = _run(root, workers=1, incremental=True)
+    first.write_reports(str(root / "r.json"), str(root / "r.md"))
+    assert (root / audyt_mw.CACHE_NAME).exists()
+
+    (root / "b.py").write_text("import a\nx = 1\n", encoding="utf-8")
+    calls = []
+    real = audyt_mw.analyze_file
+    monkeypatch.setattr(
+        audyt_mw, "analyze_file", lambda p, d=None: calls.append(p) or real(p, d)
+    )
+    second = _run(root, workers=1, incremental=True)
+    assert [os.path.basename(p) for p in calls] == ["b.py"]
+    assert len(second.reused) == 2
+    assert not any(i.kind == "TODO" for i in second.issues)
+    assert [i.line for i in second.issues if i.kind == "ERROR-HANDLING"] == [8]
+
+
+def test_process_pool_gives_same_report(tmp_path, monkeypatch):
+    root = _project(tmp_path)
+    monkeypatch.setattr(audyt_mw, "PARALLEL_MIN_FILES", 0)
+    key = lambda a: [(i.file, i.kind, i.message, i.line) for i in a.issues]
+    assert key(_run(root, workers=2)) == key(_run(root, workers=1))
@@ -0,0 +1,196 @@
+import hashlib
+import os
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import backup
+
+
+class _DavHandler(BaseHTTPRequestHandler):
+    """Minimalny WebDAV: PUT/GET/HEAD/MKCOL na katalogu ``server.root``."""
+
+    def log_message(self, *args):
+        pass
+
+    def _path(self):
+        return os.path.join(self.server.root, self.path.lstrip("/"))
+
+    def do_MKCOL(self):
+        path = self._path()
+        if os.path.isdir(path):
+            self.send_response(405)
+        else:
+            os.makedirs(path)
+            self.send_response(201)
+        self.end_headers()
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.puts.append(self.path)
+        if self.server.fail.get(self.path, 0) > 0:
+            self.server.fail[self.path] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.headers.get("X-Content-SHA256") != hashlib.sha256(body).hexdigest():
+            self.send_response(400)
+            self.end_headers()
+            return
+        os.makedirs(os.path.dirname(self._path()), exist_ok=True)
+        with open(self._path(), "wb") as f:
+            f.write(body)
+        self.send_response(201)
+        self.end_headers()
+
+    def _send_file(self, with_body):
+        path = self._path()
+        if not os.path.isfile(path):
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(data)
+
+    def do_HEAD(self):
+        if self.server.head_status:
+            self.send_response(self.server.head_status)
+            self.end_headers()
+            return
+        self._send_file(False)
+
+    def do_GET(self):
+        if self.server.fail.get(self.path, 0) > 0:
+            self.server.fail[self.path] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        self._send_file(True)
+
+
+@pytest.fixture
+def dav(tmp_path, monkeypatch):
+    root = tmp_path / "server"
+    root.mkdir()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DavHandler)
+    server.root = str(root)
+    server.puts = []
+    server.fail = {}
+    server.head_status = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(backup, "_sleep", lambda s: None)
+    (root / "kopie").mkdir()
+    settings = {
+        "url": f"http://127.0.0.1:{server.server_address[1]}",
+        "folder": "kopie",
+        "username": "u",
+        "password": "p",
+        "chunk_mb": 1 / 1024,  # 1 KiB
+    }
+    yield server, settings
+    server.shutdown()
+    server.server_close()
+
+
+def _payload(tmp_path, size=5000):
+    path = tmp_path / "kopia.bin"
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+def test_small_file_single_put(dav, tmp_path):
+    server, settings = dav
+    path = tmp_path / "maly.json"
+    path.write_text("{}", encoding="utf-8")
+    assert backup.upload_backup(str(path), settings)
+    assert server.puts == ["/kopie/maly.json", "/kopie/maly.json.manifest.json"]
+    out = tmp_path / "pobrany.json"
+    assert backup.download_backup("maly.json", str(out), settings)
+    assert out.read_text(encoding="utf-8") == "{}"
+
+    # uszkodzony plik na serwerze – suma z manifestu się nie zgadza
+    (tmp_path / "server" / "kopie" / "maly.json").write_text("[]", encoding="utf-8")
+    assert not backup.download_backup("maly.json", str(tmp_path / "zly.json"), settings)
+    assert not (tmp_path / "zly.json").exists()
+
+
+def test_download_without_manifest_only_on_404(dav, tmp_path, monkeypatch):
+    server, settings = dav
+    (tmp_path / "server" / "kopie" / "stary.json").write_text("{}", encoding="utf-8")
+    out = tmp_path / "stary.json"
+    assert backup.download_backup("stary.json", str(out), settings)  # kopia sprzed manifestów
+
+    path = _payload(tmp_path)
+    assert backup.upload_backup(str(path), settings)
+    monkeypatch.setattr(backup, "RETRY_DELAYS", ())
+    server.fail["/kopie/kopia.bin.manifest.json"] = 1
+    assert not backup.download_backup("kopia.bin", str(tmp_path / "k.bin"), settings)
+    assert backup.download_backup("kopia.bin", str(tmp_path / "k.bin"), settings)
+    assert (tmp_path / "k.bin").read_bytes() == path.read_bytes()
+
+
+def test_upload_without_head_support(dav, tmp_path):
+    server, settings = dav
+    server.head_status = 405
+    path = _payload(tmp_path)
+    assert backup.upload_backup(str(path), settings)
+    assert backup.download_backup("kopia.bin", str(tmp_path / "k.bin"), settings)
+
+
+def test_chunked_upload_retries_and_roundtrip(dav, tmp_path):
+    server, settings = dav
+    path = _payload(tmp_path)
+    server.fail["/kopie/kopia.bin.parts/00002"] = 2
+    assert backup.upload_backup(str(path), settings)
+    parts = sorted(os.listdir(os.path.join(server.root, "kopie", "kopia.bin.parts")))
+    assert parts == ["00000", "00001", "00002", "00003", "00004"]
+    assert server.puts.count("/kopie/kopia.bin.parts/00002") == 3
+    assert not os.path.exists(str(path) + ".upload.json")
+
+    out = tmp_path / "odtworzony.bin"
+    assert backup.download_backup("kopia.bin", str(out), settings)
+    assert out.read_bytes() == path.read_bytes()
+
+    # uszkodzona część na serwerze – pobranie się nie udaje
+    with open(os.path.join(server.root, "kopie", "kopia.bin.parts", "00001"), "r+b") as f:
+        f.write(b"\0\0\0")
+    assert not backup.download_backup("kopia.bin", str(tmp_path / "zly.bin"), settings)
+    assert not (tmp_path / "zly.bin").exists()
+
+
+def test_interrupted_upload_resumes(dav, tmp_path, monkeypatch):
+    server, settings = dav
+    path = _payload(tmp_path)
+    monkeypatch.setattr(backup, "RETRY_DELAYS", ())
+    server.fail["/kopie/kopia.bin.parts/00003"] = 1
+    assert not backup.upload_backup(str(path), settings)
+    assert os.path.exists(str(path) + ".upload.json")
+
+    server.puts.clear()
+    assert backup.upload_backup(str(path), settings)
+    assert server.puts == [
+        "/kopie/kopia.bin.parts/00003",
+        "/kopie/kopia.bin.parts/00004",
+        "/kopie/kopia.bin.manifest.json",
+    ]
+
+
+def test_build_archive_streams_tar_gz(tmp_path):
+    data = tmp_path / "data"
+    (data / "sub").mkdir(parents=True)
+    (data / "a.json").write_text("[1]", encoding="utf-8")
+    (data / "sub" / "b.json").write_text("[2]", encoding="utf-8")
+    archive, digest, size = backup.build_archive(str(data), str(tmp_path / "out" / "d.tar.gz"))
+    with open(archive, "rb") as f:
+        raw = f.read()
+    assert len(raw) == size and hashlib.sha256(raw).hexdigest() == digest
+    with tarfile.open(archive, "r:gz") as tar:
+        assert sorted(tar.getnames()) == ["data/a.json", "data/sub/b.json"]
@@ -310,3 +310,198 @@ def test_backup_cloud_persistence(make_manager):
     assert reloaded.get("backup.cloud.username") == "alice"
     assert reloaded.get("backup.cloud.password") == "secret"
     assert reloaded.get("backup.cloud.folder") == "/remote"
+
+
+def test_incremental_merge_matches_full_merge(make_manager):
+    schema = {
+        "config_version": 1,
+        "options": [
+            {"key": "b.x", "type": "int"},
+            {"key": "c", "type": "int", "scope": "local"},
+        ],
+    }
+    mgr, _ = make_manager(
+        defaults={"a": 1, "b": {"x": 1, "y": 1}},
+        global_cfg={"b": {"x": 2}},
+        local_cfg={"c": 4},
+        schema=schema,
+    )
+    assert mgr.get("b") == {"x": 2, "y": 1}
+
+    mgr.set("b.x", 7)
+    mgr.set("c", 9)
+    mgr.set("d.e.f", "nowy")
+    assert mgr.get("b.x") == 7
+    assert mgr.get("b") == {"x": 7, "y": 1}
+    assert mgr.get("c") == 9
+    assert mgr.get("d.e") == {"f": "nowy"}
+    assert mgr.merged == mgr._merge_all()
+
+    # widok scalony nie współdzieli słowników z warstwami
+    mgr.set("b.y", 3)
+    assert mgr.defaults["b"]["y"] == 1
+
+
+def test_batch_saves_once_and_only_dirty_layers(make_manager, monkeypatch):
+    schema = {"config_version": 1, "options": [{"key": "foo", "type": "int"}]}
+    mgr, paths = make_manager(defaults={"foo": 1}, schema=schema)
+    mgr.save_all()  # zapis wstrzykniętych wartości startowych
+    mgr._last_save_ts = 0.0
+
+    saved = []
+    orig = mgr._save_json
+    monkeypatch.setattr(
+        mgr, "_save_json", lambda path, data: (saved.append(path), orig(path, data))
+    )
+    with mgr.batch():
+        for value in range(2, 12):
+            mgr.set("foo", value, who="tester")
+            mgr.save_all()
+        assert saved == []
+
+    assert saved == [str(paths["global"])]
+    with open(paths["global"], encoding="utf-8") as f:
+        assert json.load(f)["foo"] == 11
+
+    audit_file = Path(paths["audit"]) / "config_changes.jsonl"
+    with open(audit_file, encoding="utf-8") as f:
+        foo_records = [r for r in map(json.loads, f) if r["key"] == "foo"]
+    assert [r["after"] for r in foo_records] == list(range(2, 12))
+
+
+def test_set_same_value_is_noop(make_manager):
+    schema = {"config_version": 1, "options": [{"key": "foo", "type": "int"}]}
+    mgr, paths = make_manager(global_cfg={"foo": 3}, schema=schema)
+    mgr.save_all()
+    mgr.set("foo", 3)
+    assert mgr._dirty_layers == set()
+
+
+def test_change_bus_key_scoped_events(make_manager):
+    mgr, _ = make_manager(defaults={"ui": {"theme": "dark"}, "foo": 1})
+    seen = []
+    unsub = mgr.subscribe("ui", lambda key, value: seen.append((key, value)))
+    try:
+        mgr.set("foo", 2)
+        mgr.set("ui.theme", "light")
+        assert seen == [("ui.theme", "light")]
+
+        with mgr.batch():
+            mgr.set("ui.language", "en")
+            assert seen == [("ui.theme", "light")]
+        assert seen[-1] == ("ui.language", "en")
+    finally:
+        unsub()
+    mgr.set("ui.theme", "dark")
+    assert len(seen) == 2
+
+
+def test_change_bus_external_file_edit(make_manager):
+    mgr, paths = make_manager(global_cfg={"foo": 1, "bar": 1})
+    mgr.save_all()
+    seen = []
+    unsub = mgr.subscribe("", lambda key, value: seen.append((key, value)))
+    try:
+        # własny zapis nie jest zmianą zewnętrzną
+        assert str(paths["global"]) not in cm._BUS.check_files()
+
+        data = json.loads(paths["global"].read_text(encoding="utf-8"))
+        data["foo"] = 5
+        paths["global"].write_text(json.dumps(data), encoding="utf-8")
+        assert str(paths["global"]) in cm._BUS.check_files()
+    finally:
+        unsub()
+
+    assert mgr.get("foo") == 5
+    assert seen == [("foo", 5)]
+
+
+def test_change_bus_marshals_reload_to_tk_thread(make_manager):
+    import threading
+
+    class FakeRoot:
+        def __init__(self):
+            self.pending = []
+
+        def after(self, ms, callback):
+            self.pending.append(callback)
+
+    mgr, paths = make_manager(global_cfg={"foo": 1})
+    mgr.save_all()
+    root = FakeRoot()
+    cm._BUS.attach_tk(root)
+    seen = []
+    unsub = mgr.subscribe(
+        "foo", lambda key, value: seen.append((key, value, threading.get_ident()))
+    )
+    try:
+        data = json.loads(paths["global"].read_text(encoding="utf-8"))
+        data["foo"] = 7
+        paths["global"].write_text(json.dumps(data), encoding="utf-8")
+        worker = threading.Thread(target=cm._BUS.check_files)
+        worker.start()
+        worker.join()
+        # przeładowane w wątku obserwatora, ale subskrybent jeszcze nie wołany
+        assert mgr.get("foo") == 7
+        assert seen == []
+
+        root.pending.pop()()
+        assert seen == [("foo", 7, threading.get_ident())]
+    finally:
+        unsub()
+        cm._BUS.detach_tk(root)
+
+
+def test_reload_and_set_do_not_interleave(make_manager):
+    import threading
+
+    mgr, paths = make_manager(global_cfg={"foo": 1})
+    mgr.save_all()
+    entered = threading.Event()
+    release = threading.Event()
+    original = mgr._load_json
+
+    def slow_load(path):
+        if path == str(paths["global"]):
+            entered.set()
+            release.wait(5)
+        return original(path)
+
+    mgr._load_json = slow_load
+    worker = threading.Thread(target=mgr.reload_from_disk, args=(str(paths["global"]),))
+    worker.start()
+    assert entered.wait(5)
+    setter = threading.Thread(target=mgr.set, args=("bar", 2))
+    setter.start()
+    setter.join(0.2)
+    # set czeka, aż przeładowanie podmieni warstwy
+    assert setter.is_alive()
+    release.set()
+    worker.join(5)
+    setter.join(5)
+    assert mgr.get("bar") == 2
+
+
+def test_save_records_config_snapshot(make_manager):
+    import snapshots
+
+    schema = {"config_version": 1, "options": [{"key": "foo", "type": "int"}]}
+    mgr, paths = make_manager(defaults={"foo": 1}, schema=schema)
+    mgr.set("foo", 2, who="tester")
+    mgr.save_all()
+
+    store = snapshots.get_store()
+    assert Path(store.root) == paths["backup"] / "snapshots"
+    sid = store.list_snapshots()[-1]
+    saved = json.loads(store.read_file(sid, "config.json"))
+    assert saved["foo"] == 2
+    assert store.manifest(sid)["label"] == "config"
+
+
+def test_config_or_live_prefers_module_config(make_manager):
+    mgr, _paths = make_manager(global_cfg={"foo": 1})
+    assert cm.config_or_live({"own": True}) == {"own": True}
+    live = cm.config_or_live({})
+    assert live is mgr.merged
+    mgr.set("foo", 2)
+    assert live["foo"] == 2
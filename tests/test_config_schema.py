@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+import config_manager as cm
+from core import config_schema
+
+SCHEMA = {
+    "tabs": [
+        {
+            "id": "ui",
+            "groups": [
+                {
+                    "fields": [
+                        {"key": "ui.theme", "type": "enum", "enum": ["dark", "light"]},
+                        {"key": "ui.scale", "type": "int", "min": 1, "max": 3},
+                        {"key": "ui.old", "type": "int", "deprecated": True},
+                    ]
+                }
+            ],
+            "subtabs": [
+                {"groups": [{"fields": [{"key": "ui.flag", "type": "bool", "default": "yes"}]}]}
+            ],
+        }
+    ],
+    "options": [
+        {"key": "units", "type": "dict", "value_type": "string"},
+        {"key": "paths.list", "type": "array"},
+        {"key": "ui.theme", "type": "string"},  # duplikat – wygrywa pierwsze pole
+    ],
+}
+
+
+def test_compiled_fields_and_messages():
+    compiled = config_schema.CompiledSchema(SCHEMA)
+    assert list(compiled.fields) == ["ui.theme", "ui.scale", "ui.flag", "units", "paths.list"]
+    compiled.validate("ui.theme", "dark")
+    compiled.validate("nieznany.klucz", object())
+    cases = [
+        ("ui.theme", "blue", "ui.theme: blue nie w ['dark', 'light']"),
+        ("ui.theme", ["x"], "ui.theme: ['x'] nie w ['dark', 'light']"),
+        ("ui.scale", "2", "ui.scale: oczekiwano int, dostano str"),
+        ("ui.scale", 5, "ui.scale: > max 3"),
+        ("ui.flag", 1, "ui.flag: oczekiwano bool, dostano int"),
+        ("units", {"szt": 1}, "units.szt: oczekiwano string, dostano int"),
+        ("paths.list", "a", "paths.list: oczekiwano listy, dostano str"),
+    ]
+    for key, value, msg in cases:
+        with pytest.raises(config_schema.ConfigError) as exc:
+            compiled.validate(key, value)
+        assert str(exc.value) == msg
+
+    compiled.validate_config({"ui": {"theme": "light", "scale": None}, "paths": "x"})
+    with pytest.raises(config_schema.ConfigError):
+        compiled.validate_config({"ui": {"scale": 0}})
+
+    assert compiled.get("ui.flag").default() is True
+    assert compiled.coerce("ui.flag", "0") is False
+    assert compiled.coerce("ui.theme", "blue") == "dark"
+
+
+def test_load_is_cached_by_file_hash(tmp_path):
+    config_schema.clear_cache()
+    first = tmp_path / "a.json"
+    second = tmp_path / "b.json"
+    for p in (first, second):
+        p.write_text(json.dumps(SCHEMA), encoding="utf-8")
+    compiled = config_schema.load(str(first))
+    assert config_schema.load(str(first)) is compiled
+    assert config_schema.load(str(second)) is compiled  # ta sama treść
+
+    first.write_text(json.dumps({"options": [{"key": "x", "type": "int"}]}), encoding="utf-8")
+    changed = config_schema.load(str(first))
+    assert changed is not compiled and list(changed.fields) == ["x"]
+
+
+def test_config_manager_shares_compiled_schema(tmp_path, monkeypatch):
+    schema_path = tmp_path / "settings_schema.json"
+    schema_path.write_text(json.dumps(SCHEMA), encoding="utf-8")
+    for name in ("DEFAULTS_PATH", "GLOBAL_PATH", "LOCAL_PATH", "SECRETS_PATH"):
+        path = tmp_path / f"{name}.json"
+        path.write_text("{}", encoding="utf-8")
+        monkeypatch.setattr(cm, name, str(path))
+    monkeypatch.setattr(cm, "SCHEMA_PATH", str(schema_path))
+    monkeypatch.setattr(cm, "AUDIT_DIR", str(tmp_path / "audit"))
+    monkeypatch.setattr(cm, "BACKUP_DIR", str(tmp_path / "backup"))
+
+    mgr = cm.ConfigManager.refresh()
+    again = cm.ConfigManager.refresh()
+    assert again.compiled is mgr.compiled
+    assert again.schema is mgr.compiled.schema
+    assert set(again._schema_index()) == set(mgr.compiled.fields)
+    with pytest.raises(cm.ConfigError):
+        again.set("ui.scale", 9)
+    again.set("ui.scale", 2)
+    assert again.get("ui.scale") == 2
@@ -0,0 +1,142 @@
+import json
+
+import data_integrity
+import snapshots
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _data_tree(tmp_path):
+    data = tmp_path / "data"
+    _write(data / "magazyn" / "surowce.json", [{"kod": "SR001", "nazwa": "Blacha", "stan": 5}])
+    _write(data / "magazyn" / "polprodukty.json", {"PP001": {"stan": 1}})
+    _write(data / "polprodukty" / "PP002.json", {"kod": "PP002", "surowiec": {"kod": "SR001"}})
+    _write(data / "produkty" / "PRD.json", {
+        "kod": "PRD",
+        "polprodukty": [
+            {"kod": "PP001", "surowiec": {"typ": "blacha"}},
+            {"kod": "PP404", "surowiec": {"typ": "SR404"}},
+        ],
+    })
+    _write(data / "narzedzia" / "007.json", {"numer": "007", "zadania": []})
+    _write(data / "profil_overrides" / "assign_tools.json", {"NARZ-7-1": "ola", "NARZ-9": "ola"})
+    _write(data / "zlecenia" / "000001.json", {"id": "000001", "status": "nowe", "produkt": "PRD"})
+    return data
+
+
+def test_clean_tree_and_reference_warnings(tmp_path):
+    data = _data_tree(tmp_path)
+    result = data_integrity.IntegrityChecker(str(data)).scan()
+    assert result.errors == []
+    refs = sorted((i.path, i.message) for i in result.issues if i.kind == data_integrity.REFERENCE)
+    assert refs == [
+        ("produkty/PRD.json", "brak odwołania (półprodukt): PP404"),
+        ("produkty/PRD.json", "brak odwołania (surowiec): SR404"),
+        ("profil_overrides/assign_tools.json", "brak odwołania (narzędzie): NARZ-9"),
+    ]
+
+
+def test_detects_problems_and_uses_cache(tmp_path):
+    data = _data_tree(tmp_path)
+    (data / "bom.json").write_bytes(b"\xef\xbb\xbf{\"a\": 1}")
+    (data / "urwany.json").write_text('{"a": [1, 2', encoding="utf-8")
+    (data / "zera.json").write_bytes(b"\x00" * 16)
+    (data / "cp.json").write_bytes('{"nazwa": "Płaskownik"}'.encode("cp1250"))
+    (data / "log.jsonl").write_text('{"a": 1}\n{"a": 2', encoding="utf-8")
+    _write(data / "narzedzia" / "008.json", {"nazwa": "bez numeru", "zadania": {}})
+
+    checker = data_integrity.IntegrityChecker(str(data))
+    result = checker.scan()
+    kinds = {(i.path, i.kind) for i in result.issues}
+    assert ("bom.json", "bom") in kinds
+    assert ("urwany.json", "truncated") in kinds
+    assert ("zera.json", "empty") in kinds
+    assert ("cp.json", "encoding") in kinds
+    assert ("log.jsonl", "truncated") in kinds
+    schema = [i.message for i in result.issues if i.path == "narzedzia/008.json"]
+    assert schema == ["brak pola 'numer'", "pole 'zadania' nie jest listą"]
+
+    again = data_integrity.IntegrityChecker(str(data)).scan()  # wyniki z pliku cache
+    assert again.checked == 0 and again.cached == len(result.reports)
+    assert {(i.path, i.kind) for i in again.issues} == kinds
+
+
+def test_repair_restores_from_snapshot_or_quarantines(tmp_path):
+    data = _data_tree(tmp_path)
+    store = snapshots.SnapshotStore(str(tmp_path / "store"))
+    store.snapshot({"data": str(data)})
+    good = (data / "magazyn" / "surowce.json").read_text(encoding="utf-8")
+
+    (data / "magazyn" / "surowce.json").write_text('[{"kod": "SR0', encoding="utf-8")
+    (data / "nowy.json").write_text("{oops}", encoding="utf-8")
+    (data / "bom.json").write_bytes(b"\xef\xbb\xbf[1]")
+    (data / "cp.json").write_bytes('{"nazwa": "Płaskownik"}'.encode("cp1250"))
+    (data / "log.jsonl").write_text('{"a": 1}\nzle\n{"a": 3}\n{"a"', encoding="utf-8")
+
+    checker = data_integrity.IntegrityChecker(str(data))
+    actions = dict(checker.repair(checker.scan(), store=store))
+
+    assert actions["magazyn/surowce.json"].startswith("przywrócono z migawki")
+    assert (data / "magazyn" / "surowce.json").read_text(encoding="utf-8") == good
+    assert actions["nowy.json"].startswith("kwarantanna")
+    assert not (data / "nowy.json").exists()
+    assert len(list((data / "_quarantine").rglob("nowy.json"))) == 1
+    assert (data / "bom.json").read_bytes() == b"[1]"
+    assert json.loads((data / "cp.json").read_text(encoding="utf-8")) == {"nazwa": "Płaskownik"}
+    assert (data / "log.jsonl").read_text(encoding="utf-8") == '{"a": 1}\n{"a": 3}\n'
+    assert list((data / "_quarantine").rglob("log.jsonl"))
+
+    after = checker.scan()
+    assert after.errors == []
+    assert not any(i.kind == "bom" for i in after.issues)
+
+
+def test_assignment_references_include_log(tmp_path):
+    data = _data_tree(tmp_path)
+    _write(data / "zadania_przypisania.json", [
+        {"task": "NARZ-7-1", "user": "ola", "context": "narzedzia"},
+        {"task": "NARZ-8-1", "user": "ola", "context": "narzedzia"},
+    ])
+    (data / "zadania_przypisania.log.jsonl").write_text(
+        json.dumps({"op": "unassign", "task": "NARZ-8-1", "context": "narzedzia"}) + "\n"
+        + json.dumps({"op": "assign", "task": "NARZ-5-2", "user": "jan", "context": "narzedzia"})
+        + "\n",
+        encoding="utf-8",
+    )
+    result = data_integrity.IntegrityChecker(str(data)).scan()
+    refs = sorted(
+        (i.path, i.message) for i in result.issues
+        if i.kind == data_integrity.REFERENCE and i.path.startswith("zadania_")
+    )
+    # NARZ-8 zwolnione w dzienniku, NARZ-5 przypisane tylko w dzienniku
+    assert refs == [("zadania_przypisania.json", "brak odwołania (narzędzie): NARZ-5-2")]
+
+
+def test_assignment_log_repaired_under_store_lock(tmp_path):
+    import threading
+
+    import zadania_assign_io
+
+    data = _data_tree(tmp_path)
+    log = data / "zadania_przypisania.log.jsonl"
+    first = json.dumps({"op": "assign", "task": "NARZ-7-1", "user": "ola", "context": "n"})
+    log.write_text(first + "\n" + '{"op": "assign", "ta', encoding="utf-8")
+    checker = data_integrity.IntegrityChecker(str(data))
+    result = checker.scan()
+    assert any(i.kind == data_integrity.TRUNCATED for i in result.reports[log.name].issues)
+
+    done = []
+    with zadania_assign_io.file_lock(data / "zadania_przypisania.json"):
+        worker = threading.Thread(target=lambda: done.append(checker.repair(result)))
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive()  # naprawa czeka na zapis innego procesu
+        # inny proces kończy dopisywaną linię
+        with open(log, "a", encoding="utf-8") as f:
+            f.write('sk": "NARZ-7-2", "user": "jan", "context": "n"}\n')
+    worker.join(5)
+    assert done == [[]]
+    assert log.read_text(encoding="utf-8").count("\n") == 2
@@ -19,3 +19,11 @@ def test_brygadzista_side_panel_has_settings_button(root):
     side = root.winfo_children()[0]
     texts = [w.cget("text") for w in side.winfo_children() if hasattr(w, "cget")]
     assert "Ustawienia" in texts
+
+
+def test_users_panel_watches_resolved_users_file(monkeypatch, tmp_path):
+    import profile_utils
+
+    users = tmp_path / "dane" / "uzytkownicy.json"
+    monkeypatch.setattr(profile_utils, "USERS_FILE", str(users))
+    assert gui_panel._panel_watch(gui_panel._watch_uzytkownicy) == (str(users),)
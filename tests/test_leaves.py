@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+import leaves
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    monkeypatch.setattr(leaves, "config", {"leaves": {}})
+    monkeypatch.setattr(leaves, "config_path", str(tmp_path / "config.json"))
+    monkeypatch.setattr(leaves, "_STATE", {})
+    return tmp_path
+
+
+def test_totals_from_aggregates(ledger):
+    leaves.add_entry("jan", "urlop", "2026-02-01", quantity_days=2)
+    leaves.add_entry("jan", "spoznienie", "2026-02-02", minutes=15)
+    leaves.add_entry("jan", "urlop", "2025-12-30", quantity_days=1)
+    leaves.add_entry("ola", "l4", "2026-03-01", quantity_days=3)
+    leaves.add_entry("ola", "delegacja", "2026-03-05", quantity_days=1)
+
+    assert leaves.totals_for("jan", 2026)["urlop"] == 2.0
+    assert leaves.totals_for("jan", 2026)["spoznienie_min"] == 15
+    assert leaves.totals_for("jan")["urlop"] == 3.0
+    assert leaves.totals_for("", 2026) == {
+        "urlop": 2.0, "l4": 3.0, "spoznienie_min": 15, "nn": 0.0, "inny": 1.0
+    }
+    assert set(leaves.totals_for_all(2026)) == {"jan", "ola"}
+    assert leaves.totals_for_all(2026)["ola"]["l4"] == 3.0
+
+    lines = (ledger / "leaves.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 5 and len(leaves.read_all()) == 5
+
+
+def test_snapshot_and_external_appends(ledger):
+    leaves.add_entry("jan", "urlop", "2026-02-01", quantity_days=2)
+    snap = json.loads((ledger / "leaves_totals.json").read_text(encoding="utf-8"))
+    assert snap["totals"]["jan"]["2026"]["urlop"] == 2.0
+
+    # inny proces dopisał linię – nowa instancja doczytuje tylko ogon pliku
+    rec = {"login": "jan", "type": "nn", "date": "2026-04-01", "quantity_days": 1}
+    with open(ledger / "leaves.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(rec) + "\n")
+    leaves._STATE.clear()
+    assert leaves.totals_for("jan", 2026)["nn"] == 1.0
+    assert leaves.totals_for("jan", 2026)["urlop"] == 2.0
+
+
+def test_legacy_json_is_migrated(ledger):
+    legacy = [{"login": "jan", "type": "urlop", "date": "2026-01-05", "quantity_days": 4}]
+    (ledger / "leaves.json").write_text(json.dumps(legacy), encoding="utf-8")
+    assert leaves.totals_for("jan", "2026")["urlop"] == 4.0
+    assert not (ledger / "leaves.json").exists()
+    assert (ledger / "leaves.json.migrated").exists()
+
+
+def test_entitlements_follow_users_file(ledger):
+    users = ledger / "uzytkownicy.json"
+    users.write_text(json.dumps([{"login": "jan", "entitlements": {"urlop_rocznie": 20}}]), encoding="utf-8")
+    assert leaves.entitlements_for("jan")["urlop_rocznie"] == 20
+    users.write_text(json.dumps([{"login": "jan", "entitlements": {"urlop_rocznie": 300}}]), encoding="utf-8")
+    assert leaves.entitlements_for("jan")["urlop_rocznie"] == 300
+    assert leaves.entitlements_for("ola")["urlop_rocznie"] == 26
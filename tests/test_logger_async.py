@@ -0,0 +1,104 @@
+import json
+import logging
+
+import pytest
+
+import logger
+import wm_log
+from config import paths
+
+
+@pytest.fixture
+def logs_dir(tmp_path, monkeypatch):
+    target = tmp_path / "logs"
+    monkeypatch.setattr(
+        paths, "_SETTINGS_GETTER", lambda key: str(target) if key == "paths.logs_dir" else None
+    )
+    logger.shutdown_logs()
+    yield target
+    logger.shutdown_logs()
+
+
+def test_log_lines_written_in_order_after_flush(logs_dir):
+    for i in range(50):
+        logger.log_akcja(f"akcja {i}")
+        logger.log_magazyn("zuzycie", {"item_id": f"IT-{i}", "ilosc": 1})
+
+    assert logger.flush_logs()
+
+    gui = (logs_dir / "logi_gui.txt").read_text(encoding="utf-8").splitlines()
+    assert [line.split("] ", 1)[1] for line in gui] == [f"akcja {i}" for i in range(50)]
+    mag = [
+        json.loads(line)
+        for line in (logs_dir / "logi_magazyn.txt").read_text(encoding="utf-8").splitlines()
+    ]
+    assert [rec["dane"]["item_id"] for rec in mag] == [f"IT-{i}" for i in range(50)]
+
+
+def test_log_magazyn_snapshots_data(logs_dir):
+    dane = {"item_id": "A", "ilosc": 1}
+    logger.log_magazyn("zuzycie", dane)
+    dane["ilosc"] = 99
+    logger.flush_logs()
+    rec = json.loads((logs_dir / "logi_magazyn.txt").read_text(encoding="utf-8"))
+    assert rec["dane"]["ilosc"] == 1
+
+
+def test_log_rotation(logs_dir, monkeypatch):
+    monkeypatch.setattr(logger, "LOG_MAX_BYTES", 200)
+    monkeypatch.setattr(logger, "LOG_BACKUP_COUNT", 2)
+    for i in range(6):
+        logger.log_akcja("x" * 80)
+        logger.flush_logs()
+    assert (logs_dir / "logi_gui.txt.1").exists()
+    assert (logs_dir / "logi_gui.txt.2").exists()
+    assert not (logs_dir / "logi_gui.txt.3").exists()
+    assert (logs_dir / "logi_gui.txt").stat().st_size <= 200
+
+
+def test_disabled_level_skips_queue(logs_dir):
+    akcje = logging.getLogger("wm.akcje")
+    level = akcje.level
+    akcje.setLevel(logging.WARNING)
+    try:
+        logger.log_akcja("nie zapisuj")
+        logger.flush_logs()
+    finally:
+        akcje.setLevel(level)
+    assert not (logs_dir / "logi_gui.txt").exists()
+
+
+def test_akcje_enabled_with_root_at_warning(logs_dir):
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.WARNING)
+    try:
+        # bez paths.logs_dir nikt nie obniża poziomu roota – audyt i tak działa
+        assert logging.getLogger("wm.akcje").level == logging.INFO
+        logger.log_akcja("zapisz mimo WARNING")
+        logger.flush_logs()
+    finally:
+        root.setLevel(level)
+    assert "zapisz mimo WARNING" in (logs_dir / "logi_gui.txt").read_text(encoding="utf-8")
+
+
+def test_wm_log_level_cache(monkeypatch, capsys):
+    calls = []
+
+    def getter(key):
+        calls.append(key)
+        return {"system.log_level": "info", "system.debug_enabled": True}.get(key)
+
+    monkeypatch.setattr(wm_log, "_term_supports_color", lambda: False)
+    wm_log.bind_settings_getter(getter)
+    try:
+        for _ in range(100):
+            wm_log.dbg("test", "ukryte")
+        wm_log.info("test", "widoczne")
+        assert len(calls) == 2
+        out = capsys.readouterr().out
+        assert "ukryte" not in out and "widoczne" in out
+    finally:
+        wm_log.bind_settings_getter(lambda _key: None)
+        wm_log._SETTINGS_GETTER = None
+        wm_log.refresh_levels()
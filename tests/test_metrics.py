@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from core import metrics
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    metrics.enable(True, flush_interval_s=0)
+    yield metrics
+    metrics.enable(False)
+    metrics.reset()
+
+
+def test_disabled_metrics_are_noop():
+    metrics.enable(False)
+    metrics.reset()
+
+    @metrics.timed("test.fn")
+    def fn(x):
+        return x * 2
+
+    assert fn(3) == 6
+    metrics.incr("test.count")
+    with metrics.timer("test.block"):
+        pass
+    assert metrics.snapshot() == {"counters": {}, "timers": {}}
+
+
+def test_timed_and_counters_are_recorded(enabled_metrics):
+    @metrics.timed("test.fn")
+    def fn():
+        return "ok"
+
+    for _ in range(3):
+        assert fn() == "ok"
+    with metrics.timer("test.block"):
+        pass
+    metrics.incr("test.count")
+    metrics.incr("test.count", 2)
+
+    snap = metrics.snapshot()
+    assert snap["counters"] == {"test.count": 3}
+    assert snap["timers"]["test.fn"]["count"] == 3
+    assert snap["timers"]["test.block"]["count"] == 1
+
+
+def test_quantiles_follow_buckets(enabled_metrics):
+    for _ in range(95):
+        metrics.observe("test.q", 0.5)
+    for _ in range(5):
+        metrics.observe("test.q", 300.0)
+
+    stats = metrics.snapshot()["timers"]["test.q"]
+    # kwantyl to górna granica kubełka (1 ms), nie surowa wartość
+    assert stats["p50_ms"] == 1.0
+    assert stats["p95_ms"] == 1.0
+    assert stats["max_ms"] == 300.0
+
+
+def test_flush_appends_jsonl(enabled_metrics, tmp_path):
+    target = tmp_path / "logs" / "metrics.jsonl"
+    assert metrics.flush(target) is False
+
+    metrics.observe("test.flush", 4.0)
+    assert metrics.flush(target) is True
+    assert metrics.flush(target) is True
+
+    lines = target.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    rec = json.loads(lines[0])
+    assert rec["timers"]["test.flush"]["count"] == 1
+    assert "ts" in rec and "pid" in rec
+
+
+def test_metrics_path_follows_logs_dir(tmp_path, monkeypatch):
+    from config import paths
+
+    monkeypatch.setattr(
+        paths, "_SETTINGS_GETTER", lambda key: str(tmp_path) if key == "paths.logs_dir" else None
+    )
+    assert metrics.metrics_path() == tmp_path / "metrics.jsonl"
+
+
+def test_configure_flag_overrides_env(monkeypatch):
+    class Cfg(dict):
+        def get(self, key, default=None):
+            return super().get(key, default)
+
+    try:
+        metrics.enable(True, flush_interval_s=0)
+        metrics.configure(Cfg({"diagnostics.metrics_enabled": False, "diagnostics.metrics_flush_s": 0}))
+        assert not metrics.is_enabled()
+        metrics.configure(Cfg({"diagnostics.metrics_flush_s": 0}))
+        assert not metrics.is_enabled()
+        metrics.configure(Cfg({"diagnostics.metrics_enabled": True, "diagnostics.metrics_flush_s": 0}))
+        assert metrics.is_enabled()
+    finally:
+        metrics.enable(False)
@@ -0,0 +1,65 @@
+import json
+import os
+from datetime import datetime
+
+import profile_tasks
+from profile_tasks import TaskStore
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_store_indexes_and_deadline_filter(tmp_path):
+    tasks = tmp_path / "zadania.json"
+    _write(
+        tasks,
+        [
+            {"id": 1, "login": "Jan", "status": "Nowe", "termin": "2026-03-10"},
+            {"id": 2, "owner": " jan ", "status": "zrobione", "termin": "2026-01-01"},
+            {"id": 3, "assigned_to": "JAN", "status": "w toku"},
+            {"id": 4, "login": "ola", "status": "open", "deadline": "2026-02-01T08:00:00Z"},
+        ],
+    )
+    store = TaskStore([str(tasks)]).refresh()
+    assert [store.records[p]["id"] for p in store.by_owner["jan"]] == [1, 2, 3]
+    due = store.positions_for("jan", datetime(2026, 2, 1))
+    assert [store.records[p]["id"] for p in due] == [2, 3]
+    assert store.active_by_owner == {"jan": 2, "ola": 1}
+
+
+def test_store_reloads_only_after_file_change(tmp_path, monkeypatch):
+    tasks = tmp_path / "zadania.json"
+    _write(tasks, [{"id": 1, "login": "jan", "status": "nowe"}])
+    store = TaskStore([str(tasks)]).refresh()
+    builds = []
+    real_build = store._build
+    monkeypatch.setattr(store, "_build", lambda recs: (builds.append(1), real_build(recs)))
+
+    store.refresh()
+    assert builds == []
+    _write(tasks, [{"id": 1, "login": "jan", "status": "nowe"}, {"id": 2, "login": "ola", "status": "nowe"}])
+    os.utime(tasks, ns=(1, 1))
+    store.refresh()
+    assert builds == [1]
+    assert set(store.by_owner) == {"jan", "ola"}
+
+
+def test_public_helpers_use_store(tmp_path, monkeypatch):
+    tasks = tmp_path / "zadania.json"
+    _write(
+        tasks,
+        [
+            {"id": 1, "login": "jan", "status": "nowe", "termin": "2026-05-01"},
+            {"id": 2, "login": "jan", "status": "zrobione"},
+            {"id": 3, "login": "ola", "status": "w toku", "termin": "2026-01-01"},
+        ],
+    )
+    monkeypatch.setattr(profile_tasks, "_STORE", TaskStore([str(tasks)]))
+
+    assert [t["id"] for t in profile_tasks.get_tasks_for("JAN", statusy=["Nowe"])] == [1]
+    assert profile_tasks.workload_for(["jan", "ola", "ewa"]) == [("ewa", 0), ("jan", 1), ("ola", 1)]
+    assert profile_tasks.workload_for(["jan", "ola"], do_deadline=datetime(2026, 2, 1)) == [
+        ("jan", 0),
+        ("ola", 1),
+    ]
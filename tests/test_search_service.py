@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+from services import search_service
+from services.search_service import SearchIndex, Source
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def index(tmp_path):
+    tools = tmp_path / "narzedzia"
+    tools.mkdir()
+    _write(tools / "001.json", {"numer": "001", "nazwa": "Wykrojnik Łącznik", "typ": "Tłoczące"})
+    _write(tools / "002.json", {"numer": "002", "nazwa": "Gięcie blachy", "opis": "łącznik kątowy"})
+    machines = _write(tmp_path / "maszyny.json", [{"id": "42", "nazwa": "Strugarka wzdłużna"}])
+    sources = [
+        Source(
+            "narzedzia",
+            lambda: [str(p) for p in tools.glob("*.json")],
+            search_service._parse_tool,
+            search_service._describe_tool,
+        ),
+        Source("maszyny", lambda: [machines], search_service._parse_machines, search_service._describe_machine),
+    ]
+    idx = SearchIndex(sources)
+    idx.refresh(force=True)
+    idx.tools_dir = tools
+    return idx
+
+
+def test_folding_prefix_and_ranking(index):
+    hits = index.search("lacz")
+    assert [(h.domain, h.key) for h in hits] == [("narzedzia", "001"), ("narzedzia", "002")]
+    assert hits[0].score > hits[1].score  # tytuł waży więcej niż opis
+    assert [h.key for h in index.search("TLOCZ wykr")] == ["001"]
+    assert [h.key for h in index.search("strug")] == ["42"]
+    assert index.search("lacznik strug") == []
+    assert index.search("lacz", domains=["maszyny"]) == []
+
+
+def test_incremental_file_updates(index):
+    tools = index.tools_dir
+    path = _write(tools / "003.json", {"numer": "3", "nazwa": "Frez palcowy"})
+    index.reindex_file("narzedzia", path)
+    assert [h.key for h in index.search("frez")] == ["003"]
+
+    _write(tools / "003.json", {"numer": "3", "nazwa": "Wiertło"})
+    index.reindex_file("narzedzia", path)
+    assert index.search("frez") == []
+    assert [h.key for h in index.search("wiert")] == ["003"]
+
+    os.remove(path)
+    index.refresh(force=True)
+    assert index.search("wiert") == []
+    assert len(index) == 3
+
+
+def test_notify_saved_without_index_is_noop(monkeypatch):
+    monkeypatch.setattr(search_service, "_INDEX", None)
+    search_service.notify_saved("narzedzia", "brak.json")
+    assert search_service._INDEX is None
@@ -257,3 +257,39 @@ def test_deprecated_not_rendered(make_manager, monkeypatch, capsys):
     assert out.count("[WM-DBG][SETTINGS] pomijam deprecated") == 2
     root.destroy()
 
+
+
+def test_tabs_built_on_first_selection(make_manager, monkeypatch):
+    tabs = [
+        {
+            "id": f"t{i}",
+            "title": f"Tab{i}",
+            "groups": [
+                {"label": "G", "fields": [{"key": f"k{i}", "type": "int", "default": i}]}
+            ],
+        }
+        for i in range(3)
+    ]
+    paths = _setup_schema(make_manager, monkeypatch, tabs=tabs)
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("Tkinter not available")
+    root.withdraw()
+    panel = gui_settings.SettingsPanel(
+        root, config_path=paths["global"], schema_path=paths["schema"]
+    )
+    nb = panel.nb
+    frames = [root.nametowidget(t) for t in nb.tabs()]
+    assert frames[0].winfo_children()
+    assert not frames[1].winfo_children() and not frames[2].winfo_children()
+    assert list(panel.vars) == ["k0"]
+    assert panel.settings_state["k2"] == 2
+
+    nb.select(nb.tabs()[1])
+    nb.event_generate("<<NotebookTabChanged>>")
+    root.update_idletasks()
+    assert frames[1].winfo_children()
+    assert panel.vars["k2"].get() == 2  # odczyt klucza buduje jego zakładkę
+    assert frames[2].winfo_children()
+    root.destroy()
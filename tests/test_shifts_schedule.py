@@ -94,3 +94,71 @@ def test_slot_for_mode_121(monkeypatch):
     assert shifts_schedule._slot_for_mode("121", 1) == "POPO"
     assert shifts_schedule._slot_for_mode("121", 2) == "RANO"
 
+
+
+def _fixed_times(monkeypatch):
+    monkeypatch.setattr(
+        shifts_schedule,
+        "_shift_times",
+        lambda: {
+            "R_START": time(6, 0),
+            "R_END": time(14, 0),
+            "P_START": time(14, 0),
+            "P_END": time(22, 0),
+        },
+    )
+
+
+def test_week_roster_cached_until_modes_change(monkeypatch):
+    modes = {"anchor_monday": "2025-01-06", "patterns": {}, "modes": {"1": "1212", "2": "12"}}
+    users = [
+        {"id": "1", "name": "Ala", "active": True},
+        {"id": "2", "name": "Ola", "active": True},
+        {"id": "3", "name": "Ela", "active": False},
+    ]
+    _patch_loads(monkeypatch, modes=modes, users=users)
+    _fixed_times(monkeypatch)
+    shifts_schedule.clear_roster_cache()
+    calls = []
+    real_slot = shifts_schedule._slot_for_mode
+    monkeypatch.setattr(
+        shifts_schedule,
+        "_slot_for_mode",
+        lambda mode, widx: calls.append(mode) or real_slot(mode, widx),
+    )
+
+    first = shifts_schedule.week_matrix(date(2025, 1, 8))
+    again = shifts_schedule.week_matrix(date(2025, 1, 6))
+    assert [r["user"] for r in first["rows"]] == ["Ala", "Ola"]
+    assert again["rows"] == first["rows"]
+    assert sorted(calls) == ["12", "1212"]  # one slot per mode, second call cached
+
+    modes["modes"] = {"1": "12", "2": "12"}
+    changed = shifts_schedule.week_matrix(date(2025, 1, 6))
+    assert [r["mode"] for r in changed["rows"]] == ["12", "12"]
+
+
+def test_who_is_on_and_range_export(monkeypatch):
+    modes = {"anchor_monday": "2025-01-06", "patterns": {}, "modes": {"1": "12", "2": "21"}}
+    users = [{"id": "1", "name": "Ala", "active": True}, {"id": "2", "name": "Ola", "active": True}]
+    _patch_loads(monkeypatch, modes=modes, users=users)
+    _fixed_times(monkeypatch)
+    shifts_schedule.clear_roster_cache()
+
+    from datetime import datetime
+
+    morning = shifts_schedule.who_is_on_now(datetime(2025, 1, 7, 7, 0))
+    assert morning == {"slot": "RANO", "users": ["Ala"]}
+    evening = shifts_schedule.who_is_on_now(datetime(2025, 1, 14, 15, 0))
+    assert evening == {"slot": "POPO", "users": ["Ala"]}
+    assert shifts_schedule.who_is_on_now(datetime(2025, 1, 7, 23, 0))["slot"] is None
+
+    entries = shifts_schedule.roster_range(date(2025, 1, 10), date(2025, 1, 13))
+    assert [(e["date"], e["user"], e["shift"]) for e in entries] == [
+        ("2025-01-10", "Ala", "R"),
+        ("2025-01-10", "Ola", "P"),
+        ("2025-01-11", "Ala", "R"),
+        ("2025-01-11", "Ola", "R"),
+        ("2025-01-13", "Ala", "P"),
+        ("2025-01-13", "Ola", "R"),
+    ]
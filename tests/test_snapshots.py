@@ -0,0 +1,136 @@
+import json
+import os
+
+import snapshots
+
+
+def _tree(tmp_path):
+    data = tmp_path / "data"
+    (data / "magazyn").mkdir(parents=True)
+    (data / "maszyny.json").write_text('[{"id": 1}]', encoding="utf-8")
+    (data / "magazyn" / "stany.json").write_text("x" * 5000, encoding="utf-8")
+    cfg = tmp_path / "config.json"
+    cfg.write_text('{"theme": "dark"}', encoding="utf-8")
+    return {"config.json": str(cfg), "data": str(data)}
+
+
+def test_snapshots_share_unchanged_content(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "CHUNK_SIZE", 1024)
+    sources = _tree(tmp_path)
+    store = snapshots.SnapshotStore(str(tmp_path / "store"))
+
+    first = store.snapshot(sources)
+    objects = sum(len(f) for _, _, f in os.walk(store.objects_dir))
+    assert objects == 4  # 4 identyczne kawałki „x” to jeden obiekt + końcówka + 2 małe pliki
+    assert store.snapshot(sources) is None  # bez zmian – brak nowej migawki
+
+    (tmp_path / "data" / "maszyny.json").write_text('[{"id": 2}]', encoding="utf-8")
+    second = store.snapshot(sources)
+    assert second and second != first
+    assert sum(len(f) for _, _, f in os.walk(store.objects_dir)) == objects + 1
+    assert set(store.manifest(second)["files"]) == {
+        "config.json", "data/maszyny.json", "data/magazyn/stany.json"
+    }
+
+    assert store.read_file(first, "data/maszyny.json") == b'[{"id": 1}]'
+    store.restore_file(first, "data/maszyny.json")
+    assert (tmp_path / "data" / "maszyny.json").read_text(encoding="utf-8") == '[{"id": 1}]'
+
+    out = tmp_path / "out"
+    written = store.restore(second, dest_root=str(out))
+    assert len(written) == 3
+    assert (out / "data" / "magazyn" / "stany.json").read_text(encoding="utf-8") == "x" * 5000
+
+
+def test_restore_full_tree_and_delete_extra(tmp_path):
+    sources = _tree(tmp_path)
+    store = snapshots.SnapshotStore(str(tmp_path / "store"))
+    sid = store.snapshot(sources)
+    (tmp_path / "data" / "nowy.json").write_text("{}", encoding="utf-8")
+    (tmp_path / "config.json").write_text("{}", encoding="utf-8")
+    store.restore(sid, delete_extra=True)
+    assert not (tmp_path / "data" / "nowy.json").exists()
+    assert (tmp_path / "config.json").read_text(encoding="utf-8") == '{"theme": "dark"}'
+    assert store.restore(sid) == []  # już zgodne – nic nie zapisuje
+
+
+def test_prune_keeps_policy_and_collects_objects(tmp_path):
+    store = snapshots.SnapshotStore(str(tmp_path / "store"))
+    src = tmp_path / "f.txt"
+    ids = []
+    for i in range(5):
+        src.write_text(f"wersja {i}", encoding="utf-8")
+        ids.append(store.snapshot({"f": str(src)}))
+    removed = store.prune(keep_last=2, keep_hourly=0, keep_daily=0)
+    assert removed == list(reversed(ids[:3]))
+    assert store.list_snapshots() == ids[3:]
+    assert sum(len(f) for _, _, f in os.walk(store.objects_dir)) == 2
+    assert store.read_file(ids[3], "f") == b"wersja 3"
+
+
+def test_prune_applies_policy_per_source_set(tmp_path):
+    store = snapshots.SnapshotStore(str(tmp_path / "store"))
+    cfg = tmp_path / "config.json"
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.json").write_text("1", encoding="utf-8")
+    cfg.write_text("{}", encoding="utf-8")
+    full = store.snapshot({"config.json": str(cfg), "data": str(data)}, label="auto")
+    config_ids = []
+    for i in range(4):  # seria zapisów ustawień po migawce data/
+        cfg.write_text(json.dumps({"n": i}), encoding="utf-8")
+        config_ids.append(store.snapshot({"config.json": str(cfg)}, label="config"))
+
+    removed = store.prune(keep_last=2, keep_hourly=1, keep_daily=1)
+    assert full in store.list_snapshots()
+    assert sorted(removed) == config_ids[:2]
+    assert store.read_file(full, "data/a.json") == b"1"
+
+
+def test_config_snapshot_not_blocked_by_data_snapshot(tmp_path, monkeypatch):
+    import threading
+
+    store = snapshots.SnapshotStore(str(tmp_path / "store"))
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.json").write_text("1", encoding="utf-8")
+    cfg = tmp_path / "config.json"
+    cfg.write_text("{}", encoding="utf-8")
+
+    started, release = threading.Event(), threading.Event()
+    real_store_file = store._store_file
+
+    def slow_store_file(path):
+        if path.endswith("a.json"):
+            started.set()
+            release.wait(5)
+        return real_store_file(path)
+
+    monkeypatch.setattr(store, "_store_file", slow_store_file)
+    worker = threading.Thread(target=store.snapshot, args=({"data": str(data)},))
+    worker.start()
+    assert started.wait(5)
+    try:
+        assert store.snapshot({"config.json": str(cfg)}, label="config")
+    finally:
+        release.set()
+        worker.join(5)
+    assert len(store.list_snapshots()) == 2
+
+
+def test_retention_defaults_match_config_and_schema():
+    from core import config_schema
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, "config.defaults.json"), encoding="utf-8") as f:
+        defaults = json.load(f)["backup"]["snapshots"]
+    expected = dict(snapshots.DEFAULT_RETENTION, interval_min=snapshots.DEFAULT_INTERVAL_MIN)
+    assert defaults == expected
+    with open(os.path.join(root, "settings_schema.json"), encoding="utf-8") as f:
+        schema = json.load(f)
+    fields = {
+        f["key"]: f["default"]
+        for f in config_schema.iter_schema_fields(schema)
+        if f.get("key", "").startswith("backup.snapshots.")
+    }
+    assert fields == {f"backup.snapshots.{k}": v for k, v in expected.items()}
@@ -0,0 +1,29 @@
+from core.text_index import NgramIndex, fold
+
+
+def test_fold_strips_polish_diacritics():
+    assert fold("Łożysko ŚRUBA źćń") == "lozysko sruba zcn"
+
+
+def test_search_is_substring_in_insertion_order():
+    idx = NgramIndex().build(
+        [("b", "Frez 12 mm"), ("a", "Śruba M12"), ("c", "Wiertło 5")]
+    )
+    assert idx.search("") == ["b", "a", "c"]
+    assert idx.search("12") == ["b", "a"]
+    assert idx.search("sruba") == ["a"]
+    assert idx.search("z 12") == ["b"]
+    assert idx.search("wiertlo 5") == ["c"]
+    assert idx.search("nic") == []
+
+
+def test_add_replace_and_remove():
+    idx = NgramIndex()
+    idx.add(1, "frez")
+    idx.add(2, "gwintownik")
+    idx.add(1, "pilnik")
+    assert idx.search("frez") == []
+    assert idx.search("nik") == [1, 2]
+    idx.remove(2)
+    assert idx.search("nik") == [1]
+    assert len(idx) == 1
@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from utils import thumbnails
+
+
+@pytest.fixture(autouse=True)
+def _cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(thumbnails, "CACHE_DIR", str(tmp_path / "thumbs"))
+    thumbnails.clear_photos()
+    yield
+    thumbnails.clear_photos()
+
+
+def _fake_render(calls):
+    def render(src, dest, size):
+        calls.append(src)
+        with open(dest, "w", encoding="utf-8") as fh:
+            fh.write(f"{src}@{size}")
+
+    return render
+
+
+def test_key_changes_with_content_and_size(tmp_path):
+    src = tmp_path / "a.png"
+    src.write_text("x")
+    key = thumbnails.source_key(str(src))
+    assert key == thumbnails.source_key(str(src))
+    assert key != thumbnails.source_key(str(src), (100, 100))
+    src.write_text("xyz")
+    os.utime(src, ns=(1, 1))
+    assert thumbnails.source_key(str(src)) != key
+    assert thumbnails.source_key(str(tmp_path / "missing.png")) is None
+
+
+def test_thumbnail_file_renders_once(tmp_path):
+    src = tmp_path / "a.png"
+    src.write_text("x")
+    calls = []
+    first = thumbnails.thumbnail_file(str(src), render=_fake_render(calls))
+    second = thumbnails.thumbnail_file(str(src), render=_fake_render(calls))
+    assert first == second and os.path.exists(first)
+    assert first.startswith(thumbnails.CACHE_DIR)
+    assert calls == [str(src)]
+    assert not [n for n in os.listdir(os.path.dirname(first)) if n.endswith(".tmp")]
+
+
+def test_failed_render_leaves_no_file(tmp_path):
+    src = tmp_path / "a.png"
+    src.write_text("x")
+
+    def broken(_src, dest, _size):
+        open(dest, "w").close()
+        raise OSError("zły plik")
+
+    assert thumbnails.thumbnail_file(str(src), render=broken) is None
+    assert thumbnails.thumbnail_file(str(src), render=_fake_render([])) is not None
+
+
+def test_photo_lru_evicts_oldest(tmp_path, monkeypatch):
+    monkeypatch.setattr(thumbnails, "PHOTO_LRU_SIZE", 2)
+    paths = []
+    for name in ("a", "b", "c"):
+        p = tmp_path / f"{name}.png"
+        p.write_text(name)
+        paths.append(str(p))
+    size = (10, 10)
+    thumbnails.remember_photo(paths[0], size, "A")
+    thumbnails.remember_photo(paths[1], size, "B")
+    assert thumbnails.cached_photo(paths[0], size) == "A"  # a becomes newest
+    thumbnails.remember_photo(paths[2], size, "C")
+    assert thumbnails.cached_photo(paths[1], size) is None
+    assert thumbnails.cached_photo(paths[0], size) == "A"
+    assert thumbnails.cached_photo(paths[2], size) == "C"
+    assert thumbnails.cached_photo(paths[0], (20, 20)) is None
+
+
+def test_prewarm_skips_paths_already_pending(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    release = threading.Event()
+    calls = []
+
+    def slow_thumbnail(path, size):
+        calls.append(path)
+        release.wait(5)
+        return path
+
+    monkeypatch.setattr(thumbnails, "Image", object())
+    monkeypatch.setattr(thumbnails, "thumbnail_file", slow_thumbnail)
+    src = str(tmp_path / "a.png")
+    try:
+        first = thumbnails.prewarm([src])
+        assert len(first) == 1
+        # the same path requested again while it is still rendering
+        assert thumbnails.prewarm([src, src]) == []
+        release.set()
+        first[0].result(5)
+        deadline = time.monotonic() + 5
+        while thumbnails._PREWARM_PENDING and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(thumbnails.prewarm([src])) == 1
+    finally:
+        release.set()
+        thumbnails.shutdown()
+    assert calls[0] == src
@@ -13,3 +13,16 @@ def test_append_tool_history_jsonl(tmp_path: Path) -> None:
     lines = path.read_text(encoding="utf-8").splitlines()
     assert json.loads(lines[0]) == entry1
     assert json.loads(lines[1]) == entry2
+
+
+def test_read_tail_newest_first(tmp_path: Path) -> None:
+    path = tmp_path / "hist.jsonl"
+    for i in range(200):
+        tools_history.append_tool_history(path, {"i": i, "txt": "ż" * (i % 7)})
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write('{"i": "w trakcie')  # niedokończony zapis
+    got = tools_history.read_tail(path, 5)
+    assert [e["i"] for e in got] == [199, 198, 197, 196, 195]
+    lines = list(tools_history.iter_reverse_lines(path, block_size=16))
+    assert [json.loads(x)["i"] for x in lines] == list(range(199, -1, -1))
+    assert tools_history.read_tail(tmp_path / "brak.jsonl") == []
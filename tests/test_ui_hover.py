@@ -192,3 +192,31 @@ def test_load_image_respects_max_size(monkeypatch):
     assert pil_img.thumb_called_with == (600, 800)
     assert result.width <= 600
     assert result.height <= 800
+
+
+def test_treeview_row_hover_resolves_paths_lazily(monkeypatch):
+    setup_dummy(monkeypatch)
+    tree = DummyTree()
+    resolved = []
+
+    def resolve(row):
+        resolved.append(row)
+        return ["img.png"]
+
+    hover = ui_hover.TreeviewRowHover(tree, resolve)
+    assert resolved == []
+
+    tree.trigger_motion(1)
+    assert resolved == ["row"]
+    assert hover._tooltip is not None
+    tree.trigger_motion(1)
+    tree.trigger_motion(2)
+    assert hover._tooltip is None
+    tree.trigger_motion(1)
+    assert resolved == ["row"]  # ścieżki z cache
+
+    hover.clear()
+    tree.trigger_motion(1)
+    assert resolved == ["row", "row"]
+    tree.trigger_leave()
+    assert hover._tooltip is None
@@ -0,0 +1,147 @@
+import os
+
+import pytest
+
+import ui_panel_cache
+
+
+class FakeWidget:
+    def __init__(self, master=None):
+        self.master = master
+        self.children = []
+        self.packed = False
+        self.alive = True
+        if master is not None:
+            master.children.append(self)
+
+    def winfo_children(self):
+        return list(self.children)
+
+    def winfo_exists(self):
+        return self.alive
+
+    def pack(self, **_kw):
+        self.packed = True
+
+    def pack_forget(self):
+        self.packed = False
+
+    def destroy(self):
+        for child in list(self.children):
+            child.destroy()
+        self.alive = False
+        if self.master is not None and self in self.master.children:
+            self.master.children.remove(self)
+
+
+class View:
+    def __init__(self, host, size=1):
+        self.refreshed = 0
+        for _ in range(size):
+            FakeWidget(host)
+
+    def refresh(self):
+        self.refreshed += 1
+
+
+def _cache(**kw):
+    container = FakeWidget()
+    return container, ui_panel_cache.PanelCache(container, make_host=FakeWidget, **kw)
+
+
+def test_switch_reuses_hidden_panels():
+    _container, cache = _cache()
+    built = []
+
+    def build(name):
+        return lambda host: built.append(name) or View(host)
+
+    a = cache.show("a", build("a"))
+    b = cache.show("b", build("b"))
+    assert not a.packed and b.packed
+    assert cache.show("a", build("a")) is a
+    assert a.packed and not b.packed
+    assert built == ["a", "b"]
+    stats = cache.stats()
+    assert stats["a"]["builds"] == 1 and stats["a"]["hits"] == 1
+    assert stats["a"]["widgets"] == 2
+
+
+def test_changed_data_refreshes_or_rebuilds(tmp_path):
+    data = tmp_path / "magazyn"
+    data.mkdir()
+    (data / "stan.json").write_text("{}", encoding="utf-8")
+    _container, cache = _cache()
+    views = []
+
+    def build_view(host):
+        views.append(View(host))
+        return views[-1]
+
+    cache.show("mag", build_view, watch=(str(data),))
+    plain = []
+    cache.show("plain", lambda host: plain.append(FakeWidget(host)), watch=(str(data),))
+
+    (data / "stan.json").write_text('{"a": 1}', encoding="utf-8")
+    cache.show("mag", build_view, watch=(str(data),))
+    assert len(views) == 1 and views[0].refreshed == 1
+    cache.show("plain", lambda host: plain.append(FakeWidget(host)), watch=(str(data),))
+    assert len(plain) == 2  # brak refresh() -> przebudowa
+
+    cache.show("mag", build_view)
+    assert views[0].refreshed == 1
+    cache.invalidate("mag")
+    cache.show("plain", lambda host: None)
+    cache.show("mag", build_view)
+    assert views[0].refreshed == 2
+
+
+def test_lru_eviction_by_count_and_widgets():
+    _container, cache = _cache(max_panels=2, max_widgets=10)
+    hosts = {k: cache.show(k, lambda host: View(host)) for k in ("a", "b")}
+    cache.show("a", lambda host: View(host))
+    cache.show("c", lambda host: View(host))
+    assert cache.keys() == ("a", "c")
+    assert not hosts["b"].alive
+
+    cache.show("big", lambda host: View(host, size=8))
+    assert cache.keys() == ("big",)  # 2 + 2 + 9 > 10 widżetów
+
+
+def test_transient_view_and_failed_build():
+    container, cache = _cache()
+    a = cache.show("a", lambda host: View(host))
+    host = cache.show_transient()
+    FakeWidget(host)
+    assert not a.packed and host.packed
+    cache.show("a", lambda host: View(host))
+    assert not host.packed and host.children == []
+
+    with pytest.raises(RuntimeError):
+        cache.show("bad", lambda host: (_ for _ in ()).throw(RuntimeError("x")))
+    assert "bad" not in cache.keys()
+
+
+def test_data_signature_missing_and_dirs(tmp_path):
+    missing = str(tmp_path / "brak.json")
+    assert ui_panel_cache.data_signature([missing]) == ((missing, 0, -1),)
+    (tmp_path / "x.json").write_text("1", encoding="utf-8")
+    sig = ui_panel_cache.data_signature([str(tmp_path)])
+    assert [os.path.basename(p) for p, *_ in sig] == ["x.json"]
+
+
+def test_new_watch_list_replaces_old(tmp_path):
+    old = tmp_path / "old.json"
+    new = tmp_path / "new.json"
+    old.write_text("1", encoding="utf-8")
+    new.write_text("2", encoding="utf-8")
+    _container, cache = _cache()
+    views = []
+    build = lambda host: views.append(View(host)) or views[-1]  # noqa: E731
+
+    cache.show("t", build, watch=(str(old),))
+    cache.show("t", build, watch=(str(new),))
+    assert views[0].refreshed == 1
+    new.write_text("22", encoding="utf-8")
+    cache.show("t", build, watch=(str(new),))
+    assert views[0].refreshed == 2
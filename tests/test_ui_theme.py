@@ -0,0 +1,70 @@
+import json
+
+import pytest
+import tkinter as tk
+from tkinter import ttk
+
+import ui_theme
+
+
+def test_palette_is_cached_and_read_only():
+    first = ui_theme._build_palette("warm")
+    assert ui_theme._build_palette("warm") is first
+    assert first["accent"] == ui_theme.THEMES["warm"]["accent"]
+    with pytest.raises(TypeError):
+        first["bg"] = "#000000"
+
+
+def test_option_entries_follow_palette():
+    palette = ui_theme._build_palette("christmas")
+    entries = {pattern: (value, prio) for pattern, value, prio in ui_theme._option_entries("christmas")}
+    assert entries["*background"] == (palette["bg"], "widgetDefault")
+    assert entries["*Label.foreground"] == (palette["fg"], "interactive")
+    assert entries["*Entry.background"][0] == palette["entry_bg"]
+    assert ui_theme._class_options("christmas")["Text"]["insertbackground"] == palette["fg"]
+
+
+def test_configured_theme_name_rereads_only_changed_file(tmp_path, monkeypatch):
+    cfg = tmp_path / "config.json"
+    cfg.write_text(json.dumps({"ui": {"theme": "warm"}}), encoding="utf-8")
+    calls = []
+    real = ui_theme.load_theme_name
+    monkeypatch.setattr(ui_theme, "load_theme_name", lambda p: calls.append(p) or real(p))
+
+    assert ui_theme._configured_theme_name(cfg) == "warm"
+    assert ui_theme._configured_theme_name(cfg) == "warm"
+    assert len(calls) == 1
+
+    cfg.write_text(json.dumps({"ui": {"theme": "christmas"}}), encoding="utf-8")
+    assert ui_theme._configured_theme_name(cfg) == "christmas"
+    assert len(calls) == 2
+
+
+def test_apply_once_per_palette_and_class_defaults(monkeypatch):
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("Tkinter not available")
+    root.withdraw()
+    try:
+        old = tk.Label(root, text="x")
+        calls = []
+        real = ui_theme._apply_base_styles
+        monkeypatch.setattr(ui_theme, "_apply_base_styles", lambda *a: calls.append(1) or real(*a))
+
+        ui_theme.apply_theme(root, scheme="warm")
+        warm = ui_theme._build_palette("warm")
+        assert old.cget("bg") == warm["bg"]
+
+        frame = tk.Frame(root)
+        ui_theme.apply_theme_tree(frame, scheme="warm")
+        assert len(calls) == 1
+        assert tk.Label(frame).cget("fg") == warm["fg"]
+        assert tk.Entry(frame).cget("bg") == warm["entry_bg"]
+        ttk.Label(frame)
+
+        ui_theme.apply_theme(root, scheme="christmas")
+        assert len(calls) == 2
+        assert old.cget("bg") == ui_theme._build_palette("christmas")["bg"]
+    finally:
+        root.destroy()
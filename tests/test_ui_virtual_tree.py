@@ -0,0 +1,161 @@
+import itertools
+
+from ui_virtual_tree import RowStore, VirtualTreeview
+
+
+class FakeTree:
+    """Minimal stand-in for ttk.Treeview (no display needed)."""
+
+    def __init__(self, height=5):
+        self.height = height
+        self.rows = {}
+        self.order = []
+        self._sel = ()
+        self._ids = itertools.count()
+        self.inserts = 0
+        self.updates = 0
+        self.after_calls = []
+
+    def cget(self, name):
+        return self.height
+
+    def bind(self, *_a, **_kw):
+        pass
+
+    def insert(self, _parent, _index, values=(), tags=()):
+        iid = f"I{next(self._ids)}"
+        self.rows[iid] = (tuple(values), tuple(tags))
+        self.order.append(iid)
+        self.inserts += 1
+        return iid
+
+    def item(self, iid, values=(), tags=()):
+        self.rows[iid] = (tuple(values), tuple(tags))
+        self.updates += 1
+
+    def delete(self, iid):
+        del self.rows[iid]
+        self.order.remove(iid)
+
+    def selection(self):
+        return self._sel
+
+    def selection_set(self, items):
+        self._sel = tuple(items)
+
+    def focus(self, _iid):
+        pass
+
+    def identify_row(self, y):
+        idx = y // 20
+        return self.order[idx] if 0 <= idx < len(self.order) else ""
+
+    def after(self, ms, fn, *args):
+        self.after_calls.append((fn, args))
+        return len(self.after_calls)
+
+    def after_cancel(self, _id):
+        pass
+
+    def shown_ids(self):
+        return [self.rows[iid][0][0] for iid in self.order]
+
+
+def _store(n=100):
+    store = RowStore(
+        lambda key, item: (key, item["nazwa"]),
+        lambda key, item: item["nazwa"],
+        tags=lambda key, item: ("low",) if item["stan"] < 2 else (),
+    )
+    store.load((f"ID{i:03d}", {"nazwa": f"Śruba M{i}", "stan": i}) for i in range(n))
+    return store
+
+
+def test_filter_uses_lowercase_blob_and_narrows():
+    store = _store()
+    assert len(store.filter("")) == 100
+    assert store.filter("śruba m99") == ["ID099"]
+    assert store.filter("M1") == ["ID001"] + [f"ID{i:03d}" for i in range(10, 20)]
+    assert store.filter("m12") == ["ID012"]
+    odd = store.filter("m1", lambda k, it: it["stan"] % 2 == 1, predicate_id="odd")
+    assert odd == ["ID001"] + [f"ID{i:03d}" for i in range(11, 20, 2)]
+    assert store.filter("m13", lambda k, it: it["stan"] % 2 == 1, predicate_id="odd") == ["ID013"]
+
+
+def test_only_visible_rows_are_materialized_and_reused():
+    tree = FakeTree(height=5)
+    store = _store()
+    view = VirtualTreeview(tree)
+    view.bind_store(store)
+    view.set_keys(store.filter(""))
+
+    assert tree.shown_ids() == ["ID000", "ID001", "ID002", "ID003", "ID004"]
+    assert tree.rows[tree.order[0]][1] == ("low",)
+    ids_before = list(tree.order)
+
+    view.scroll_to(50)
+    assert tree.shown_ids() == ["ID050", "ID051", "ID052", "ID053", "ID054"]
+    assert tree.order == ids_before
+    assert tree.inserts == 5
+
+    view.scroll_to(1000)
+    assert tree.shown_ids()[-1] == "ID099"
+
+    view.set_keys(store.filter("m7"))
+    assert tree.shown_ids() == ["ID007", "ID070", "ID071", "ID072", "ID073"]
+    view.set_keys(store.filter("m99"))
+    assert tree.shown_ids() == ["ID099"]
+    assert len(tree.rows) == 1
+
+
+def test_unchanged_rows_are_not_rewritten():
+    tree = FakeTree(height=3)
+    store = _store(10)
+    view = VirtualTreeview(tree)
+    view.bind_store(store)
+    view.set_keys(store.keys)
+    tree.updates = 0
+    view.set_keys(store.keys)
+    assert tree.updates == 0
+    view.scroll_to(1)
+    assert tree.updates == 3
+
+
+def test_selection_follows_key_and_schedule_debounces():
+    tree = FakeTree(height=3)
+    store = _store(10)
+    view = VirtualTreeview(tree)
+    view.bind_store(store)
+    view.set_keys(store.keys)
+
+    tree.selection_set((tree.order[1],))
+    view._on_select()
+    assert view.selected_key() == "ID001"
+    view.scroll_to(5)
+    assert tree.selection() == ()
+    assert view.selected_key() == "ID001"
+    view.select_key("ID001")
+    assert tree.rows[tree.selection()[0]][0][0] == "ID001"
+
+    view.schedule(lambda: store.filter("m2"))
+    view.schedule(lambda: store.filter("m3"))
+    fn, args = tree.after_calls[-1]
+    fn(*args)
+    assert tree.shown_ids() == ["ID003"]
+    # ID001 was filtered out – it must not stay the selected key
+    assert view.selected_key() is None
+
+
+def test_select_at_maps_row_to_key_after_scroll():
+    tree = FakeTree(height=3)
+    store = _store(10)
+    view = VirtualTreeview(tree)
+    view.bind_store(store)
+    view.set_keys(store.keys)
+    view.scroll_to(4)
+
+    assert view.select_at(25) == "ID005"
+    assert view.selected_key() == "ID005"
+    assert tree.rows[tree.selection()[0]][0][0] == "ID005"
+    assert view.select_at(500) is None
+    assert view.selected_key() == "ID005"
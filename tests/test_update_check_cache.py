@@ -0,0 +1,90 @@
+import json
+import subprocess
+import time
+
+import updater
+
+
+def _fake_git(calls, behind="abc123\n"):
+    def fake_run(cmd, *args, **kwargs):
+        calls.append((cmd, kwargs.get("timeout")))
+        if cmd[:2] == ["git", "rev-parse"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout="main\n")
+        if cmd[:2] == ["git", "ls-remote"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout="ref\n")
+        if cmd[:2] == ["git", "fetch"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout="")
+        if cmd[:2] == ["git", "rev-list"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout=behind)
+        raise AssertionError(cmd)
+
+    return fake_run
+
+
+def test_cached_check_skips_git_when_fresh(monkeypatch, tmp_path):
+    monkeypatch.setattr(updater, "LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(updater, "UPDATE_CHECK_FILE", tmp_path / "check.json")
+    calls = []
+    monkeypatch.setattr(subprocess, "run", _fake_git(calls))
+
+    assert updater.git_has_updates_cached(tmp_path, timeout=5) is True
+    assert calls and all(timeout == 5 for _cmd, timeout in calls)
+    saved = json.loads((tmp_path / "check.json").read_text(encoding="utf-8"))
+    assert saved["available"] is True
+
+    calls.clear()
+    assert updater.git_has_updates_cached(tmp_path) is True
+    assert calls == []
+
+    assert updater.git_has_updates_cached(tmp_path, force=True) is True
+    assert calls
+
+
+def test_stale_or_failed_check_not_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(updater, "LOGS_DIR", tmp_path / "logs")
+    cache = tmp_path / "check.json"
+    monkeypatch.setattr(updater, "UPDATE_CHECK_FILE", cache)
+    cache.write_text(
+        json.dumps({"checked_at": time.time() - 7200, "available": True}),
+        encoding="utf-8",
+    )
+    assert updater.cached_update_status(max_age_hours=1) is None
+    assert updater.cached_update_status(max_age_hours=3) is True
+
+    def timeout_run(cmd, *args, **kwargs):
+        raise subprocess.TimeoutExpired(cmd, kwargs.get("timeout"))
+
+    monkeypatch.setattr(subprocess, "run", timeout_run)
+    assert updater.git_has_updates_cached(tmp_path, max_age_hours=1) is False
+    assert updater.cached_update_status(max_age_hours=1) is None
+
+
+def test_background_check_delivers_result(monkeypatch, tmp_path):
+    monkeypatch.setattr(updater, "LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(updater, "UPDATE_CHECK_FILE", tmp_path / "check.json")
+    monkeypatch.setattr(subprocess, "run", _fake_git([], behind=""))
+    results = []
+
+    thread = updater.check_updates_in_background(tmp_path, results.append)
+    thread.join(timeout=5)
+
+    assert results == [False]
+    assert updater.cached_update_status() is False
+
+
+def test_git_pull_is_bounded_by_timeout(monkeypatch, tmp_path):
+    monkeypatch.setattr(updater, "LOGS_DIR", tmp_path / "logs")
+    seen = []
+
+    def fake_run(cmd, *args, **kwargs):
+        seen.append(kwargs.get("timeout"))
+        raise subprocess.TimeoutExpired(cmd, kwargs.get("timeout"))
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    try:
+        updater._run_git_pull(tmp_path, "STAMP")
+    except RuntimeError as e:
+        assert "limit czasu" in str(e)
+    else:  # pragma: no cover
+        raise AssertionError("brak wyjątku")
+    assert seen == [updater.UPDATE_PULL_TIMEOUT_S]
@@ -0,0 +1,76 @@
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+import updater
+
+
+@pytest.fixture
+def app_dir(tmp_path, monkeypatch):
+    root = tmp_path / "app"
+    root.mkdir()
+    monkeypatch.chdir(root)
+    monkeypatch.setattr(updater, "BACKUP_DIR", Path("backups"))
+    monkeypatch.setattr(updater, "LOGS_DIR", Path("logs"))
+    (root / "a.py").write_text("A = 1\n", encoding="utf-8")
+    (root / "pkg").mkdir()
+    (root / "pkg" / "b.py").write_text("B = 1\n", encoding="utf-8")
+    return root
+
+
+def _bundle(path, files, manifest=False):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, text in files.items():
+            zf.writestr(name, text)
+        zf.writestr("pkg/", "")
+        zf.writestr("../evil.py", "x")
+    if manifest:
+        updater.write_zip_manifest(path)
+    return path
+
+
+@pytest.mark.parametrize("manifest", [False, True])
+def test_only_changed_files_are_backed_up_and_written(app_dir, tmp_path, manifest):
+    bundle = _bundle(
+        tmp_path / f"u{manifest}.zip",
+        {"a.py": "A = 1\n", "pkg/b.py": "B = 2\n", "nowy.py": "N = 1\n"},
+        manifest=manifest,
+    )
+    stats = {}
+    changed = updater._extract_zip_overwrite(bundle, "S1", stats)
+
+    assert sorted(changed) == ["nowy.py", "pkg/b.py"]
+    assert stats["total"] == 3 and stats["changed"] == 2
+    assert {"scan_s", "extract_s", "swap_s"} <= set(stats)
+    assert (app_dir / "pkg" / "b.py").read_text(encoding="utf-8") == "B = 2\n"
+    backups = sorted(p.relative_to(app_dir / "backups" / "S1").as_posix()
+                     for p in (app_dir / "backups" / "S1").rglob("*") if p.is_file())
+    assert backups == ["pkg/b.py"]
+    assert not (tmp_path / "evil.py").exists()
+    assert not list((app_dir / "backups").glob(".staging-*"))
+
+    # ponowny import tej samej paczki nic nie zmienia
+    assert updater._extract_zip_overwrite(bundle, "S2") == []
+    assert not (app_dir / "backups" / "S2").exists()
+
+    restored = updater._restore_backup("S1")
+    assert restored == [str(Path("pkg/b.py"))]
+    assert (app_dir / "pkg" / "b.py").read_text(encoding="utf-8") == "B = 1\n"
+    assert updater._restore_backup("S1") == []
+
+
+def test_manifest_mismatch_aborts_before_writing(app_dir, tmp_path):
+    bundle = tmp_path / "u.zip"
+    with zipfile.ZipFile(bundle, "w") as zf:
+        zf.writestr("a.py", "A = 2\n")
+        zf.writestr(
+            updater.ZIP_MANIFEST,
+            json.dumps({"files": {"a.py": {"sha256": "0" * 64, "size": 6}}}),
+        )
+
+    with pytest.raises(ValueError):
+        updater._extract_zip_overwrite(bundle, "S1")
+    assert (app_dir / "a.py").read_text(encoding="utf-8") == "A = 1\n"
+    assert not list((app_dir / "backups").glob(".staging-*"))
@@ -0,0 +1,44 @@
+import os
+
+import updater
+import wymagane_pliki_version_check as wpv
+from utils import version_index
+
+
+def test_scan_reads_only_changed_files(tmp_path, monkeypatch):
+    (tmp_path / "a.py").write_text("# Wersja pliku: 1.0.0\nA = 1\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text('"""Wersja pliku: w docstringu"""\n', encoding="utf-8")
+    (tmp_path / "venv").mkdir()
+    (tmp_path / "venv" / "c.py").write_text("# Wersja pliku: 9\n", encoding="utf-8")
+    idx = version_index.VersionIndex()
+
+    reads = []
+    real = version_index._read_header_lines
+    monkeypatch.setattr(
+        version_index, "_read_header_lines", lambda p: reads.append(p) or real(p)
+    )
+    rows = idx.scan(tmp_path, skip_dirs={"venv"})
+    assert [(os.path.basename(p), v) for p, v in rows] == [("a.py", "1.0.0")]
+    assert len(reads) == 2
+
+    reads.clear()
+    assert idx.scan(tmp_path, skip_dirs={"venv"}) == rows
+    assert reads == []
+
+    (tmp_path / "a.py").write_text("# Wersja pliku: 1.0.10\nA = 1\n", encoding="utf-8")
+    assert idx.version(tmp_path / "a.py") == "1.0.10"
+    assert [os.path.basename(p) for p in reads] == ["a.py"]
+    assert idx.header_lines(tmp_path / "b.py") == ('"""Wersja pliku: w docstringu"""',)
+
+
+def test_callers_share_index(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "start.py").write_text("# Wersja pliku: 1.4.7\n", encoding="utf-8")
+    assert wpv.sprawdz_wersje("start.py", "1.4.7").startswith("✅")
+    assert wpv.sprawdz_wersje("brak.py", None).startswith("❌")
+    assert updater._scan_versions(tmp_path) == [("start.py", "1.4.7")]
+
+    import kreator_sprawdzenia as ks
+
+    status, _msg, found, _exp = ks.check_file_version(str(tmp_path), "start.py", {"start.py": {"min": "1.0"}})
+    assert (status, found) == ("OK", "1.4.7")
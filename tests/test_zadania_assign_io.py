@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+import zadania_assign_io as io
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(io, "DATA_PATH", tmp_path / "zadania_przypisania.json")
+    monkeypatch.setattr(io, "_STORE", None)
+    monkeypatch.setattr(io, "_LISTENERS", [])
+    return tmp_path
+
+
+def test_indexes_follow_updates(store):
+    io.assign("T1", "jan", "narzedzia")
+    io.assign("T2", "jan", "narzedzia")
+    io.assign("T1", "ola", "zlecenia")
+    io.assign("T1", "ola", "narzedzia")  # przepisanie
+
+    assert [r["task"] for r in io.list_for_user("jan")] == ["T2"]
+    assert {r["context"] for r in io.list_for_user("ola")} == {"narzedzia", "zlecenia"}
+    assert {r["user"] for r in io.list_for_task("T1")} == {"ola"}
+    assert [r["task"] for r in io.list_in_context("narzedzia")] == ["T1", "T2"]
+
+    io.unassign("T2", "narzedzia")
+    assert io.list_for_user("jan") == []
+    assert len(io.list_all()) == 2
+
+    rec = io.list_all()[0]
+    rec["user"] = "zmienione"
+    assert io.list_all()[0]["user"] != "zmienione"
+
+
+def test_log_replay_and_compaction(store, monkeypatch):
+    monkeypatch.setattr(io, "COMPACT_EVERY", 3)
+    io.assign("T1", "jan", "narzedzia")
+    io.assign("T2", "jan", "narzedzia")
+    log = store / "zadania_przypisania.log.jsonl"
+    assert len(log.read_text(encoding="utf-8").splitlines()) == 2
+    assert not (store / "zadania_przypisania.json").exists()
+
+    # nowy proces odtwarza stan z dziennika
+    fresh = io.AssignmentStore(io.DATA_PATH)
+    assert len(fresh.select("user", "jan")) == 2
+
+    io.assign("T3", "ola", "zlecenia")
+    assert log.read_text(encoding="utf-8") == ""
+    snap = json.loads((store / "zadania_przypisania.json").read_text(encoding="utf-8"))
+    assert [r["task"] for r in snap] == ["T1", "T2", "T3"]
+
+    # dopisanie innego procesu jest doczytywane z ogona dziennika
+    fresh.write({"op": "unassign", "task": "T1", "context": "narzedzia"})
+    assert [r["task"] for r in io.list_for_user("jan")] == ["T2"]
+
+
+def test_change_feed(store):
+    events = []
+    unsubscribe = io.subscribe(events.append)
+    io.assign("T1", "jan", "narzedzia")
+    io.assign("T1", "jan", "narzedzia")  # bez zmiany – bez zdarzenia
+    io.unassign("T1", "narzedzia")
+    assert [(e["op"], e["task"]) for e in events] == [("assign", "T1"), ("unassign", "T1")]
+
+    io.compact()
+    (store / "zadania_przypisania.json").write_text(
+        json.dumps([{"task": "X", "user": "ola", "context": "zlecenia"}]), encoding="utf-8"
+    )
+    assert [r["task"] for r in io.list_for_user("ola")] == ["X"]
+    assert events[-1] == {"op": "reload"}
+
+    unsubscribe()
+    io.assign("T9", "jan", "narzedzia")
+    assert events[-1] == {"op": "reload"}
+
+
+def test_compact_keeps_ops_of_other_process(store):
+    path = store / "zadania_przypisania.json"
+    first = io.AssignmentStore(path)
+    second = io.AssignmentStore(path)  # drugi proces na tym samym katalogu
+
+    first.write({"op": "assign", "task": "T1", "user": "jan", "context": "narzedzia"})
+    second.write({"op": "assign", "task": "T2", "user": "ola", "context": "narzedzia"})
+    first.compact()  # bez wcześniejszego sync – dopisanie T2 nie może przepaść
+
+    assert (store / "zadania_przypisania.log.jsonl").read_text(encoding="utf-8") == ""
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert {r["task"] for r in saved} == {"T1", "T2"}
+
+    first.write({"op": "assign", "task": "T3", "user": "jan", "context": "narzedzia"})
+    assert first._log_offset == (store / "zadania_przypisania.log.jsonl").stat().st_size
+    assert {r["task"] for r in io.AssignmentStore(path).select()} == {"T1", "T2", "T3"}
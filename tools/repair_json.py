@@ -1,11 +1,12 @@
 # tools/repair_json.py
-# Wersja: 1.0.0
+# Wersja: 1.1.0
 # Cel:
 # - Naprawa pliku data/maszyny/maszyny.json
 # - Usunięcie BOM, normalizacja na UTF-8 + LF
 # - Walidacja JSON
+# - [1.1.0] --all: kontrola całego data/ (data_integrity), --fix: naprawa/kwarantanna
 
-import os, io, json
+import os, io, json, sys
 
 TARGET = "data/maszyny/maszyny.json"
 
@@ -27,5 +28,22 @@ def main():
     print("[INFO] Naprawiono i zapisano:", TARGET)
     print("[INFO] Maszyny:", len(data.get("maszyny", [])) if isinstance(data, dict) else len(data))
 
+def check_all(root="data", fix=False):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import data_integrity
+
+    result = data_integrity.check(root)
+    if fix:
+        for rel, action in data_integrity.repair(result, store=data_integrity._snapshot_store()):
+            print(f"[FIX] {rel}: {action}")
+        result = data_integrity.check(root)
+    for issue in result.issues:
+        tag = "ERROR" if issue.severity == "error" else "WARN"
+        print(f"[{tag}] {issue.path}: {issue.message}")
+    print(f"[INFO] Plików: {len(result.reports)}, błędów: {len(result.errors)}")
+    return 1 if result.errors else 0
+
 if __name__ == "__main__":
+    if "--all" in sys.argv:
+        sys.exit(check_all(fix="--fix" in sys.argv))
     main()
@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List
 
 
 def append_tool_history(path: Path, entry: Dict[str, Any]) -> None:
@@ -23,3 +24,54 @@ def append_tool_history(path: Path, entry: Dict[str, Any]) -> None:
     with path.open("a", encoding="utf-8") as fh:
         json.dump(entry, fh, ensure_ascii=False)
         fh.write("\n")
+
+
+def iter_reverse_lines(path: Path, block_size: int = 8192) -> Iterator[bytes]:
+    """Yield raw lines of ``path`` from the last one to the first.
+
+    The file is read backwards in blocks of ``block_size`` bytes, so reading
+    the newest entries costs the same regardless of the history length.
+    A trailing line without ``\\n`` (a write in progress) is skipped.
+    """
+    try:
+        fh = Path(path).open("rb")
+    except OSError:
+        return
+    with fh:
+        pos = fh.seek(0, os.SEEK_END)
+        tail = b""
+        complete = True
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            fh.seek(pos)
+            chunk = fh.read(step) + tail
+            lines = chunk.split(b"\n")
+            tail = lines.pop(0)
+            if lines and complete:
+                # ostatni element po split to część za ostatnim "\n"
+                if lines[-1]:
+                    lines.pop()
+                complete = False
+            for line in reversed(lines):
+                if line:
+                    yield line
+        if tail and not complete:
+            yield tail
+
+
+def read_tail(path: Path, limit: int = 50) -> List[Dict[str, Any]]:
+    """Return up to ``limit`` newest entries of ``path`` (newest first)."""
+    out: List[Dict[str, Any]] = []
+    if limit <= 0:
+        return out
+    for raw in iter_reverse_lines(path):
+        try:
+            entry = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            continue
+        if isinstance(entry, dict):
+            out.append(entry)
+            if len(out) >= limit:
+                break
+    return out
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import itertools
-from typing import Iterable, List
+from typing import Callable, Dict, Iterable, List
 
 try:  # Pillow is optional
     from PIL import Image, ImageTk  # type: ignore
@@ -14,6 +14,8 @@ except Exception:  # pragma: no cover - optional dependency
 
 import tkinter as tk
 
+from utils import thumbnails
+
 
 class ImageHoverTooltip:
     """Display a small image preview while hovering over a widget.
@@ -29,6 +31,7 @@ class ImageHoverTooltip:
         image_paths: Iterable[str] | None,
         delay: int = 500,
         max_size: tuple[int, int] = (600, 800),
+        bind: bool = True,
     ) -> None:
         self.widget = widget
         self.image_paths: List[str] = list(image_paths or [])
@@ -41,6 +44,8 @@ class ImageHoverTooltip:
         self._tooltip: tk.Toplevel | None = None
         self._label: tk.Label | None = None
 
+        if not bind:  # shown/hidden by the caller (e.g. TreeviewRowHover)
+            return
         try:
             widget.bind("<Enter>", self.show_tooltip, add="+")
             widget.bind("<Leave>", self.hide_tooltip, add="+")
@@ -60,12 +65,19 @@ class ImageHoverTooltip:
 
     def _load_image(self, path: str) -> tk.PhotoImage:
         if _PIL_AVAILABLE and Image is not None:
+            photo = thumbnails.cached_photo(path, self.max_size)
+            if photo is not None:
+                return photo
             try:  # pragma: no cover - Pillow branch
-                img = Image.open(path)
+                # small cached thumbnail instead of decoding the full image
+                src = thumbnails.thumbnail_file(path, self.max_size) or path
+                img = Image.open(src)
                 img.thumbnail(self.max_size)
-                return ImageTk.PhotoImage(img)
+                photo = ImageTk.PhotoImage(img)
             except Exception:
                 return self._placeholder_image()
+            thumbnails.remember_photo(path, self.max_size, photo)
+            return photo
         return self._placeholder_image()
 
     def _ensure_images(self) -> None:
@@ -172,3 +184,65 @@ def bind_treeview_row_hover(
         tree.bind("<Motion>", _on_motion)
         tree.bind("<Leave>", _on_leave)
     return tooltip
+
+
+class TreeviewRowHover:
+    """Image previews for Treeview rows with a single pair of bindings.
+
+    Unlike :func:`bind_treeview_row_hover` (one tooltip and handler per row)
+    image paths are resolved by ``resolve_paths(row_id)`` only when a row is
+    hovered for the first time.  Call :meth:`clear` after the rows were
+    rebuilt so that cached paths of old row ids are dropped.
+    """
+
+    def __init__(
+        self,
+        tree: tk.Treeview,
+        resolve_paths: Callable[[str], Iterable[str] | None],
+        delay: int = 500,
+        max_size: tuple[int, int] = (600, 800),
+    ) -> None:
+        self.tree = tree
+        self.resolve_paths = resolve_paths
+        self.delay = delay
+        self.max_size = max_size
+        self._paths: Dict[str, List[str]] = {}
+        self._row: str | None = None
+        self._tooltip: ImageHoverTooltip | None = None
+        try:
+            tree.bind("<Motion>", self._on_motion, add="+")
+            tree.bind("<Leave>", self.hide, add="+")
+        except TypeError:
+            tree.bind("<Motion>", self._on_motion)
+            tree.bind("<Leave>", self.hide)
+
+    def clear(self) -> None:
+        self.hide()
+        self._paths.clear()
+
+    def hide(self, _event: object | None = None) -> None:
+        if self._tooltip is not None:
+            self._tooltip.hide_tooltip()
+            self._tooltip = None
+        self._row = None
+
+    def _on_motion(self, event: tk.Event) -> None:
+        row = self.tree.identify_row(event.y)
+        if row == self._row:
+            return
+        self.hide()
+        if not row:
+            return
+        self._row = row
+        paths = self._paths.get(row)
+        if paths is None:
+            try:
+                paths = list(self.resolve_paths(row) or [])
+            except Exception:
+                paths = []
+            self._paths[row] = paths
+        if paths:
+            self._tooltip = ImageHoverTooltip(
+                self.tree, paths, delay=self.delay, max_size=self.max_size, bind=False
+            )
+            self._tooltip.show_tooltip()
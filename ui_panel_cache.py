@@ -0,0 +1,315 @@
+"""LRU cache of constructed panels in the main window's content area.
+
+Each cached panel lives in its own host frame inside the content
+container.  Switching panels only hides (``pack_forget``) the current host
+and shows the target one; a panel is built from scratch only on its first
+use or after it was evicted.  Hidden panels are kept up to ``max_panels``
+and ``max_widgets`` (total widget count – a proxy for memory); beyond that
+the least recently shown ones are destroyed.
+
+On show the cache compares the ``(mtime_ns, size)`` signature of the files
+the panel declared in ``watch`` with the one taken when it was last built.
+When the data changed (or :meth:`PanelCache.invalidate` was called) the
+panel's ``refresh()`` is called – the object returned by ``build`` or the
+``refresh`` argument – and only panels without one are rebuilt.
+
+Every switch is timed and reported as ``panel.switch.<key>`` in
+:mod:`core.metrics`; :meth:`PanelCache.stats` gives per-panel counters.
+
+Usage::
+
+    cache = PanelCache(content, max_panels=4, max_widgets=20000)
+    cache.show("magazyn", lambda host: open_panel(host),
+               watch=("data/magazyn",))
+    host = cache.show_transient()          # view that is never cached
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from core import metrics
+
+DEFAULT_MAX_PANELS = 4
+DEFAULT_MAX_WIDGETS = 20000
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+def data_signature(paths: Iterable[str]) -> Signature:
+    """``(path, mtime_ns, size)`` of files under ``paths`` (files or dirs)."""
+
+    out = []
+    for root in paths:
+        if os.path.isdir(root):
+            for base, dirs, files in os.walk(root):
+                dirs.sort()
+                for fname in sorted(files):
+                    path = os.path.join(base, fname)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    out.append((path, st.st_mtime_ns, st.st_size))
+        else:
+            try:
+                st = os.stat(root)
+            except OSError:
+                out.append((root, 0, -1))
+                continue
+            out.append((root, st.st_mtime_ns, st.st_size))
+    return tuple(out)
+
+
+def count_widgets(widget: Any) -> int:
+    """Number of widgets in the tree rooted at ``widget`` (iterative)."""
+
+    stack = [widget]
+    count = 0
+    while stack:
+        node = stack.pop()
+        count += 1
+        try:
+            stack.extend(node.winfo_children())
+        except Exception:
+            pass
+    return count
+
+
+def _default_host(container: Any) -> Any:
+    from tkinter import ttk
+
+    return ttk.Frame(container)
+
+
+def _alive(widget: Any) -> bool:
+    try:
+        return bool(widget.winfo_exists())
+    except Exception:
+        return False
+
+
+def _clear(widget: Any) -> None:
+    try:
+        children = list(widget.winfo_children())
+    except Exception:
+        return
+    for child in children:
+        try:
+            child.destroy()
+        except Exception:
+            pass
+
+
+class _Entry:
+    __slots__ = ("host", "build", "watch", "refresh", "signature", "dirty", "widgets")
+
+    def __init__(self, host: Any, build: Callable[[Any], Any], watch: Tuple[str, ...]) -> None:
+        self.host = host
+        self.build = build
+        self.watch = watch
+        self.refresh: Optional[Callable[[], Any]] = None
+        self.signature: Signature = ()
+        self.dirty = False
+        self.widgets = 0
+
+
+class PanelCache:
+    """Hidden panel frames kept alive between switches (LRU)."""
+
+    def __init__(
+        self,
+        container: Any,
+        *,
+        max_panels: int = DEFAULT_MAX_PANELS,
+        max_widgets: int = DEFAULT_MAX_WIDGETS,
+        make_host: Callable[[Any], Any] | None = None,
+    ) -> None:
+        self.container = container
+        self.max_panels = max(1, int(max_panels))
+        self.max_widgets = int(max_widgets)
+        self._make_host = make_host or _default_host
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._current: Optional[str] = None
+        self._transient: Any = None
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    # -- showing -----------------------------------------------------------
+    def show(
+        self,
+        key: str,
+        build: Callable[[Any], Any],
+        *,
+        watch: Iterable[str] = (),
+        refresh: Callable[[], Any] | None = None,
+    ) -> Any:
+        """Show panel ``key``, building it with ``build(host)`` when needed.
+
+        ``watch`` given on a later show replaces the stored list (paths may
+        depend on the config).  Returns the host frame.  Exceptions from
+        ``build``/``refresh`` propagate; the failed panel is dropped.
+        """
+
+        started = time.perf_counter()
+        entry = self._entries.get(key)
+        if entry is not None and not _alive(entry.host):
+            self._drop(key)
+            entry = None
+
+        self._hide_transient()
+        if self._current is not None and self._current != key:
+            current = self._entries.get(self._current)
+            if current is not None:
+                self._forget(current.host)
+        self._current = key
+
+        try:
+            if entry is None:
+                entry = _Entry(self._make_host(self.container), build, tuple(watch))
+                self._entries[key] = entry
+                self._pack(entry.host)
+                self._build(entry, refresh)
+                kind = "build"
+            else:
+                entry.build = build
+                if watch:
+                    # paths may follow the config; a new list means a new signature
+                    entry.watch = tuple(watch)
+                self._pack(entry.host)
+                kind = self._refresh_if_stale(entry, refresh)
+        except Exception:
+            self.evict(key)
+            raise
+        self._entries.move_to_end(key)
+        self._enforce_limits()
+
+        ms = (time.perf_counter() - started) * 1000
+        self._record(key, kind, ms, entry.widgets)
+        return entry.host
+
+    def show_transient(self) -> Any:
+        """Hide cached panels and return an empty frame for an uncached view."""
+
+        if self._current is not None:
+            current = self._entries.get(self._current)
+            if current is not None:
+                self._forget(current.host)
+            self._current = None
+        if self._transient is None or not _alive(self._transient):
+            self._transient = self._make_host(self.container)
+        else:
+            _clear(self._transient)
+        self._pack(self._transient)
+        return self._transient
+
+    # -- invalidation / eviction ---------------------------------------------
+    def invalidate(self, key: str | None = None) -> None:
+        """Mark ``key`` (or every panel) to be refreshed on its next show."""
+
+        for name, entry in self._entries.items():
+            if key is None or name == key:
+                entry.dirty = True
+
+    def evict(self, key: str) -> None:
+        entry = self._drop(key)
+        if entry is not None:
+            try:
+                entry.host.destroy()
+            except Exception:
+                pass
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self.evict(key)
+
+    def keys(self) -> Tuple[str, ...]:
+        """Cached panels, least recently shown first."""
+        return tuple(self._entries)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per panel: ``builds``, ``refreshes``, ``hits``, ``last_ms``, ``widgets``."""
+        return {k: dict(v) for k, v in self._stats.items()}
+
+    # -- internals -----------------------------------------------------------
+    def _build(self, entry: _Entry, refresh: Callable[[], Any] | None) -> None:
+        entry.signature = data_signature(entry.watch)
+        result = entry.build(entry.host)
+        candidate = refresh or getattr(result, "refresh", None)
+        entry.refresh = candidate if callable(candidate) else None
+        entry.dirty = False
+        entry.widgets = count_widgets(entry.host)
+
+    def _refresh_if_stale(self, entry: _Entry, refresh: Callable[[], Any] | None) -> str:
+        signature = data_signature(entry.watch) if entry.watch else entry.signature
+        if not entry.dirty and signature == entry.signature:
+            return "hit"
+        if refresh is not None:
+            entry.refresh = refresh
+        if entry.refresh is not None:
+            entry.signature = signature
+            entry.refresh()
+            entry.dirty = False
+            entry.widgets = count_widgets(entry.host)
+            return "refresh"
+        _clear(entry.host)
+        self._build(entry, refresh)
+        return "rebuild"
+
+    def _enforce_limits(self) -> None:
+        def over() -> bool:
+            if len(self._entries) > self.max_panels:
+                return True
+            total = sum(e.widgets for e in self._entries.values())
+            return self.max_widgets > 0 and total > self.max_widgets
+
+        for key in list(self._entries):
+            if not over():
+                break
+            if key == self._current:
+                continue
+            print(f"[WM-DBG][PANEL] cache: usuwam panel '{key}' (LRU)")
+            self.evict(key)
+
+    def _drop(self, key: str) -> Optional[_Entry]:
+        if self._current == key:
+            self._current = None
+        return self._entries.pop(key, None)
+
+    def _record(self, key: str, kind: str, ms: float, widgets: int) -> None:
+        st = self._stats.setdefault(
+            key, {"builds": 0, "refreshes": 0, "hits": 0, "last_ms": 0.0, "widgets": 0}
+        )
+        field = {"build": "builds", "rebuild": "builds", "refresh": "refreshes"}.get(kind, "hits")
+        st[field] += 1
+        st["last_ms"] = round(ms, 2)
+        st["widgets"] = widgets
+        metrics.observe(f"panel.switch.{key}", ms)
+        print(f"[WM-DBG][PANEL] {key}: {kind} {ms:.1f} ms ({widgets} widżetów)")
+
+    def _hide_transient(self) -> None:
+        if self._transient is not None and _alive(self._transient):
+            _clear(self._transient)
+            self._forget(self._transient)
+
+    @staticmethod
+    def _pack(host: Any) -> None:
+        host.pack(fill="both", expand=True)
+
+    @staticmethod
+    def _forget(host: Any) -> None:
+        try:
+            host.pack_forget()
+        except Exception:
+            pass
+
+
+__all__ = [
+    "DEFAULT_MAX_PANELS",
+    "DEFAULT_MAX_WIDGETS",
+    "PanelCache",
+    "count_widgets",
+    "data_signature",
+]
@@ -1,5 +1,10 @@
 """Warstwa stylów Warsztat Menager.
 
+Wersja 1.2.0 – style ttk i wpisy bazy opcji Tk liczone raz na paletę;
+nowe widżety dostają kolory z domyślnych klas (``option_add``) zamiast
+rekurencyjnego przechodzenia drzewa przy każdym ``Toplevel``. Pełne
+przemalowanie istniejących widżetów następuje tylko przy zmianie motywu.
+
 Wersja 1.1.1 – dodano strażnika `ensure_theme_applied` z obsługą logowania
 i importu wstecznie kompatybilnego.
 """
@@ -8,12 +13,18 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Mapping
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
 
 import tkinter as tk
 from tkinter import TclError, ttk
 
+from core import metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -143,7 +154,34 @@ def load_theme_name(config_path: Path) -> str:
     return DEFAULT_THEME
 
 
+_THEME_NAME_CACHE: Dict[str, Tuple[int, int, str]] = {}
+
+
+def _configured_theme_name(config_path: Path) -> str:
+    """:func:`load_theme_name` z pamięcią wg ``(mtime_ns, rozmiar)`` pliku.
+
+    Każdy nowy ``Toplevel`` pyta o motyw z configu – plik czytamy ponownie
+    dopiero, gdy się zmieni.
+    """
+
+    key = os.path.abspath(config_path)
+    try:
+        st = os.stat(key)
+        sig = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        sig = (0, -1)
+    known = _THEME_NAME_CACHE.get(key)
+    if known and known[:2] == sig:
+        return known[2]
+    name = load_theme_name(config_path)
+    _THEME_NAME_CACHE[key] = (sig[0], sig[1], name)
+    return name
+
+
+@lru_cache(maxsize=None)
 def _build_palette(name: str) -> Mapping[str, str]:
+    """Paleta semantyczna motywu ``name`` (wynik niezmienny, liczony raz)."""
+
     theme = THEMES[name]
     bg = theme.get("bg", "#111214")
     panel = theme.get("panel", theme.get("card", bg))
@@ -159,7 +197,7 @@ def _build_palette(name: str) -> Mapping[str, str]:
     entry_bd = theme.get("entry_bd", line)
     selection = theme.get("selection", accent_hover)
 
-    return {
+    return MappingProxyType({
         "bg": bg,
         "bg_alt": panel,
         "card": card,
@@ -175,7 +213,7 @@ def _build_palette(name: str) -> Mapping[str, str]:
         "selection": selection,
         "tab_active": theme.get("tab_active", accent),
         "tab_inactive": theme.get("tab_inactive", muted),
-    }
+    })
 
 
 def _apply_base_styles(style: ttk.Style, palette: Mapping[str, str]) -> None:
@@ -525,7 +563,67 @@ def _configure_wm_styles(
     style.configure("TSeparator", background=border)
 
 
+# Domyślne opcje klas klasycznych widżetów Tk, wpisywane do bazy opcji
+# (``*Klasa.zasób``) i używane przy przemalowaniu istniejącego drzewa.
+# Klucz ``"*"`` dotyczy pozostałych klas (dawniej ``_set_bg_recursive``
+# ustawiał ``bg`` na każdym widżecie, a ``fg`` na etykietach).
+_CLASS_RESOURCES: Tuple[Tuple[str, str, str], ...] = (
+    ("*", "background", "bg"),
+    ("Frame", "background", "bg"),
+    ("Toplevel", "background", "bg"),
+    ("Labelframe", "background", "bg"),
+    ("Canvas", "background", "bg"),
+    ("Label", "background", "bg"),
+    ("Label", "foreground", "fg"),
+    ("Text", "background", "bg_alt"),
+    ("Text", "foreground", "fg"),
+    ("Text", "insertBackground", "fg"),
+    ("Text", "selectBackground", "selection"),
+    ("Text", "selectForeground", "fg"),
+    ("Entry", "background", "entry_bg"),
+    ("Entry", "foreground", "entry_fg"),
+    ("Entry", "insertBackground", "fg"),
+    ("Entry", "selectBackground", "selection"),
+    ("Entry", "selectForeground", "fg"),
+)
+
+# ``*background`` ma niższy priorytet niż wpisy konkretnych klas.
+_GENERIC_PRIORITY = "widgetDefault"
+_CLASS_PRIORITY = "interactive"
+
+
+@lru_cache(maxsize=None)
+def _option_entries(name: str) -> Tuple[Tuple[str, str, str], ...]:
+    """Wpisy ``(wzorzec, wartość, priorytet)`` bazy opcji dla motywu ``name``."""
+
+    palette = _build_palette(name)
+    entries = []
+    for cls, resource, color in _CLASS_RESOURCES:
+        if cls == "*":
+            entries.append((f"*{resource}", palette[color], _GENERIC_PRIORITY))
+        else:
+            entries.append((f"*{cls}.{resource}", palette[color], _CLASS_PRIORITY))
+    return tuple(entries)
+
+
+@lru_cache(maxsize=None)
+def _class_options(name: str) -> Mapping[str, Mapping[str, str]]:
+    """``klasa Tk → {opcja configure: kolor}`` dla przemalowania drzewa."""
+
+    palette = _build_palette(name)
+    out: Dict[str, Dict[str, str]] = {}
+    for cls, resource, color in _CLASS_RESOURCES:
+        out.setdefault(cls, {})[resource.lower()] = palette[color]
+    return MappingProxyType({k: MappingProxyType(v) for k, v in out.items()})
+
+
 def _set_bg_recursive(widget: tk.Misc, palette: Mapping[str, str]) -> None:
+    """Dawny, rekurencyjny sposób kolorowania drzewa widżetów.
+
+    Nieużywany przez :func:`apply_theme`; zostawiony dla zgodności
+    i jako punkt odniesienia w ``scripts/bench_theme_apply.py``.
+    """
+
     bg = palette["bg"]
     fg = palette["fg"]
 
@@ -551,28 +649,94 @@ def _set_bg_recursive(widget: tk.Misc, palette: Mapping[str, str]) -> None:
         _set_bg_recursive(child, palette)
 
 
-def _apply_widget_options(root: tk.Misc, palette: Mapping[str, str]) -> None:
+def _apply_widget_options(root: tk.Misc, palette: Mapping[str, str] | str) -> None:
+    """Wpisuje domyślne kolory klas do bazy opcji interpretera ``root``.
+
+    ``palette`` to nazwa motywu (lub – dla zgodności – słownik palety,
+    wtedy nazwa jest wyszukiwana wśród znanych motywów).
+    """
+
+    name = palette if isinstance(palette, str) else _palette_name(palette)
+    for pattern, value, priority in _option_entries(name):
+        try:
+            root.option_add(pattern, value, priority)
+        except Exception:
+            pass
+
+
+def _palette_name(palette: Mapping[str, str]) -> str:
+    for name in THEMES:
+        if _build_palette(name) == palette:
+            return name
+    return DEFAULT_THEME
+
+
+def _configure_widget(widget: tk.Misc, name: str) -> None:
+    options = _class_options(name)
     try:
-        root.option_add("*Text.background", palette["bg_alt"])
-        root.option_add("*Text.foreground", palette["fg"])
-        root.option_add("*Text.insertBackground", palette["fg"])
-        root.option_add("*Text.selectBackground", palette["selection"])
-        root.option_add("*Text.selectForeground", palette["fg"])
+        opts = options.get(widget.winfo_class()) or options["*"]
+        widget.configure(**opts)
     except Exception:
         pass
 
+
+def _restyle_existing(root: tk.Misc, name: str) -> int:
+    """Przemalowuje istniejące klasyczne widżety Tk pod ``root``.
+
+    Iteracyjnie (bez rekurencji); widżety ``ttk`` są pomijane – biorą kolory
+    ze stylów. Zwraca liczbę odwiedzonych widżetów.
+    """
+
+    stack = [root]
+    count = 0
+    while stack:
+        widget = stack.pop()
+        count += 1
+        if not isinstance(widget, ttk.Widget):
+            _configure_widget(widget, name)
+        try:
+            stack.extend(widget.winfo_children())
+        except Exception:
+            pass
+    return count
+
+
+def _interp_root(widget: tk.Misc) -> tk.Misc:
     try:
-        root.option_add("*Entry.background", palette["entry_bg"])
-        root.option_add("*Entry.foreground", palette["entry_fg"])
-        root.option_add("*Entry.insertBackground", palette["fg"])
-        root.option_add("*Entry.selectBackground", palette["selection"])
-        root.option_add("*Entry.selectForeground", palette["fg"])
+        return widget._root()
     except Exception:
-        pass
+        return widget
 
 
 def apply_theme(target: tk.Misc | ttk.Style, *, scheme: str = DEFAULT_THEME) -> None:
-    """Aplikuje motyw do wskazanego widgetu lub obiektu ttk.Style."""
+    """Aplikuje motyw do wskazanego widgetu lub obiektu ttk.Style.
+
+    Style ttk i baza opcji są wspólne dla całego interpretera Tk, więc
+    konfigurowane są tylko przy pierwszym użyciu lub zmianie motywu
+    (wtedy też raz przemalowywane jest istniejące drzewo). Kolejne wywołania
+    z tym samym motywem ustawiają jedynie kolory samego ``target``.
+    """
+
+    started = time.perf_counter()
+    resolved_name = resolve_theme_name(scheme)
+    if resolved_name not in THEMES:
+        print(
+            f"[WM-DBG][THEME] Motyw '{resolved_name}' nieznany, przełączam na 'default'"
+        )
+        resolved_name = DEFAULT_THEME
+
+    root: tk.Misc | None
+    if isinstance(target, ttk.Style):
+        root = getattr(target, "master", None)
+    else:
+        root = target
+
+    interp = _interp_root(root) if isinstance(root, tk.Misc) else None
+    if interp is not None and getattr(interp, "_wm_theme_name", None) == resolved_name:
+        if not isinstance(root, ttk.Widget):
+            _configure_widget(root, resolved_name)
+        metrics.observe("theme.apply_cached", (time.perf_counter() - started) * 1000)
+        return
 
     try:
         style = target if isinstance(target, ttk.Style) else ttk.Style(target)
@@ -585,30 +749,23 @@ def apply_theme(target: tk.Misc | ttk.Style, *, scheme: str = DEFAULT_THEME) ->
     except TclError:
         logger.debug("Styl 'clam' jest niedostępny – pozostawiam bieżący motyw ttk")
 
-    resolved_name = resolve_theme_name(scheme)
-    if resolved_name not in THEMES:
-        print(
-            f"[WM-DBG][THEME] Motyw '{resolved_name}' nieznany, przełączam na 'default'"
-        )
-        resolved_name = DEFAULT_THEME
-
     palette = _build_palette(resolved_name)
     _apply_base_styles(style, palette)
     _configure_wm_styles(style, THEMES[resolved_name], palette)
 
-    root: tk.Misc | None
-    if isinstance(target, ttk.Style):
-        root = getattr(target, "master", None)
-    else:
-        root = target
-
     if root is None:
         root = getattr(style, "master", None)
 
     if isinstance(root, tk.Misc):
-        _set_bg_recursive(root, palette)
-        _apply_widget_options(root, palette)
+        interp = _interp_root(root)
+        _apply_widget_options(interp, resolved_name)
+        _restyle_existing(interp, resolved_name)
+        try:
+            interp._wm_theme_name = resolved_name
+        except Exception:
+            pass
 
+    metrics.observe("theme.apply", (time.perf_counter() - started) * 1000)
     print(f"[WM-DBG][THEME] Zastosowano motyw: {resolved_name}")
 
 
@@ -622,7 +779,7 @@ def apply_theme_safe(
 
     try:
         path = config_path or CONFIG_FILE
-        theme_name = scheme or load_theme_name(path)
+        theme_name = scheme or _configured_theme_name(path)
         theme_name = resolve_theme_name(theme_name)
 
         style_or_widget: tk.Misc | ttk.Style
@@ -642,12 +799,13 @@ def apply_theme_tree(
     *,
     config_path: Path | None = None,
 ) -> None:
-    """Zastosuj motyw dla podanego widgetu i całego jego drzewa potomków."""
+    """Zastosuj motyw dla podanego widgetu i całego jego drzewa potomków.
+
+    Potomkowie dostają kolory z bazy opcji (nowe widżety) albo z jednorazowego
+    przemalowania przy zmianie motywu – ponowne wywołania nie przechodzą drzewa.
+    """
 
     apply_theme_safe(widget, scheme=scheme, config_path=config_path)
-    if hasattr(widget, "winfo_children"):
-        for child in widget.winfo_children():
-            apply_theme_tree(child, scheme=scheme, config_path=config_path)
 
 
 # ===== Kolory magazynu (używane przez gui_magazyn) =====
@@ -0,0 +1,354 @@
+"""Virtualized ``ttk.Treeview`` for large tables with in-memory filtering.
+
+:class:`RowStore` keeps the table data in memory with a precomputed
+lowercase search blob per row and narrows the previous result when the
+query is only extended (typing).  :class:`VirtualTreeview` materializes
+only as many Treeview rows as fit in the widget and reuses their ids while
+scrolling – rows whose content did not change are not touched.
+
+Usage::
+
+    store = RowStore(format_row=_format_row, search_text=_blob, tags=_tags)
+    store.load(pairs)                      # [(key, item), ...]
+    view = VirtualTreeview(tree, vsb)
+    view.bind_store(store)
+    view.set_keys(store.filter("śruba"))   # or view.schedule(...) (debounce)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Sequence
+
+FILTER_DEBOUNCE_MS = 150
+DEFAULT_ROW_HEIGHT = 20
+
+
+class RowStore:
+    """Rows of a table with cached formatted values, tags and search blobs.
+
+    ``format_row(key, item)`` returns the Treeview ``values`` tuple,
+    ``search_text(key, item)`` the text searched by :meth:`filter` (it is
+    lowercased once on load) and optional ``tags(key, item)`` the row tags.
+    Values and tags are computed lazily – only for rows that get displayed.
+    """
+
+    def __init__(
+        self,
+        format_row: Callable[[Hashable, Any], Sequence[Any]],
+        search_text: Callable[[Hashable, Any], str],
+        tags: Callable[[Hashable, Any], Sequence[str]] | None = None,
+    ) -> None:
+        self._format_row = format_row
+        self._search_text = search_text
+        self._tags = tags
+        self.keys: List[Hashable] = []
+        self._items: Dict[Hashable, Any] = {}
+        self._blobs: Dict[Hashable, str] = {}
+        self._values: Dict[Hashable, tuple] = {}
+        self._row_tags: Dict[Hashable, tuple] = {}
+        self._last: tuple[str, Hashable, List[Hashable]] | None = None
+
+    def load(self, pairs: Iterable[tuple[Hashable, Any]]) -> None:
+        """Replace all rows (order of ``pairs`` is the display order)."""
+
+        self.keys = []
+        self._items = {}
+        self._blobs = {}
+        self._values = {}
+        self._row_tags = {}
+        self._last = None
+        for key, item in pairs:
+            self.keys.append(key)
+            self._items[key] = item
+            self._blobs[key] = str(self._search_text(key, item) or "").lower()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def item(self, key: Hashable) -> Any:
+        return self._items.get(key)
+
+    def values(self, key: Hashable) -> tuple:
+        vals = self._values.get(key)
+        if vals is None:
+            vals = self._values[key] = tuple(self._format_row(key, self._items[key]))
+        return vals
+
+    def tags(self, key: Hashable) -> tuple:
+        if self._tags is None:
+            return ()
+        tags = self._row_tags.get(key)
+        if tags is None:
+            tags = self._row_tags[key] = tuple(self._tags(key, self._items[key]) or ())
+        return tags
+
+    def filter(
+        self,
+        query: str = "",
+        predicate: Callable[[Hashable, Any], bool] | None = None,
+        predicate_id: Hashable = None,
+    ) -> List[Hashable]:
+        """Return keys whose blob contains ``query`` (substring, case-insensitive).
+
+        ``predicate`` is an extra filter; pass a hashable ``predicate_id``
+        describing it (e.g. the selected type) so that a query extending
+        the previous one can narrow the previous result instead of scanning
+        all rows.
+        """
+
+        q = (query or "").strip().lower()
+        base: Iterable[Hashable] = self.keys
+        last = self._last
+        if (
+            last is not None
+            and last[1] == predicate_id
+            and q.startswith(last[0])
+            and (predicate is None or predicate_id is not None)
+        ):
+            if q == last[0]:
+                return list(last[2])
+            base = last[2]
+            if predicate_id is not None:
+                predicate = None  # already applied to the previous result
+        blobs = self._blobs
+        items = self._items
+        out = [
+            key
+            for key in base
+            if (not q or q in blobs[key])
+            and (predicate is None or predicate(key, items[key]))
+        ]
+        self._last = (q, predicate_id, out)
+        return list(out)
+
+
+class VirtualTreeview:
+    """Shows a long list of :class:`RowStore` keys in a fixed set of rows.
+
+    Only the rows visible in ``tree`` exist as Treeview items; scrolling
+    rewrites their values in place.  The selection follows the row key, use
+    :meth:`selected_key` instead of ``tree.selection()`` when the selected
+    row may be scrolled out of view.
+    """
+
+    def __init__(
+        self,
+        tree: Any,
+        scrollbar: Any | None = None,
+        *,
+        debounce_ms: int = FILTER_DEBOUNCE_MS,
+    ) -> None:
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.debounce_ms = debounce_ms
+        self.store: RowStore | None = None
+        self.keys: List[Hashable] = []
+        self.offset = 0
+        self._slots: List[str] = []
+        self._shown: List[tuple | None] = []
+        self._slot_count = int(_option(tree, "height", 0) or 0) or 20
+        self._row_height = 0
+        self._selected: Hashable = None
+        self._after_id: Any = None
+
+        if scrollbar is not None:
+            scrollbar.configure(command=self.yview)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tree.bind(seq, self._on_wheel, add="+")
+        tree.bind("<Configure>", self._on_configure, add="+")
+        tree.bind("<<TreeviewSelect>>", self._on_select, add="+")
+        tree.bind("<Up>", lambda _e: self._step(-1), add="+")
+        tree.bind("<Down>", lambda _e: self._step(1), add="+")
+        tree.bind("<Prior>", lambda _e: self._step(-self._slot_count), add="+")
+        tree.bind("<Next>", lambda _e: self._step(self._slot_count), add="+")
+
+    # ----- data -----
+    def bind_store(self, store: RowStore) -> None:
+        self.store = store
+        self._shown = [None] * len(self._slots)
+
+    def set_keys(self, keys: Sequence[Hashable], keep_position: bool = False) -> None:
+        """Show ``keys`` (e.g. a filter result) from the top.
+
+        With ``keep_position`` the scroll offset is kept (reload of the
+        same list, e.g. after editing a row).
+        """
+
+        self.keys = list(keys)
+        if self._selected not in self.keys:
+            # filtered out: a stale key would act on a row the user can't see
+            self._selected = None
+        offset = self.offset if keep_position else 0
+        self.offset = max(0, min(offset, len(self.keys) - self._slot_count))
+        self._render()
+
+    def refresh_rows(self) -> None:
+        """Redraw visible rows (after the store was reloaded)."""
+
+        self._shown = [None] * len(self._slots)
+        self._render()
+
+    def schedule(self, compute: Callable[[], Sequence[Hashable]]) -> None:
+        """Debounce: run ``compute`` after ``debounce_ms`` and show its keys.
+
+        Repeated calls within the delay (typing) restart the timer.
+        """
+
+        if self._after_id is not None:
+            try:
+                self.tree.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = self.tree.after(self.debounce_ms, self._run_scheduled, compute)
+
+    def _run_scheduled(self, compute: Callable[[], Sequence[Hashable]]) -> None:
+        self._after_id = None
+        self.set_keys(compute())
+
+    # ----- selection -----
+    def selected_key(self) -> Hashable:
+        return self._selected
+
+    def select_key(self, key: Hashable) -> None:
+        self._selected = key
+        if key in self.keys:
+            idx = self.keys.index(key)
+            if not self.offset <= idx < self.offset + self._slot_count:
+                self.offset = max(0, min(idx, len(self.keys) - self._slot_count))
+        self._render()
+
+    def select_at(self, y: int) -> Hashable:
+        """Select the row under widget coordinate ``y`` (e.g. right click).
+
+        Returns its key, or ``None`` when ``y`` is not over a row.
+        """
+
+        iid = self.tree.identify_row(y)
+        try:
+            idx = self.offset + self._slots.index(iid)
+        except ValueError:
+            return None
+        if idx >= len(self.keys):
+            return None
+        self.select_key(self.keys[idx])
+        return self._selected
+
+    def _on_select(self, _event: Any = None) -> None:
+        sel = self.tree.selection()
+        if not sel:
+            return
+        try:
+            slot = self._slots.index(sel[0])
+        except ValueError:
+            return
+        idx = self.offset + slot
+        if idx < len(self.keys):
+            self._selected = self.keys[idx]
+
+    # ----- scrolling -----
+    def yview(self, *args: Any) -> None:
+        """Scrollbar command (``moveto`` / ``scroll N units|pages``)."""
+
+        total = len(self.keys)
+        if not args or not total:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and str(args[2]).startswith("page"):
+                step *= max(1, self._slot_count - 1)
+            self.scroll_to(self.offset + step)
+
+    def scroll_to(self, offset: int) -> None:
+        offset = max(0, min(offset, len(self.keys) - self._slot_count))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def _on_wheel(self, event: Any) -> str:
+        num = getattr(event, "num", 0)
+        delta = getattr(event, "delta", 0)
+        if num == 4 or delta > 0:
+            self.scroll_to(self.offset - 3)
+        elif num == 5 or delta < 0:
+            self.scroll_to(self.offset + 3)
+        return "break"
+
+    def _step(self, step: int) -> str | None:
+        """Keyboard navigation past the first/last materialized row."""
+
+        if not self.keys:
+            return None
+        cur = self.keys.index(self._selected) if self._selected in self.keys else self.offset - 1
+        idx = max(0, min(len(self.keys) - 1, cur + step))
+        self.select_key(self.keys[idx])
+        return "break"
+
+    def _on_configure(self, _event: Any = None) -> None:
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return
+        header = 0
+        if self._slots:
+            bbox = self.tree.bbox(self._slots[0])
+            if bbox:
+                header, self._row_height = bbox[1], bbox[3]
+        row_h = self._row_height or DEFAULT_ROW_HEIGHT
+        count = max(1, (height - header) // row_h)
+        if count != self._slot_count:
+            self._slot_count = count
+            self.offset = max(0, min(self.offset, len(self.keys) - count))
+            self._render()
+
+    # ----- rendering -----
+    def _render(self) -> None:
+        tree = self.tree
+        store = self.store
+        visible = self.keys[self.offset : self.offset + self._slot_count]
+
+        while len(self._slots) > len(visible):
+            tree.delete(self._slots.pop())
+            self._shown.pop()
+        selected_iid = None
+        for slot, key in enumerate(visible):
+            values = store.values(key) if store is not None else (key,)
+            tags = store.tags(key) if store is not None else ()
+            row = (values, tags)
+            if slot < len(self._slots):
+                iid = self._slots[slot]
+                if self._shown[slot] != row:
+                    tree.item(iid, values=values, tags=tags)
+                    self._shown[slot] = row
+            else:
+                iid = tree.insert("", "end", values=values, tags=tags)
+                self._slots.append(iid)
+                self._shown.append(row)
+            if key == self._selected:
+                selected_iid = iid
+
+        current = tuple(tree.selection())
+        wanted = (selected_iid,) if selected_iid is not None else ()
+        if current != wanted:
+            tree.selection_set(wanted)
+            if selected_iid is not None:
+                tree.focus(selected_iid)
+        if self.scrollbar is not None:
+            total = len(self.keys)
+            if total:
+                self.scrollbar.set(
+                    self.offset / total,
+                    min(1.0, (self.offset + len(visible)) / total),
+                )
+            else:
+                self.scrollbar.set(0.0, 1.0)
+
+
+def _option(widget: Any, name: str, default: Any = None) -> Any:
+    try:
+        return widget.cget(name)
+    except Exception:
+        return default
+
+
+__all__ = ["FILTER_DEBOUNCE_MS", "RowStore", "VirtualTreeview"]
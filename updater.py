@@ -1,5 +1,9 @@
-# Wersja pliku: 1.2.3
+# Wersja pliku: 1.3.0
 # Plik: updater.py
+# Zmiany 1.3.0 (2026-10-19):
+# - Import ZIP podmienia tylko pliki o innej zawartości (manifest sum w paczce
+#   albo CRC32 z katalogu ZIP), przez katalog staging + os.replace, z czasami etapów
+# - Restore kopiuje tylko pliki różniące się od bieżących
 # Zmiany 1.2.3 (2025-08-18):
 # - Wymuszenie ciemnego tła dla TFrame i TLabelframe (spójny theme w całej zakładce)
 # - Zachowane: Git pull, update z .zip (z backupem), restore z backups/,
@@ -8,8 +12,12 @@
 
 import os
 import sys
-import re
+import json
+import time
 import shutil
+import hashlib
+import zlib
+import threading
 import zipfile
 import subprocess
 import traceback
@@ -19,7 +27,7 @@ from typing import Optional
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from utils import error_dialogs
+from utils import error_dialogs, version_index
 
 from config_manager import ConfigManager
 
@@ -80,8 +88,20 @@ def _backup_files(file_list, stamp):
                 )
     return dest_root
 
+def _same_content(a: Path, b: Path) -> bool:
+    try:
+        if a.stat().st_size != b.stat().st_size:
+            return False
+        return _file_digests(a)[0] == _file_digests(b)[0]
+    except OSError:
+        return False
+
 def _restore_backup(stamp: str):
-    """Przywraca backup o podanym znaczniku czasu."""
+    """Przywraca backup o podanym znaczniku czasu.
+
+    Kopiowane są tylko pliki różniące się od bieżących (rozmiar, sha256);
+    każdy zapis idzie przez plik tymczasowy + ``os.replace``.
+    """
     src_root = BACKUP_DIR / stamp
     if not src_root.exists():
         raise FileNotFoundError(f"Backup {stamp} nie istnieje.")
@@ -91,47 +111,224 @@ def _restore_backup(stamp: str):
             src_file = Path(root) / f
             rel_path = src_file.relative_to(src_root)
             dst_file = Path(rel_path)
+            if _same_content(src_file, dst_file):
+                continue
             dst_file.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(src_file, dst_file)
+            tmp = dst_file.with_name(dst_file.name + f".restore-{stamp}.tmp")
+            shutil.copy2(src_file, tmp)
+            os.replace(tmp, dst_file)
             restored.append(str(rel_path))
     _write_log(stamp, "[RESTORE] Przywrócono:\n" + "\n".join(restored), kind="restore")
     return restored
 
 def _list_backups():
     _ensure_dirs()
-    return sorted([d.name for d in BACKUP_DIR.iterdir() if d.is_dir()])
+    return sorted([d.name for d in BACKUP_DIR.iterdir() if d.is_dir() and not d.name.startswith(".")])
 
 # --- update methods ---
 
-def _extract_zip_overwrite(zip_path: Path, stamp: str):
-    """Rozpakowuje ZIP nadpisując istniejące pliki. Tworzy backup tylko nadpisywanych."""
-    changed = []
-    with zipfile.ZipFile(zip_path, "r") as zf:
-        for zi in zf.infolist():
-            if zi.is_dir():
-                continue
-            rel_path = Path(zi.filename)
-            # bezpieczeństwo: nie pozwól wychodzić ponad katalog
-            if ".." in rel_path.parts:
-                continue
-            changed.append(str(rel_path))
+# --- delta ZIP ---
+
+ZIP_MANIFEST = "wm_manifest.json"       # {"files": {"ścieżka": {"sha256": ..., "size": ...}}}
+LOCAL_MANIFEST_NAME = "files_manifest.json"
+LAST_APPLY_STATS: dict = {}
 
-    _backup_files(changed, stamp)
+def _local_manifest_path() -> Path:
+    return BACKUP_DIR / LOCAL_MANIFEST_NAME
 
+def _load_local_manifest() -> dict:
+    try:
+        with open(_local_manifest_path(), encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_local_manifest(manifest: dict) -> None:
+    _ensure_dirs()
+    path = _local_manifest_path()
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def _file_digests(path: Path):
+    """(sha256, crc32) zawartości pliku – jeden odczyt."""
+    h = hashlib.sha256()
+    crc = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+            crc = zlib.crc32(block, crc)
+    return h.hexdigest(), crc
+
+def _local_digests(rel: str, manifest: dict):
+    """Sumy lokalnego pliku; z manifestu, jeśli (rozmiar, mtime) się nie zmienił."""
+    p = Path(rel)
+    try:
+        st = p.stat()
+    except OSError:
+        manifest.pop(rel, None)
+        return None
+    entry = manifest.get(rel)
+    if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+        return entry[0], entry[2], entry[3]
+    sha, crc = _file_digests(p)
+    manifest[rel] = [st.st_size, st.st_mtime_ns, sha, crc]
+    return st.st_size, sha, crc
+
+def _zip_members(zf: zipfile.ZipFile):
+    for zi in zf.infolist():
+        if zi.is_dir() or zi.filename == ZIP_MANIFEST:
+            continue
+        rel_path = Path(zi.filename)
+        # bezpieczeństwo: nie pozwól wychodzić ponad katalog
+        if ".." in rel_path.parts or rel_path.is_absolute():
+            continue
+        yield zi, rel_path
+
+def write_zip_manifest(zip_path: Path) -> int:
+    """Dopisuje ``wm_manifest.json`` (sha256 i rozmiar plików) do paczki ZIP."""
+    files = {}
     with zipfile.ZipFile(zip_path, "r") as zf:
-        for zi in zf.infolist():
-            if zi.is_dir():
-                continue
-            rel_path = Path(zi.filename)
-            if ".." in rel_path.parts:
-                continue
-            rel_path.parent.mkdir(parents=True, exist_ok=True)
-            with zf.open(zi, "r") as src, open(rel_path, "wb") as dst:
-                shutil.copyfileobj(src, dst)
+        if ZIP_MANIFEST in zf.namelist():
+            raise ValueError(f"Paczka zawiera już {ZIP_MANIFEST}")
+        for zi, rel_path in _zip_members(zf):
+            h = hashlib.sha256()
+            with zf.open(zi, "r") as src:
+                for block in iter(lambda: src.read(1 << 20), b""):
+                    h.update(block)
+            files[rel_path.as_posix()] = {"sha256": h.hexdigest(), "size": zi.file_size}
+    with zipfile.ZipFile(zip_path, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(ZIP_MANIFEST, json.dumps({"files": files}, ensure_ascii=False, indent=1))
+    return len(files)
+
+def _extract_zip_overwrite(zip_path: Path, stamp: str, stats: Optional[dict] = None):
+    """Rozpakowuje ZIP nadpisując tylko pliki o innej zawartości.
+
+    Porównanie: sha256 z ``wm_manifest.json`` w paczce (jeśli jest), inaczej
+    CRC32 i rozmiar z katalogu ZIP – w obu przypadkach bez rozpakowywania
+    niezmienionych plików. Lokalne sumy trzymane są w ``backups/files_manifest.json``
+    i liczone ponownie tylko dla plików o zmienionym (rozmiar, mtime).
+
+    Zmienione pliki trafiają najpierw do ``backups/.staging-<stamp>``, potem
+    robiony jest backup nadpisywanych, a na końcu każdy plik podmieniany jest
+    przez ``os.replace``. Przerwaną aktualizację wystarczy uruchomić ponownie –
+    pliki już podmienione nie różnią się i zostaną pominięte.
+    Zwraca listę podmienionych plików; czasy etapów trafiają do ``stats``.
+    """
+    t0 = time.perf_counter()
+    local = _load_local_manifest()
+    changed = []
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        try:
+            remote = json.loads(zf.read(ZIP_MANIFEST)).get("files", {})
+        except (KeyError, ValueError, AttributeError):
+            remote = {}
+        members = list(_zip_members(zf))
+        todo = []
+        for zi, rel_path in members:
+            rel = rel_path.as_posix()
+            have = _local_digests(rel, local)
+            want = remote.get(rel)
+            if have is not None:
+                if want and want.get("sha256"):
+                    if have[0] == want.get("size", zi.file_size) and have[1] == want["sha256"]:
+                        continue
+                elif have[0] == zi.file_size and have[2] == zi.CRC:
+                    continue
+            todo.append((zi, rel_path, want))
+        t_scan = time.perf_counter()
+
+        staging = BACKUP_DIR / f".staging-{stamp}"
+        if todo:
+            staging.mkdir(parents=True, exist_ok=True)
+        for zi, rel_path, want in todo:
+            staged = staging / rel_path
+            staged.parent.mkdir(parents=True, exist_ok=True)
+            h = hashlib.sha256()
+            with zf.open(zi, "r") as src, open(staged, "wb") as dst:
+                for block in iter(lambda: src.read(1 << 20), b""):
+                    dst.write(block)
+                    h.update(block)
+            if want and want.get("sha256") and h.hexdigest() != want["sha256"]:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise ValueError(f"Suma kontrolna {rel_path} nie zgadza się z manifestem paczki")
+        t_extract = time.perf_counter()
+
+    _backup_files([str(rel_path) for _zi, rel_path, _w in todo], stamp)
+    for _zi, rel_path, _want in todo:
+        rel_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staging / rel_path, rel_path)
+        _local_digests(rel_path.as_posix(), local)
+        changed.append(str(rel_path))
+    if todo:
+        shutil.rmtree(staging, ignore_errors=True)
+    _save_local_manifest(local)
+    t_end = time.perf_counter()
+
+    LAST_APPLY_STATS.clear()
+    LAST_APPLY_STATS.update(
+        total=len(members),
+        changed=len(changed),
+        scan_s=round(t_scan - t0, 3),
+        extract_s=round(t_extract - t_scan, 3),
+        swap_s=round(t_end - t_extract, 3),
+    )
+    if stats is not None:
+        stats.update(LAST_APPLY_STATS)
     return changed
 
 
-def _git_has_updates(cwd: Path) -> bool:
+def _git_check_updates(cwd: Path, timeout: Optional[float] = None) -> bool:
+    """Właściwe sprawdzenie zdalnych commitów; błędy są propagowane.
+
+    ``timeout`` (w sekundach) ogranicza każde wywołanie ``git``.
+    """
+    # ustalenie bieżącej gałęzi
+    proc_branch = subprocess.run(
+        ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+        timeout=timeout,
+    )
+    branch = proc_branch.stdout.strip()
+
+    if not remote_branch_exists("origin", branch, cwd, timeout=timeout):
+        _write_log(
+            _now_stamp(),
+            f"[WARN] remote branch origin/{branch} not found; skipping update check",
+        )
+        return False
+
+    # aktualizacja odniesień zdalnych
+    subprocess.run(
+        ["git", "fetch"],
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+        timeout=timeout,
+    )
+
+    # sprawdzenie różnic między HEAD a origin/<branch>
+    proc_rev = subprocess.run(
+        ["git", "rev-list", f"HEAD..origin/{branch}"],
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+        timeout=timeout,
+    )
+    return bool(proc_rev.stdout.strip())
+
+
+def _git_has_updates(cwd: Path, timeout: Optional[float] = None) -> bool:
     """Sprawdza, czy zdalne repozytorium zawiera nowe commity.
 
     Wykonuje ``git fetch`` oraz ``git rev-list HEAD..origin/<branch>``.
@@ -140,57 +337,127 @@ def _git_has_updates(cwd: Path) -> bool:
     zapisuje informację do logu.
     """
     try:
-        # ustalenie bieżącej gałęzi
-        proc_branch = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True,
+        return _git_check_updates(cwd, timeout=timeout)
+    except Exception as e:
+        stderr = getattr(e, "stderr", None)
+        _write_log(
+            _now_stamp(),
+            f"[WARN] git update check failed: {e}",
+            stderr=stderr,
+            tb=traceback.format_exc(),
         )
-        branch = proc_branch.stdout.strip()
+        return False
 
-        if not remote_branch_exists("origin", branch, cwd):
-            _write_log(
-                _now_stamp(),
-                f"[WARN] remote branch origin/{branch} not found; skipping update check",
-            )
-            return False
 
-        # aktualizacja odniesień zdalnych
-        subprocess.run(
-            ["git", "fetch"],
-            cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True,
-        )
+# --- cache sprawdzania aktualizacji (start w tle) ---
 
-        # sprawdzenie różnic między HEAD a origin/<branch>
-        proc_rev = subprocess.run(
-            ["git", "rev-list", f"HEAD..origin/{branch}"],
-            cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True,
-        )
-        return bool(proc_rev.stdout.strip())
+UPDATE_CHECK_FILE = Path("data") / "update_check.json"
+UPDATE_CHECK_INTERVAL_H = 6.0
+UPDATE_CHECK_TIMEOUT_S = 20.0
+UPDATE_PULL_TIMEOUT_S = 120.0
+
+
+def _load_update_check() -> dict:
+    try:
+        with open(UPDATE_CHECK_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_update_check(available: bool) -> None:
+    data = {"checked_at": time.time(), "available": bool(available)}
+    try:
+        UPDATE_CHECK_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = UPDATE_CHECK_FILE.with_name(UPDATE_CHECK_FILE.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, UPDATE_CHECK_FILE)
+    except OSError as e:
+        _write_log(_now_stamp(), f"[WARN] update check cache write failed: {e}")
+
+
+def cached_update_status(
+    max_age_hours: float = UPDATE_CHECK_INTERVAL_H,
+) -> Optional[bool]:
+    """Zwraca zapamiętany wynik sprawdzenia aktualizacji.
+
+    ``None`` oznacza brak wpisu lub wpis starszy niż ``max_age_hours``.
+    """
+    data = _load_update_check()
+    checked_at = data.get("checked_at")
+    if not isinstance(checked_at, (int, float)):
+        return None
+    age = time.time() - checked_at
+    if age < 0 or age > max_age_hours * 3600:
+        return None
+    return bool(data.get("available"))
+
+
+def git_has_updates_cached(
+    cwd: Path,
+    max_age_hours: float = UPDATE_CHECK_INTERVAL_H,
+    timeout: Optional[float] = UPDATE_CHECK_TIMEOUT_S,
+    force: bool = False,
+) -> bool:
+    """Jak :func:`_git_has_updates`, ale z zapamiętaniem wyniku na dysku.
+
+    Jeśli ostatnie sprawdzenie jest młodsze niż ``max_age_hours``, Git nie
+    jest wywoływany. Nieudane sprawdzenie (np. przekroczony ``timeout``) nie
+    jest zapamiętywane, więc kolejny start spróbuje ponownie.
+    """
+    if not force:
+        cached = cached_update_status(max_age_hours)
+        if cached is not None:
+            return cached
+    try:
+        available = _git_check_updates(cwd, timeout=timeout)
     except Exception as e:
-        stderr = getattr(e, "stderr", None)
         _write_log(
             _now_stamp(),
             f"[WARN] git update check failed: {e}",
-            stderr=stderr,
+            stderr=getattr(e, "stderr", None),
             tb=traceback.format_exc(),
         )
         return False
+    _save_update_check(available)
+    return available
+
+
+def check_updates_in_background(
+    cwd: Path,
+    callback,
+    max_age_hours: float = UPDATE_CHECK_INTERVAL_H,
+    timeout: Optional[float] = UPDATE_CHECK_TIMEOUT_S,
+    force: bool = False,
+) -> threading.Thread:
+    """Uruchamia :func:`git_has_updates_cached` w wątku w tle.
+
+    ``callback(available)`` jest wołany z wątku roboczego – kod GUI powinien
+    przekazać wynik do pętli Tk przez ``after``.
+    """
 
+    def _worker():
+        available = git_has_updates_cached(
+            cwd, max_age_hours=max_age_hours, timeout=timeout, force=force
+        )
+        try:
+            callback(available)
+        except Exception as e:
+            _write_log(
+                _now_stamp(),
+                f"[WARN] update check callback failed: {e}",
+                tb=traceback.format_exc(),
+            )
 
-def _run_git_pull(cwd: Path, stamp: str):
-    """Wykonuje git pull w katalogu aplikacji."""
+    thread = threading.Thread(target=_worker, name="wm-update-check", daemon=True)
+    thread.start()
+    return thread
+
+
+def _run_git_pull(cwd: Path, stamp: str, timeout: Optional[float] = UPDATE_PULL_TIMEOUT_S):
+    """Wykonuje git pull w katalogu aplikacji (najdłużej ``timeout`` s)."""
     cmd = ["git", "pull"]
     try:
         result = subprocess.run(
@@ -200,6 +467,7 @@ def _run_git_pull(cwd: Path, stamp: str):
             stderr=subprocess.PIPE,
             text=True,
             check=True,
+            timeout=timeout,
         )
         _write_log(
             stamp,
@@ -207,6 +475,8 @@ def _run_git_pull(cwd: Path, stamp: str):
             kind="update",
             stderr=result.stderr or None,
         )
+        # po udanym pull zapamiętany wynik sprawdzenia jest nieaktualny
+        _save_update_check(False)
         return result.stdout
     except subprocess.CalledProcessError as e:
         _write_log(
@@ -223,41 +493,33 @@ def _run_git_pull(cwd: Path, stamp: str):
                 "Zapisz lub odrzuć je przed aktualizacją."
             )
         raise RuntimeError(f"git pull failed: {e.stderr.strip()}")
+    except subprocess.TimeoutExpired as e:
+        _write_log(
+            stamp,
+            f"[GIT PULL] przekroczono limit czasu ({timeout} s)",
+            kind="update",
+            tb=traceback.format_exc(),
+        )
+        raise RuntimeError(f"git pull: przekroczono limit czasu ({timeout} s)") from e
 
 # --- version scanner ---
 
 _SKIP_DIRS = {".git", "__pycache__", "venv", ".venv", "logs", "backups", "dist", "build", ".idea", ".vscode"}
-_RX_VERSION = re.compile(r"^#\s*Wersja pliku:\s*(.+)$", re.M)
-
-def _iter_python_files(root: Path):
-    """Rekurencyjnie iteruje po .py z pominięciem katalogów ze _SKIP_DIRS."""
-    for base, dirs, files in os.walk(root):
-        dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
-        for fname in files:
-            if fname.endswith(".py"):
-                yield Path(base) / fname
-
-def _read_head(path: Path, max_chars: int = 4000) -> str:
-    """Czyta tylko początek pliku (dla szybkości)."""
-    try:
-        with open(path, "r", encoding="utf-8", errors="replace") as f:
-            return f.read(max_chars)
-    except OSError:
-        return ""
 
 def _scan_versions(start_dir: Path = Path(".")):
-    """Zwraca listę (plik, wersja) dla wszystkich .py z nagłówkiem '# Wersja pliku:'."""
+    """Zwraca listę (plik, wersja) dla wszystkich .py z nagłówkiem '# Wersja pliku:'.
+
+    Nagłówki pochodzą ze wspólnego indeksu ``utils.version_index`` – po
+    pierwszym skanie czytane są tylko pliki o zmienionym (mtime, rozmiar).
+    """
     entries = []
-    for p in _iter_python_files(start_dir.resolve()):
-        head = _read_head(p)
-        m = _RX_VERSION.search(head)
-        if m:
-            ver = m.group(1).strip()
-            try:
-                rel = p.relative_to(Path.cwd())
-            except ValueError:
-                rel = p
-            entries.append((str(rel).replace("\\", "/"), ver))
+    for p, ver in version_index.get_index().scan(start_dir.resolve(), skip_dirs=_SKIP_DIRS):
+        p = Path(p)
+        try:
+            rel = p.relative_to(Path.cwd())
+        except ValueError:
+            rel = p
+        entries.append((str(rel).replace("\\", "/"), ver))
     # sort: najpierw pliki w katalogu głównym, potem alfabetycznie
     entries.sort(key=lambda t: (t[0].count("/"), t[0].lower()))
     return entries
@@ -556,13 +818,22 @@ class UpdatesUI(ttk.Frame):
         stamp = _now_stamp()
         try:
             self._append_out(f"[INFO] Import paczki: {zip_path}")
-            changed = _extract_zip_overwrite(Path(zip_path), stamp)
-            self._append_out(f"[INFO] Nadpisano plików: {len(changed)}")
+            stats: dict = {}
+            changed = _extract_zip_overwrite(Path(zip_path), stamp, stats)
+            self._append_out(
+                f"[INFO] Nadpisano plików: {len(changed)} z {stats.get('total', len(changed))}"
+                f" (porównanie {stats.get('scan_s', 0):.2f}s, rozpakowanie {stats.get('extract_s', 0):.2f}s,"
+                f" podmiana {stats.get('swap_s', 0):.2f}s)"
+            )
             for c in changed[:80]:
                 self._append_out(f" - {c}")
             if len(changed) > 80:
                 self._append_out(" - … (lista skrócona w UI, pełna w logu)")
-            _write_log(stamp, "[INFO] ZIP updated files:\n" + "\n".join(changed), kind="update")
+            _write_log(
+                stamp,
+                f"[INFO] ZIP delta: {stats}\n[INFO] ZIP updated files:\n" + "\n".join(changed),
+                kind="update",
+            )
             self.check_remote_status()
             messagebox.showinfo("Aktualizacje", "Wgrano paczkę. Program uruchomi się ponownie.")
             _restart_app()
@@ -19,7 +19,12 @@ from typing import Optional, Tuple
 logger = logging.getLogger(__name__)
 
 
-def remote_branch_exists(remote: str, branch: str, cwd: Path | None = None) -> bool:
+def remote_branch_exists(
+    remote: str,
+    branch: str,
+    cwd: Path | None = None,
+    timeout: float | None = None,
+) -> bool:
     """Check if ``branch`` exists on ``remote``.
 
     Parameters
@@ -30,6 +35,8 @@ def remote_branch_exists(remote: str, branch: str, cwd: Path | None = None) -> b
         Nazwa gałęzi do sprawdzenia.
     cwd:
         Katalog roboczy dla polecenia ``git``.
+    timeout:
+        Limit czasu (w sekundach) dla ``git ls-remote``; ``None`` bez limitu.
 
     Returns
     -------
@@ -45,6 +52,7 @@ def remote_branch_exists(remote: str, branch: str, cwd: Path | None = None) -> b
         stderr=subprocess.PIPE,
         text=True,
         check=True,
+        timeout=timeout,
     )
     return bool(result.stdout.strip())
 
@@ -120,8 +120,8 @@ def panel_ustawien(
     def _mark_dirty(*_args):
         panel._dirty = True
 
-    for var in panel.vars.values():
-        var.trace_add("write", _mark_dirty)
+    # variables of tabs built later (on first selection) are traced as well
+    panel.bind_vars(lambda _key, var: var.trace_add("write", _mark_dirty))
 
     # Intercept tab changes and window close to warn about unsaved changes.
     prev_tab = {"id": panel.nb.select()}
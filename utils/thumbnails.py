@@ -0,0 +1,281 @@
+"""Thumbnail cache for tool images and DXF previews.
+
+Thumbnails are stored on disk under ``<data_root>/cache/thumbs`` and named
+after a hash of the source path, its mtime, its size and the requested
+thumbnail size – a changed source file gets a new name, so stale entries
+are never read.  Decoded ``PhotoImage`` objects are kept in a small LRU so
+that hovering the same rows again does not decode the image again.
+
+Rendering DXF drawings (ezdxf + matplotlib) is slow, therefore
+:func:`submit_dxf_preview` runs it in a worker process and returns a
+``Future``.  Pillow, ezdxf and matplotlib are optional; without Pillow
+:func:`thumbnail_file` returns ``None`` and callers use the original file.
+
+Usage::
+
+    thumbnails.prewarm(paths)                        # background, visible rows
+    photo = thumbnails.cached_photo(path, size)      # Tk main thread only
+    fut = thumbnails.submit_dxf_preview(dxf_path)    # -> path of the PNG
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List
+
+try:  # Pillow is optional
+    from PIL import Image  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZE = (600, 800)
+PHOTO_LRU_SIZE = 64
+PREWARM_WORKERS = 2
+
+# Overrides the cache location (tests, portable installs).
+CACHE_DIR: str | None = None
+
+_PHOTOS: "OrderedDict[str, Any]" = OrderedDict()
+_POOL_LOCK = threading.Lock()
+_DXF_POOL: Executor | None = None
+_PREWARM_POOL: ThreadPoolExecutor | None = None
+# (path, size) -> future still queued or running in the prewarm pool
+_PREWARM_PENDING: "dict[tuple[str, tuple[int, int]], Future]" = {}
+
+
+def cache_dir() -> str:
+    if CACHE_DIR:
+        return CACHE_DIR
+    from config.paths import join_path
+
+    return join_path("paths.data_root", "cache", "thumbs")
+
+
+def source_key(path: str, size: tuple[int, int] = DEFAULT_SIZE) -> str | None:
+    """Cache key of ``path`` at ``size`` or ``None`` if the file is missing."""
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{size[0]}x{size[1]}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _render_thumbnail(src: str, dest: str, size: tuple[int, int]) -> None:
+    with Image.open(src) as img:
+        img.thumbnail(size)
+        img.save(dest, "PNG")
+
+
+def thumbnail_file(
+    path: str,
+    size: tuple[int, int] = DEFAULT_SIZE,
+    render: Callable[[str, str, tuple[int, int]], None] | None = None,
+) -> str | None:
+    """Return the cached thumbnail of ``path``, creating it when needed.
+
+    ``render(src, dest, size)`` writes the thumbnail (Pillow by default).
+    Returns ``None`` when the source does not exist, Pillow is missing or
+    rendering failed.  Safe to call from worker threads.
+    """
+
+    key = source_key(path, size)
+    if key is None:
+        return None
+    target = os.path.join(cache_dir(), key[:2], key + ".png")
+    if os.path.exists(target):
+        return target
+    if render is None:
+        if Image is None:
+            return None
+        render = _render_thumbnail
+    tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        render(path, tmp, size)
+        os.replace(tmp, target)
+    except Exception as e:
+        logger.warning("[THUMBS] Nie udało się utworzyć miniatury %s: %s", path, e)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return None
+    return target
+
+
+# ----------------------------------------------------------------------
+# PhotoImage LRU (Tk objects – use from the main thread only)
+
+def cached_photo(path: str, size: tuple[int, int] = DEFAULT_SIZE) -> Any | None:
+    key = source_key(path, size)
+    if key is None:
+        return None
+    photo = _PHOTOS.get(key)
+    if photo is not None:
+        _PHOTOS.move_to_end(key)
+    return photo
+
+
+def remember_photo(path: str, size: tuple[int, int], photo: Any) -> None:
+    key = source_key(path, size)
+    if key is None or photo is None:
+        return
+    _PHOTOS[key] = photo
+    _PHOTOS.move_to_end(key)
+    while len(_PHOTOS) > PHOTO_LRU_SIZE:
+        _PHOTOS.popitem(last=False)
+
+
+def clear_photos() -> None:
+    _PHOTOS.clear()
+
+
+# ----------------------------------------------------------------------
+# Background work
+
+def dxf_preview_path(dxf_path: str) -> str:
+    return os.path.splitext(dxf_path)[0] + "_dxf.png"
+
+
+def render_dxf_preview(dxf_path: str, size: tuple[int, int] = DEFAULT_SIZE) -> str | None:
+    """Render ``<name>_dxf.png`` next to ``dxf_path``; ``None`` on error.
+
+    Runs in the DXF worker process, but can be called directly as well.
+    """
+
+    try:  # pragma: no cover - zależne od opcjonalnych bibliotek
+        import ezdxf
+        from ezdxf.addons.drawing import matplotlib as ezdxf_matplotlib
+        import matplotlib.pyplot as plt
+
+        doc = ezdxf.readfile(dxf_path)
+        fig = ezdxf_matplotlib.draw(doc.modelspace())
+        png_path = dxf_preview_path(dxf_path)
+        fig.savefig(png_path)
+        plt.close(fig)
+        if Image is not None:
+            try:
+                with Image.open(png_path) as img:
+                    img.thumbnail(size)
+                    img.save(png_path)
+            except OSError:  # Pillow best effort
+                pass
+        return png_path
+    except (OSError, ImportError, ValueError, RuntimeError) as e:  # pragma: no cover - best effort
+        logger.warning("[THUMBS] Błąd generowania miniatury DXF %s: %s", dxf_path, e)
+        return None
+
+
+def _init_dxf_worker() -> None:  # pragma: no cover - runs in the child process
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+    except Exception:
+        pass
+
+
+def _dxf_executor() -> Executor:
+    global _DXF_POOL
+    with _POOL_LOCK:
+        if _DXF_POOL is None:
+            pool: Executor | None = None
+            if not getattr(sys, "frozen", False):
+                try:
+                    pool = ProcessPoolExecutor(max_workers=1, initializer=_init_dxf_worker)
+                except (OSError, ValueError, NotImplementedError) as e:
+                    logger.info("[THUMBS] Brak puli procesów (%s) – wątek", e)
+            _DXF_POOL = pool or ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="dxf-preview"
+            )
+        return _DXF_POOL
+
+
+def submit_dxf_preview(dxf_path: str, size: tuple[int, int] = DEFAULT_SIZE) -> Future:
+    """Render the DXF preview in the background; the future yields its path."""
+
+    global _DXF_POOL
+    try:
+        return _dxf_executor().submit(render_dxf_preview, dxf_path, size)
+    except RuntimeError:  # broken/shut down pool – start a fresh one
+        with _POOL_LOCK:
+            _DXF_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dxf-preview")
+        return _DXF_POOL.submit(render_dxf_preview, dxf_path, size)
+
+
+def prewarm(paths: Iterable[str], size: tuple[int, int] = DEFAULT_SIZE) -> List[Future]:
+    """Create missing disk thumbnails for ``paths`` in background threads.
+
+    Paths whose thumbnail is already queued or being rendered are skipped;
+    only the newly submitted futures are returned.
+    """
+
+    global _PREWARM_POOL
+    if Image is None:
+        return []
+    todo = list(dict.fromkeys(p for p in paths if p))
+    if not todo:
+        return []
+    with _POOL_LOCK:
+        if _PREWARM_POOL is None:
+            _PREWARM_POOL = ThreadPoolExecutor(
+                max_workers=PREWARM_WORKERS, thread_name_prefix="thumbs"
+            )
+        pool = _PREWARM_POOL
+        submitted = []
+        for p in todo:
+            key = (p, tuple(size))
+            if key in _PREWARM_PENDING:
+                continue
+            fut = _PREWARM_PENDING[key] = pool.submit(thumbnail_file, p, size)
+            submitted.append((key, fut))
+    for key, fut in submitted:
+        fut.add_done_callback(lambda f, key=key: _prewarm_done(key, f))
+    return [fut for _key, fut in submitted]
+
+
+def _prewarm_done(key: tuple[str, tuple[int, int]], fut: Future) -> None:
+    with _POOL_LOCK:
+        if _PREWARM_PENDING.get(key) is fut:
+            del _PREWARM_PENDING[key]
+
+
+@atexit.register
+def shutdown() -> None:
+    global _DXF_POOL, _PREWARM_POOL
+    with _POOL_LOCK:
+        pools = (_DXF_POOL, _PREWARM_POOL)
+        _DXF_POOL = _PREWARM_POOL = None
+        _PREWARM_PENDING.clear()
+    # outside the lock: cancelled futures run _prewarm_done, which takes it
+    for pool in pools:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = [
+    "DEFAULT_SIZE",
+    "PHOTO_LRU_SIZE",
+    "cache_dir",
+    "cached_photo",
+    "clear_photos",
+    "dxf_preview_path",
+    "prewarm",
+    "remember_photo",
+    "render_dxf_preview",
+    "shutdown",
+    "source_key",
+    "submit_dxf_preview",
+    "thumbnail_file",
+]
@@ -0,0 +1,132 @@
+"""Shared index of ``# Wersja pliku:`` headers.
+
+The updater's version table, ``kreator_sprawdzenia`` and
+``wymagane_pliki_version_check`` all need the version header of Python
+files.  The index keeps, per file, the header lines found in the first
+``HEAD_CHARS`` characters and re-reads a file only when its
+``(mtime_ns, size)`` changes.  The first scan of a tree reads the files in a
+thread pool; later scans only stat them.
+
+Usage::
+
+    idx = version_index.get_index()
+    idx.scan(Path("."), skip_dirs={".git", "venv"})   # -> [(path, version)]
+    idx.version("start.py")                            # -> "1.0.2" / None
+    idx.header_lines("start.py")                       # -> ("# Wersja pliku: 1.0.2",)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+HEAD_CHARS = 16384
+SCAN_WORKERS = 8
+
+_HEADER_LINE_RE = re.compile(r"Wersja\s+pliku:")
+_VERSION_RE = re.compile(r"^#\s*Wersja pliku:\s*(.+)$")
+
+Entry = Tuple[int, int, Tuple[str, ...]]  # mtime_ns, size, header lines
+
+
+def _read_header_lines(path: str) -> Tuple[str, ...]:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        head = f.read(HEAD_CHARS)
+    return tuple(line for line in head.splitlines() if _HEADER_LINE_RE.search(line))
+
+
+class VersionIndex:
+    """Version headers cached by ``(path, mtime_ns, size)``."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Entry] = {}
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, path: str, st: os.stat_result) -> Optional[Tuple[str, ...]]:
+        entry = self._entries.get(path)
+        if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            return entry[2]
+        return None
+
+    def _load(self, path: str, st: os.stat_result) -> Tuple[str, ...]:
+        try:
+            lines = _read_header_lines(path)
+        except OSError:
+            lines = ()
+        with self._lock:
+            self._entries[path] = (st.st_mtime_ns, st.st_size, lines)
+        return lines
+
+    def header_lines(self, path: os.PathLike | str) -> Tuple[str, ...]:
+        """Lines containing ``Wersja pliku:`` in the head of ``path``.
+
+        Raises ``FileNotFoundError`` when the file does not exist.
+        """
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        cached = self._lookup(key, st)
+        return cached if cached is not None else self._load(key, st)
+
+    def version(self, path: os.PathLike | str) -> Optional[str]:
+        """Value of the first ``# Wersja pliku: X`` line or ``None``."""
+        try:
+            lines = self.header_lines(path)
+        except OSError:
+            return None
+        return _version_from(lines)
+
+    def scan(self, root: os.PathLike | str, skip_dirs: Iterable[str] = (),
+             suffix: str = ".py") -> List[Tuple[str, str]]:
+        """``(absolute path, version)`` for files under ``root`` with a header.
+
+        Unchanged files are served from the cache; the others are read in
+        ``SCAN_WORKERS`` threads.
+        """
+        skip = set(skip_dirs)
+        stats: List[Tuple[str, os.stat_result]] = []
+        for base, dirs, files in os.walk(os.path.abspath(root)):
+            dirs[:] = [d for d in dirs if d not in skip]
+            for fname in files:
+                if fname.endswith(suffix):
+                    path = os.path.join(base, fname)
+                    try:
+                        stats.append((path, os.stat(path)))
+                    except OSError:
+                        continue
+        stale = [(p, st) for p, st in stats if self._lookup(p, st) is None]
+        if len(stale) > 1:
+            with ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="versions") as pool:
+                list(pool.map(lambda item: self._load(*item), stale))
+        elif stale:
+            self._load(*stale[0])
+        out = []
+        for path, _st in stats:
+            ver = _version_from(self._entries.get(path, (0, 0, ()))[2])
+            if ver:
+                out.append((path, ver))
+        return out
+
+
+def _version_from(lines: Tuple[str, ...]) -> Optional[str]:
+    for line in lines:
+        m = _VERSION_RE.match(line)
+        if m:
+            return m.group(1).strip()
+    return None
+
+
+_INDEX = VersionIndex()
+
+
+def get_index() -> VersionIndex:
+    return _INDEX
+
+
+__all__ = ["HEAD_CHARS", "VersionIndex", "get_index"]
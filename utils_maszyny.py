@@ -9,6 +9,8 @@ import time
 import unicodedata
 from typing import Any, Dict, Iterable, List, Tuple
 
+from services import search_service
+
 PRIMARY_DATA = os.path.join("data", "maszyny.json")
 LEGACY_DATA = os.path.join("data", "maszyny", "maszyny.json")
 PLACEHOLDER_PATH = os.path.join("grafiki", "machine_placeholder.png")
@@ -322,3 +324,4 @@ def apply_machine_updates(machine: dict, updates: dict) -> bool:
 def save_machines(rows: Iterable[dict]) -> None:
     data = sort_machines(rows)
     _save_json_file(PRIMARY_DATA, data)
+    search_service.notify_saved(search_service.DOMAIN_MACHINES, PRIMARY_DATA)
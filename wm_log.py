@@ -12,6 +12,7 @@ def bind_settings_getter(getter: Callable[[str], Any]) -> None:
     """Podłącz funkcję pobierającą ustawienia (np. lambda k: settings_state.get(k))."""
     global _SETTINGS_GETTER
     _SETTINGS_GETTER = getter
+    refresh_levels()
 
 
 def _get_setting(key: str, default: Any = None) -> Any:
@@ -41,22 +42,44 @@ def _term_supports_color() -> bool:
     return sys.stdout.isatty()
 
 
-def _enabled(level_name: str) -> bool:
+# Cache wyniku _enabled: (ważny_do, zbiór włączonych tagów). Ustawienia są
+# czytane najwyżej raz na _LEVEL_TTL_S, więc wyłączone dbg() kosztuje jedno
+# porównanie czasu i lookup w zbiorze.
+_LEVEL_TTL_S = 2.0
+_LEVEL_CACHE: tuple[float, frozenset[str]] = (0.0, frozenset())
+
+
+def _compute_enabled_tags() -> frozenset[str]:
     # Flaga debug
     debug_enabled = bool(_get_setting("system.debug_enabled", True))
     # Globalny poziom
     lvl = str(_get_setting("system.log_level", "debug")).lower()
     min_level = _LEVELS.get(lvl, 10)
-    cur_level = {"DBG": 10, "INFO": 20, "ERR": 30}[level_name]
-    if cur_level < min_level:
-        # filtr progu
-        if level_name == "DBG" and not debug_enabled:
-            return False
-        return False
+    tags = {
+        tag
+        for tag, cur_level in (("DBG", 10), ("INFO", 20), ("ERR", 30))
+        if cur_level >= min_level
+    }
     # Dla DBG dodatkowo sprawdź flagę
-    if level_name == "DBG" and not debug_enabled:
-        return False
-    return True
+    if not debug_enabled:
+        tags.discard("DBG")
+    return frozenset(tags)
+
+
+def refresh_levels() -> None:
+    """Wymusza ponowny odczyt ``system.log_level``/``system.debug_enabled``."""
+    global _LEVEL_CACHE
+    _LEVEL_CACHE = (0.0, frozenset())
+
+
+def _enabled(level_name: str) -> bool:
+    global _LEVEL_CACHE
+    expires, tags = _LEVEL_CACHE
+    now = time.monotonic()
+    if now >= expires:
+        tags = _compute_enabled_tags()
+        _LEVEL_CACHE = (now + _LEVEL_TTL_S, tags)
+    return level_name in tags
 
 
 def _kv_pairs(kv: dict[str, Any]) -> str:
@@ -1,10 +1,12 @@
 # Plik: kreator_sprawdzenia.py
-# Wersja: 1.1
+# Wersja: 1.2
 # Opis: Sprawdza obecność plików i wersję deklarowaną w nagłówku (komentarz # Wersja pliku: ...)
 
 import os
 import re
 
+from utils import version_index
+
 # Lista wymaganych plików i oczekiwanych wersji
 wymagane_pliki = {
     "start.py": "1.4.7",
@@ -18,18 +20,18 @@ wymagane_pliki = {
 
 def sprawdz_wersje(plik, oczekiwana):
     try:
-        with open(plik, "r", encoding="utf-8") as f:
-            for linia in f:
-                match = re.match(r"# Wersja pliku:\s*(\S+)", linia)
-                if match:
-                    znaleziona = match.group(1)
-                    if oczekiwana is None or znaleziona == oczekiwana:
-                        return f"✅ {plik} – wersja OK ({znaleziona})"
-                    else:
-                        return f"⚠️ {plik} – wersja NIEZGODNA (znaleziona {znaleziona}, oczekiwana {oczekiwana})"
-            return f"⚠️ {plik} – brak nagłówka wersji"
+        linie = version_index.get_index().header_lines(plik)
     except FileNotFoundError:
         return f"❌ Brakuje: {plik}"
+    for linia in linie:
+        match = re.match(r"# Wersja pliku:\s*(\S+)", linia)
+        if match:
+            znaleziona = match.group(1)
+            if oczekiwana is None or znaleziona == oczekiwana:
+                return f"✅ {plik} – wersja OK ({znaleziona})"
+            else:
+                return f"⚠️ {plik} – wersja NIEZGODNA (znaleziona {znaleziona}, oczekiwana {oczekiwana})"
+    return f"⚠️ {plik} – brak nagłówka wersji"
 
 def sprawdz():
     print("\n🛠 Sprawdzanie plików i wersji Warsztat Menager...")
@@ -1,62 +1,345 @@
+"""Przypisania zadań do użytkowników (narzędzia, zlecenia...).
+
+Stan trzymany jest w pamięci z indeksami po użytkowniku, zadaniu i
+kontekście. Zmiany dopisywane są jako linie do dziennika
+``zadania_przypisania.log.jsonl``; co ``COMPACT_EVERY`` wpisów dziennik
+jest zwijany do ``zadania_przypisania.json`` (ten sam format listy co
+wcześniej). Dopisania zrobione przez inny proces są doczytywane z ogona
+dziennika. Zapis (doczytanie + dopisanie) i kompakcja odbywają się pod
+blokadą pliku ``zadania_przypisania.json.lock``, więc procesy na wspólnym
+katalogu danych nie gubią nawzajem swoich operacji.
+
+Panele mogą słuchać zmian przez :func:`subscribe`::
+
+    unsubscribe = zadania_assign_io.subscribe(lambda ev: refresh())
+"""
+
 from __future__ import annotations
 
 import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from threading import RLock
+from typing import Any, Callable, Dict, List, Tuple
 
 DATA_PATH = Path("data") / "zadania_przypisania.json"
+COMPACT_EVERY = 200
 
+logger = logging.getLogger(__name__)
 
-def _load_all() -> List[Dict[str, Any]]:
-    """Load all assignment records from the JSON file."""
-    if DATA_PATH.exists():
-        try:
-            with open(DATA_PATH, encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                return data
-        except (OSError, json.JSONDecodeError):
+Key = Tuple[str, str]  # (task, context)
+
+
+try:  # blokada pliku między procesami
+    import fcntl
+
+    def _lock_file(f) -> None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+
+    def _unlock_file(f) -> None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+
+except ImportError:  # pragma: no cover - Windows
+    try:
+        import msvcrt
+
+        def _lock_file(f) -> None:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+        def _unlock_file(f) -> None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    except ImportError:  # pragma: no cover - brak blokady
+        def _lock_file(_f) -> None:
             pass
-    return []
 
+        def _unlock_file(_f) -> None:
+            pass
+
+
+def _log_path(path: Path) -> Path:
+    return path.with_name(path.stem + ".log.jsonl")
+
+
+def _file_sig(path: Path) -> Tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class AssignmentStore:
+    """Indeksowany stan przypisań z dziennikiem zmian i kompakcją."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.log_path = _log_path(self.path)
+        self._lock = RLock()
+        self._records: Dict[Key, Dict[str, Any]] = {}
+        self._order: Dict[Key, int] = {}
+        self._seq = 0
+        self._by_user: Dict[str, Dict[Key, None]] = {}
+        self._by_task: Dict[str, Dict[Key, None]] = {}
+        self._by_context: Dict[str, Dict[Key, None]] = {}
+        self._snapshot_sig: Tuple[int, int] | None = None
+        self._log_offset = 0
+        self._log_lines = 0
+        self._loaded = False
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock_depth = 0
+        self._lock_f = None
+
+    @contextmanager
+    def _file_locked(self):
+        """Blokada wątków i procesów (plik ``<path>.lock``); wielokrotnego wejścia."""
+        with self._lock:
+            if self._lock_depth == 0:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._lock_f = open(self.path.with_name(self.path.name + ".lock"), "a+b")
+                try:
+                    _lock_file(self._lock_f)
+                except OSError:
+                    self._lock_f.close()
+                    self._lock_f = None
+                    raise
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_f is not None:
+                    try:
+                        _unlock_file(self._lock_f)
+                    finally:
+                        self._lock_f.close()
+                        self._lock_f = None
+
+    # ----- indeksy -----
+    def _index(self, key: Key, rec: Dict[str, Any]) -> None:
+        self._by_user.setdefault(rec.get("user"), {})[key] = None
+        self._by_task.setdefault(key[0], {})[key] = None
+        self._by_context.setdefault(key[1], {})[key] = None
+
+    def _unindex(self, key: Key, rec: Dict[str, Any]) -> None:
+        for idx, value in (
+            (self._by_user, rec.get("user")),
+            (self._by_task, key[0]),
+            (self._by_context, key[1]),
+        ):
+            bucket = idx.get(value)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del idx[value]
+
+    def _apply(self, op: Dict[str, Any]) -> bool:
+        key = (op.get("task"), op.get("context"))
+        current = self._records.get(key)
+        if op.get("op") == "unassign":
+            if current is None:
+                return False
+            self._unindex(key, current)
+            del self._records[key]
+            del self._order[key]
+            return True
+        user = op.get("user")
+        if current is not None:
+            if current.get("user") == user:
+                return False
+            self._unindex(key, current)
+            current["user"] = user
+            self._index(key, current)
+            return True
+        rec = {"task": key[0], "user": user, "context": key[1]}
+        self._records[key] = rec
+        self._order[key] = self._seq
+        self._seq += 1
+        self._index(key, rec)
+        return True
+
+    # ----- pliki -----
+    def _reload(self) -> None:
+        self._records.clear()
+        self._order.clear()
+        self._by_user.clear()
+        self._by_task.clear()
+        self._by_context.clear()
+        data: Any = []
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                data = []
+        for rec in data if isinstance(data, list) else []:
+            if isinstance(rec, dict):
+                self._apply({"op": "assign", **rec})
+        self._snapshot_sig = _file_sig(self.path)
+        self._log_offset = 0
+        self._log_lines = 0
+        self._loaded = True
+
+    def _replay_log(self) -> List[Dict[str, Any]]:
+        applied: List[Dict[str, Any]] = []
+        try:
+            size = self.log_path.stat().st_size
+        except OSError:
+            size = 0
+        if size < self._log_offset:  # dziennik zwinięty przez inny proces
+            self._reload()
+        if size <= self._log_offset:
+            return applied
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # niedokończona linia – doczytamy później
+                self._log_offset += len(raw)
+                self._log_lines += 1
+                try:
+                    op = json.loads(raw.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    continue
+                if isinstance(op, dict) and self._apply(op):
+                    applied.append(op)
+        return applied
 
-def _save_all(data: List[Dict[str, Any]]) -> None:
-    """Persist assignment records to the JSON file."""
-    DATA_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(DATA_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    def sync(self) -> None:
+        """Doczytaj zmiany z dysku (kompakcja lub dopisania innego procesu)."""
+
+        with self._lock:
+            external = False
+            if not self._loaded or _file_sig(self.path) != self._snapshot_sig:
+                external = self._loaded
+                self._reload()
+            changed = self._replay_log()
+        if external:
+            self._emit({"op": "reload"})
+        for op in changed:
+            self._emit(op)
+
+    def _append(self, op: Dict[str, Any]) -> None:
+        """Dopisz ``op`` (pod :meth:`_file_locked`, po :meth:`sync`)."""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        line = (json.dumps(op, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.log_path, "ab") as f:
+            f.write(line)
+            self._log_offset = f.tell()
+        self._log_lines += 1
+
+    def compact(self) -> None:
+        """Zapisz stan do pliku głównego i wyczyść dziennik.
+
+        Przed zapisem doczytywany jest dziennik, więc operacje dopisane przez
+        inny proces trafiają do stanu zamiast przepaść przy czyszczeniu.
+        """
+
+        with self._file_locked():
+            self.sync()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(list(self._records.values()), f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+            # kolejność ma znaczenie: przy awarii po zapisie stanu dziennik
+            # jest jeszcze raz odtwarzany, a operacje są idempotentne
+            with open(self.log_path, "wb"):
+                pass
+            self._snapshot_sig = _file_sig(self.path)
+            self._log_offset = 0
+            self._log_lines = 0
+
+    # ----- operacje -----
+    def write(self, op: Dict[str, Any]) -> None:
+        with self._file_locked():
+            self.sync()
+            op = dict(op, ts=datetime.now(timezone.utc).isoformat())
+            if not self._apply(op):
+                return
+            self._append(op)
+            if self._log_lines >= COMPACT_EVERY:
+                try:
+                    self.compact()
+                except OSError as e:
+                    logger.warning("[ASSIGN] kompakcja nieudana: %s", e)
+        self._emit(op)
+
+    def select(self, index: str | None = None, value: Any = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            self.sync()
+            if index is None:
+                return [dict(rec) for rec in self._records.values()]
+            bucket = getattr(self, f"_by_{index}").get(value, {})
+            if len(bucket) > 1:  # kolejność jak w pliku (kolejność dodania)
+                order = self._order
+                bucket = sorted(bucket, key=order.__getitem__)
+            return [dict(self._records[k]) for k in bucket]
+
+    # ----- kanał zmian -----
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> Callable[[], None]:
+        self._listeners.append(callback)
+
+        def _unsubscribe() -> None:
+            try:
+                self._listeners.remove(callback)
+            except ValueError:
+                pass
+
+        return _unsubscribe
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        for cb in list(self._listeners):
+            try:
+                cb(event)
+            except Exception as e:  # słuchacz nie może zepsuć zapisu
+                logger.warning("[ASSIGN] błąd słuchacza zmian: %s", e)
+
+
+_STORE: AssignmentStore | None = None
+_LISTENERS: List[Callable[[Dict[str, Any]], None]] = []
+
+
+def _store() -> AssignmentStore:
+    global _STORE
+    if _STORE is None or _STORE.path != Path(DATA_PATH):
+        _STORE = AssignmentStore(DATA_PATH)
+        _STORE._listeners = _LISTENERS
+    return _STORE
+
+
+def _load_all() -> List[Dict[str, Any]]:
+    """Load all assignment records (snapshot + change log)."""
+    return _store().select()
 
 
 def assign(task_id: str, user: str, context: str) -> None:
     """Assign ``task_id`` in ``context`` to ``user``."""
-    data = _load_all()
-    for rec in data:
-        if rec.get("task") == task_id and rec.get("context") == context:
-            rec["user"] = user
-            _save_all(data)
-            return
-    data.append({"task": task_id, "user": user, "context": context})
-    _save_all(data)
+    _store().write({"op": "assign", "task": task_id, "user": user, "context": context})
 
 
 def unassign(task_id: str, context: str) -> None:
     """Remove assignment for ``task_id`` in ``context``."""
-    data = [
-        rec
-        for rec in _load_all()
-        if not (rec.get("task") == task_id and rec.get("context") == context)
-    ]
-    _save_all(data)
+    _store().write({"op": "unassign", "task": task_id, "context": context})
 
 
 def list_for_user(user: str) -> List[Dict[str, Any]]:
     """Return assignments for ``user``."""
-    return [rec for rec in _load_all() if rec.get("user") == user]
+    return _store().select("user", user)
+
+
+def list_for_task(task_id: str) -> List[Dict[str, Any]]:
+    """Return assignments of ``task_id`` in all contexts."""
+    return _store().select("task", task_id)
 
 
 def list_in_context(context: str) -> List[Dict[str, Any]]:
     """Return assignments belonging to ``context``."""
-    return [rec for rec in _load_all() if rec.get("context") == context]
+    return _store().select("context", context)
 
 
 def list_all() -> List[Dict[str, Any]]:
@@ -64,10 +347,44 @@ def list_all() -> List[Dict[str, Any]]:
     return _load_all()
 
 
+def subscribe(callback: Callable[[Dict[str, Any]], None]) -> Callable[[], None]:
+    """Call ``callback(event)`` after each change; returns an unsubscribe function.
+
+    ``event`` is the logged operation (``op`` = ``assign``/``unassign`` with
+    ``task``, ``user``, ``context``) or ``{"op": "reload"}`` when the file
+    was rewritten by another process.
+    """
+    return _store().subscribe(callback)
+
+
+def compact() -> None:
+    """Fold the change log into the main JSON file now."""
+    _store().compact()
+
+
+def file_lock(path: Path | str | None = None):
+    """Context manager holding the cross-process write lock of the store.
+
+    For tools rewriting ``zadania_przypisania.json`` or its log outside
+    :class:`AssignmentStore` (e.g. ``data_integrity`` repair): writers in
+    other processes wait, so no line is half-written or appended meanwhile.
+    """
+    target = Path(path) if path is not None else Path(DATA_PATH)
+    store = _store()
+    if os.path.abspath(store.path) != os.path.abspath(target):
+        store = AssignmentStore(target)
+    return store._file_locked()
+
+
 __all__ = [
+    "AssignmentStore",
     "assign",
     "unassign",
     "list_for_user",
+    "list_for_task",
     "list_in_context",
     "list_all",
+    "subscribe",
+    "compact",
+    "file_lock",
 ]
@@ -11,6 +11,7 @@ from datetime import datetime
 
 import bom
 from utils.json_io import _ensure_dirs as _ensure_dirs_impl, _read_json, _write_json
+from services import search_service
 
 DATA_DIR = Path("data")
 BOM_DIR = DATA_DIR / "produkty"
@@ -155,7 +156,9 @@ def create_zlecenie(
         zlec["zlec_wew"] = zlec_wew
     if braki:
         zlec["braki"] = braki
-    _write_json(ZLECENIA_DIR / f"{zlec['id']}.json", zlec)
+    p = ZLECENIA_DIR / f"{zlec['id']}.json"
+    _write_json(p, zlec)
+    search_service.notify_saved(search_service.DOMAIN_ORDERS, str(p))
     return zlec, braki
 
 def _next_id():
@@ -191,6 +194,7 @@ def update_status(zlec_id, new_status, kto="system"):
         "kto": kto, "co": f"status -> {new_status}"
     })
     _write_json(p, j)
+    search_service.notify_saved(search_service.DOMAIN_ORDERS, str(p))
     return j
 
 
@@ -229,6 +233,7 @@ def update_zlecenie(zlec_id, *, ilosc=None, uwagi=None, zlec_wew=None, kto="syst
             }
         )
         _write_json(p, j)
+        search_service.notify_saved(search_service.DOMAIN_ORDERS, str(p))
     return j
 
 def delete_zlecenie(zlec_id: str) -> bool:
@@ -236,6 +241,7 @@ def delete_zlecenie(zlec_id: str) -> bool:
     p = ZLECENIA_DIR / f"{zlec_id}.json"
     if p.exists():
         p.unlink()
+        search_service.notify_saved(search_service.DOMAIN_ORDERS, str(p))
         print(f"[INFO][delete_zlecenie] Usunięto {p.name}")
         return True
     return False
@@ -15,6 +15,7 @@ from typing import Dict, List, Tuple
 from bom import compute_sr_for_pp
 from io_utils import read_json
 from config.paths import get_path, join_path
+from services import search_service
 
 try:  # pragma: no cover - fallback dla środowisk testowych
     from config_manager import ConfigManager  # type: ignore
@@ -341,6 +342,7 @@ def save_order(data: Dict[str, object]) -> None:
     path = join_path(ORDERS_DIR_KEY, f"{filename}.json")
     with open(path, "w", encoding="utf-8") as handle:
         json.dump(data, handle, ensure_ascii=False, indent=2)
+    search_service.notify_saved(search_service.DOMAIN_ORDERS, path)
     print(f"[WM-DBG][ZLECENIA] Zapisano zlecenie {data.get('id')}")
 
 